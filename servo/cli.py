@@ -1085,6 +1085,69 @@ class ServoCLI(CLI):
                     typer.echo(f"{servo_.name}")
                 typer.echo(tabulate(table, headers, tablefmt="plain") + "\n")
 
+        @show_cli.command()
+        def pubsub(
+            context: Context,
+            duration: Optional[str] = typer.Option(
+                "10s",
+                "--duration",
+                "-d",
+                help="Duration to observe pub/sub traffic for",
+                metavar="DURATION",
+                callback=self.duration_callback,
+            ),
+        ) -> None:
+            """
+            Display pub/sub channel and subscriber statistics
+
+            The servos are started locally and sampled for the duration, so the statistics
+            reflect the traffic of a fresh run rather than of a servo running elsewhere.
+            """
+            servos = [
+                servo_ for servo_ in context.assembly.servos
+                if not context.servo or context.servo == servo_
+            ]
+
+            async def _observe() -> List[servo.pubsub.Stats]:
+                await asyncio.gather(*(servo_.startup() for servo_ in servos))
+                try:
+                    await asyncio.sleep(duration.total_seconds())
+                    return [servo_.pubsub_exchange.stats() for servo_ in servos]
+                finally:
+                    await asyncio.gather(*(servo_.shutdown() for servo_ in servos))
+
+            for servo_, stats in zip(servos, run_async(_observe())):
+                if len(context.assembly.servos) > 1:
+                    typer.echo(f"{servo_.name}")
+
+                headers = ["CHANNEL", "PUBLISHED", "PUBLISH RATE", "DELIVERED", "DELIVERY RATE", "RETAINED"]
+                table = [
+                    [
+                        channel.name,
+                        channel.published,
+                        f"{channel.publish_rate:.2f}/s",
+                        channel.delivered,
+                        f"{channel.delivery_rate:.2f}/s",
+                        channel.retained,
+                    ]
+                    for channel in stats.channels
+                ]
+                typer.echo(tabulate(table, headers, tablefmt="plain") + "\n")
+
+                headers = ["SUBSCRIBER", "CONSUMER", "DELIVERED", "DELIVERY RATE", "QUEUE DEPTH", "LAG"]
+                table = [
+                    [
+                        subscriber.selector,
+                        subscriber.consumer,
+                        subscriber.delivered,
+                        f"{subscriber.delivery_rate:.2f}/s",
+                        subscriber.queue_depth,
+                        str(subscriber.lag) if subscriber.lag is not None else "-",
+                    ]
+                    for subscriber in stats.subscribers
+                ]
+                typer.echo(tabulate(table, headers, tablefmt="plain") + "\n")
+
         self.add_cli(show_cli, section=Section.assembly)
 
         @self.command("list", section=Section.assembly)
@@ -20,6 +20,7 @@ __all__ = [
     "BaseConfiguration",
     "BaseServoConfiguration",
     "Optimizer",
+    "PubSubSettings",
     "ServoConfiguration",
 ]
 
@@ -318,6 +319,23 @@ class Timeouts(BaseConfiguration):
         super().__init__(**kwargs)
 
 
+class PubSubSettings(BaseConfiguration):
+    """PubSubSettings models the configuration of the pub/sub Exchange that connects the
+    connectors of a servo assembly.
+    """
+
+    lag_threshold: Optional[servo.types.Duration] = "5s"
+    """The time after which a subscriber that has not handled a message is considered to be lagging.
+
+    A warning is logged when a subscriber starts lagging. Set to `null` to disable lag detection.
+    """
+
+    stats_every: Optional[servo.types.Duration] = None
+    """An optional interval at which traffic statistics are published to the reserved
+    `servo.pubsub.stats` channel.
+    """
+
+
 ProxyKey = pydantic.constr(regex=r"^(https?|all)://")
 
 
@@ -411,6 +429,9 @@ class ServoConfiguration(BaseConfiguration):
     See https://www.python-httpx.org/advanced/#ssl-certificates
     """
 
+    pubsub: Optional[PubSubSettings] = None
+    """Configuration for the pub/sub exchange that connects the connectors of the servo."""
+
     @pydantic.validator("timeouts", pre=True)
     def parse_timeouts(cls, v):
         if isinstance(v, (str, int, float)):
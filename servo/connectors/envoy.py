@@ -0,0 +1,526 @@
+"""Measure Envoy sidecar proxies by scraping their admin stats directly.
+
+Prometheus scrapes and `rate()` windows of minutes set a floor on how quickly a measurement
+of the Envoy sidecars can settle. The Envoy connector scrapes the admin `/stats/prometheus`
+endpoint of each sidecar at sub-second intervals and computes rates and latency quantiles
+in-process over a short sliding window, so readings track the traffic within seconds.
+"""
+import asyncio
+import collections
+import datetime
+import enum
+import re
+import time
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pydantic
+
+import servo
+import servo.connectors.kubernetes
+import servo.connectors.prometheus
+from servo.connectors.prometheus import Aggregation, LabelMatcher
+
+CHANNEL = 'metrics.envoy'
+DEFAULT_ADMIN_PORT = 9901
+DEFAULT_STATS_PATH = "/stats/prometheus"
+
+Labels = FrozenSet[Tuple[str, str]]
+Samples = Dict[Tuple[str, Labels], float]
+
+
+class EnvoyStatType(str, enum.Enum):
+    """An enumeration of the types of Envoy stats and how metrics are computed from them.
+
+    Counters are reported as per second rates, gauges as their current values, and histograms
+    as a quantile of the observations recorded within the rate window.
+    """
+    counter = "counter"
+    gauge = "gauge"
+    histogram = "histogram"
+
+
+class EnvoyMetric(servo.Metric):
+    """EnvoyMetric objects describe metrics computed from the admin stats of Envoy proxies.
+
+    ### Attributes:
+        stat: The name of the stat in the Prometheus exposition format, such as
+            `envoy_cluster_upstream_rq_total`. Histograms are named without the `_bucket` suffix.
+        type: The type of the stat, determining how values are computed.
+        matchers: Label matchers selecting the series of the stat. May be given as a selector
+            body such as `opsani_role!="tuning"`. The labels of a series include the labels of
+            the target it was scraped from. Missing labels match as empty strings.
+        aggregation: The aggregation of the values of the selected series. Histograms always
+            sum their buckets before computing the quantile.
+        quantile: The quantile to compute from histogram stats.
+    """
+    stat: str
+    type: EnvoyStatType = EnvoyStatType.counter
+    matchers: List[LabelMatcher] = []
+    aggregation: Aggregation = Aggregation.sum
+    quantile: Optional[pydantic.confloat(ge=0, le=1)] = None
+
+    @pydantic.validator("matchers", pre=True)
+    @classmethod
+    def _parse_matchers(cls, matchers) -> List[LabelMatcher]:
+        if isinstance(matchers, str):
+            return LabelMatcher.parse_selector(f"{{{matchers}}}")
+        return matchers
+
+    @pydantic.root_validator(skip_on_failure=True)
+    @classmethod
+    def _validate_quantile(cls, values: dict) -> dict:
+        is_histogram = values["type"] == EnvoyStatType.histogram
+        assert is_histogram == (values["quantile"] is not None), "a quantile must be given for histogram stats only"
+        return values
+
+    @property
+    def series_names(self) -> Tuple[str, ...]:
+        """Return the names of the exposed series the metric is computed from."""
+        if self.type == EnvoyStatType.histogram:
+            return (f"{self.stat}_bucket", )
+        return (self.stat, )
+
+    def __check__(self) -> servo.Check:
+        return servo.Check(
+            name=f"Check {self.name}",
+            description=f'Scrape "{self.stat}" from Envoy'
+        )
+
+
+class EnvoyTarget(pydantic.BaseModel):
+    """An Envoy admin endpoint to scrape.
+
+    ### Attributes:
+        url: The base URL of the Envoy admin interface.
+        labels: Labels attached to every series scraped from the target.
+    """
+    url: pydantic.AnyHttpUrl
+    labels: Dict[str, str] = {}
+
+    _normalize_url = pydantic.validator('url', allow_reuse=True)(servo.connectors.prometheus._rstrip_slash)
+
+
+class EnvoyConfiguration(servo.BaseConfiguration):
+    """EnvoyConfiguration objects describe how EnvoyConnector objects scrape and compute
+    measurements from the admin stats of Envoy proxies.
+
+    Targets are given explicitly or discovered from the pods of a Kubernetes Deployment, which
+    are scraped directly at their admin port. Discovered targets are labeled with the labels
+    of their pod (including `opsani_role` for tuning pods) and `pod`.
+    """
+
+    targets: List[EnvoyTarget] = []
+    """Envoy admin endpoints to scrape in addition to those discovered."""
+
+    namespace: Optional[str] = None
+    """The Kubernetes namespace to discover Envoy sidecars in."""
+
+    deployment: Optional[str] = None
+    """The name of a Deployment whose pods (and tuning pod) run Envoy sidecars to scrape."""
+
+    port: pydantic.conint(gt=0, lt=65536) = DEFAULT_ADMIN_PORT
+    """The port of the Envoy admin interface on discovered pods."""
+
+    path: str = DEFAULT_STATS_PATH
+    """The path of the Prometheus formatted stats on the Envoy admin interface."""
+
+    scrape_interval: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("250ms"))
+    """The interval to scrape targets and publish metrics at."""
+
+    rate_window: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("5s"))
+    """The sliding window that rates and histogram quantiles are computed over."""
+
+    discovery_interval: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("30s"))
+    """The interval to rediscover the pods of the Deployment at."""
+
+    timeout: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("1s"))
+    """The timeout for scraping a target."""
+
+    buffer_size: pydantic.PositiveInt = 14_400
+    """The maximum number of computed data points to retain per metric."""
+
+    settlement: Optional[servo.Duration] = None
+    """An optional duration that all metrics must be stable for to end a measurement early."""
+
+    settlement_tolerance: pydantic.confloat(ge=0) = 0.05
+    """The maximum relative spread of the values of a metric during settlement to be stable."""
+
+    metrics: List[EnvoyMetric]
+    """The metrics to compute from the stats of the targets."""
+
+    @pydantic.root_validator(skip_on_failure=True)
+    @classmethod
+    def _validate_targets(cls, values: dict) -> dict:
+        assert values["targets"] or (values["namespace"] and values["deployment"]), (
+            "targets or a namespace and deployment to discover them in must be given"
+        )
+        return values
+
+    @classmethod
+    def generate(cls, **kwargs) -> "EnvoyConfiguration":
+        """Generate a default configuration for measuring Envoy sidecars of a Deployment.
+
+        Returns:
+            A default configuration for EnvoyConnector objects.
+        """
+        return cls(
+            **{**dict(
+                description="Update the namespace and deployment to match your Envoy sidecars",
+                namespace="default",
+                deployment="app",
+                metrics=[
+                    EnvoyMetric(
+                        "request_rate",
+                        servo.Unit.requests_per_second,
+                        stat="envoy_cluster_upstream_rq_total",
+                    ),
+                    EnvoyMetric(
+                        "p99_latency",
+                        servo.Unit.milliseconds,
+                        stat="envoy_cluster_upstream_rq_time",
+                        type=EnvoyStatType.histogram,
+                        quantile=0.99,
+                    ),
+                ],
+            ), **kwargs}
+        )
+
+
+def parse_exposition(text: str, names: Iterable[str]) -> Samples:
+    """Parse the samples of the named series from the Prometheus text exposition format.
+
+    Lines of other series are skipped before their labels are parsed, which keeps scraping the
+    thousands of stats exposed by Envoy cheap when only a few are measured.
+    """
+    names = tuple(names)
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith(names):
+            continue
+
+        name, _, rest = line.partition("{")
+        if rest:
+            labels, _, value = rest.rpartition("}")
+        else:
+            name, _, value = line.partition(" ")
+            labels = ""
+        if name not in names:
+            continue
+
+        samples[(name, frozenset(_LABEL_PATTERN.findall(labels)) if labels else frozenset())] = float(
+            value.split()[0]
+        )
+
+    return samples
+
+
+_LABEL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+class _TargetWindow:
+    """A sliding window of the samples scraped from a target."""
+
+    def __init__(self, labels: Dict[str, str]) -> None:
+        self.labels = labels
+        self.snapshots: Deque[Tuple[float, Samples]] = collections.deque()
+
+    def append(self, timestamp: float, samples: Samples, window: float) -> None:
+        self.snapshots.append((timestamp, samples))
+        # NOTE: The oldest snapshot at or before the start of the window anchors the rates
+        while len(self.snapshots) > 2 and self.snapshots[1][0] <= timestamp - window:
+            self.snapshots.popleft()
+
+    def series(self, metric: EnvoyMetric) -> Iterable[Tuple[Dict[str, str], Optional[float], float]]:
+        """Yield the labels, first value in the window, and last value of the selected series."""
+        if not self.snapshots:
+            return
+
+        (_, first), (_, last) = self.snapshots[0], self.snapshots[-1]
+        for (name, labels), value in last.items():
+            if name not in metric.series_names:
+                continue
+            labels_ = {**self.labels, **dict(labels)}
+            if all(matcher.matches(labels_) for matcher in metric.matchers):
+                yield labels_, first.get((name, labels)), value
+
+    @property
+    def duration(self) -> float:
+        return self.snapshots[-1][0] - self.snapshots[0][0] if self.snapshots else 0.0
+
+
+def _increase(first: Optional[float], last: float) -> float:
+    # NOTE: Counters reset when Envoy restarts
+    if first is None or last < first:
+        return last
+    return last - first
+
+
+class EnvoyScraper:
+    """Scrapes Envoy admin endpoints and computes metric values from the scraped stats.
+
+    Requests to all targets are issued concurrently over a pooled HTTP client. Failed scrapes
+    are logged and skipped, leaving the window of the target to age out.
+    """
+
+    def __init__(self, config: EnvoyConfiguration) -> None: # noqa: D107
+        self.config = config
+        self.targets: List[EnvoyTarget] = list(config.targets)
+        self._windows: Dict[str, _TargetWindow] = {}
+        self._names = tuple(set(name for metric in config.metrics for name in metric.series_names))
+        self._http_client = httpx.AsyncClient(
+            timeout=config.timeout.total_seconds(),
+            limits=httpx.Limits(max_keepalive_connections=None, max_connections=None),
+        )
+
+    async def discover(self) -> List[EnvoyTarget]:
+        """Discover the Envoy sidecars of the pods of the configured Deployment."""
+        if not self.config.deployment:
+            return self.targets
+
+        deployment = await servo.connectors.kubernetes.Deployment.read(self.config.deployment, self.config.namespace)
+        async with servo.connectors.kubernetes.Pod.preferred_client() as api_client:
+            pod_list = await api_client.list_namespaced_pod(
+                namespace=self.config.namespace,
+                label_selector=deployment.label_selector,
+            )
+
+        discovered = [
+            EnvoyTarget(
+                url=f"http://{pod.status.pod_ip}:{self.config.port}",
+                labels={**(pod.metadata.labels or {}), "pod": pod.metadata.name},
+            )
+            for pod in pod_list.items
+            if pod.status.pod_ip and pod.status.phase == "Running"
+        ]
+        self.targets = [*self.config.targets, *discovered]
+        servo.logger.debug(f"Discovered {len(discovered)} Envoy sidecars of Deployment '{self.config.deployment}'")
+        return self.targets
+
+    async def scrape(self) -> Dict[str, servo.DataPoint]:
+        """Scrape all targets and return the current data points of the metrics."""
+        await asyncio.gather(*list(map(self._scrape_target, self.targets)))
+        urls = set(target.url for target in self.targets)
+        for url in list(self._windows.keys()):
+            if url not in urls:
+                del self._windows[url]
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        data_points = {}
+        for metric in self.config.metrics:
+            value = self.value(metric)
+            if value is not None:
+                data_points[metric.name] = servo.DataPoint(metric, now, value)
+        return data_points
+
+    def value(self, metric: EnvoyMetric) -> Optional[float]:
+        """Compute the current value of a metric from the scraped windows."""
+        windows = list(filter(lambda w: w.duration > 0, self._windows.values()))
+        if metric.type == EnvoyStatType.histogram:
+            buckets = collections.defaultdict(float)
+            for window in windows:
+                for labels, first, last in window.series(metric):
+                    buckets[float(labels["le"])] += _increase(first, last)
+            if not buckets:
+                return None
+
+            upper_bounds = np.array(sorted(buckets.keys()))
+            counts = np.array([[buckets[upper_bound]] for upper_bound in upper_bounds])
+            (quantile, ) = servo.connectors.prometheus._histogram_quantile(metric.quantile, upper_bounds, counts)
+            return None if np.isnan(quantile) else float(quantile)
+
+        if metric.type == EnvoyStatType.gauge:
+            values = [last for window in windows for _, _, last in window.series(metric)]
+        else:
+            values = [
+                _increase(first, last) / window.duration
+                for window in windows for _, first, last in window.series(metric)
+            ]
+        if not values:
+            return None
+
+        return float({
+            Aggregation.avg: np.mean,
+            Aggregation.sum: np.sum,
+            Aggregation.min: np.min,
+            Aggregation.max: np.max,
+        }[metric.aggregation](values))
+
+    async def aclose(self) -> None:
+        await self._http_client.aclose()
+
+    async def _scrape_target(self, target: EnvoyTarget) -> None:
+        try:
+            response = await self._http_client.get(
+                f"{target.url}{self.config.path}", params={"usedonly": ""}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as error:
+            servo.logger.warning(f"Failed scraping Envoy stats from {target.url}: {error}")
+            return
+
+        window = self._windows.get(target.url)
+        if window is None:
+            window = self._windows[target.url] = _TargetWindow(target.labels)
+        window.append(time.monotonic(), parse_exposition(response.text, self._names), self.config.rate_window.total_seconds())
+
+
+class EnvoyChecks(servo.BaseChecks):
+    """Checks verifying that the Envoy admin stats of the configured targets can be scraped.
+
+    ### Attributes:
+        config: The connector configuration being checked.
+    """
+    config: EnvoyConfiguration
+
+    @servo.require("Scrape Envoy targets")
+    async def check_targets(self) -> str:
+        """Checks that targets are discovered and their stats can be scraped."""
+        scraper = EnvoyScraper(self.config)
+        try:
+            targets = await scraper.discover()
+            assert targets, "no Envoy targets were found"
+            await scraper.scrape()
+            assert len(scraper._windows) == len(targets), (
+                f"scraped {len(scraper._windows)} of {len(targets)} Envoy targets"
+            )
+        finally:
+            await scraper.aclose()
+
+        return f"scraped {len(targets)} targets"
+
+
+@servo.metadata(
+    description="Envoy admin stats connector for Opsani",
+    version="0.1.0",
+    homepage="https://github.com/opsani/servox",
+    license=servo.License.apache2,
+    maturity=servo.Maturity.experimental,
+)
+class EnvoyConnector(servo.BaseConnector):
+    """A servo connector that measures Envoy proxies by scraping their admin stats.
+
+    ### Attributes:
+        config: The configuration of the connector instance.
+    """
+    config: EnvoyConfiguration
+    _scraper: Optional[EnvoyScraper] = pydantic.PrivateAttr(None)
+    _buffers: Dict[str, Deque[servo.DataPoint]] = pydantic.PrivateAttr(default_factory=dict)
+
+    @servo.on_event()
+    async def startup(self) -> None:
+        self._scraper = EnvoyScraper(self.config)
+        self._buffers = {
+            metric.name: collections.deque(maxlen=self.config.buffer_size) for metric in self.config.metrics
+        }
+        logger = servo.logger.bind(component=f"{self.name} -> {CHANNEL}")
+        logger.info(f"Scraping Envoy stats every {self.config.scrape_interval}")
+        discovered_at = None
+
+        @self.publish(CHANNEL, every=self.config.scrape_interval)
+        async def _publish_metrics(publisher: servo.pubsub.Publisher) -> None:
+            nonlocal discovered_at
+            if discovered_at is None or time.monotonic() - discovered_at >= self.config.discovery_interval.total_seconds():
+                await self._scraper.discover()
+                discovered_at = time.monotonic()
+
+            data_points = await self._scraper.scrape()
+            for name, data_point in data_points.items():
+                self._buffers[name].append(data_point)
+
+            await publisher(servo.pubsub.Message(json=[
+                (name, data_point.time.isoformat(), data_point.value) for name, data_point in data_points.items()
+            ]))
+            logger.trace(f"Published {len(data_points)} metrics.")
+
+    @servo.on_event()
+    async def shutdown(self) -> None:
+        if self._scraper is not None:
+            self.cancel_publishers()
+            await self._scraper.aclose()
+
+    @servo.on_event()
+    async def check(
+        self,
+        matching: Optional[servo.CheckFilter] = None,
+        halt_on: Optional[servo.ErrorSeverity] = servo.ErrorSeverity.critical,
+    ) -> List[servo.Check]:
+        """Checks that the Envoy targets can be discovered and scraped."""
+        return await EnvoyChecks.run(self.config, matching=matching, halt_on=halt_on)
+
+    @servo.on_event()
+    def describe(self) -> servo.Description:
+        """Describes the current state of Metrics measured from Envoy."""
+        return servo.Description(metrics=self.config.metrics)
+
+    @servo.on_event()
+    def metrics(self) -> List[servo.Metric]:
+        """Returns the list of metrics measured from Envoy."""
+        return self.config.metrics
+
+    @servo.on_event()
+    async def measure(
+        self, *, metrics: List[str] = None, control: servo.Control = servo.Control()
+    ) -> servo.Measurement:
+        """Measures the metrics computed from the scraped Envoy stats over the duration of the control.
+
+        When a settlement duration is configured, the measurement returns as soon as the values
+        of every metric have been stable for the settlement duration.
+
+        Args:
+            metrics (List[str], optional): A list of the metric names to measure.
+                When None, all configured metrics are measured. Defaults to None.
+            control (Control, optional): A control descriptor that describes how
+                the measurement is to be captured. Defaults to Control().
+
+        Returns:
+            Measurement: An object that aggregates the readings of the metrics.
+        """
+        metrics__ = [m for m in self.config.metrics if not metrics or m.name in metrics]
+        await asyncio.sleep(control.warmup.total_seconds())
+        start = datetime.datetime.now(datetime.timezone.utc)
+        end = start + control.duration
+        self.logger.info(
+            f"Measuring {len(metrics__)} Envoy metrics for up to {control.duration}: "
+            f"{servo.utilities.join_to_series(list(map(lambda m: m.name, metrics__)))}"
+        )
+
+        while (now := datetime.datetime.now(datetime.timezone.utc)) < end:
+            if self.config.settlement and self._settled(metrics__, start, now):
+                self.logger.info(f"Envoy metrics stable for {self.config.settlement}: reporting after {servo.Duration(now - start)}")
+                break
+            await asyncio.sleep(min(self.config.scrape_interval.total_seconds(), (end - now).total_seconds()))
+
+        readings = []
+        for metric in metrics__:
+            data_points = [
+                data_point for data_point in self._buffers.get(metric.name, ())
+                if start <= data_point.time <= end
+            ]
+            if data_points:
+                readings.append(servo.TimeSeries(metric, data_points, id="envoy"))
+
+        return servo.Measurement(readings=readings)
+
+    def _settled(self, metrics: List[EnvoyMetric], start: datetime.datetime, now: datetime.datetime) -> bool:
+        since = now - self.config.settlement
+        if since < start:
+            return False
+
+        for metric in metrics:
+            values = [
+                data_point.value for data_point in self._buffers.get(metric.name, ())
+                if data_point.time >= since
+            ]
+            # NOTE: Require readings spanning the settlement window rather than a lull in scraping
+            if len(values) < 2:
+                return False
+            spread, scale = max(values) - min(values), abs(np.mean(values))
+            if spread > self.config.settlement_tolerance * scale:
+                return False
+
+        return True
+
+
+app = servo.cli.ConnectorCLI(EnvoyConnector, help="Metrics from Envoy admin stats")
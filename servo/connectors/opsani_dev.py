@@ -1,9 +1,13 @@
+import asyncio
 import json
 import os
 import operator
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pydantic
 
 import servo
+import servo.connectors.envoy
 import servo.connectors.kubernetes
 import servo.connectors.prometheus
 
@@ -27,6 +31,7 @@ class OpsaniDevConfiguration(servo.AbstractBaseConfiguration):
     cpu: servo.connectors.kubernetes.CPU
     memory: servo.connectors.kubernetes.Memory
     prometheus_base_url: str = PROMETHEUS_SIDECAR_BASE_URL
+    envoy_scrape_interval: Optional[servo.Duration] = None
 
     @classmethod
     def generate(cls, **kwargs) -> "OpsaniDevConfiguration":
@@ -87,11 +92,14 @@ class OpsaniDevConfiguration(servo.AbstractBaseConfiguration):
             description="A sidecar configuration for aggregating metrics from Envoy sidecar proxies.",
             base_url=PROMETHEUS_SIDECAR_BASE_URL,
             streaming_interval='10s',
+            # NOTE: Main metrics are grouped to share one query per expression. Tuning counts and
+            # rates keep their per-series queries, as grouping would sum the series of the tuning pod
             metrics=[
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_instance_count",
                     servo.types.Unit.count,
-                    query='sum(envoy_cluster_membership_healthy{opsani_role!="tuning"})',
+                    query='envoy_cluster_membership_healthy',
+                    group=servo.connectors.prometheus.QueryGroup(by="opsani_role", matchers='opsani_role!="tuning"'),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_instance_count",
@@ -106,12 +114,14 @@ class OpsaniDevConfiguration(servo.AbstractBaseConfiguration):
                 servo.connectors.prometheus.PrometheusMetric(
                     "total_request_rate",
                     servo.types.Unit.requests_per_second,
-                    query="sum(rate(envoy_cluster_upstream_rq_total[3m]))",
+                    query='rate(envoy_cluster_upstream_rq_total[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(by="opsani_role"),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_request_rate",
                     servo.types.Unit.requests_per_second,
-                    query='sum(rate(envoy_cluster_upstream_rq_total{opsani_role!="tuning"}[3m]))',
+                    query='rate(envoy_cluster_upstream_rq_total[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(by="opsani_role", matchers='opsani_role!="tuning"'),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_request_rate",
@@ -121,80 +131,303 @@ class OpsaniDevConfiguration(servo.AbstractBaseConfiguration):
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_success_rate",
                     servo.types.Unit.requests_per_second,
-                    query='sum(rate(envoy_cluster_upstream_rq_xx{opsani_role!="tuning", envoy_response_code_class="2"}[3m]))',
+                    query='rate(envoy_cluster_upstream_rq_xx{envoy_response_code_class="2"}[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(by="opsani_role", matchers='opsani_role!="tuning"'),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_success_rate",
                     servo.types.Unit.requests_per_second,
                     query='rate(envoy_cluster_upstream_rq_xx{opsani_role="tuning", envoy_response_code_class="2"}[3m])',
-                    absent=servo.connectors.prometheus.Absent.zero
+                    absent=servo.connectors.prometheus.Absent.zero,
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_error_rate",
                     servo.types.Unit.requests_per_second,
-                    query='sum(rate(envoy_cluster_upstream_rq_xx{opsani_role!="tuning", envoy_response_code_class=~"4|5"}[3m]))',
-                    absent=servo.connectors.prometheus.Absent.zero
+                    query='rate(envoy_cluster_upstream_rq_xx{envoy_response_code_class=~"4|5"}[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(by="opsani_role", matchers='opsani_role!="tuning"'),
+                    absent=servo.connectors.prometheus.Absent.zero,
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_error_rate",
                     servo.types.Unit.requests_per_second,
                     query='rate(envoy_cluster_upstream_rq_xx{opsani_role="tuning", envoy_response_code_class=~"4|5"}[3m])',
-                    absent=servo.connectors.prometheus.Absent.zero
+                    absent=servo.connectors.prometheus.Absent.zero,
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_p99_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.99,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role!="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role!="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.99, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_p99_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.99,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.99, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_p90_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.9,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role!="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role!="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.9, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_p90_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.9,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.9, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "main_p50_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.5,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role!="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role!="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.5, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
                 ),
                 servo.connectors.prometheus.PrometheusMetric(
                     "tuning_p50_latency",
                     servo.types.Unit.milliseconds,
-                    query='avg(histogram_quantile(0.5,rate(envoy_cluster_upstream_rq_time_bucket{opsani_role="tuning"}[3m])))',
+                    query='rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+                    group=servo.connectors.prometheus.QueryGroup(matchers='opsani_role="tuning"'),
+                    histogram=servo.connectors.prometheus.HistogramQuantile(
+                        quantile=0.5, aggregation=servo.connectors.prometheus.Aggregation.avg
+                    ),
+                ),
+            ],
+            **kwargs,
+        )
+
+
+    def generate_envoy_config(
+        self, **kwargs
+    ) -> servo.connectors.envoy.EnvoyConfiguration:
+        """Generate a configuration for measuring the Envoy sidecars of the main and tuning
+        pods directly at sub-second resolution.
+
+        Returns:
+            An Envoy connector configuration object.
+        """
+        if self.envoy_scrape_interval is not None:
+            kwargs.setdefault("scrape_interval", self.envoy_scrape_interval)
+
+        return servo.connectors.envoy.EnvoyConfiguration(
+            description="A configuration for scraping the admin stats of Envoy sidecar proxies.",
+            namespace=self.namespace,
+            deployment=self.deployment,
+            metrics=[
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_main_request_rate",
+                    servo.types.Unit.requests_per_second,
+                    stat="envoy_cluster_upstream_rq_total",
+                    matchers='opsani_role!="tuning"',
+                ),
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_main_error_rate",
+                    servo.types.Unit.requests_per_second,
+                    stat="envoy_cluster_upstream_rq_xx",
+                    matchers='opsani_role!="tuning", envoy_response_code_class=~"4|5"',
+                ),
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_main_p99_latency",
+                    servo.types.Unit.milliseconds,
+                    stat="envoy_cluster_upstream_rq_time",
+                    matchers='opsani_role!="tuning"',
+                    type=servo.connectors.envoy.EnvoyStatType.histogram,
+                    quantile=0.99,
+                ),
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_tuning_request_rate",
+                    servo.types.Unit.requests_per_second,
+                    stat="envoy_cluster_upstream_rq_total",
+                    matchers='opsani_role="tuning"',
+                ),
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_tuning_error_rate",
+                    servo.types.Unit.requests_per_second,
+                    stat="envoy_cluster_upstream_rq_xx",
+                    matchers='opsani_role="tuning", envoy_response_code_class=~"4|5"',
+                ),
+                servo.connectors.envoy.EnvoyMetric(
+                    "envoy_tuning_p99_latency",
+                    servo.types.Unit.milliseconds,
+                    stat="envoy_cluster_upstream_rq_time",
+                    matchers='opsani_role="tuning"',
+                    type=servo.connectors.envoy.EnvoyStatType.histogram,
+                    quantile=0.99,
                 ),
             ],
             **kwargs,
         )
 
 
+class ClusterSnapshot:
+    """A snapshot of the Kubernetes objects and Prometheus targets read by Opsani Dev checks.
+
+    Each object is read once on first use and shared by every check until the snapshot is
+    refreshed. Concurrent reads of the same object share a single request, and failed reads
+    are retained so that dependent checks report the same error without retrying.
+    """
+
+    def __init__(self, config: OpsaniDevConfiguration) -> None: # noqa: D107
+        self.config = config
+        self._reads: Dict[str, asyncio.Future] = {}
+        self._prometheus_client: Optional[servo.connectors.prometheus.Client] = None
+
+    @property
+    def prometheus_client(self) -> servo.connectors.prometheus.Client:
+        """Return a pooled Prometheus client, opening it on first use."""
+        if self._prometheus_client is None:
+            self._prometheus_client = servo.connectors.prometheus.Client(
+                base_url=self.config.prometheus_base_url
+            )
+        return self._prometheus_client
+
+    def refresh(self, *keys: str) -> None:
+        """Discard objects read from the cluster so that they are read again on next use.
+
+        When called without any keys all objects are discarded.
+        """
+        for key in keys or list(self._reads.keys()):
+            self._reads.pop(key, None)
+
+    async def namespace(self) -> servo.connectors.kubernetes.Namespace:
+        return await self._read(
+            "namespace", servo.connectors.kubernetes.Namespace.read, self.config.namespace
+        )
+
+    async def deployment(self) -> servo.connectors.kubernetes.Deployment:
+        return await self._read(
+            "deployment", servo.connectors.kubernetes.Deployment.read, self.config.deployment, self.config.namespace
+        )
+
+    async def service(self) -> servo.connectors.kubernetes.Service:
+        return await self._read(
+            "service", servo.connectors.kubernetes.Service.read, self.config.service, self.config.namespace
+        )
+
+    async def config_map(self, name: str) -> servo.connectors.kubernetes.ConfigMap:
+        return await self._read(
+            f"config_map/{name}", servo.connectors.kubernetes.ConfigMap.read, name, self.config.namespace
+        )
+
+    async def deployment_pods(self) -> List[servo.connectors.kubernetes.Pod]:
+        async def _list_pods() -> List[servo.connectors.kubernetes.Pod]:
+            return await (await self.deployment()).get_pods()
+
+        return await self._read("deployment_pods", _list_pods)
+
+    async def servo_pod(self) -> Optional[servo.connectors.kubernetes.Pod]:
+        return await self._read("servo_pod", self._read_servo_pod)
+
+    async def prometheus_targets(self) -> servo.connectors.prometheus.TargetsResponse:
+        return await self._read("prometheus_targets", self.prometheus_client.list_targets)
+
+    async def aclose(self) -> None:
+        """Close the Prometheus client. Objects read are retained until the snapshot is refreshed."""
+        if self._prometheus_client is not None:
+            await self._prometheus_client.aclose()
+            self._prometheus_client = None
+
+    async def _read(self, key: str, read: Callable[..., Awaitable[Any]], *args) -> Any:
+        future = self._reads.get(key)
+        if future is None:
+            future = self._reads[key] = asyncio.ensure_future(read(*args))
+        # NOTE: Shielded so that a cancelled check does not cancel the read for the others
+        return await asyncio.shield(future)
+
+    async def _read_servo_pod(self) -> Optional[servo.connectors.kubernetes.Pod]:
+        return await self._read_servo_pod_from_env() or next(
+            reversed(await self._list_servo_pods()), None
+        )
+
+    async def _read_servo_pod_from_env(self) -> Optional[servo.connectors.kubernetes.Pod]:
+        """Reads the servo Pod from Kubernetes by referencing the `POD_NAME` and
+        `POD_NAMESPACE` environment variables.
+
+        Returns:
+            The Pod object that was read or None if the Pod could not be read.
+        """
+        pod_name = os.getenv("POD_NAME")
+        pod_namespace = os.getenv("POD_NAMESPACE")
+        if None in (pod_name, pod_namespace):
+            return None
+
+        return await servo.connectors.kubernetes.Pod.read(pod_name, pod_namespace)
+
+    async def _list_servo_pods(self) -> List[servo.connectors.kubernetes.Pod]:
+        """Lists all servo pods in the configured namespace.
+
+        Returns:
+            A list of servo pods in the configured namespace.
+        """
+        async with servo.connectors.kubernetes.Pod.preferred_client() as api_client:
+            label_selector = servo.connectors.kubernetes.selector_string(
+                {"app.kubernetes.io/name": "servo"}
+            )
+            pod_list: servo.connectors.kubernetes.client.V1PodList = (
+                await api_client.list_namespaced_pod(
+                    namespace=self.config.namespace, label_selector=label_selector
+                )
+            )
+
+        pods = [servo.connectors.kubernetes.Pod(p) for p in pod_list.items]
+        return pods
+
+
 class OpsaniDevChecks(servo.BaseChecks):
     config: OpsaniDevConfiguration
+    _snapshot: Optional[ClusterSnapshot] = pydantic.PrivateAttr(None)
+
+    async def run_all(self, **kwargs) -> List[servo.Check]:
+        # NOTE: Checks within a run share reads of the cluster, which is read anew on every run
+        # (e.g. each iteration of `servo check --wait` or remedy and recheck of a single check)
+        self.snapshot.refresh()
+        try:
+            return await super().run_all(**kwargs)
+        finally:
+            if self._snapshot is not None:
+                await self._snapshot.aclose()
+
+    @property
+    def snapshot(self) -> ClusterSnapshot:
+        """Return the snapshot of the cluster shared by the checks."""
+        if self._snapshot is None:
+            self._snapshot = ClusterSnapshot(self.config)
+        return self._snapshot
+
+    @property
+    def prometheus_client(self) -> servo.connectors.prometheus.Client:
+        """Return a pooled Prometheus client shared by the checks."""
+        return self.snapshot.prometheus_client
 
     ##
     # Kubernetes essentials
 
     @servo.checks.require("namespace")
     async def check_kubernetes_namespace(self) -> None:
-        await servo.connectors.kubernetes.Namespace.read(self.config.namespace)
+        await self.snapshot.namespace()
 
     @servo.checks.require("deployment")
     async def check_kubernetes_deployment(self) -> None:
-        await servo.connectors.kubernetes.Deployment.read(self.config.deployment, self.config.namespace)
+        await self.snapshot.deployment()
 
     @servo.checks.require("container")
     async def check_kubernetes_container(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment, self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         container = deployment.find_container(self.config.container)
         assert (
             container
@@ -202,13 +435,11 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("service")
     async def check_kubernetes_service(self) -> None:
-        await servo.connectors.kubernetes.Service.read(self.config.service, self.config.namespace)
+        await self.snapshot.service()
 
     @servo.checks.warn("service type")
     async def check_kubernetes_service_type(self) -> None:
-        service = await servo.connectors.kubernetes.Service.read(
-            self.config.service, self.config.namespace
-        )
+        service = await self.snapshot.service()
         if not service.obj.spec.type in ("ClusterIP", "LoadBalancer"):
             raise ValueError(
                 f"expected service type of ClusterIP or LoadBalancer but found {service.spec.type}"
@@ -219,15 +450,13 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Prometheus ConfigMap exists")
     async def check_prometheus_config_map(self) -> None:
-        config = await servo.connectors.kubernetes.ConfigMap.read(
-            "prometheus-config", self.config.namespace
-        )
+        config = await self.snapshot.config_map("prometheus-config")
         self.logger.trace(f"read Prometheus ConfigMap: {repr(config)}")
         assert config, "failed: no config map named 'prometheus-config'"
 
     @servo.checks.check("Prometheus sidecar is running")
     async def check_prometheus_sidecar_exists(self) -> None:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"no servo pod is running in namespace '{self.config.namespace}'")
 
@@ -238,7 +467,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.check("Prometheus sidecar is ready")
     async def check_prometheus_sidecar_is_ready(self) -> None:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"no servo pod was found")
 
@@ -247,7 +476,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.warn("Prometheus sidecar is stable")
     async def check_prometheus_restart_count(self) -> None:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"no servo pod was found")
 
@@ -260,7 +489,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Prometheus has container port on 9090")
     async def check_prometheus_container_port(self) -> None:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"failed: no servo pod was found")
 
@@ -277,7 +506,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Prometheus is accessible")
     async def check_prometheus_is_accessible(self) -> str:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"no servo pod was found")
 
@@ -287,57 +516,15 @@ class OpsaniDevChecks(servo.BaseChecks):
             len(container.obj.ports) == 1
         ), f"expected 1 container port but found {len(container.obj.ports)}"
 
-        client = servo.connectors.prometheus.Client(base_url=self.config.prometheus_base_url)
-        await client.list_targets()
+        await self.snapshot.prometheus_targets()
         return f"Prometheus is accessible at {self.config.prometheus_base_url}"
 
-    async def _read_servo_pod(self) -> Optional[servo.connectors.kubernetes.Pod]:
-        return await self._read_servo_pod_from_env() or next(
-            reversed(await self._list_servo_pods()), None
-        )
-
-    async def _read_servo_pod_from_env(self) -> Optional[servo.connectors.kubernetes.Pod]:
-        """Reads the servo Pod from Kubernetes by referencing the `POD_NAME` and
-        `POD_NAMESPACE` environment variables.
-
-        Returns:
-            The Pod object that was read or None if the Pod could not be read.
-        """
-        pod_name = os.getenv("POD_NAME")
-        pod_namespace = os.getenv("POD_NAMESPACE")
-        if None in (pod_name, pod_namespace):
-            return None
-
-        return await servo.connectors.kubernetes.Pod.read(pod_name, pod_namespace)
-
-    async def _list_servo_pods(self) -> List[servo.connectors.kubernetes.Pod]:
-        """Lists all servo pods in the configured namespace.
-
-        Returns:
-            A list of servo pods in the configured namespace.
-        """
-        async with servo.connectors.kubernetes.Pod.preferred_client() as api_client:
-            label_selector = servo.connectors.kubernetes.selector_string(
-                {"app.kubernetes.io/name": "servo"}
-            )
-            pod_list: servo.connectors.kubernetes.client.V1PodList = (
-                await api_client.list_namespaced_pod(
-                    namespace=self.config.namespace, label_selector=label_selector
-                )
-            )
-
-        pods = [servo.connectors.kubernetes.Pod(p) for p in pod_list.items]
-        return pods
-
     ##
     # Kubernetes Deployment edits
 
     @servo.checks.require("Deployment PodSpec has expected annotations")
     async def check_deployment_annotations(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment,
-            self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         assert deployment, f"failed to read deployment '{self.config.deployment}' in namespace '{self.config.namespace}'"
 
         # NOTE: Only check for annotation keys
@@ -358,10 +545,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Deployment PodSpec has expected labels")
     async def check_deployment_labels(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment,
-            self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         assert deployment, f"failed to read deployment '{self.config.deployment}' in namespace '{self.config.namespace}'"
 
         labels = deployment.pod_template_spec.metadata.labels
@@ -382,10 +566,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Deployment has Envoy sidecar container")
     async def check_deployment_envoy_sidecars(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment,
-            self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         assert deployment, f"failed to read deployment '{self.config.deployment}' in namespace '{self.config.namespace}'"
 
         # Search the containers list for the sidecar
@@ -403,14 +584,11 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.checks.require("Pods have Envoy sidecar containers")
     async def check_pod_envoy_sidecars(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment,
-            self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         assert deployment, f"failed to read deployment '{self.config.deployment}' in namespace '{self.config.namespace}'"
 
         pods_without_sidecars = []
-        for pod in await deployment.get_pods():
+        for pod in await self.snapshot.deployment_pods():
             # Search the containers list for the sidecar
             if not pod.get_container('opsani-envoy'):
                 # TODO: Add more heuristics about the image, etc.
@@ -425,7 +603,7 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.require("Prometheus is discovering targets")
     async def check_prometheus_targets(self) -> None:
-        pod = await self._read_servo_pod()
+        pod = await self.snapshot.servo_pod()
         if pod is None:
             raise servo.checks.CheckError(f"no servo pod was found")
 
@@ -435,8 +613,7 @@ class OpsaniDevChecks(servo.BaseChecks):
             len(container.obj.ports) == 1
         ), f"expected 1 container port but found {len(container.obj.ports)}"
 
-        client = servo.connectors.prometheus.Client(base_url=self.config.prometheus_base_url)
-        targets = await client.list_targets()
+        targets = await self.snapshot.prometheus_targets()
         assert len(targets.active) > 0, "no active targets were found"
 
         return f"found {targets.active} active targets"
@@ -457,7 +634,7 @@ class OpsaniDevChecks(servo.BaseChecks):
                 step="10s"
             )
         ]
-        client = servo.connectors.prometheus.Client(base_url=self.config.prometheus_base_url)
+        client = self.prometheus_client
         summaries = []
         for metric in metrics:
             response = await client.query(metric)
@@ -508,7 +685,7 @@ class OpsaniDevChecks(servo.BaseChecks):
     @servo.check("Traffic is proxied through Envoy")
     async def check_service_proxy(self) -> str:
         proxy_service_port = ENVOY_SIDECAR_DEFAULT_PORT  # TODO: move to configuration
-        service = await servo.connectors.kubernetes.Service.read(self.config.service, self.config.namespace)
+        service = await self.snapshot.service()
         for port in service.ports:
             if port.target_port == proxy_service_port:
                 return
@@ -525,14 +702,13 @@ class OpsaniDevChecks(servo.BaseChecks):
 
     @servo.check("Tuning pod is running")
     async def check_canary_is_running(self) -> None:
-        deployment = await servo.connectors.kubernetes.Deployment.read(
-            self.config.deployment,
-            self.config.namespace
-        )
+        deployment = await self.snapshot.deployment()
         assert deployment, f"failed to read deployment '{self.config.deployment}' in namespace '{self.config.namespace}'"
 
         try:
             await deployment.ensure_canary_pod()
+            # NOTE: The tuning pod may have just been created
+            self.snapshot.refresh("deployment_pods")
         except Exception as error:
             raise servo.checks.CheckError(
                 f"could not find tuning pod '{deployment.canary_pod_name}''"
@@ -552,7 +728,7 @@ class OpsaniDevChecks(servo.BaseChecks):
                 query=f'rate(envoy_cluster_upstream_rq_total{{opsani_role="tuning", kubernetes_namespace="{self.config.namespace}"}}[10s])'
             ),
         ]
-        client = servo.connectors.prometheus.Client(base_url=self.config.prometheus_base_url)
+        client = self.prometheus_client
         summaries = []
         for metric in metrics:
             response = await client.query(metric)
@@ -594,6 +770,14 @@ class OpsaniDevConnector(servo.BaseConnector):
                 config=self.config.generate_prometheus_config(),
             ),
         )
+        if self.config.envoy_scrape_interval is not None:
+            await servo_.add_connector(
+                "opsani-dev:envoy",
+                servo.connectors.envoy.EnvoyConnector(
+                    optimizer=self.optimizer,
+                    config=self.config.generate_envoy_config(),
+                ),
+            )
 
     @servo.on_event()
     async def check(
@@ -1,5 +1,8 @@
 import abc
+import array
 import asyncio
+import bisect
+import collections
 import datetime
 import enum
 import functools
@@ -7,17 +10,38 @@ import itertools
 import math
 import operator
 import re
-from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Type, Union
+import time
+import warnings
+import weakref
+from typing import Any, Callable, Deque, Dict, Iterable, List, Literal, Optional, Sequence, Tuple, Type, Union
 
 import httpx
+import numpy as np
+import orjson
 import pydantic
 import pytz
 
 import servo
+from servo.connectors.prometheus_remote_read import ChunkedReadDecoder, decode_read_response, encode_read_request
 
 DEFAULT_BASE_URL = "http://prometheus:9090"
 API_PATH = "/api/v1"
 CHANNEL = 'metrics.prometheus'
+ABSENT_LABEL = "servo_absent"
+"""The label marking series produced by the absence probe of a query."""
+REMOTE_READ_HEADERS = {
+    "Content-Encoding": "snappy",
+    "Content-Type": "application/x-protobuf",
+    "X-Prometheus-Remote-Read-Version": "0.1.0",
+}
+"""The headers of requests to the Prometheus remote read API."""
+AUTO_STEP_MAX_POINTS = 1_000
+"""The number of points per series targeted by metrics with a step of `auto`."""
+AUTO_STEPS = tuple(
+    servo.Duration(step)
+    for step in ("1s", "5s", "10s", "15s", "30s", "1m", "2m", "5m", "10m", "15m", "30m", "1h", "2h", "6h", "12h", "1d")
+)
+"""The steps that automatically selected steps are rounded up to."""
 
 class Absent(str, enum.Enum):
     """An enumeration of behaviors for handling absent metrics.
@@ -37,6 +61,136 @@ class Absent(str, enum.Enum):
     warn = "warn"
     fail = "fail"
 
+class MatchType(str, enum.Enum):
+    """An enumeration of the operators that label matchers of series selectors apply."""
+    equal = "="
+    not_equal = "!="
+    regex = "=~"
+    not_regex = "!~"
+
+
+class LabelMatcher(pydantic.BaseModel):
+    """A matcher that selects series by the value of a label.
+
+    ### Attributes:
+        name: The name of the label to match.
+        value: The value or regular expression to match the label against.
+        type: The type of match to apply.
+    """
+    name: str
+    value: str
+    type: MatchType = MatchType.equal
+
+    def matches(self, labels: Dict[str, str]) -> bool:
+        """Return True if the labels of a series match, treating missing labels as empty."""
+        value = labels.get(self.name, "")
+        if self.type == MatchType.equal:
+            return value == self.value
+        elif self.type == MatchType.not_equal:
+            return value != self.value
+        elif self.type == MatchType.regex:
+            return re.fullmatch(self.value, value) is not None
+        return re.fullmatch(self.value, value) is None
+
+    @classmethod
+    def parse_selector(cls, selector: str) -> List["LabelMatcher"]:
+        """Parse a PromQL series selector such as `http_requests_total{job=~"api|web"}` into matchers."""
+        match = re.fullmatch(r"\s*([a-zA-Z_:][a-zA-Z0-9_:]*)?\s*(?:\{(.*)\})?\s*", selector, re.DOTALL)
+        if not match or not any(match.groups()):
+            raise ValueError(f"invalid series selector: '{selector}'")
+
+        name, body = match.groups()
+        matchers = [cls(name="__name__", value=name)] if name else []
+        pattern = re.compile(r'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(=~|!~|!=|=)\s*"((?:[^"\\]|\\.)*)"\s*(?:,|$)')
+        position, body = 0, (body or "").strip()
+        while position < len(body):
+            if not (matcher := pattern.match(body, position)):
+                raise ValueError(f"invalid series selector: '{selector}'")
+            label, operator_, value = matcher.groups()
+            matchers.append(cls(name=label, value=re.sub(r"\\(.)", r"\1", value), type=operator_))
+            position = matcher.end()
+
+        return matchers
+
+
+class Aggregation(str, enum.Enum):
+    """An enumeration of aggregations of series computed locally.
+
+    Aggregations follow the semantics of the PromQL aggregation operators of the same name.
+    """
+    avg = "avg"
+    sum = "sum"
+    min = "min"
+    max = "max"
+
+
+class HistogramQuantile(pydantic.BaseModel):
+    """A quantile computed locally from the buckets of Prometheus histograms.
+
+    The query of the metric must return the bucket rates (or counts) of the histograms as
+    series labeled with `le`, e.g. `rate(http_request_duration_seconds_bucket[5m])`. Buckets are
+    grouped into histograms by their remaining labels and the quantile is computed with the
+    semantics of the PromQL `histogram_quantile` function.
+
+    Metrics that share a query fetch the buckets once, so any number of quantiles can be
+    derived from a single request.
+
+    ### Attributes:
+        quantile: The quantile to compute (0 <= quantile <= 1).
+        aggregation: An optional aggregation of the quantiles of every histogram into a single
+            time series. Defaults to `None`, returning a time series per histogram.
+    """
+    quantile: pydantic.confloat(ge=0, le=1)
+    aggregation: Optional[Aggregation] = None
+
+
+class QueryGroup(pydantic.BaseModel):
+    """Selects the series of a metric from a query that is shared with other metrics.
+
+    Metrics with the same query and grouping are fetched with a single request, such as
+    `sum by (opsani_role) (rate(envoy_cluster_upstream_rq_total[3m]))`, and each metric
+    selects and aggregates its series from the response locally.
+
+    ### Attributes:
+        by: A label to aggregate the query by on the server. Defaults to `None`, fetching the
+            series of the query as is (e.g. histogram buckets to compute quantiles from).
+        aggregation: The aggregation applied by label on the server and across the selected
+            series locally. Must compose over groups, so `avg` is not supported.
+        matchers: Label matchers selecting the series of the metric. May be given as a selector
+            body such as `opsani_role!="tuning"`. Missing labels match as empty strings.
+    """
+    by: Optional[str] = None
+    aggregation: Aggregation = Aggregation.sum
+    matchers: List[LabelMatcher] = []
+
+    @pydantic.validator("aggregation")
+    @classmethod
+    def _validate_aggregation(cls, aggregation) -> Aggregation:
+        assert aggregation != Aggregation.avg, "averages cannot be aggregated across groups"
+        return aggregation
+
+    @pydantic.validator("matchers", pre=True)
+    @classmethod
+    def _parse_matchers(cls, matchers) -> List[LabelMatcher]:
+        if isinstance(matchers, str):
+            return LabelMatcher.parse_selector(f"{{{matchers}}}")
+        return matchers
+
+    def build_query(self, query: str) -> str:
+        """Return the shared query of the group for a base query."""
+        if self.by:
+            return f"{self.aggregation.value} by ({self.by}) ({query})"
+        return query
+
+    def select(self, vectors: Iterable["BaseVector"]) -> List["BaseVector"]:
+        """Return the vectors whose labels match every matcher of the group."""
+        return [
+            vector for vector in vectors
+            if ABSENT_LABEL not in vector.metric
+            and all(matcher.matches(vector.metric) for matcher in self.matchers)
+        ]
+
+
 class PrometheusMetric(servo.Metric):
     """A metric that can be measured by querying Prometheus.
 
@@ -49,19 +203,92 @@ class PrometheusMetric(servo.Metric):
         absent: The behavior to apply when the queried metric is absent.
         eager: The duration to observe the metric and eagerly return a measurement if it does not change.
             Defaults to `None`, disabling eager measurements.
+        max_points: The maximum number of data points per series to query for. When set, `step` is
+            the minimum step and is grown to fit the queried time range (see `step_for`). A step of
+            `auto` is shorthand for the default step with a `max_points` of `AUTO_STEP_MAX_POINTS`.
+        histogram: Computes a quantile locally from the histogram buckets returned by the query.
+            Defaults to `None`, returning the query results as is.
+        raw: Read the raw samples of the series selected by the query through the remote read
+            API instead of evaluating it. The query must be a series selector such as
+            `http_requests_total{job="api"}`. Absent raw metrics are never zeroed.
+        group: Selects the series of the metric locally from a query shared with other metrics
+            (see `QueryGroup`). Absent grouped metrics are detected locally rather than by
+            appending to the query.
     """
     query: str = None
     step: servo.Duration = "1m"
     absent: Absent = Absent.ignore
     eager: Optional[servo.Duration] = None
+    max_points: Optional[pydantic.conint(ge=2)] = None
+    histogram: Optional[HistogramQuantile] = None
+    raw: bool = False
+    group: Optional[QueryGroup] = None
+
+    @pydantic.root_validator(pre=True)
+    @classmethod
+    def _expand_auto_step(cls, values: dict) -> dict:
+        if values.get("step") == "auto":
+            values = {**values, "step": cls.__fields__["step"].default}
+            values.setdefault("max_points", AUTO_STEP_MAX_POINTS)
+        return values
+
+    @pydantic.root_validator(skip_on_failure=True)
+    @classmethod
+    def _validate_group(cls, values: dict) -> dict:
+        if group := values.get("group"):
+            assert not values.get("raw"), "raw metrics cannot be grouped"
+            assert not (group.by and values.get("histogram")), "histogram metrics cannot be grouped by label"
+        return values
+
+    def step_for(self, start: datetime.datetime, end: datetime.datetime) -> servo.Duration:
+        """Return the step to query the metric with over a time range.
 
-    def build_query(self) -> str:
+        Without `max_points`, the configured step is returned. Otherwise the smallest step
+        that is at least the configured step and fits the range into `max_points` points is
+        selected. When the query contains range selectors (e.g. `rate(...[3m])`), the step
+        is a divisor of the shortest window or a multiple of it so that evaluations stay
+        aligned with the windows. Otherwise the step is rounded up to one of `AUTO_STEPS`.
+        """
+        if self.max_points is None:
+            return self.step
+
+        needed = max(
+            self.step.total_seconds(),
+            math.ceil((end - start).total_seconds() / (self.max_points - 1)),
+        )
+        windows = list(map(operator.methodcaller("total_seconds"), _range_windows(self.query)))
+        if windows and (window := int(min(windows))):
+            if needed <= window:
+                # NOTE: The largest number of whole-second steps per window that are still long enough
+                divisions = next(
+                    k for k in range(int(window // needed), 0, -1) if window % k == 0
+                )
+                return servo.Duration(window // divisions)
+
+            return servo.Duration(window * math.ceil(needed / window))
+
+        for step in AUTO_STEPS:
+            if step.total_seconds() >= needed:
+                return step
+
+        day = AUTO_STEPS[-1].total_seconds()
+        return servo.Duration(day * math.ceil(needed / day))
+
+    def build_query(self, *, probe_absent: bool = False) -> str:
         """Build and return a complete Prometheus query string.
 
-        The current implementation handles appending the zero vector suffix.
+        The current implementation handles appending the zero vector suffix and the shared
+        query of grouped metrics. When `probe_absent`
+        is True and the metric warns or fails on absence, an `absent()` probe is appended that
+        returns a series labeled with `ABSENT_LABEL` at each step that the query has no data.
         """
-        if self.absent == Absent.zero:
+        if self.group:
+            # NOTE: Absence is per metric, so it cannot be handled by the shared query
+            return self.group.build_query(self.query)
+        elif self.absent == Absent.zero:
             return self.query + " or on() vector(0)"
+        elif probe_absent and self.absent in {Absent.warn, Absent.fail}:
+            return f'{self.query} or on() label_replace(absent({self.query}), "{ABSENT_LABEL}", "true", "", "")'
         return self.query
 
     @property
@@ -227,6 +454,38 @@ class RangeQuery(QueryRequest):
         return end
 
 
+class RemoteReadRequest(BaseRequest):
+    """A request for the raw samples of series through the Prometheus remote read API.
+
+    Remote read requests are sent as snappy compressed protocol buffers rather than
+    parameters. Streamed chunked responses are preferred over buffered sample responses.
+
+    ### Attributes:
+        endpoint: Constant value of `/read`.
+        selector: A PromQL series selector of the series to read.
+        start: Start time of the time range to read.
+        end: End time of the time range to read.
+    """
+    endpoint: str = pydantic.Field("/read", const=True)
+    param_attrs: Tuple[str] = pydantic.Field((), const=True)
+    selector: str
+    start: datetime.datetime
+    end: datetime.datetime
+
+    @property
+    def matchers(self) -> List[LabelMatcher]:
+        return LabelMatcher.parse_selector(self.selector)
+
+    @property
+    def content(self) -> bytes:
+        """Return the snappy compressed `ReadRequest` protocol buffer of the request."""
+        return encode_read_request(
+            int(self.start.timestamp() * 1000),
+            int(self.end.timestamp() * 1000),
+            [(list(MatchType).index(matcher.type), matcher.name, matcher.value) for matcher in self.matchers],
+        )
+
+
 class ResultType(str, enum.Enum):
     """Types of results returned for Prometheus queries.
 
@@ -308,6 +567,47 @@ class RangeVector(BaseVector):
         return iter(self.values)
 
 
+class ColumnarRangeVector(BaseVector):
+    """A range vector whose samples are held in packed arrays of timestamps and values.
+
+    Columnar range vectors are decoded from matrix results without modeling each sample,
+    which keeps large range query responses compact. Iteration yields time and value pairs
+    as with `RangeVector`.
+
+    ### Attributes:
+        timestamps: The POSIX timestamps of the samples.
+        samples: The values of the samples.
+    """
+    timestamps: array.array
+    samples: array.array
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @classmethod
+    def from_values(cls, metric: Dict[str, str], values: Iterable[Tuple[float, str]]) -> "ColumnarRangeVector":
+        """Return a columnar range vector packed from the `[timestamp, value]` pairs of a matrix result."""
+        timestamps, samples = array.array('d'), array.array('d')
+        for timestamp, value in values:
+            timestamps.append(timestamp)
+            samples.append(float(value))
+        return cls.construct(metric=metric, timestamps=timestamps, samples=samples)
+
+    @property
+    def values(self) -> List[Scalar]:
+        """Return the samples as time and value pairs."""
+        return list(iter(self))
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __iter__(self) -> Scalar:
+        return (
+            (datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc), value)
+            for timestamp, value in zip(self.timestamps, self.samples)
+        )
+
+
 class Status(str, enum.Enum):
     """Prometheus HTTP API response statuses.
 
@@ -340,7 +640,7 @@ class QueryData(pydantic.BaseModel):
         result: The query result. The type is polymorphic based on the result type.
     """
     result_type: ResultType = pydantic.Field(..., alias='resultType')
-    result: Union[List[InstantVector], List[RangeVector], Scalar, String]
+    result: Union[List[InstantVector], List[RangeVector], List[ColumnarRangeVector], Scalar, String]
 
     def __len__(self) -> int:
         if self.is_vector:
@@ -391,6 +691,21 @@ class TargetData(pydantic.BaseModel):
 Data = Union[QueryData, TargetData]
 
 
+class RangeQueryChunk(pydantic.BaseModel):
+    """A timing record for one chunk of a range query that was split into several requests.
+
+    ### Attributes:
+        start: Start time of the chunk.
+        end: End time of the chunk.
+        points: The number of data points returned across all series in the chunk.
+        duration: The time elapsed fetching the chunk, including time spent waiting for a request slot.
+    """
+    start: datetime.datetime
+    end: datetime.datetime
+    points: int
+    duration: servo.Duration
+
+
 class BaseResponse(pydantic.BaseModel, abc.ABC):
     """Abstract base class for responses returned by the Prometheus HTTP API.
 
@@ -404,12 +719,16 @@ class BaseResponse(pydantic.BaseModel, abc.ABC):
         data: The data payload returned in response to the request.
         error: A description of the error triggering query failure, if any.
         warnings: A list of warnings returned during query evaluation, if any.
+        chunks: Timings of the requests that a split range query was fetched with, if any.
+        replica: The base URL of the Prometheus replica that served the response, if known.
     """
     request: BaseRequest
     status: Status
     data: Data
     error: Optional[Error]
     warnings: Optional[List[str]]
+    chunks: Optional[List[RangeQueryChunk]] = None
+    replica: Optional[str] = None
 
     @pydantic.root_validator(pre=True)
     def _parse_error(cls, values: Dict[str, Any]) -> Dict[str, Any]:
@@ -465,12 +784,21 @@ class MetricResponse(BaseResponse):
         """
         if self.status == Status.error:
             return None
+        elif self.metric.group and (not self.data or self.data.is_vector):
+            return list(map(self._time_series_from_vector, self._grouped_vectors()))
         elif not self.data:
             return []
+        elif self.metric.histogram and self.data.is_vector:
+            return list(map(
+                self._time_series_from_vector,
+                _histogram_quantile_vectors(self.metric.histogram, self.data),
+            ))
 
         results_ = []
         for result in self.data:
             if self.data.is_vector:
+                if ABSENT_LABEL in result.metric:
+                    continue
                 results_.append(
                     self._time_series_from_vector(result)
                 )
@@ -483,17 +811,48 @@ class MetricResponse(BaseResponse):
 
         return results_
 
+    def _grouped_vectors(self) -> List[BaseVector]:
+        group = self.metric.group
+        vectors = group.select(self.data or [])
+        if self.metric.histogram:
+            vectors = _histogram_quantile_vectors(self.metric.histogram, vectors)
+        elif group.by:
+            vectors = _aggregate_vectors(group.aggregation, vectors)
+
+        if not vectors and self.metric.absent == Absent.zero:
+            # NOTE: Shared queries cannot be zeroed with `or on() vector(0)` per metric
+            return [_zero_vector(self.request)]
+        return vectors
+
     def _time_series_from_vector(self, vector: BaseVector) -> servo.TimeSeries:
         instance = vector.metric.get("instance")
         job = vector.metric.get("job")
         annotation = " ".join(
             map(lambda m: "=".join(m), sorted(vector.metric.items(), key=operator.itemgetter(0)))
         )
+        metadata = {}
+        if self.replica:
+            metadata["replica"] = self.replica
+        if self.metric.max_points and isinstance(self.request, RangeQuery):
+            # NOTE: Record the step selected for the range so readings can be interpreted
+            metadata["step"] = str(self.request.step)
+        metadata = metadata or None
+        if isinstance(vector, ColumnarRangeVector):
+            return servo.ColumnarTimeSeries(
+                self.metric,
+                vector.timestamps,
+                vector.samples,
+                id=f"{{instance={instance},job={job}}}",
+                annotation=annotation,
+                metadata=metadata,
+            )
+
         return servo.TimeSeries(
             self.metric,
             list(map(lambda v: servo.DataPoint(self.metric, *v), iter(vector))),
             id=f"{{instance={instance},job={job}}}",
             annotation=annotation,
+            metadata=metadata,
         )
 
 
@@ -501,6 +860,17 @@ def _rstrip_slash(cls, base_url):
     return base_url.rstrip("/")
 
 
+def _range_windows(query: Optional[str]) -> List[servo.Duration]:
+    """Return the durations of the range selectors and subqueries in a PromQL query."""
+    windows = []
+    for window in re.findall(r"\[\s*([0-9a-z]+)\s*(?::[^\]]*)?\]", query or ""):
+        try:
+            windows.append(servo.Duration(window))
+        except ValueError:
+            continue
+    return windows
+
+
 class Client(pydantic.BaseModel):
     """A high level interface for interacting with the Prometheus HTTP API.
 
@@ -510,11 +880,68 @@ class Client(pydantic.BaseModel):
 
     For details about the Prometheus HTTP API see: https://prometheus.io/docs/prometheus/latest/querying/api/
 
+    Connections are pooled and kept alive across requests, and a semaphore bounds the number
+    of queries in flight. Clients should be shared by everything querying the same Prometheus
+    and closed via `aclose` (or used as an async context manager) when no longer needed.
+
     ### Attributes:
         base_url: The base URL for connecting to Prometheus.
+        max_connections: The maximum number of connections to hold open to Prometheus.
+        max_concurrent_queries: The maximum number of requests in flight at once. Requests
+            beyond the limit wait for a slot.
+        timeouts: Optional timeouts for requests. Defaults to the HTTPX library defaults.
+        max_points_per_query: The maximum number of data points per series to request in a single
+            range query. Longer range queries are split into step-aligned chunks that are fetched
+            concurrently and merged.
+        cache_size: The maximum number of responses to cache. Only range queries over windows that
+            have already passed are cached. Zero disables caching.
+        cache_ttl: The time to retain cached responses for.
+        replicas: Base URLs of additional Prometheus replicas that are equivalent to `base_url`.
+        hedge_percentile: The percentile of a replica's recent latency after which an unanswered
+            request is hedged by sending it to the next replica.
+        hedge_delay: The time after which to hedge requests to a replica without enough latency
+            history to compute the percentile.
+
+    Concurrent identical requests are coalesced into a single HTTP request regardless of caching.
+
+    When replicas are configured, requests go to the healthy replica with the lowest typical
+    latency. Slow requests are hedged to the next replica and the first response wins. Failed
+    replicas are failed over and skipped with an increasing backoff. Responses record the
+    replica that served them.
     """
     base_url: pydantic.AnyHttpUrl
+    max_connections: pydantic.PositiveInt = 10
+    max_concurrent_queries: pydantic.PositiveInt = 10
+    timeouts: Optional[servo.configuration.Timeouts] = None
+    max_points_per_query: pydantic.conint(ge=2) = 11_000
+    cache_size: pydantic.conint(ge=0) = 256
+    cache_ttl: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("10m"))
+    replicas: List[pydantic.AnyHttpUrl] = []
+    hedge_percentile: pydantic.confloat(gt=0, le=100) = 95.0
+    hedge_delay: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("1s"))
     _normalize_base_url = pydantic.validator('base_url', allow_reuse=True)(_rstrip_slash)
+    _normalize_replicas = pydantic.validator('replicas', each_item=True, allow_reuse=True)(_rstrip_slash)
+    _cache: collections.OrderedDict = pydantic.PrivateAttr(default_factory=collections.OrderedDict)
+    _in_flight: Dict[Tuple, asyncio.Task] = pydantic.PrivateAttr(default_factory=dict)
+    _endpoints: List["_Endpoint"] = pydantic.PrivateAttr(default_factory=list)
+    _semaphore: Optional[asyncio.Semaphore] = pydantic.PrivateAttr(None)
+    _loop: Optional[weakref.ref] = pydantic.PrivateAttr(None)
+
+    @classmethod
+    def from_config(cls, config: "PrometheusConfiguration") -> "Client":
+        """Return a new Client configured by a Prometheus connector configuration."""
+        return cls(
+            base_url=config.base_url,
+            max_connections=config.max_connections,
+            max_concurrent_queries=config.max_concurrent_queries,
+            timeouts=config.timeouts,
+            max_points_per_query=config.max_points_per_query,
+            cache_size=config.cache_size,
+            cache_ttl=config.cache_ttl,
+            replicas=config.replicas,
+            hedge_percentile=config.hedge_percentile,
+            hedge_delay=config.hedge_delay,
+        )
 
     @property
     def api_url(self) -> str:
@@ -563,12 +990,21 @@ class Client(pydantic.BaseModel):
         step: servo.Duration = None,
         *,
         timeout: Optional[servo.DurationDescriptor] = None,
-        method: Literal['GET', 'POST'] = 'GET'
+        method: Literal['GET', 'POST'] = 'GET',
+        probe_absent: bool = False,
     ) -> BaseResponse:
-        """Send a range query to Prometheus for evaluation and return the response."""
+        """Send a range query to Prometheus for evaluation and return the response.
+
+        The range is narrowed to the multiples of the step within it, so that the windows of
+        queries made moments apart evaluate at the same timestamps and share cached responses.
+        Ranges that do not span a step boundary are queried as given.
+
+        When `probe_absent` is True, metric queries are built with an absence probe (see
+        `PrometheusMetric.build_query`).
+        """
         if isinstance(promql, PrometheusMetric):
-            promql_ = promql.build_query()
-            step_ = step or promql.step
+            promql_ = promql.build_query(probe_absent=probe_absent)
+            step_ = step or promql.step_for(start, end)
             response_type = functools.partial(MetricResponse, metric=promql)
         elif isinstance(promql, str):
             promql_ = promql
@@ -577,6 +1013,12 @@ class Client(pydantic.BaseModel):
         else:
             raise TypeError(f"cannot query for type: '{promql.__class__.__name__}'")
 
+        if step_:
+            step_ = servo.Duration(step_)
+            aligned_start, aligned_end = _align_to_step(start, step_), _align_to_step(end, step_, math.floor)
+            if aligned_start < aligned_end:
+                start, end = aligned_start, aligned_end
+
         query = RangeQuery(
             query=promql_,
             start=start,
@@ -584,7 +1026,124 @@ class Client(pydantic.BaseModel):
             step=step_,
             timeout=timeout,
         )
-        return await self.send_request(method, query, response_type)
+        chunks = _split_range_query(query, self.max_points_per_query)
+        if len(chunks) == 1:
+            return await self.send_request(method, query, response_type)
+
+        servo.logger.debug(
+            f"Splitting range query (`{query.query}`) into {len(chunks)} chunks of up to {self.max_points_per_query} points"
+        )
+
+        async def _fetch_chunk(chunk: RangeQuery) -> Tuple[BaseResponse, servo.Duration]:
+            started_at = time.perf_counter()
+            response = await self.send_request(method, chunk, response_type)
+            return response, servo.Duration(time.perf_counter() - started_at)
+
+        results = await asyncio.gather(*list(map(_fetch_chunk, chunks)))
+        timings = []
+        for chunk, (response, duration) in zip(chunks, results):
+            points = sum(map(len, response.data)) if response.status == Status.success else 0
+            timings.append(RangeQueryChunk(start=chunk.start, end=chunk.end, points=points, duration=duration))
+            servo.logger.debug(
+                f"Fetched range query chunk {chunk.start} - {chunk.end} ({points} points) in {duration}"
+            )
+
+        return _merge_range_responses(query, [response for response, _ in results], timings)
+
+    async def read_metric(
+        self, metric: PrometheusMetric, start: datetime.datetime, end: datetime.datetime
+    ) -> List[servo.TimeSeries]:
+        """Query a metric over a range and return its readings.
+
+        Metrics that warn or fail when absent are queried with an absence probe so that an
+        absent metric is detected from the same response rather than an additional request.
+        Raw metrics are read through the remote read API.
+        """
+        if metric.raw:
+            return await self._read_raw_metric(metric, start, end)
+
+        response = await self.query_range(metric, start, end, probe_absent=True)
+        servo.logger.trace(f"Got response data type {response.__class__} for metric {metric}: {response}")
+        response.raise_for_error()
+
+        readings = response.results()
+        if readings or metric.absent in {Absent.ignore, Absent.zero}:
+            # NOTE: metric zeroing is handled at the query level
+            return readings
+
+        # NOTE: Grouped metrics are absent when no series of the shared query are selected
+        if metric.group or any(map(lambda vector: ABSENT_LABEL in vector.metric, response.data)):
+            _report_absent_metric(metric)
+        else:
+            servo.logger.info(f"Metric '{metric.query}' is present in Prometheus but returned an empty result set")
+
+        return []
+
+    async def remote_read(self, request: RemoteReadRequest) -> Tuple[List[ColumnarRangeVector], str]:
+        """Read raw samples through the remote read API and return them with the replica that served them.
+
+        Samples are decoded into columnar vectors as chunks stream in. Failed replicas are
+        failed over but remote reads are not hedged, as they can be arbitrarily large.
+        """
+        error = None
+        for endpoint in sorted(self._pooled_endpoints(), key=lambda e: not e.healthy):
+            try:
+                return await self._remote_read_from(endpoint, request)
+            except (httpx.HTTPError, ValueError) as error_:
+                if _is_request_error(error_):
+                    raise
+                error = error_
+                servo.logger.warning(f"Prometheus remote read from {endpoint.base_url} failed: {error}")
+
+        raise error
+
+    async def _remote_read_from(
+        self, endpoint: "_Endpoint", request: RemoteReadRequest
+    ) -> Tuple[List[ColumnarRangeVector], str]:
+        async with self._semaphore:
+            started_at = time.perf_counter()
+            try:
+                async with endpoint.http_client.stream(
+                    "POST", request.endpoint, content=request.content, headers=REMOTE_READ_HEADERS
+                ) as http_response:
+                    http_response.raise_for_status()
+                    if http_response.headers.get("Content-Type", "").startswith("application/x-streamed-protobuf"):
+                        decoder = ChunkedReadDecoder()
+                        async for data in http_response.aiter_bytes():
+                            decoder.feed(data)
+                        series = decoder.series()
+                    else:
+                        series = decode_read_response(await http_response.aread())
+            except (httpx.HTTPError, ValueError) as error:
+                servo.logger.trace(f"Error encountered during remote read from {endpoint.base_url}: {error}")
+                if not _is_request_error(error):
+                    endpoint.failed()
+                raise
+
+            endpoint.succeeded(time.perf_counter() - started_at)
+            vectors = [
+                ColumnarRangeVector.construct(metric=labels, timestamps=timestamps, samples=samples)
+                for labels, timestamps, samples in series
+            ]
+            return vectors, endpoint.base_url
+
+    async def _read_raw_metric(
+        self, metric: PrometheusMetric, start: datetime.datetime, end: datetime.datetime
+    ) -> List[servo.TimeSeries]:
+        request = RemoteReadRequest(selector=metric.query, start=start, end=end)
+        vectors, replica = await self.remote_read(request)
+        response = MetricResponse.construct(
+            request=request,
+            status=Status.success,
+            data=QueryData.construct(result_type=ResultType.matrix, result=vectors),
+            metric=metric,
+            replica=replica,
+        )
+        readings = response.results()
+        if not readings and metric.absent != Absent.ignore:
+            _report_absent_metric(metric)
+
+        return readings
 
     async def list_targets(self, state: Optional[TargetsStateFilter] = None) -> TargetsResponse:
         """List the targets discovered by Prometheus.
@@ -630,7 +1189,102 @@ class Client(pydantic.BaseModel):
         servo.logger.trace(
             f"Sending request to Prometheus HTTP API (`{request}`): {method} {request.endpoint}"
         )
-        async with httpx.AsyncClient(base_url=self.api_url) as client:
+        content, replica = await self._fetch(method, request)
+        return _decode_response(response_type, request, content, replica=replica)
+
+    def replica_stats(self) -> List["ReplicaStats"]:
+        """Return the health and latency of the Prometheus replicas queried by the client."""
+        return list(map(operator.methodcaller("stats"), self._pooled_endpoints()))
+
+    async def _fetch(self, method: Literal['GET', 'POST'], request: BaseRequest) -> Tuple[bytes, str]:
+        # NOTE: Identical requests in flight share a single HTTP call and completed windows are cached
+        key = (method, request.endpoint, tuple(sorted(request.params.items())))
+        if cached := self._cache.get(key):
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                servo.logger.trace(f"Serving cached response for Prometheus request (`{request}`)")
+                return result
+            del self._cache[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._send(method, request))
+            task.add_done_callback(functools.partial(self._fetched, key, request))
+            self._in_flight[key] = task
+        else:
+            servo.logger.trace(f"Joining in flight Prometheus request (`{request}`)")
+
+        # NOTE: Shielded so that a cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    def _fetched(self, key: Tuple, request: BaseRequest, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if self.cache_size and _is_completed_window(request):
+            self._cache[key] = (time.monotonic() + self.cache_ttl.total_seconds(), task.result())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _send(self, method: Literal['GET', 'POST'], request: BaseRequest) -> Tuple[bytes, str]:
+        endpoints = self._pooled_endpoints()
+        if len(endpoints) == 1:
+            return await self._send_to(endpoints[0], method, request)
+
+        # NOTE: Prefer healthy replicas with the lowest typical latency
+        remaining = sorted(endpoints, key=lambda e: (not e.healthy, e.percentile(50) or 0.0))
+        pending: Dict[asyncio.Task, _Endpoint] = {}
+        error: Optional[BaseException] = None
+
+        def _launch() -> _Endpoint:
+            endpoint = remaining.pop(0)
+            pending[asyncio.create_task(self._send_to(endpoint, method, request))] = endpoint
+            return endpoint
+
+        latest = _launch()
+        try:
+            while pending:
+                delay = None
+                if remaining:
+                    delay = latest.percentile(self.hedge_percentile) or self.hedge_delay.total_seconds()
+                done, _ = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    servo.logger.debug(
+                        f"Hedging Prometheus request (`{request}`) to {remaining[0].base_url}: no response from {latest.base_url} after {servo.Duration(delay)}"
+                    )
+                    latest = _launch()
+                    continue
+
+                for task in done:
+                    endpoint = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+
+                    error = task.exception()
+                    if _is_request_error(error):
+                        raise error
+
+                    servo.logger.warning(f"Prometheus replica {endpoint.base_url} failed: {error}")
+
+                if remaining and not pending:
+                    servo.logger.info(f"Failing over Prometheus request (`{request}`) to {remaining[0].base_url}")
+                    latest = _launch()
+
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send_to(
+        self, endpoint: "_Endpoint", method: Literal['GET', 'POST'], request: BaseRequest
+    ) -> Tuple[bytes, str]:
+        client = endpoint.http_client
+        async with self._semaphore:
+            started_at = time.perf_counter()
             try:
                 kwargs = (
                     dict(params=request.params) if method == 'GET'
@@ -639,7 +1293,6 @@ class Client(pydantic.BaseModel):
                 http_request = client.build_request(method, request.endpoint, **kwargs)
                 http_response = await client.send(http_request)
                 http_response.raise_for_status()
-                return response_type(request=request, **http_response.json())
             except (
                 httpx.HTTPError,
                 httpx.ReadTimeout,
@@ -648,8 +1301,495 @@ class Client(pydantic.BaseModel):
                 servo.logger.trace(
                     f"HTTP error encountered during GET {request.url}: {error}"
                 )
+                if not _is_request_error(error):
+                    endpoint.failed()
                 raise
 
+            endpoint.succeeded(time.perf_counter() - started_at)
+            return http_response.content, endpoint.base_url
+
+    async def aclose(self) -> None:
+        """Close the pooled connections to Prometheus."""
+        endpoints, self._endpoints = self._endpoints, []
+        for endpoint in endpoints:
+            await endpoint.http_client.aclose()
+
+    async def __aenter__(self) -> "Client":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    def _pooled_http_client(self) -> httpx.AsyncClient:
+        return self._pooled_endpoints()[0].http_client
+
+    def _pooled_endpoints(self) -> List["_Endpoint"]:
+        # NOTE: Pooled connections and the semaphore belong to the event loop that created them
+        loop = asyncio.get_event_loop()
+        if not self._endpoints or self._loop() is not loop:
+            if self.timeouts:
+                timeout = httpx.Timeout(
+                    connect=_seconds(self.timeouts.connect),
+                    read=_seconds(self.timeouts.read),
+                    write=_seconds(self.timeouts.write),
+                    pool=_seconds(self.timeouts.pool),
+                )
+            else:
+                timeout = httpx.Timeout(5.0)
+
+            self._endpoints = [
+                _Endpoint(
+                    base_url,
+                    httpx.AsyncClient(
+                        base_url=f"{base_url}{API_PATH}",
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                        timeout=timeout,
+                    ),
+                )
+                for base_url in [self.base_url, *self.replicas]
+            ]
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+            self._loop = weakref.ref(loop)
+
+        return self._endpoints
+
+
+class ReplicaStats(pydantic.BaseModel):
+    """Health and latency statistics of a Prometheus replica.
+
+    ### Attributes:
+        base_url: The base URL of the replica.
+        healthy: Whether or not the replica is currently eligible to be queried first.
+        failures: The number of consecutive failed requests to the replica.
+        served: The number of requests that the replica has answered.
+        latency_p50: The median latency of recent requests to the replica.
+        latency_p95: The 95th percentile latency of recent requests to the replica.
+    """
+    base_url: str
+    healthy: bool
+    failures: int
+    served: int
+    latency_p50: Optional[servo.Duration]
+    latency_p95: Optional[servo.Duration]
+
+
+class _Endpoint:
+    """Tracks the health and recent latencies of a Prometheus replica."""
+    # NOTE: The number of latency samples required to estimate percentiles
+    MIN_SAMPLES = 5
+
+    def __init__(self, base_url: str, http_client: httpx.AsyncClient, *, window: int = 100) -> None:
+        self.base_url = base_url
+        self.http_client = http_client
+        self.latencies: Deque[float] = collections.deque(maxlen=window)
+        self.failures = 0
+        self.served = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def succeeded(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.served += 1
+        self.failures = 0
+        self.unhealthy_until = 0.0
+
+    def failed(self) -> None:
+        # NOTE: Back off exponentially from a failed replica, up to a minute
+        self.failures += 1
+        self.unhealthy_until = time.monotonic() + min(2 ** self.failures, 60)
+
+    def stats(self) -> ReplicaStats:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return ReplicaStats(
+            base_url=self.base_url,
+            healthy=self.healthy,
+            failures=self.failures,
+            served=self.served,
+            latency_p50=servo.Duration(p50) if p50 is not None else None,
+            latency_p95=servo.Duration(p95) if p95 is not None else None,
+        )
+
+
+def _is_request_error(error: BaseException) -> bool:
+    # NOTE: Client errors are caused by the request and will fail on every replica
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500
+
+
+def _decode_response(
+    response_type: Type[BaseResponse], request: BaseRequest, content: bytes, *, replica: Optional[str] = None
+) -> BaseResponse:
+    """Decode the body of a Prometheus HTTP API response.
+
+    Matrix results are packed directly into columnar range vectors rather than being
+    validated sample by sample.
+    """
+    body = orjson.loads(content)
+    data = body.get("data")
+    if isinstance(data, dict) and data.get("resultType") == ResultType.matrix:
+        body["data"] = QueryData.construct(
+            result_type=ResultType.matrix,
+            result=[
+                ColumnarRangeVector.from_values(result["metric"], result["values"])
+                for result in data.get("result") or []
+            ],
+        )
+
+    return response_type(request=request, replica=replica, **body)
+
+
+def _is_completed_window(request: BaseRequest) -> bool:
+    """Return True if the request is a range query over a window that has passed.
+
+    A step of grace is allowed past the end of the window for samples to be ingested.
+    """
+    return (
+        isinstance(request, RangeQuery)
+        and request.end.timestamp() + request.step.total_seconds() <= time.time()
+    )
+
+
+def _align_to_step(
+    time_: datetime.datetime, step: datetime.timedelta, rounding: Callable[[float], int] = math.ceil
+) -> datetime.datetime:
+    """Return a time rounded to a multiple of a step since the epoch, rounding up by default."""
+    step_ = step.total_seconds()
+    # NOTE: Times within float precision of a multiple are not rounded past it
+    steps = rounding(round(time_.timestamp() / step_, 6))
+    return datetime.datetime.fromtimestamp(steps * step_, tz=time_.tzinfo)
+
+
+def _split_range_query(query: RangeQuery, max_points: int) -> List[RangeQuery]:
+    """Split a range query into chunks that return no more than `max_points` points per series.
+
+    Chunks are aligned to the step of the query so that every chunk evaluates at the same
+    timestamps as the original query would. Adjacent chunks share their boundary timestamp,
+    which is de-duplicated when the responses are merged.
+    """
+    interval = query.step * (max_points - 1)
+    if query.start + interval >= query.end:
+        return [query]
+
+    chunks = []
+    start = query.start
+    while start < query.end:
+        end = min(start + interval, query.end)
+        chunks.append(query.copy(update={"start": start, "end": end}))
+        start += interval
+
+    return chunks
+
+
+def _merge_range_responses(
+    query: RangeQuery, responses: List[BaseResponse], chunks: List[RangeQueryChunk]
+) -> BaseResponse:
+    """Merge the responses to the chunks of a split range query into a single response."""
+    for response in responses:
+        if response.status == Status.error:
+            return response.copy(update={"request": query, "chunks": chunks})
+
+    series: Dict[Tuple[Tuple[str, str], ...], Tuple[Dict[str, str], Dict[float, float]]] = {}
+    for response in responses:
+        for vector in response.data:
+            key = tuple(sorted(vector.metric.items()))
+            _, values = series.setdefault(key, (vector.metric, {}))
+            if isinstance(vector, ColumnarRangeVector):
+                samples = zip(vector.timestamps, vector.samples)
+            else:
+                samples = ((timestamp.timestamp(), value) for timestamp, value in vector)
+            for timestamp, value in samples:
+                values.setdefault(timestamp, value)
+
+    result = [
+        ColumnarRangeVector.from_values(metric, sorted(values.items(), key=operator.itemgetter(0)))
+        for metric, values in series.values()
+    ]
+    warnings = list(dict.fromkeys(itertools.chain.from_iterable(r.warnings or [] for r in responses)))
+    return responses[0].copy(
+        update={
+            "request": query,
+            "data": responses[0].data.copy(update={"result": result}),
+            "warnings": warnings or None,
+            "chunks": chunks,
+        }
+    )
+
+
+def _report_absent_metric(metric: PrometheusMetric) -> None:
+    """Warn about or fail on an absent metric as configured by its `absent` attribute."""
+    kind = "selector" if metric.raw else "query"
+    if metric.absent == Absent.warn:
+        servo.logger.warning(f"Found absent metric for {kind} (`{metric.query}`)")
+    elif metric.absent == Absent.fail:
+        servo.logger.error(f"Required metric '{metric.name}' is absent from Prometheus ({kind}='{metric.query}')")
+        raise RuntimeError(f"Required metric '{metric.name}' is absent from Prometheus")
+    elif metric.absent not in {Absent.ignore, Absent.zero}:
+        raise ValueError(f"unknown metric absent value: {metric.absent}")
+
+
+def _aggregate_vectors(aggregation: Aggregation, vectors: List[BaseVector]) -> List[ColumnarRangeVector]:
+    """Aggregate vectors into a single unlabeled vector aligned by timestamp.
+
+    Like PromQL aggregation operators, series without a sample at a timestamp are ignored.
+    """
+    if not vectors:
+        return []
+
+    columns = list(map(_vector_columns, vectors))
+    timestamps = np.unique(np.concatenate([times for times, _ in columns]))
+    samples = np.full((len(columns), len(timestamps)), np.nan)
+    for index, (times, values) in enumerate(columns):
+        samples[index, np.searchsorted(timestamps, times)] = values
+
+    aggregate = {
+        Aggregation.sum: np.nansum,
+        Aggregation.min: np.nanmin,
+        Aggregation.max: np.nanmax,
+    }[aggregation]
+    values = aggregate(samples, axis=0)
+    return [
+        ColumnarRangeVector.construct(
+            metric={},
+            timestamps=array.array('d', timestamps.tobytes()),
+            samples=array.array('d', values.astype(np.float64).tobytes()),
+        )
+    ]
+
+
+def _zero_vector(request: QueryRequest) -> ColumnarRangeVector:
+    """Return an unlabeled vector of zeros at the evaluation timestamps of a query."""
+    if isinstance(request, RangeQuery):
+        start, step = request.start.timestamp(), request.step.total_seconds()
+        count = int((request.end.timestamp() - start) // step) + 1
+        timestamps = array.array('d', (start + index * step for index in range(count)))
+    else:
+        timestamps = array.array('d', [(request.time or datetime.datetime.now(datetime.timezone.utc)).timestamp()])
+
+    return ColumnarRangeVector.construct(
+        metric={}, timestamps=timestamps, samples=array.array('d', bytes(8 * len(timestamps)))
+    )
+
+
+def _histogram_quantile_vectors(
+    histogram: HistogramQuantile, vectors: Iterable[BaseVector]
+) -> List[ColumnarRangeVector]:
+    """Compute a quantile from vectors of histogram buckets.
+
+    Buckets are grouped into histograms by their labels other than `le` and aligned by
+    timestamp. Returns a vector per histogram, or a single unlabeled vector when the
+    quantiles are aggregated.
+    """
+    groups: Dict[Tuple, List[Tuple[float, BaseVector]]] = collections.defaultdict(list)
+    for vector in vectors:
+        if ABSENT_LABEL in vector.metric or "le" not in vector.metric:
+            continue
+        labels = tuple(sorted((k, v) for k, v in vector.metric.items() if k not in {"le", "__name__"}))
+        groups[labels].append((float(vector.metric["le"]), vector))
+
+    if not groups:
+        return []
+
+    timestamps = np.unique(np.concatenate([
+        _vector_columns(vector)[0] for buckets in groups.values() for _, vector in buckets
+    ]))
+    quantiles = []
+    for buckets in groups.values():
+        buckets.sort(key=operator.itemgetter(0))
+        counts = np.full((len(buckets), len(timestamps)), np.nan)
+        for index, (_, vector) in enumerate(buckets):
+            times, values = _vector_columns(vector)
+            counts[index, np.searchsorted(timestamps, times)] = values
+
+        upper_bounds = np.array([upper_bound for upper_bound, _ in buckets])
+        quantiles.append(_histogram_quantile(histogram.quantile, upper_bounds, counts))
+
+    def _vector(labels: Dict[str, str], values: np.ndarray) -> ColumnarRangeVector:
+        return ColumnarRangeVector.construct(
+            metric=labels,
+            timestamps=array.array('d', timestamps.tobytes()),
+            samples=array.array('d', values.astype(np.float64).tobytes()),
+        )
+
+    if histogram.aggregation is None:
+        return [_vector(dict(labels), values) for labels, values in zip(groups.keys(), quantiles)]
+
+    # NOTE: Like PromQL, min and max ignore NaN while avg and sum propagate it
+    aggregate = {
+        Aggregation.avg: np.mean,
+        Aggregation.sum: np.sum,
+        Aggregation.min: np.nanmin,
+        Aggregation.max: np.nanmax,
+    }[histogram.aggregation]
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        values = aggregate(np.vstack(quantiles), axis=0)
+    return [_vector({}, values)]
+
+
+def _histogram_quantile(quantile: float, upper_bounds: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Compute a quantile of a histogram at every timestamp with PromQL `histogram_quantile` semantics.
+
+    ### Args:
+        quantile: The quantile to compute.
+        upper_bounds: The sorted upper bounds of the buckets.
+        counts: The cumulative counts of the buckets, shaped (buckets, timestamps), with NaN
+            marking missing samples.
+    """
+    if len(upper_bounds) < 2 or not np.isposinf(upper_bounds[-1]):
+        return np.full(counts.shape[1], np.nan)
+
+    with np.errstate(all="ignore"):
+        # NOTE: Timestamps missing any bucket have no quantile
+        missing = np.isnan(counts).any(axis=0)
+        # NOTE: Rates of buckets may be slightly non-monotonic due to scrape timing
+        counts = np.fmax.accumulate(counts, axis=0)
+        observations = counts[-1]
+        rank = quantile * observations
+        bucket = np.argmax(counts >= rank, axis=0)
+        columns = np.arange(counts.shape[1])
+
+        bucket_start = np.where(bucket == 0, 0.0, upper_bounds[bucket - 1])
+        bucket_end = upper_bounds[bucket]
+        count_start = np.where(bucket == 0, 0.0, counts[bucket - 1, columns])
+        count = counts[bucket, columns] - count_start
+        result = bucket_start + (bucket_end - bucket_start) * ((rank - count_start) / count)
+
+        # NOTE: Quantiles in the +Inf bucket return the upper bound of the second highest bucket
+        result = np.where(bucket == len(upper_bounds) - 1, upper_bounds[-2], result)
+        result = np.where((bucket == 0) & (upper_bounds[0] <= 0), upper_bounds[0], result)
+        return np.where(missing | (observations == 0), np.nan, result)
+
+
+def _vector_columns(vector: BaseVector) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(vector, ColumnarRangeVector):
+        return np.frombuffer(vector.timestamps, dtype=np.float64), np.frombuffer(vector.samples, dtype=np.float64)
+
+    times, values = zip(*vector) if len(vector) else ((), ())
+    return (
+        np.array(list(map(operator.methodcaller("timestamp"), times)), dtype=np.float64),
+        np.array(values, dtype=np.float64),
+    )
+
+
+def _seconds(duration: Optional[servo.Duration]) -> Optional[float]:
+    return duration.total_seconds() if duration is not None else None
+
+
+class MetricsBuffer:
+    """A bounded ring buffer of the time series samples captured by streaming metric queries.
+
+    Samples are retained per metric and per series, up to `maxlen` samples per series. Windows
+    of buffered samples are assembled into `TimeSeries` readings, reporting the gaps that are
+    not covered by the buffer so that they can be backfilled via range queries.
+    """
+
+    def __init__(self, maxlen: int) -> None: # noqa: D107
+        self.maxlen = maxlen
+        self._series: Dict[str, Dict[str, Tuple[Optional[str], Deque[servo.DataPoint]]]] = {}
+
+    def append(self, metric: servo.Metric, readings: List[servo.TimeSeries]) -> None:
+        """Append the data points of time series readings to the buffer of a metric."""
+        series = self._series.setdefault(metric.name, {})
+        for time_series in readings:
+            key = time_series.annotation or time_series.id or ""
+            _, data_points = series.setdefault(
+                key, (time_series.id, collections.deque(maxlen=self.maxlen))
+            )
+            for data_point in time_series:
+                if not data_points or data_point.time > data_points[-1].time:
+                    data_points.append(data_point)
+
+    def gaps(
+        self,
+        metric: servo.Metric,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        tolerance: datetime.timedelta,
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Return the intervals of a window that are not covered by buffered samples.
+
+        Consecutive samples further apart than the tolerance (and window edges further than
+        the tolerance from the nearest sample) are reported as gaps.
+        """
+        start_, end_ = start.timestamp(), end.timestamp()
+        timestamps = sorted(set(
+            data_point.time.timestamp()
+            for _, data_points in self._series.get(metric.name, {}).values()
+            for data_point in data_points
+            if start_ <= data_point.time.timestamp() <= end_
+        ))
+        # NOTE: Express sample times in the timezone of the window for comparison with its edges
+        edges = (
+            [(start_, start)]
+            + [(timestamp, datetime.datetime.fromtimestamp(timestamp, tz=start.tzinfo)) for timestamp in timestamps]
+            + [(end_, end)]
+        )
+
+        gaps = []
+        for (previous, previous_time), (next_, next_time) in zip(edges, edges[1:]):
+            if next_ - previous > tolerance.total_seconds():
+                gaps.append((previous_time, next_time))
+
+        return gaps
+
+    def readings(
+        self,
+        metric: servo.Metric,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        *,
+        step: datetime.timedelta,
+        tolerance: Optional[datetime.timedelta] = None,
+        backfill: Optional[List[servo.TimeSeries]] = None,
+    ) -> List[servo.TimeSeries]:
+        """Return the samples of a metric within a window resampled onto a grid of steps from the start.
+
+        Backfilled time series are merged into the buffered series, preferring buffered samples
+        at the same timestamp. Each step of the grid takes the value of the latest sample at or
+        before it, provided that the sample is no older than the tolerance (defaulting to the
+        step), so that the readings share the resolution of a range query.
+        """
+        start_, end_ = start.timestamp(), end.timestamp()
+        tolerance_ = (step if tolerance is None else tolerance).total_seconds()
+        series: Dict[str, Tuple[Optional[str], Dict[float, float]]] = {}
+        for key, (id, data_points) in self._series.get(metric.name, {}).items():
+            _, points = series.setdefault(key, (id, {}))
+            for data_point in data_points:
+                if start_ - tolerance_ <= data_point.time.timestamp() <= end_:
+                    points[data_point.time.timestamp()] = data_point.value
+
+        for time_series in backfill or []:
+            _, points = series.setdefault(time_series.annotation or time_series.id or "", (time_series.id, {}))
+            for data_point in time_series:
+                points.setdefault(data_point.time.timestamp(), data_point.value)
+
+        steps = int((end - start) / step) if end >= start else -1
+        grid = [(start_ + index * step.total_seconds(), start + index * step) for index in range(steps + 1)]
+        readings = []
+        for key, (id, points) in series.items():
+            timestamps = sorted(points)
+            data_points = []
+            for timestamp, grid_time in grid:
+                index = bisect.bisect_right(timestamps, timestamp + 1e-6) - 1
+                if index >= 0 and timestamp - timestamps[index] <= tolerance_:
+                    data_points.append(servo.DataPoint(metric, grid_time, points[timestamps[index]]))
+            if data_points:
+                readings.append(servo.TimeSeries(metric, data_points, id=id, annotation=key or None))
+
+        return readings
+
+
 class PrometheusConfiguration(servo.BaseConfiguration):
     """PrometheusConfiguration objects describe how PrometheusConnector objects
     capture measurements from the Prometheus metrics server.
@@ -664,6 +1804,14 @@ class PrometheusConfiguration(servo.BaseConfiguration):
     """
 
     streaming_interval: Optional[servo.Duration] = None
+    """An optional interval to query and publish metrics at.
+
+    Streamed samples are retained in a buffer that measurements are assembled from,
+    backfilling any gaps in the buffer with range queries.
+    """
+
+    streaming_buffer_size: pydantic.PositiveInt = 1024
+    """The maximum number of streamed samples to retain per metric series."""
 
     metrics: List[PrometheusMetric]
     """The metrics to measure from Prometheus.
@@ -676,6 +1824,52 @@ class PrometheusConfiguration(servo.BaseConfiguration):
     scraped by the Prometheus instance being queried.
     """
 
+    max_connections: pydantic.PositiveInt = 10
+    """The maximum number of connections to hold open to Prometheus.
+
+    Connections are pooled and kept alive between queries.
+    """
+
+    max_concurrent_queries: pydantic.PositiveInt = 10
+    """The maximum number of queries in flight against Prometheus at once."""
+
+    timeouts: Optional[servo.configuration.Timeouts] = None
+    """Timeouts for requests to the Prometheus HTTP API. A single duration sets all timeouts."""
+
+    max_points_per_query: pydantic.conint(ge=2) = 11_000
+    """The maximum number of data points per series to request in a single range query.
+
+    Longer range queries are split into step-aligned chunks that are fetched concurrently.
+    """
+
+    cache_size: pydantic.conint(ge=0) = 256
+    """The maximum number of Prometheus responses to cache.
+
+    Only range queries over windows that have already passed are cached. Zero disables caching.
+    """
+
+    cache_ttl: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("10m"))
+    """The time to retain cached Prometheus responses for."""
+
+    replicas: List[pydantic.AnyHttpUrl] = []
+    """Base URLs of additional Prometheus replicas that are equivalent to the base URL.
+
+    Requests are hedged and failed over across the base URL and its replicas.
+    """
+    _normalize_replicas = pydantic.validator('replicas', each_item=True, allow_reuse=True)(_rstrip_slash)
+
+    hedge_percentile: pydantic.confloat(gt=0, le=100) = 95.0
+    """The percentile of a replica's recent latency after which a request is hedged to another replica."""
+
+    hedge_delay: servo.Duration = pydantic.Field(default_factory=lambda: servo.Duration("1s"))
+    """The time after which to hedge requests to a replica without enough latency history."""
+
+    @pydantic.validator("timeouts", pre=True)
+    def parse_timeouts(cls, v):
+        if isinstance(v, (str, int, float)):
+            return servo.configuration.Timeouts(v)
+        return v
+
     @classmethod
     def generate(cls, **kwargs) -> "PrometheusConfiguration":
         """Generate a default configuration for capturing measurements from the
@@ -714,10 +1908,27 @@ class PrometheusChecks(servo.BaseChecks):
         config: The connector configuration being checked.
     """
     config: PrometheusConfiguration
+    _prometheus_client: Optional[Client] = pydantic.PrivateAttr(None)
+    _owns_client: bool = pydantic.PrivateAttr(False)
+
+    async def run_all(self, **kwargs) -> List[servo.Check]:
+        try:
+            return await super().run_all(**kwargs)
+        finally:
+            await self._aclose()
+
+    async def _aclose(self) -> None:
+        """Close the Prometheus client if it was opened by the checks rather than shared with them."""
+        if self._owns_client and self._prometheus_client is not None:
+            client, self._prometheus_client, self._owns_client = self._prometheus_client, None, False
+            await client.aclose()
 
     @property
     def _client(self) -> Client:
-        return Client(base_url=self.config.base_url)
+        if self._prometheus_client is None:
+            self._prometheus_client = Client.from_config(self.config)
+            self._owns_client = True
+        return self._prometheus_client
 
     @servo.require('Connect to "{self.config.base_url}"')
     async def check_base_url(self) -> None:
@@ -763,6 +1974,15 @@ class PrometheusConnector(servo.BaseConnector):
         config: The configuration of the connector instance.
     """
     config: PrometheusConfiguration
+    _client: Optional[Client] = pydantic.PrivateAttr(None)
+    _buffer: Optional[MetricsBuffer] = pydantic.PrivateAttr(None)
+
+    @property
+    def client(self) -> Client:
+        """Return the pooled client for querying Prometheus, creating it on first use."""
+        if self._client is None:
+            self._client = Client.from_config(self.config)
+        return self._client
 
     @servo.on_event()
     async def startup(self) -> None:
@@ -771,23 +1991,32 @@ class PrometheusConnector(servo.BaseConnector):
         if streaming_interval is not None:
             logger = servo.logger.bind(component=f"{self.name} -> {CHANNEL}")
             logger.info(f"Streaming Prometheus metrics every {streaming_interval}")
+            self._buffer = MetricsBuffer(self.config.streaming_buffer_size)
 
             @self.publish(CHANNEL, every=streaming_interval)
             async def _publish_metrics(publisher: servo.pubsub.Publisher) -> None:
                 report = []
-                client = Client(base_url=self.config.base_url)
                 responses = await asyncio.gather(
-                    *list(map(client.query, self.config.metrics))
+                    *list(map(self.client.query, self.config.metrics))
                 )
                 for response in responses:
-                    if response.data:
-                        # NOTE: Instant queries return a single vector
-                        timestamp, value = response.data[0].value
-                        report.append((response.metric.name, timestamp.isoformat(), value))
+                    if response.status == Status.success:
+                        readings = response.results()
+                        self._buffer.append(response.metric, readings)
+
+                        if readings:
+                            # NOTE: Instant queries return a single data point per time series
+                            data_point = readings[0][0]
+                            report.append((response.metric.name, data_point.time.isoformat(), data_point.value))
 
                 await publisher(servo.pubsub.Message(json=report))
                 logger.info(f"Published {len(report)} metrics.")
 
+    @servo.on_event()
+    async def shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
     @servo.on_event()
     async def check(
         self,
@@ -809,9 +2038,9 @@ class PrometheusConnector(servo.BaseConnector):
             List[Check]: A list of check objects that report the outcomes of the
                 checks that were run.
         """
-        return await PrometheusChecks.run(
-            self.config, matching=matching, halt_on=halt_on
-        )
+        checks = PrometheusChecks(self.config)
+        checks._prometheus_client = self.client
+        return await checks.run_all(matching=matching, halt_on=halt_on)
 
     @servo.on_event()
     def describe(self) -> servo.Description:
@@ -863,7 +2092,13 @@ class PrometheusConnector(servo.BaseConnector):
         # Handle eager metrics
         eager_metrics = list(filter(lambda m: m.eager, metrics__))
         eager_settlement = max(eager_metrics, key=operator.attrgetter("eager")).eager if eager_metrics else None
-        eager_observer = EagerMetricObserver(base_url=self.config.base_url, metrics=eager_metrics, start=start, end=end)
+        eager_observer = EagerMetricObserver(
+            base_url=self.config.base_url,
+            metrics=eager_metrics,
+            start=start,
+            end=end,
+            client=self.client,
+        )
         if eager_metrics:
             servo.logger.info(f"Observing values of {len(eager_metrics)} eager metrics: measurement will return after {eager_settlement} of stability")
         else:
@@ -874,10 +2109,16 @@ class PrometheusConnector(servo.BaseConnector):
         await progress.watch(eager_observer.observe)
 
         # Capture the measurements
-        self.logger.info(f"Querying Prometheus for {len(metrics__)} metrics...")
-        readings = await asyncio.gather(
-            *list(map(lambda m: self._query_prometheus(m, start, end), metrics__))
-        )
+        if self._buffer is not None:
+            self.logger.info(f"Assembling {len(metrics__)} metrics from streamed samples...")
+            readings = await asyncio.gather(
+                *list(map(lambda m: self._read_buffer(m, start, end), metrics__))
+            )
+        else:
+            self.logger.info(f"Querying Prometheus for {len(metrics__)} metrics...")
+            readings = await asyncio.gather(
+                *list(map(lambda m: self._query_prometheus(m, start, end), metrics__))
+            )
         all_readings = (
             functools.reduce(lambda x, y: x + y, readings) if readings else []
         )
@@ -886,38 +2127,54 @@ class PrometheusConnector(servo.BaseConnector):
 
     async def targets(self) -> List[TargetsResponse]:
         """Return the targets discovered by Prometheus."""
-        client = Client(base_url=self.config.base_url)
-        response = await client.list_targets()
+        response = await self.client.list_targets()
         return response
 
-    async def _query_prometheus(
+    async def _read_buffer(
         self, metric: PrometheusMetric, start: datetime, end: datetime
     ) -> List[servo.TimeSeries]:
-        client = Client(base_url=self.config.base_url)
-        response = await client.query_range(metric, start, end)
-        self.logger.trace(f"Got response data type {response.__class__} for metric {metric}: {response}")
-        response.raise_for_error()
-
-        if response.data:
-            return response.results()
-        else:
-            # Handle absent metric cases
-            if metric.absent in {Absent.ignore, Absent.zero}:
-                # NOTE: metric zeroing is handled at the query level
-                pass
-            else:
-                if await client.check_is_metric_absent(metric):
-                    if metric.absent == Absent.warn:
-                        servo.logger.warning(
-                            f"Found absent metric for query (`{metric.query}`)"
-                        )
-                    elif metric.absent == Absent.fail:
-                        servo.logger.error(f"Required metric '{metric.name}' is absent from Prometheus (query='{metric.query}')")
-                        raise RuntimeError(f"Required metric '{metric.name}' is absent from Prometheus")
-                    else:
-                        raise ValueError(f"unknown metric absent value: {metric.absent}")
+        # NOTE: The window can extend into the future when eager metrics settle early
+        window_end = min(end, datetime.datetime.now(start.tzinfo))
+        step = metric.step_for(start, end)
+        tolerance = self.config.streaming_interval * 2
+        gaps = self._buffer.gaps(metric, start, window_end, tolerance)
+        # NOTE: Streamed samples are coarser than the raw samples of raw metrics and of steps
+        # shorter than the streaming interval
+        if (
+            metric.raw
+            or self.config.streaming_interval > step
+            or window_end <= start
+            or gaps == [(start, window_end)]
+        ):
+            return await self._query_prometheus(metric, start, end)
+
+        # NOTE: Backfill from the first step within each gap so that backfilled samples land on
+        # the same step-aligned grid as range queries
+        backfill_windows = []
+        for gap_start, gap_end in gaps:
+            gap_start = _align_to_step(gap_start, step)
+            if gap_start <= gap_end:
+                backfill_windows.append((gap_start, gap_end))
+
+        backfills = await asyncio.gather(
+            *list(map(lambda window: self._query_prometheus(metric, *window), backfill_windows))
+        )
+        self.logger.debug(
+            f"Assembled `{metric.name}` from streamed samples, backfilling {len(backfill_windows)} gaps"
+        )
+        return self._buffer.readings(
+            metric,
+            _align_to_step(start, step),
+            window_end,
+            step=step,
+            tolerance=tolerance,
+            backfill=list(itertools.chain.from_iterable(backfills)),
+        )
 
-            return []
+    async def _query_prometheus(
+        self, metric: PrometheusMetric, start: datetime, end: datetime
+    ) -> List[servo.TimeSeries]:
+        return await self.client.read_metric(metric, start, end)
 
 app = servo.cli.ConnectorCLI(PrometheusConnector, help="Metrics from Prometheus")
 
@@ -926,7 +2183,11 @@ def targets(
     context: servo.cli.Context,
 ):
     """Display the targets being scraped."""
-    targets = servo.cli.run_async(context.connector.targets())
+    async def _targets() -> List[TargetsResponse]:
+        async with context.connector.client:
+            return await context.connector.targets()
+
+    targets = servo.cli.run_async(_targets())
     headers = ["POOL", "HEALTH", "URL", "LABELS", "LAST SCRAPED", "ERROR"]
     table = []
     for target in targets.active:
@@ -973,11 +2234,26 @@ def _chart_delta(a, b, unit) -> str:
 
 
 class EagerMetricObserver(pydantic.BaseModel):
+    """Observes eager metrics during a measurement to report eagerly once they have stabilized.
+
+    Polling is incremental: each poll queries only from the last seen timestamp of a metric
+    onward and appends new data points to a bounded per-metric tail buffer, so the cost of a
+    poll stays constant as the measurement runs. All eager metrics are queried concurrently.
+    Queries are sent through the given client, which remains owned by the caller.
+    """
     base_url: pydantic.AnyHttpUrl
     metrics: List[servo.Metric]
     start: datetime.datetime
     end: datetime.datetime
     data_points: Dict[servo.Metric, servo.DataPoint] = {}
+    tail_size: pydantic.PositiveInt = 16
+    _client: Client = pydantic.PrivateAttr()
+    _tails: Dict[str, Deque[servo.DataPoint]] = pydantic.PrivateAttr(default_factory=dict)
+
+    def __init__(self, *, client: Client, **kwargs) -> None: # noqa: D107
+        super().__init__(**kwargs)
+        # NOTE: Held privately so that the pooled client is shared rather than copied by validation
+        self._client = client
 
     async def observe(self, progress: servo.EventProgress) -> None:
         if not self.metrics:
@@ -997,11 +2273,11 @@ class EagerMetricObserver(pydantic.BaseModel):
             progress.complete()
             return
         else:
-            for metric in self.metrics:
+            tails = await asyncio.gather(*list(map(self._poll, self.metrics)))
+            for metric, tail in zip(self.metrics, tails):
                 active_data_point = self.data_points.get(metric)
-                readings = await self._query_prometheus(metric)
-                if readings:
-                    data_point = readings[0][-1]
+                if tail:
+                    data_point = tail[-1]
                     servo.logger.trace(f"Prometheus returned reading for the `{metric.name}` metric: {data_point}")
                     if data_point.value > 0:
                         if active_data_point is None:
@@ -1020,7 +2296,7 @@ class EagerMetricObserver(pydantic.BaseModel):
                                 servo.logger.success(progress.annotate(f"read updated `{metric.name}` metric value of {round(active_data_point[1])}{metric.unit} ({delta_str}), awaiting {progress.settlement} before reporting"))
                                 progress.trigger()
                         else:
-                            servo.logger.debug(f"metric `{metric.name}` has not changed value, ignoring (reading={active_data_point}, num_readings={len(readings[0].data_points)})")
+                            servo.logger.debug(f"metric `{metric.name}` has not changed value, ignoring (reading={active_data_point}, num_readings={len(tail)})")
                     else:
                         if active_data_point:
                             # NOTE: If we had a value and fall back to zero it could be a burst
@@ -1039,37 +2315,34 @@ class EagerMetricObserver(pydantic.BaseModel):
                         # NOTE: generally only happens on initialization and we don't care
                         servo.logger.trace(progress.annotate(f"Prometheus returned no readings for the `{metric.name}` metric"))
 
+                if active_data_point is not None:
+                    self.data_points[metric] = active_data_point
+
             if not progress.completed and not progress.timed_out:
                 max_step_metric = max(self.metrics, key=operator.attrgetter("step"), default=None)
                 servo.logger.debug(f"sleeping for {max_step_metric.step} to allow metrics to aggregate")
                 await asyncio.sleep(max_step_metric.step.total_seconds())
 
-    async def _query_prometheus(
-        self, metric: PrometheusMetric
-    ) -> List[servo.TimeSeries]:
-        # TODO: Duplicating controller functionality. Refactor. Likely becomes boundary for Promethean library
-        client = Client(base_url=self.base_url)
-        response = await client.query_range(metric, self.start, self.end)
-        servo.logger.trace(f"Got response data type {response.__class__} for metric {metric}: {response}")
-        response.raise_for_error()
+    async def _poll(self, metric: PrometheusMetric) -> Deque[servo.DataPoint]:
+        """Query for the data points of a metric newer than those already seen and return its tail buffer."""
+        tail = self._tails.setdefault(metric.name, collections.deque(maxlen=self.tail_size))
+        # NOTE: Resume at the last seen timestamp, which is aligned to the step of the metric
+        start = (
+            datetime.datetime.fromtimestamp(tail[-1].time.timestamp(), tz=self.start.tzinfo) if tail
+            else self.start
+        )
+        if start >= self.end:
+            return tail
 
-        if response.data:
-            return response.results()
-        else:
-            # Handle absent metric cases
-            if metric.absent in {Absent.ignore, Absent.zero}:
-                # NOTE: metric zeroing is handled at the query level
-                pass
-            else:
-                if await client.check_is_metric_absent(metric):
-                    if metric.absent == Absent.warn:
-                        servo.logger.warning(
-                            f"Found absent metric for query (`{metric.query}`)"
-                        )
-                    elif metric.absent == Absent.fail:
-                        servo.logger.error(f"Required metric '{metric.name}' is absent from Prometheus (query='{metric.query}')")
-                        raise RuntimeError(f"Required metric '{metric.name}' is absent from Prometheus")
-                    else:
-                        raise ValueError(f"unknown metric absent value: {metric.absent}")
+        readings = await self._query_prometheus(metric, start)
+        if readings:
+            for data_point in readings[0]:
+                if not tail or data_point.time > tail[-1].time:
+                    tail.append(data_point)
 
-            return []
+        return tail
+
+    async def _query_prometheus(
+        self, metric: PrometheusMetric, start: Optional[datetime.datetime] = None
+    ) -> List[servo.TimeSeries]:
+        return await self._client.read_metric(metric, start or self.start, self.end)
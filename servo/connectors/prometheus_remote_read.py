@@ -0,0 +1,251 @@
+"""Encode and decode messages of the Prometheus remote read protocol.
+
+Requests and buffered responses are snappy compressed protocol buffers. Streamed responses
+are frames of `ChunkedReadResponse` messages carrying the Gorilla XOR encoded chunks of the
+Prometheus TSDB. See https://prometheus.io/docs/prometheus/latest/querying/remote_read_api/
+"""
+import array
+from typing import Dict, List, Sequence, Tuple
+
+import google_crc32c
+import snappy
+from google.protobuf import descriptor_pb2, message_factory
+
+__all__ = (
+    "ChunkedReadDecoder",
+    "ChunkedReadResponse",
+    "ReadRequest",
+    "ReadResponse",
+    "Series",
+    "decode_read_response",
+    "decode_xor_chunk",
+    "encode_read_request",
+)
+
+Series = Tuple[Dict[str, str], array.array, array.array]
+"""The labels of a series with packed arrays of its timestamps in seconds and its sample values."""
+
+# NOTE: A subset of the `prometheus` protocol buffer package. Fields are numbered in order and
+# enums are declared as `int32`, which shares their wire encoding.
+_MESSAGES = {
+    "Label": ("string name", "string value"),
+    "Sample": ("double value", "int64 timestamp"),
+    "TimeSeries": ("repeated Label labels", "repeated Sample samples"),
+    "LabelMatcher": ("int32 type", "string name", "string value"),
+    "Query": ("int64 start_timestamp_ms", "int64 end_timestamp_ms", "repeated LabelMatcher matchers"),
+    "ReadRequest": ("repeated Query queries", "repeated int32 accepted_response_types"),
+    "QueryResult": ("repeated TimeSeries timeseries", ),
+    "ReadResponse": ("repeated QueryResult results", ),
+    "Chunk": ("int64 min_time_ms", "int64 max_time_ms", "int32 type", "bytes data"),
+    "ChunkedSeries": ("repeated Label labels", "repeated Chunk chunks"),
+    "ChunkedReadResponse": ("repeated ChunkedSeries chunked_series", "int64 query_index"),
+}
+_PACKAGE = "servo.connectors.prometheus_remote_read"
+_XOR_ENCODING = 1
+_STREAMED_XOR_CHUNKS, _SAMPLES = 1, 0
+
+
+def _file_descriptor() -> descriptor_pb2.FileDescriptorProto:
+    FieldDescriptorProto = descriptor_pb2.FieldDescriptorProto
+    file_descriptor = descriptor_pb2.FileDescriptorProto(
+        name=f"{_PACKAGE.replace('.', '/')}.proto", package=_PACKAGE, syntax="proto3"
+    )
+    for name, fields in _MESSAGES.items():
+        message = file_descriptor.message_type.add(name=name)
+        for number, field in enumerate(fields, 1):
+            *modifiers, type_name, field_name = field.split(" ")
+            descriptor = message.field.add(
+                name=field_name,
+                number=number,
+                label=(FieldDescriptorProto.LABEL_REPEATED if modifiers else FieldDescriptorProto.LABEL_OPTIONAL),
+            )
+            if type_name in _MESSAGES:
+                descriptor.type = FieldDescriptorProto.TYPE_MESSAGE
+                descriptor.type_name = f".{_PACKAGE}.{type_name}"
+            else:
+                descriptor.type = FieldDescriptorProto.Type.Value(f"TYPE_{type_name.upper()}")
+
+    return file_descriptor
+
+
+_classes = message_factory.GetMessages([_file_descriptor()])
+ReadRequest = _classes[f"{_PACKAGE}.ReadRequest"]
+ReadResponse = _classes[f"{_PACKAGE}.ReadResponse"]
+ChunkedReadResponse = _classes[f"{_PACKAGE}.ChunkedReadResponse"]
+
+
+def encode_read_request(start_ms: int, end_ms: int, matchers: Sequence[Tuple[int, str, str]]) -> bytes:
+    """Return a snappy compressed `ReadRequest` for a time range and label matchers of type, name and value.
+
+    Streamed XOR chunks are preferred, falling back to samples on servers that do not support them.
+    """
+    request = ReadRequest(accepted_response_types=[_STREAMED_XOR_CHUNKS, _SAMPLES])
+    query = request.queries.add(start_timestamp_ms=start_ms, end_timestamp_ms=end_ms)
+    for type_, name, value in matchers:
+        query.matchers.add(type=type_, name=name, value=value)
+    return snappy.compress(request.SerializeToString())
+
+
+def decode_read_response(data: bytes) -> List[Series]:
+    """Decode a snappy compressed `ReadResponse` of buffered samples."""
+    series = []
+    for result in ReadResponse.FromString(snappy.uncompress(data)).results:
+        for time_series in result.timeseries:
+            samples = time_series.samples
+            series.append((
+                {label.name: label.value for label in time_series.labels},
+                array.array('d', (sample.timestamp / 1000 for sample in samples)),
+                array.array('d', (sample.value for sample in samples)),
+            ))
+    return series
+
+
+class ChunkedReadDecoder:
+    """Incrementally decodes streamed `ChunkedReadResponse` frames.
+
+    Each frame is a varint length, a big-endian CRC32C of the message, and the message. XOR
+    encoded chunks are decoded into packed arrays per series as frames are fed in.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._series: Dict[Tuple[Tuple[str, str], ...], Tuple[array.array, array.array]] = {}
+
+    def feed(self, data: bytes) -> None:
+        """Feed bytes of the response body to the decoder, decoding every complete frame."""
+        self._buffer.extend(data)
+        position = 0
+        while position < len(self._buffer):
+            try:
+                size, offset = _read_varint(self._buffer, position)
+            except IndexError:
+                break
+            if offset + 4 + size > len(self._buffer):
+                break
+
+            checksum = int.from_bytes(self._buffer[offset:offset + 4], "big")
+            message = bytes(self._buffer[offset + 4:offset + 4 + size])
+            if google_crc32c.value(message) != checksum:
+                raise ValueError("remote read frame failed checksum verification")
+            self._decode_frame(message)
+            position = offset + 4 + size
+
+        del self._buffer[:position]
+
+    def series(self) -> List[Series]:
+        """Return the decoded series."""
+        if self._buffer:
+            raise ValueError("remote read response ended with an incomplete frame")
+
+        return [(dict(labels), timestamps, samples) for labels, (timestamps, samples) in self._series.items()]
+
+    def _decode_frame(self, message: bytes) -> None:
+        for chunked_series in ChunkedReadResponse.FromString(message).chunked_series:
+            # NOTE: The chunks of a series can span multiple frames
+            labels = tuple(sorted((label.name, label.value) for label in chunked_series.labels))
+            timestamps, samples = self._series.setdefault(labels, (array.array('d'), array.array('d')))
+            for chunk in chunked_series.chunks:
+                if chunk.type != _XOR_ENCODING:
+                    raise ValueError(f"unsupported remote read chunk encoding: {chunk.type}")
+                decode_xor_chunk(chunk.data, timestamps, samples)
+
+
+def decode_xor_chunk(data: bytes, timestamps: array.array, samples: array.array) -> None:
+    """Decode a Gorilla XOR encoded chunk of the Prometheus TSDB, appending its samples."""
+    count = int.from_bytes(data[:2], "big")
+    if count == 0:
+        return
+
+    reader = _BitReader(data[2:])
+    read = reader.read
+    timestamp = _zigzag(reader.read_varint())
+    bits = read(64)
+
+    # NOTE: Values are collected as raw bits and reinterpreted as doubles in one pass
+    values = array.array('Q', (bits, ))
+    timestamps.append(timestamp / 1000)
+
+    delta, leading, trailing = 0, 0, 0
+    for index in range(1, count):
+        if index == 1:
+            delta = reader.read_varint()
+        else:
+            # NOTE: Delta-of-delta encoded with a prefix selecting the bit width
+            width = 0
+            for candidate in (14, 17, 20, 64):
+                if not read(1):
+                    break
+                width = candidate
+            if width:
+                dod = read(width)
+                if width == 64:
+                    dod = dod - (1 << 64) if dod >= 1 << 63 else dod
+                elif dod > (1 << (width - 1)):
+                    dod -= 1 << width
+                delta += dod
+        timestamp += delta
+
+        if read(1):
+            if read(1):
+                leading = read(5)
+                significant = read(6) or 64
+                trailing = 64 - leading - significant
+            bits ^= read(64 - leading - trailing) << trailing
+
+        timestamps.append(timestamp / 1000)
+        values.append(bits)
+
+    samples.frombytes(values.tobytes())
+
+
+class _BitReader:
+    """Reads big-endian bit fields from a byte string.
+
+    Bytes are loaded into a short window as fields are read, so the cost of a read does not
+    grow with the length of the data.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._offset = 0
+        self._window = 0
+        self._bits = 0
+
+    def read(self, width: int) -> int:
+        while self._bits < width:
+            loaded = self._data[self._offset:self._offset + 8]
+            if not loaded:
+                raise ValueError("unexpected end of XOR chunk")
+            self._offset += 8
+            self._window = (self._window << (len(loaded) << 3)) | int.from_bytes(loaded, "big")
+            self._bits += len(loaded) << 3
+
+        self._bits -= width
+        value = self._window >> self._bits
+        self._window &= (1 << self._bits) - 1
+        return value
+
+    def read_varint(self) -> int:
+        result, shift = 0, 0
+        while True:
+            byte = self.read(8)
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _read_varint(data: Sequence[int], position: int) -> Tuple[int, int]:
+    """Read a varint at a position, returning the value and the position following it."""
+    result, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
@@ -1,10 +1,18 @@
+import array
+import asyncio
+import collections
 import datetime
 import enum
+import functools
 import io
+import itertools
 import json
+import math
+import os
 import pathlib
 import re
-from typing import Any, Dict, List, Optional, Tuple, Union
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import devtools
 import jsonschema
@@ -25,6 +33,9 @@ METRICS = [
     servo.Metric("latency_min", servo.Unit.milliseconds),
 ]
 
+OFFERED_RATE = servo.Metric("offered_rate", servo.Unit.requests_per_minute)
+MAX_SUSTAINABLE_THROUGHPUT = servo.Metric("max_sustainable_throughput", servo.Unit.requests_per_minute)
+
 
 class TargetFormat(str, enum.Enum):
     http = "http"
@@ -87,6 +98,612 @@ class VegetaReport(pydantic.BaseModel):
         )  # Fraction of success inverted into % of error
 
 
+def _latency(key: str, report: Dict[str, Any]) -> float:
+    # Convert Nanonsecond -> Millisecond
+    return report["latencies"][key] * 0.000001
+
+
+# NOTE: Accessors read metric values from the raw JSON of a report without modeling it
+REPORT_ACCESSORS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "throughput": lambda report: report["throughput"] * 60,
+    "error_rate": lambda report: 100 - (report["success"] * 100),
+    **{
+        metric.name: functools.partial(_latency, metric.name.replace("latency_", ""))
+        for metric in METRICS if metric.name.startswith("latency_")
+    },
+}
+
+_FRACTIONAL_SECONDS = re.compile(r"\.(\d+)")
+
+
+def _parse_timestamp(value: str) -> float:
+    """Parse an RFC 3339 timestamp reported by Vegeta into a POSIX timestamp.
+
+    Vegeta reports nanosecond precision, which is truncated to the microsecond precision of `datetime`.
+    """
+    value = _FRACTIONAL_SECONDS.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), value, count=1)
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class VegetaReports:
+    """Vegeta reports accumulated into packed arrays of values per metric.
+
+    Reports are appended as they stream in and are never retained, so that long attacks
+    reporting at high frequency accumulate in linear time with a few bytes per value.
+
+    Attributes:
+        timestamps: The POSIX timestamps of the end of each report.
+        columns: The values of each metric in `METRICS` by name.
+        segments: The start, end and rate of each segment of a load profile or probe of a throughput search.
+    """
+
+    def __init__(self, metrics: Sequence[servo.Metric] = METRICS) -> None: # noqa: D107
+        self.metrics = list(metrics)
+        self.timestamps = array.array('d')
+        self.columns: Dict[str, array.array] = {metric.name: array.array('d') for metric in self.metrics}
+        self.segments: List[Dict[str, Any]] = []
+
+    def append(self, report: Dict[str, Any]) -> None:
+        """Append the metric values of a report decoded from the JSON output of `vegeta report`."""
+        self.timestamps.append(_parse_timestamp(report["end"]))
+        for name, accessor in REPORT_ACCESSORS.items():
+            self.columns[name].append(accessor(report))
+
+    def append_values(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Append the metric values of an interval ending at a POSIX timestamp."""
+        self.timestamps.append(timestamp)
+        for name, column in self.columns.items():
+            column.append(values[name])
+
+    def extend(self, reports: "VegetaReports", **values: float) -> None:
+        """Append the reports of an attack segment, filling metrics it does not report with constant values."""
+        self.timestamps.extend(reports.timestamps)
+        for name, column in self.columns.items():
+            if name in reports.columns:
+                column.extend(reports.columns[name])
+            else:
+                column.extend(array.array('d', [values[name]]) * len(reports))
+
+    def latest(self, name: str) -> Optional[float]:
+        """Return the value of a metric in the latest report."""
+        column = self.columns[name]
+        return column[-1] if column else None
+
+    def time_series(self, metrics: Optional[List[str]] = None) -> List[servo.TimeSeries]:
+        """Return a time series for each metric, or the named metrics, in a single pass."""
+        return [
+            servo.ColumnarTimeSeries(metric, self.timestamps, self.columns[metric.name])
+            for metric in self.metrics
+            if not metrics or metric.name in metrics
+        ]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+class LatencyHistogram:
+    """An HDR-style histogram of latencies recorded in nanoseconds.
+
+    Values are counted in buckets that double in width, each divided into linear sub-buckets,
+    which bounds the relative error of any recorded value by the configured number of
+    significant figures in a small, fixed amount of memory regardless of the range of values.
+
+    Attributes:
+        count: The number of values recorded.
+        total: The sum of the values recorded.
+        min: The smallest value recorded.
+        max: The largest value recorded.
+    """
+
+    def __init__(self, significant_figures: int = 2) -> None: # noqa: D107
+        self._sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self._counts: Dict[int, int] = collections.defaultdict(int)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self._sub_bucket_bits
+        if shift <= 0:
+            return value
+        return (shift << (self._sub_bucket_bits - 1)) + (value >> shift)
+
+    def _highest_equivalent_value(self, index: int) -> int:
+        half = 1 << (self._sub_bucket_bits - 1)
+        if index < 2 * half:
+            return index
+        shift = index // half - 1
+        return ((index - shift * half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """Record a value."""
+        self._counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def record_many(self, values: Sequence[int]) -> None:
+        """Record a batch of values."""
+        if not values:
+            return
+
+        # NOTE: Equivalent to `_index` inlined, as this is the hot path of high rate attacks
+        counts, bits = self._counts, self._sub_bucket_bits
+        for value in values:
+            shift = value.bit_length() - bits
+            counts[value if shift <= 0 else (shift << (bits - 1)) + (value >> shift)] += 1
+
+        low, high = min(values), max(values)
+        self.count += len(values)
+        self.total += sum(values)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the values recorded by another histogram of the same precision."""
+        if other._sub_bucket_bits != self._sub_bucket_bits:
+            raise ValueError("cannot merge histograms of different precision")
+        for index, count in other._counts.items():
+            self._counts[index] += count
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentiles(self, percentiles: Sequence[float]) -> List[Optional[int]]:
+        """Return the values at the given percentiles in a single pass over the buckets.
+
+        Values are reported as the highest value equivalent to the bucket they fall in, capped
+        by the largest value recorded.
+        """
+        if not self.count:
+            return [None] * len(percentiles)
+
+        ranks = [max(1, math.ceil(percentile / 100 * self.count)) for percentile in percentiles]
+        pending = sorted(set(ranks))
+        values: Dict[int, int] = {}
+        cumulative = 0
+        for index in sorted(self._counts):
+            cumulative += self._counts[index]
+            while pending and cumulative >= pending[0]:
+                values[pending.pop(0)] = min(self._highest_equivalent_value(index), self.max)
+            if not pending:
+                break
+
+        return [values[rank] for rank in ranks]
+
+    def count_at_or_below(self, value: int) -> int:
+        """Return the number of values recorded at or below a value, to the precision of the histogram."""
+        limit = self._index(value)
+        return sum(count for index, count in self._counts.items() if index <= limit)
+
+
+def _status_matches(pattern: str, code: str) -> bool:
+    if pattern.endswith("xx"):
+        return code[:1] == pattern[:1] and len(code) == 3
+    return code == pattern
+
+
+class HistogramConfiguration(pydantic.BaseModel):
+    """Configuration of latency histograms built in-process from the raw results of an attack."""
+
+    percentiles: List[float] = pydantic.Field(
+        [50, 90, 95, 99],
+        description="The latency percentiles to report as metrics.",
+    )
+    buckets: List[servo.Duration] = pydantic.Field(
+        [],
+        description="Latency bucket boundaries to report the number of requests completing at or below as metrics.",
+    )
+    status_codes: List[str] = pydantic.Field(
+        ["2xx", "3xx", "4xx", "5xx"],
+        description="Status codes or classes (e.g., 503 or 5xx) to report the throughput of as metrics. Transport errors are reported with a status code of 0.",
+    )
+    significant_figures: int = pydantic.Field(
+        2,
+        ge=1,
+        le=5,
+        description="The number of significant figures of precision that latencies are recorded to.",
+    )
+
+    @pydantic.validator("percentiles", each_item=True)
+    @classmethod
+    def validate_percentile(cls, percentile: float) -> float:
+        if not 0 < percentile <= 100:
+            raise ValueError("percentiles must be greater than 0 and at most 100")
+        return percentile
+
+    @pydantic.validator("status_codes", each_item=True)
+    @classmethod
+    def validate_status_code(cls, status_code: str) -> str:
+        if not re.fullmatch(r"\d{1,3}|\dxx", status_code):
+            raise ValueError(f"invalid status code '{status_code}'")
+        return status_code
+
+    def metrics(self) -> List[servo.Metric]:
+        """Return the metrics reported from the histograms."""
+        return [
+            servo.Metric("throughput", servo.Unit.requests_per_minute),
+            servo.Metric("error_rate", servo.Unit.percentage),
+            servo.Metric("latency_total", servo.Unit.milliseconds),
+            servo.Metric("latency_mean", servo.Unit.milliseconds),
+            *(servo.Metric(f"latency_{percentile:g}th", servo.Unit.milliseconds) for percentile in self.percentiles),
+            servo.Metric("latency_max", servo.Unit.milliseconds),
+            servo.Metric("latency_min", servo.Unit.milliseconds),
+            *(servo.Metric(f"latency_bucket_{bucket}", servo.Unit.count) for bucket in self.buckets),
+            *(servo.Metric(f"throughput_{status_code}", servo.Unit.requests_per_minute) for status_code in self.status_codes),
+        ]
+
+
+class _Interval:
+    __slots__ = ("start", "finished_at", "histogram", "status_codes")
+
+    def __init__(self, start: float, significant_figures: int) -> None:
+        self.start = start
+        self.finished_at = start
+        self.histogram = LatencyHistogram(significant_figures)
+        self.status_codes: Dict[str, int] = collections.defaultdict(int)
+
+
+class VegetaResults:
+    """Raw Vegeta attack results aggregated into a latency histogram per reporting interval.
+
+    Results are added as they are read from `vegeta encode -to csv` by one or more sources (the
+    shards of an attack). Each source reports results roughly in time order, so an interval is
+    closed once every source has added a result timestamped after its end. Results arriving
+    after their interval has closed are counted in the earliest open interval.
+    """
+
+    def __init__(self, config: HistogramConfiguration, interval: servo.Duration, sources: int = 1) -> None: # noqa: D107
+        self.config = config
+        self.interval = interval.total_seconds()
+        self._origin: Optional[float] = None
+        self._closed = 0
+        self._intervals: Dict[int, _Interval] = {}
+        self._watermarks: List[float] = [-math.inf] * sources
+
+    def add(
+        self, timestamp: float, status_code: str, latency: int, *, source: int = 0
+    ) -> List[Tuple[float, Dict[str, float]]]:
+        """Add a result, returning the end timestamp and metric values of each interval closed by it."""
+        self._record(timestamp, status_code, latency)
+        self._watermarks[source] = max(self._watermarks[source], timestamp)
+        return self._close_through(min(self._watermarks))
+
+    def add_csv(
+        self, lines: Iterable[str], *, source: int = 0, since: Optional[float] = None
+    ) -> List[Tuple[float, Dict[str, float]]]:
+        """Add the results of lines of CSV, returning the end timestamp and metric values of each interval closed by them.
+
+        Results timestamped before `since` are discarded. Results are recorded into their intervals
+        in bulk and intervals are closed once per batch rather than once per result, so that
+        consumers keep up with high rate attacks.
+        """
+        watermark = self._watermarks[source]
+        batches: Dict[int, Tuple[List[float], List[str], List[int]]] = {}
+        for line in lines:
+            # NOTE: Only the leading timestamp, code and latency columns are read, none of which are quoted
+            timestamp, status_code, latency, _ = line.split(",", 3)
+            timestamp = int(timestamp) / 1e9
+            if since is not None and timestamp < since:
+                continue
+            if self._origin is None:
+                self._origin = timestamp
+
+            index = max(self._closed, math.floor((timestamp - self._origin) / self.interval))
+            batch = batches.get(index)
+            if batch is None:
+                batch = batches[index] = ([], [], [])
+            batch[0].append(timestamp)
+            batch[1].append(status_code)
+            batch[2].append(int(latency))
+
+        for index, (timestamps, status_codes, latencies) in batches.items():
+            interval = self._interval(index)
+            interval.histogram.record_many(latencies)
+            for status_code, count in collections.Counter(status_codes).items():
+                interval.status_codes[status_code] += count
+            interval.finished_at = max(
+                interval.finished_at, max(map(lambda timestamp, latency: timestamp + latency / 1e9, timestamps, latencies))
+            )
+            watermark = max(watermark, max(timestamps))
+
+        self._watermarks[source] = watermark
+        return self._close_through(min(self._watermarks))
+
+    def finish(self, source: int = 0) -> List[Tuple[float, Dict[str, float]]]:
+        """Mark a source as finished, returning the end timestamp and metric values of each interval closed.
+
+        The interval in progress is closed at its last result once every source has finished.
+        """
+        self._watermarks[source] = math.inf
+        if min(self._watermarks) < math.inf:
+            return self._close_through(min(self._watermarks))
+
+        closed = []
+        for index in sorted(self._intervals):
+            interval = self._intervals.pop(index)
+            end = interval.start + self.interval
+            closed.append(self._close(interval, end if self._intervals else min(end, interval.finished_at)))
+        return closed
+
+    def _interval(self, index: int) -> _Interval:
+        interval = self._intervals.get(index)
+        if interval is None:
+            interval = self._intervals[index] = _Interval(
+                self._origin + index * self.interval, self.config.significant_figures
+            )
+        return interval
+
+    def _record(self, timestamp: float, status_code: str, latency: int) -> None:
+        if self._origin is None:
+            self._origin = timestamp
+
+        interval = self._interval(max(self._closed, math.floor((timestamp - self._origin) / self.interval)))
+        interval.histogram.record(latency)
+        interval.status_codes[status_code] += 1
+        interval.finished_at = max(interval.finished_at, timestamp + latency / 1e9)
+
+    def _close_through(self, watermark: float) -> List[Tuple[float, Dict[str, float]]]:
+        if self._origin is None or watermark == -math.inf:
+            return []
+
+        self._closed = max(self._closed, math.floor((watermark - self._origin) / self.interval))
+        return [
+            self._close(interval, interval.start + self.interval)
+            for interval in map(self._intervals.pop, sorted(filter(lambda index: index < self._closed, self._intervals)))
+        ]
+
+    def _close(self, interval: _Interval, end: float) -> Tuple[float, Dict[str, float]]:
+        histogram = interval.histogram
+        elapsed_minutes = max(end - interval.start, 1e-9) / 60
+        successes = sum(
+            count for status_code, count in interval.status_codes.items() if 200 <= int(status_code) < 400
+        )
+
+        values = {
+            "throughput": successes / elapsed_minutes,
+            "error_rate": 100 - (successes / histogram.count * 100),
+            "latency_total": histogram.total / 1e6,
+            "latency_mean": histogram.total / histogram.count / 1e6,
+            "latency_max": histogram.max / 1e6,
+            "latency_min": histogram.min / 1e6,
+        }
+        percentiles = histogram.percentiles(self.config.percentiles)
+        for percentile, value in zip(self.config.percentiles, percentiles):
+            values[f"latency_{percentile:g}th"] = value / 1e6
+        for bucket in self.config.buckets:
+            values[f"latency_bucket_{bucket}"] = histogram.count_at_or_below(int(bucket.total_seconds() * 1e9))
+        for pattern in self.config.status_codes:
+            count = sum(
+                count for status_code, count in interval.status_codes.items() if _status_matches(pattern, status_code)
+            )
+            values[f"throughput_{pattern}"] = count / elapsed_minutes
+
+        return end, values
+
+
+def _validate_rate(v: Union[int, str]) -> str:
+    assert isinstance(
+        v, (int, str)
+    ), "rate must be an integer or a rate descriptor string"
+
+    # Integer rates
+    if isinstance(v, int) or v.isdigit():
+        return str(v)
+
+    # Check for hits/interval
+    components = v.split("/")
+    assert len(components) == 2, "rate strings are of the form hits/interval"
+
+    hits = components[0]
+    duration = components[1]
+    assert hits.isnumeric(), "rate must have an integer hits component"
+
+    # Try to parse it from Golang duration string
+    try:
+        servo.Duration(duration)
+    except ValueError as e:
+        raise ValueError(f"Invalid duration '{duration}' in rate '{v}'") from e
+
+    return v
+
+
+def _validate_limited_rate(v: Union[int, str]) -> str:
+    rate = _validate_rate(v)
+    if _rate_per_second(rate) == 0:
+        raise ValueError("rates must be greater than zero")
+    return rate
+
+
+def _rate_per_second(rate: str) -> float:
+    hits, _, per = rate.partition("/")
+    return int(hits) / (servo.Duration(per).total_seconds() if per else 1)
+
+
+def _format_rate(per_second: float) -> str:
+    # NOTE: Vegeta requires integral hits and treats a rate of zero as unlimited
+    if per_second >= 10:
+        return f"{round(per_second)}/1s"
+    return f"{max(1, round(per_second * 60))}/1m"
+
+
+class LoadProfileType(str, enum.Enum):
+    ramp = "ramp"
+    step = "step"
+    spike = "spike"
+
+    def __str__(self):
+        return self.value
+
+
+class LoadProfile(pydantic.BaseModel):
+    """A schedule of request rates over the duration of a measurement.
+
+    Profiles are executed as successive attack segments at constant rates:
+
+    * `ramp` profiles change linearly from `start_rate` to `end_rate` across `segments` segments.
+    * `step` profiles attack at each of the `rates` in turn for an equal share of the duration.
+    * `spike` profiles attack at `spike_rate` for the last `spike_duration` of every `period` and
+        at the rate of the configuration otherwise.
+    """
+
+    type: LoadProfileType = pydantic.Field(
+        description="The type of load profile.",
+    )
+    start_rate: Optional[str] = pydantic.Field(
+        None,
+        description="The rate to start a ramp at.",
+    )
+    end_rate: Optional[str] = pydantic.Field(
+        None,
+        description="The rate to end a ramp at.",
+    )
+    segments: int = pydantic.Field(
+        5,
+        ge=2,
+        description="The number of segments to ramp across.",
+    )
+    rates: List[str] = pydantic.Field(
+        [],
+        description="The rates of the steps of a step profile.",
+    )
+    spike_rate: Optional[str] = pydantic.Field(
+        None,
+        description="The rate to attack at during a spike.",
+    )
+    period: Optional[servo.Duration] = pydantic.Field(
+        None,
+        description="How often spikes occur.",
+    )
+    spike_duration: Optional[servo.Duration] = pydantic.Field(
+        None,
+        description="How long each spike lasts.",
+    )
+
+    @pydantic.validator("start_rate", "end_rate", "spike_rate", "rates", each_item=True)
+    @classmethod
+    def validate_rate(cls, v: Union[int, str]) -> str:
+        return _validate_limited_rate(v)
+
+    @pydantic.root_validator(skip_on_failure=True)
+    @classmethod
+    def validate_profile(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        type_ = values["type"]
+        if type_ == LoadProfileType.ramp:
+            if values["start_rate"] is None or values["end_rate"] is None:
+                raise ValueError("ramp profiles require a start_rate and end_rate")
+        elif type_ == LoadProfileType.step:
+            if not values["rates"]:
+                raise ValueError("step profiles require rates")
+        elif type_ == LoadProfileType.spike:
+            spike_rate, period, spike_duration = servo.values_for_keys(values, ("spike_rate", "period", "spike_duration"))
+            if spike_rate is None or period is None or spike_duration is None:
+                raise ValueError("spike profiles require a spike_rate, period and spike_duration")
+            if spike_duration >= period:
+                raise ValueError("spike_duration must be shorter than period")
+
+        return values
+
+    def schedule(self, rate: str, duration: servo.Duration) -> List[Tuple[str, servo.Duration]]:
+        """Return the rate and duration of each segment of the profile across a duration.
+
+        The rate of the configuration is given as the base rate of spike profiles.
+        """
+        total = duration.total_seconds()
+        if self.type == LoadProfileType.ramp:
+            start, end = _rate_per_second(self.start_rate), _rate_per_second(self.end_rate)
+            segments = [
+                (_format_rate(start + (end - start) * index / (self.segments - 1)), total / self.segments)
+                for index in range(self.segments)
+            ]
+        elif self.type == LoadProfileType.step:
+            segments = [(step_rate, total / len(self.rates)) for step_rate in self.rates]
+        else:
+            period, spike_duration = self.period.total_seconds(), self.spike_duration.total_seconds()
+            segments = []
+            for offset in itertools.takewhile(lambda offset: offset < total, itertools.count(0, period)):
+                remaining = total - offset
+                segments.append((rate, min(period - spike_duration, remaining)))
+                if remaining > period - spike_duration:
+                    segments.append((self.spike_rate, min(spike_duration, remaining - (period - spike_duration))))
+
+        return [(segment_rate, servo.Duration(seconds)) for segment_rate, seconds in segments]
+
+
+class ThroughputSearch(pydantic.BaseModel):
+    """A search for the maximum throughput sustainable within a latency and error rate objective.
+
+    The rate is probed with short attacks that grow exponentially from `start_rate` until the
+    objective is missed and is then bisected until the highest sustainable rate is known to
+    within `tolerance`.
+    """
+
+    latency: servo.Duration = pydantic.Field(
+        description="The latency objective at the percentile.",
+    )
+    percentile: float = pydantic.Field(
+        99,
+        description="The latency percentile that the objective applies to.",
+    )
+    max_error_rate: float = pydantic.Field(
+        1.0,
+        ge=0,
+        le=100,
+        description="The maximum error rate percentage of the objective.",
+    )
+    start_rate: str = pydantic.Field(
+        "10/1s",
+        description="The rate of the first probe.",
+    )
+    max_rate: Optional[str] = pydantic.Field(
+        None,
+        description="The highest rate to probe.",
+    )
+    growth_factor: float = pydantic.Field(
+        2.0,
+        gt=1,
+        description="The factor to grow the rate by between probes until the objective is missed.",
+    )
+    tolerance: float = pydantic.Field(
+        0.05,
+        gt=0,
+        lt=1,
+        description="The relative precision to find the maximum sustainable rate to.",
+    )
+    probe_duration: servo.Duration = pydantic.Field(
+        "10s",
+        description="How long to attack at each probed rate.",
+    )
+    max_probes: int = pydantic.Field(
+        20,
+        ge=1,
+        description="The maximum number of probes to run.",
+    )
+
+    @pydantic.validator("start_rate", "max_rate")
+    @classmethod
+    def validate_rate(cls, v: Union[int, str]) -> str:
+        return _validate_limited_rate(v)
+
+    @property
+    def latency_metric(self) -> str:
+        """Return the name of the latency metric that the objective applies to."""
+        return f"latency_{self.percentile:g}th"
+
+    def sustained(self, reports: "VegetaReports") -> bool:
+        """Return whether the latest report of a probe meets the objective."""
+        return (
+            reports.latest("error_rate") <= self.max_error_rate
+            and reports.latest(self.latency_metric) <= self.latency.total_seconds() * 1000
+        )
+
+
 class VegetaConfiguration(servo.BaseConfiguration):
     """
     Configuration of the Vegeta connector
@@ -137,6 +754,27 @@ class VegetaConfiguration(servo.BaseConfiguration):
         "15s",
         description="How often to report metrics during a measurement cycle.",
     )
+    histograms: Optional[HistogramConfiguration] = pydantic.Field(
+        None,
+        description="Build latency histograms in-process from the raw results of the attack instead of reading the reports of `vegeta report`.",
+    )
+    shards: int = pydantic.Field(
+        1,
+        ge=1,
+        description="Specifies the number of `vegeta attack` processes to split the rate and targets across. The raw results of sharded attacks are always aggregated in-process.",
+    )
+    pin_shards: bool = pydantic.Field(
+        False,
+        description="Specifies whether to pin each shard to a single CPU core.",
+    )
+    profile: Optional[LoadProfile] = pydantic.Field(
+        None,
+        description="Specifies a load profile to execute as successive attack segments instead of attacking at a constant rate.",
+    )
+    search: Optional[ThroughputSearch] = pydantic.Field(
+        None,
+        description="Specifies a search for the maximum sustainable throughput to run instead of attacking at a constant rate.",
+    )
     _duration: servo.Duration = pydantic.PrivateAttr(None)
 
     @property
@@ -146,6 +784,46 @@ class VegetaConfiguration(servo.BaseConfiguration):
         else:
             return None
 
+    @property
+    def histogram_config(self) -> Optional[HistogramConfiguration]:
+        """Return the configuration of the histograms that raw results are aggregated into, if any.
+
+        Sharded attacks are aggregated with the default configuration unless one is given so that
+        the results of all shards merge exactly.
+        """
+        if self.histograms is None and self.shards > 1:
+            return HistogramConfiguration()
+        return self.histograms
+
+    def metrics(self) -> List[servo.Metric]:
+        """Return the metrics reported by the configured attack."""
+        histogram_config = self.histogram_config
+        metrics = histogram_config.metrics() if histogram_config else METRICS
+        if self.profile or self.search:
+            metrics = [*metrics, OFFERED_RATE]
+        if self.search:
+            metrics = [*metrics, MAX_SUSTAINABLE_THROUGHPUT]
+        return metrics
+
+    @pydantic.root_validator(skip_on_failure=True)
+    @classmethod
+    def validate_search(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        search: Optional[ThroughputSearch] = values["search"]
+        if search is None:
+            return values
+
+        if values["profile"] is not None:
+            raise ValueError("profile and search cannot both be configured")
+
+        histograms = values["histograms"]
+        if histograms is None and values["shards"] > 1:
+            histograms = HistogramConfiguration()
+        metrics = histograms.metrics() if histograms else METRICS
+        if search.latency_metric not in map(lambda metric: metric.name, metrics):
+            raise ValueError(f"latency percentile {search.percentile:g} of the search is not reported")
+
+        return values
+
     @pydantic.root_validator(pre=True)
     @classmethod
     def validate_target(cls, values: Dict[str, Any]) -> Dict[str, Any]:
@@ -231,29 +909,7 @@ class VegetaConfiguration(servo.BaseConfiguration):
     @pydantic.validator("rate")
     @classmethod
     def validate_rate(cls, v: Union[int, str]) -> str:
-        assert isinstance(
-            v, (int, str)
-        ), "rate must be an integer or a rate descriptor string"
-
-        # Integer rates
-        if isinstance(v, int) or v.isdigit():
-            return str(v)
-
-        # Check for hits/interval
-        components = v.split("/")
-        assert len(components) == 2, "rate strings are of the form hits/interval"
-
-        hits = components[0]
-        duration = components[1]
-        assert hits.isnumeric(), "rate must have an integer hits component"
-
-        # Try to parse it from Golang duration string
-        try:
-            servo.Duration(duration)
-        except ValueError as e:
-            raise ValueError(f"Invalid duration '{duration}' in rate '{v}'") from e
-
-        return v
+        return _validate_rate(v)
 
     @classmethod
     def generate(cls, **kwargs) -> "VegetaConfiguration":
@@ -271,7 +927,7 @@ class VegetaConfiguration(servo.BaseConfiguration):
 
 class VegetaChecks(servo.BaseChecks):
     config: VegetaConfiguration
-    reports: Optional[List[VegetaReport]] = None
+    reports: Optional[VegetaReports] = None
 
     @servo.require("Vegeta execution")
     async def check_execution(self) -> Tuple[bool, str]:
@@ -285,12 +941,15 @@ class VegetaChecks(servo.BaseChecks):
 
     @servo.check("Error rate < 5.0%")
     def check_error_rates(self) -> Tuple[bool, str]:
-        vegeta_report = self.reports[-1]
+        error_rate = self.reports.latest("error_rate")
         return (
-            vegeta_report.error_rate < 5.0,
-            f"Vegeta reported an error rate of {vegeta_report.error_rate:.2f}%",
+            error_rate < 5.0,
+            f"Vegeta reported an error rate of {error_rate:.2f}%",
         )
 
+    class Config:
+        arbitrary_types_allowed = True
+
 
 @servo.metadata(
     description="Vegeta load testing connector",
@@ -307,11 +966,11 @@ class VegetaConnector(servo.BaseConnector):
         """
         Describes the metrics and components exported by the connector.
         """
-        return servo.Description(metrics=METRICS, components=[])
+        return servo.Description(metrics=self.config.metrics(), components=[])
 
     @servo.on_event()
     def metrics(self) -> List[servo.Metric]:
-        return METRICS
+        return self.config.metrics()
 
     @servo.on_event()
     async def check(
@@ -320,7 +979,7 @@ class VegetaConnector(servo.BaseConnector):
         halt_on: Optional[servo.ErrorSeverity] = servo.ErrorSeverity.critical,
     ) -> List[servo.Check]:
         # Take the current config and run a 5 second check against it
-        check_config = self.config.copy()
+        check_config = self.config.copy(update={"search": None})
         check_config._duration = "5s"
         check_config.reporting_interval = "1s"
 
@@ -336,28 +995,41 @@ class VegetaConnector(servo.BaseConnector):
         number_of_urls = (
             1 if self.config.target else _number_of_lines_in_file(self.config.targets)
         )
-        summary = f"Loading {number_of_urls} URL(s) for {self.config._duration} (delay of {control.delay}, warmup of {control.warmup}) at a rate of {self.config.rate} (reporting every {self.config.reporting_interval})"
+        if self.config.search:
+            rate = f"searching for the maximum sustainable throughput from {self.config.search.start_rate}"
+        elif self.config.profile:
+            rate = f"following a {self.config.profile.type} load profile"
+        else:
+            rate = f"at a rate of {self.config.rate}"
+        summary = f"Loading {number_of_urls} URL(s) for {self.config._duration} (delay of {control.delay}, warmup of {control.warmup}) {rate} (reporting every {self.config.reporting_interval})"
         self.logger.info(summary)
 
         # Run the load generator, publishing metrics for interested subscribers
+        max_sustainable_throughput = None
         async with self.publish('loadgen.vegeta') as publisher:
-            _, vegeta_reports = await _run_vegeta(
-                config=self.config, warmup_until=warmup_until, publisher=publisher
-            )
+            if self.config.search:
+                _, vegeta_reports, max_sustainable_throughput = await _search_throughput(
+                    config=self.config, publisher=publisher
+                )
+            else:
+                _, vegeta_reports = await _run_vegeta(
+                    config=self.config, warmup_until=warmup_until, publisher=publisher
+                )
 
         self.logger.info(
             f"Producing time series readings from {len(vegeta_reports)} Vegeta reports"
         )
-        readings = (
-            _time_series_readings_from_vegeta_reports(metrics, vegeta_reports)
-            if vegeta_reports
-            else []
-        )
+        readings = vegeta_reports.time_series(metrics) if vegeta_reports else []
+        if max_sustainable_throughput is not None and (not metrics or MAX_SUSTAINABLE_THROUGHPUT.name in metrics):
+            readings.append(servo.ColumnarTimeSeries(
+                MAX_SUSTAINABLE_THROUGHPUT, [datetime.datetime.now().timestamp()], [max_sustainable_throughput * 60]
+            ))
+        annotations = {"load_profile": summary}
+        if vegeta_reports and vegeta_reports.segments:
+            annotations["load_segments"] = json.dumps(vegeta_reports.segments)
         measurement = servo.Measurement(
             readings=readings,
-            annotations={
-                "load_profile": summary,
-            },
+            annotations=annotations,
         )
         self.logger.trace(
             f"Reporting time series metrics {devtools.pformat(measurement)}"
@@ -370,48 +1042,280 @@ async def _run_vegeta(
     config: VegetaConfiguration,
     warmup_until: Optional[datetime.datetime] = None,
     publisher: Optional[servo.Publisher] = None,
-) -> Tuple[int, List[VegetaReport]]:
-    vegeta_reports: List[VegetaReport] = []
-    vegeta_cmd = _build_vegeta_command(config)
+) -> Tuple[int, VegetaReports]:
+    if config.profile:
+        return await _run_vegeta_profile(config, warmup_until, publisher)
+
+    vegeta_reports = VegetaReports(config.metrics())
+    histogram_config = config.histogram_config
     ansi_escape = re.compile(r"(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]")
     progress = servo.DurationProgress(config.duration)
 
-    async def process_stdout(output: str) -> None:
-        json_report = ansi_escape.sub("", output)
-        vegeta_report = VegetaReport(**json.loads(json_report))
+    def report_progress() -> None:
+        if not progress.started:
+            progress.start()
+
+        summary = _summarize_report(vegeta_reports, config)
+        servo.logger.info(progress.annotate(summary), progress=progress.progress)
+
+    with tempfile.TemporaryDirectory(prefix="vegeta-") as directory:
+        commands = _build_shard_commands(config, pathlib.Path(directory))
+        cores = _shard_cores(len(commands)) if config.pin_shards else [None] * len(commands)
+        if histogram_config:
+            results = VegetaResults(histogram_config, config.reporting_interval, sources=len(commands))
+            warmup_timestamp = warmup_until.timestamp() if warmup_until else None
+
+        async def append_intervals(intervals: List[Tuple[float, Dict[str, float]]]) -> None:
+            for timestamp, values in intervals:
+                if publisher:
+                    await publisher(servo.Message(json={"timestamp": timestamp, **values}))
+
+                vegeta_reports.append_values(timestamp, values)
+                report_progress()
+
+        def process_results(source: int) -> Callable[[List[str]], Awaitable[None]]:
+            async def process_stdout(lines: List[str]) -> None:
+                await append_intervals(results.add_csv(lines, source=source, since=warmup_timestamp))
+
+            return process_stdout
+
+        async def process_reports(output: str) -> None:
+            report = json.loads(ansi_escape.sub("", output))
+
+            if warmup_until is None or datetime.datetime.now() > warmup_until:
+                if publisher:
+                    await publisher(servo.Message(json=VegetaReport(**report)))
+
+                vegeta_reports.append(report)
+                report_progress()
+            else:
+                servo.logger.debug(
+                    f"Vegeta metrics excluded (warmup in effect): {report}"
+                )
+
+        async def run_shard(source: int, attack_args: List[str], consumer_args: List[str], core: Optional[int]) -> int:
+            servo.logger.debug(f"Vegeta started: `{' '.join(attack_args)} | {' '.join(consumer_args)}`")
+            exit_code = await _stream_vegeta(
+                attack_args,
+                consumer_args,
+                target=config.target,
+                core=core,
+                stdout_callback=(None if histogram_config else process_reports),
+                stdout_batch_callback=(process_results(source) if histogram_config else None),
+                stderr_callback=lambda m: servo.logger.error(f"Vegeta stderr: {m}"),
+            )
+            if histogram_config:
+                await append_intervals(results.finish(source))
+            return exit_code
+
+        exit_codes = await asyncio.gather(*(
+            run_shard(source, attack_args, consumer_args, core)
+            for source, ((attack_args, consumer_args), core) in enumerate(zip(commands, cores))
+        ))
+
+    exit_code = next(filter(None, exit_codes), 0)
+    servo.logger.debug(f"Vegeta exited with exit code: {exit_code}")
+    for (attack_args, _), shard_exit_code in zip(commands, exit_codes):
+        if shard_exit_code != 0:
+            servo.logger.error(
+                f"Vegeta command `{' '.join(attack_args)}` failed with exit code {shard_exit_code}"
+            )
+
+    return exit_code, vegeta_reports
+
+
+async def _run_vegeta_profile(
+    config: VegetaConfiguration,
+    warmup_until: Optional[datetime.datetime] = None,
+    publisher: Optional[servo.Publisher] = None,
+) -> Tuple[int, VegetaReports]:
+    """Run the segments of a load profile as successive attacks, stopping at the first that fails."""
+    if not config.duration:
+        raise ValueError(f"invalid vegeta configuration: duration must be set (duration='{config.duration}')")
+
+    vegeta_reports = VegetaReports(config.metrics())
+    exit_code = 0
+    for rate, duration in config.profile.schedule(config.rate, config.duration):
+        segment_config = config.copy(update={"rate": rate, "profile": None})
+        segment_config._duration = duration
+
+        servo.logger.info(f"Vegeta {config.profile.type} profile segment attacking at {rate} for {duration}")
+        started_at = datetime.datetime.now()
+        exit_code, segment_reports = await _run_vegeta(segment_config, warmup_until, publisher)
+        vegeta_reports.extend(segment_reports, offered_rate=_rate_per_second(rate) * 60)
+        vegeta_reports.segments.append({
+            "start": started_at.isoformat(),
+            "end": datetime.datetime.now().isoformat(),
+            "rate": rate,
+        })
+        if exit_code != 0:
+            break
 
-        if warmup_until is None or datetime.datetime.now() > warmup_until:
-            if not progress.started:
-                progress.start()
+    return exit_code, vegeta_reports
 
-            if publisher:
-                await publisher(servo.Message(json=vegeta_report))
 
-            vegeta_reports.append(vegeta_report)
-            summary = _summarize_report(vegeta_report, config)
-            servo.logger.info(progress.annotate(summary), progress=progress.progress)
+async def _search_throughput(
+    config: VegetaConfiguration,
+    publisher: Optional[servo.Publisher] = None,
+) -> Tuple[int, VegetaReports, float]:
+    """Search for the maximum rate sustainable within the objective of the search configuration.
+
+    Each probe is a short attack reported as a single interval. The reports of every probe are
+    returned with the rate that was offered and each probe is published with its outcome. Probes
+    are not subject to warmup as each is judged on its own.
+
+    Returns the exit status of the last probe, the probe reports and the maximum sustainable rate
+    in requests per second.
+    """
+    search = config.search
+    probe_config = config.copy(update={"search": None, "reporting_interval": search.probe_duration})
+    probe_config._duration = search.probe_duration
+    vegeta_reports = VegetaReports([*probe_config.metrics(), OFFERED_RATE])
+    max_rate = _rate_per_second(search.max_rate) if search.max_rate else math.inf
+
+    sustainable, unsustainable = 0.0, None
+    rate = _rate_per_second(search.start_rate)
+    exit_code = 0
+    for _ in range(search.max_probes):
+        probe_config.rate = _format_rate(rate)
+        rate = _rate_per_second(probe_config.rate)
+        started_at = datetime.datetime.now()
+        exit_code, probe_reports = await _run_vegeta(probe_config)
+        if exit_code != 0 or not probe_reports:
+            servo.logger.error(f"Vegeta throughput search aborted: probe at {probe_config.rate} failed")
+            break
+
+        sustained = search.sustained(probe_reports)
+        vegeta_reports.extend(probe_reports, offered_rate=rate * 60)
+        probe = {
+            "start": started_at.isoformat(),
+            "end": datetime.datetime.now().isoformat(),
+            "rate": probe_config.rate,
+            "sustained": sustained,
+        }
+        vegeta_reports.segments.append(probe)
+        if publisher:
+            await publisher(servo.Message(json={
+                **probe,
+                **{name: column[-1] for name, column in probe_reports.columns.items()},
+            }))
+        servo.logger.info(
+            f"Vegeta probe at {probe_config.rate} {'met' if sustained else 'missed'} the objective"
+        )
+
+        if sustained:
+            sustainable = rate
         else:
-            servo.logger.debug(
-                f"Vegeta metrics excluded (warmup in effect): {vegeta_report}"
-            )
+            unsustainable = rate
 
-    servo.logger.debug(f"Vegeta started: `{vegeta_cmd}`")
-    exit_code = await servo.stream_subprocess_shell(
-        vegeta_cmd,
-        stdout_callback=process_stdout,
-        stderr_callback=lambda m: servo.logger.error(f"Vegeta stderr: {m}"),
-    )
+        if unsustainable is None:
+            if rate >= max_rate:
+                break
+            rate = min(rate * search.growth_factor, max_rate)
+        else:
+            if unsustainable - sustainable <= search.tolerance * unsustainable:
+                break
+
+            # NOTE: Rates are rounded to whole hits, so the midpoint can land back on a probed bound
+            rate = _rate_per_second(_format_rate((sustainable + unsustainable) / 2))
+            if rate in (sustainable, unsustainable):
+                break
+
+    servo.logger.info(f"Vegeta found a maximum sustainable throughput of {sustainable:.2f} requests per second")
+    return exit_code, vegeta_reports, sustainable
+
+
+async def _stream_vegeta(
+    attack_args: List[str],
+    consumer_args: List[str],
+    *,
+    target: Optional[str] = None,
+    core: Optional[int] = None,
+    stdout_callback: Optional[servo.OutputStreamCallback] = None,
+    stderr_callback: Optional[servo.OutputStreamCallback] = None,
+    stdout_batch_callback: Optional[servo.OutputStreamBatchCallback] = None,
+) -> int:
+    """Run `vegeta attack` with its output piped into a consumer process and stream the output of the consumer.
+
+    The processes are executed directly and connected by an OS pipe rather than through a shell.
+    A single target is written to the standard input of the attack, which is pinned to a CPU core
+    when one is given. The output of the consumer is streamed by line, or in batches of lines per
+    read when `stdout_batch_callback` is given.
+
+    Returns the exit status of the attack, or of the consumer if the attack succeeded.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        try:
+            attack = await asyncio.create_subprocess_exec(
+                *attack_args,
+                stdin=(asyncio.subprocess.PIPE if target else asyncio.subprocess.DEVNULL),
+                stdout=write_fd,
+                stderr=asyncio.subprocess.PIPE,
+                preexec_fn=(functools.partial(os.sched_setaffinity, 0, {core}) if core is not None else None),
+            )
+        except FileNotFoundError as error:
+            servo.logger.error(f"Vegeta could not be executed: {error}")
+            return 127
 
-    servo.logger.debug(f"Vegeta exited with exit code: {exit_code}")
-    if exit_code != 0:
-        servo.logger.error(
-            f"Vegeta command `{vegeta_cmd}` failed with exit code {exit_code}"
+        try:
+            consumer = await asyncio.create_subprocess_exec(
+                *consumer_args,
+                stdin=read_fd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except BaseException:
+            attack.kill()
+            await attack.wait()
+            raise
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    try:
+        if target:
+            try:
+                attack.stdin.write(f"{target}\n".encode())
+                await attack.stdin.drain()
+            except (ConnectionError, RuntimeError):
+                # NOTE: The attack exited before reading its target, which is reported by its exit status
+                pass
+            finally:
+                attack.stdin.close()
+
+        attack_exit_code, consumer_exit_code = await asyncio.gather(
+            servo.stream_subprocess_output(attack, stderr_callback=stderr_callback),
+            servo.stream_subprocess_output(
+                consumer,
+                stdout_callback=stdout_callback,
+                stderr_callback=stderr_callback,
+                stdout_batch_callback=stdout_batch_callback,
+            ),
         )
+    except BaseException:
+        for process in (attack, consumer):
+            if process.returncode is None:
+                process.kill()
+        raise
 
-    return exit_code, vegeta_reports
+    return attack_exit_code or consumer_exit_code
 
 
-def _build_vegeta_command(config: VegetaConfiguration) -> str:
+def _build_vegeta_command(
+    config: VegetaConfiguration,
+    *,
+    rate: Optional[str] = None,
+    targets: Optional[pathlib.Path] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[List[str], List[str]]:
+    """Return the arguments of the `vegeta attack` command and of the command consuming its results.
+
+    The rate, targets and maximum number of workers of the configuration can be overridden for a shard.
+    """
+    rate = rate or config.rate
+    targets = targets or config.targets
+    max_workers = max_workers or config.max_workers
     if not config.duration:
         raise ValueError(f"invalid vegeta configuration: duration must be set (duration='{config.duration}')")
 
@@ -422,11 +1326,11 @@ def _build_vegeta_command(config: VegetaConfiguration) -> str:
                 "vegeta",
                 "attack",
                 "-rate",
-                config.rate,
+                rate,
                 "-duration",
                 config.duration,
                 "-targets",
-                config.targets if config.targets else "stdin",
+                targets if targets else "stdin",
                 "-format",
                 config.format,
                 "-connections",
@@ -434,7 +1338,7 @@ def _build_vegeta_command(config: VegetaConfiguration) -> str:
                 "-workers",
                 config.workers,
                 "-max-workers",
-                config.max_workers or 18446744073709551615,
+                max_workers or 18446744073709551615,
                 "-http2",
                 config.http2,
                 "-keepalive",
@@ -447,64 +1351,109 @@ def _build_vegeta_command(config: VegetaConfiguration) -> str:
         )
     )
 
-    vegeta_report_args = [
-        "vegeta",
-        "report",
-        "-type",
-        "json",
-        "-every",
-        str(config.reporting_interval),
+    if config.histogram_config:
+        consumer_args = ["vegeta", "encode", "-to", "csv"]
+    else:
+        consumer_args = [
+            "vegeta",
+            "report",
+            "-type",
+            "json",
+            "-every",
+            str(config.reporting_interval),
+        ]
+
+    return vegeta_attack_args, consumer_args
+
+
+def _build_shard_commands(config: VegetaConfiguration, directory: pathlib.Path) -> List[Tuple[List[str], List[str]]]:
+    """Return the attack and consumer arguments of each shard of an attack.
+
+    The rate and maximum number of workers are split evenly across the shards and targets files are
+    partitioned into files written to the given directory. Shards that would attack at a rate of
+    zero (which Vegeta treats as unlimited) are not run.
+    """
+    if config.shards == 1:
+        return [_build_vegeta_command(config)]
+
+    rates = _shard_rates(config.rate, config.shards)
+    shards = len(rates)
+    targets = _partition_targets(config.targets, config.format, shards, directory) if config.targets else [None] * shards
+    max_workers = math.ceil(config.max_workers / shards) if config.max_workers else None
+    return [
+        _build_vegeta_command(config, rate=rate, targets=shard_targets, max_workers=max_workers)
+        for rate, shard_targets in zip(rates, targets)
     ]
 
-    echo_cmd = f'echo "{config.target}" | ' if config.target else ""
-    vegeta_cmd = (
-        echo_cmd + " ".join(vegeta_attack_args) + " | " + " ".join(vegeta_report_args)
-    )
-    return vegeta_cmd
 
+def _shard_rates(rate: str, shards: int) -> List[str]:
+    hits, _, per = rate.partition("/")
+    hits = int(hits)
+    if hits == 0:
+        return [rate] * shards
 
-def _time_series_readings_from_vegeta_reports(
-    metrics: Optional[List[str]], vegeta_reports: List[VegetaReport]
-) -> List[servo.TimeSeries]:
-    readings = []
+    quotient, remainder = divmod(hits, shards)
+    return [
+        "/".join(filter(None, (str(quotient + (index < remainder)), per)))
+        for index in range(min(shards, hits))
+    ]
 
-    for metric in METRICS:
-        if metrics and metric.name not in metrics:
-            continue
 
-        if metric.name in (
-            "throughput",
-            "error_rate",
-        ):
-            key = metric.name
-        elif metric.name.startswith("latency_"):
-            key = "latencies" + "." + metric.name.replace("latency_", "")
-        else:
-            raise NameError(f'Unexpected metric name "{metric.name}"')
+def _partition_targets(
+    targets: pathlib.Path, format: TargetFormat, shards: int, directory: pathlib.Path
+) -> List[pathlib.Path]:
+    """Partition the targets in a file round-robin into a file per shard.
 
-        data_points: List[servo.DataPoint] = []
-        for report in vegeta_reports:
-            value = servo.value_for_key_path(report.dict(by_alias=True), key)
-            data_points.append(
-                servo.DataPoint(metric, report.end, value)
-            )
+    Every shard attacks all of the targets when there are fewer targets than shards.
+    """
+    entries: List[List[str]] = []
+    with open(targets) as file:
+        for line in file:
+            if not line.strip() or line.startswith("#"):
+                continue
+
+            if format == TargetFormat.json or not entries or line.split(" ", 1)[0] in servo.HTTP_METHODS:
+                entries.append([])
+            entries[-1].append(line.rstrip("\n"))
 
-        readings.append(servo.TimeSeries(metric, data_points))
+    if len(entries) < shards:
+        return [targets] * shards
 
-    return readings
+    paths = []
+    for index in range(shards):
+        path = directory / f"targets-{index}"
+        path.write_text("".join(
+            "\n".join(entry) + ("\n\n" if format == TargetFormat.http else "\n")
+            for entry in entries[index::shards]
+        ))
+        paths.append(path)
+    return paths
 
 
-def _summarize_report(report: VegetaReport, config: VegetaConfiguration) -> str:
-    def format_metric(value: servo.Numeric, unit: servo.Unit) -> str:
-        return f"{value:.2f}{unit.value}"
+def _shard_cores(shards: int) -> List[Optional[int]]:
+    if not hasattr(os, "sched_getaffinity"):
+        servo.logger.warning("Vegeta shards cannot be pinned to CPU cores on this platform")
+        return [None] * shards
 
-    throughput = format_metric(report.throughput, servo.Unit.requests_per_minute)
-    error_rate = format_metric(report.error_rate, servo.Unit.percentage)
-    latency_50th = format_metric(report.latencies.p50, servo.Unit.milliseconds)
-    latency_90th = format_metric(report.latencies.p90, servo.Unit.milliseconds)
-    latency_95th = format_metric(report.latencies.p95, servo.Unit.milliseconds)
-    latency_99th = format_metric(report.latencies.p99, servo.Unit.milliseconds)
-    return f'Vegeta attacking "{config.target}" @ {config.rate}: ~{throughput} ({error_rate} errors) [latencies: 50th={latency_50th}, 90th={latency_90th}, 95th={latency_95th}, 99th={latency_99th}]'
+    cores = sorted(os.sched_getaffinity(0))
+    return [cores[index % len(cores)] for index in range(shards)]
+
+
+_PERCENTILE_METRIC = re.compile(r"latency_([\d.]+th)")
+
+
+def _summarize_report(reports: VegetaReports, config: VegetaConfiguration) -> str:
+    def format_metric(name: str, unit: servo.Unit) -> str:
+        return f"{reports.latest(name):.2f}{unit.value}"
+
+    throughput = format_metric("throughput", servo.Unit.requests_per_minute)
+    error_rate = format_metric("error_rate", servo.Unit.percentage)
+    latencies = ", ".join(
+        f"{match.group(1)}={format_metric(name, servo.Unit.milliseconds)}"
+        for name, match in zip(reports.columns, map(_PERCENTILE_METRIC.fullmatch, reports.columns))
+        if match
+    )
+    return f'Vegeta attacking "{config.target}" @ {config.rate}: ~{throughput} ({error_rate} errors) [latencies: {latencies}]'
 
 
 def _number_of_lines_in_file(filename: pathlib.Path) -> int:
@@ -6,7 +6,9 @@ import asyncio
 import contextlib
 import contextvars
 import codecs
+import collections
 import datetime
+import enum
 import fnmatch
 import functools
 import inspect
@@ -14,12 +16,14 @@ import json as json_
 import random
 import string
 import re
+import time
 import yaml as yaml_
 import weakref
 
 from typing import Any, AsyncIterable, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Pattern, Set, Tuple, Union
 
 import pydantic
+import servo.repeating
 import servo.types
 
 
@@ -27,12 +31,18 @@ __all__ = [
     'BaseSubscription',
     'Callback',
     'Channel',
+    'ChannelStats',
     'Exchange',
     'Message',
     'Metadata',
     'Mixin',
+    'Operation',
     'Publisher',
+    'Reducer',
+    'Retention',
+    'Stats',
     'Subscriber',
+    'SubscriberStats',
     'Subscription',
 ]
 
@@ -142,6 +152,144 @@ ChannelName = pydantic.constr(
 )
 
 
+class Retention(pydantic.BaseModel):
+    """Retention describes the window of published Messages that a Channel keeps for replay.
+
+    Retained Messages are held in a ring buffer ordered by delivery. The buffer is bounded
+    by the number of Messages, by the age of the oldest Message, and by the total byte size
+    of the retained content. Whichever limit is reached first evicts the oldest Messages.
+
+    Attributes:
+        count: The maximum number of Messages to retain.
+        duration: The maximum age of retained Messages relative to their creation time.
+        max_bytes: The maximum total size of retained Message content in bytes.
+    """
+    count: Optional[pydantic.PositiveInt] = None
+    duration: Optional[servo.types.Duration] = None
+    max_bytes: Optional[pydantic.PositiveInt] = None
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def _check_bounded(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        if not any(values.get(key) for key in ('count', 'duration', 'max_bytes')):
+            raise ValueError("at least one of `count`, `duration`, or `max_bytes` must be given")
+
+        return values
+
+
+Replay = Union[bool, datetime.datetime, servo.types.DurationDescriptor]
+
+
+def _replay_cutoff(replay: Replay) -> Optional[datetime.datetime]:
+    # NOTE: `True` is an `int` so it must be handled before durations
+    if replay is True:
+        return None
+    elif isinstance(replay, datetime.datetime):
+        return replay
+    else:
+        return datetime.datetime.now() - servo.types.Duration(replay)
+
+
+def _age(message: Message) -> datetime.timedelta:
+    return datetime.datetime.now(message.created_at.tzinfo) - message.created_at
+
+
+STATS_CHANNEL = "servo.pubsub.stats"
+"""The name of the reserved Channel that an Exchange publishes its Stats to."""
+
+
+class _Meter:
+    """Counts events and reports their rate over a trailing window of whole seconds.
+
+    Counts are accumulated into one bucket per second so that marking an event is
+    constant time regardless of the event rate.
+    """
+
+    def __init__(self, window: int = 10) -> None:
+        self.count = 0
+        self._window = window
+        self._buckets: collections.deque = collections.deque()
+        self._started_at = time.monotonic()
+
+    def mark(self, count: int = 1) -> None:
+        """Record the occurrence of one or more events."""
+        self.count += count
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+            self._prune(second)
+
+    @property
+    def rate(self) -> float:
+        """Return the number of events per second within the trailing window."""
+        now = time.monotonic()
+        self._prune(int(now))
+        elapsed = min(self._window, now - self._started_at)
+        if elapsed <= 0:
+            return 0.0
+
+        return sum(count for _, count in self._buckets) / elapsed
+
+    def _prune(self, second: int) -> None:
+        while self._buckets and self._buckets[0][0] <= second - self._window:
+            self._buckets.popleft()
+
+
+class ChannelStats(pydantic.BaseModel):
+    """ChannelStats describes the traffic through a Channel.
+
+    Attributes:
+        name: The name of the Channel.
+        published: The total number of Messages published to the Channel.
+        delivered: The total number of Messages from the Channel handled by Subscribers.
+        publish_rate: The number of Messages published per second over the trailing window.
+        delivery_rate: The number of Messages handled per second over the trailing window.
+        retained: The number of Messages retained for replay.
+    """
+    name: str
+    published: int
+    delivered: int
+    publish_rate: float
+    delivery_rate: float
+    retained: int
+
+
+class SubscriberStats(pydantic.BaseModel):
+    """SubscriberStats describes how well a Subscriber is keeping up with its Messages.
+
+    Attributes:
+        selector: The selector of the Subscription.
+        consumer: The name of the callback or `iterator` for async iteration.
+        delivered: The total number of Messages handled by the Subscriber.
+        delivery_rate: The number of Messages handled per second over the trailing window.
+        queue_depth: The number of Messages delivered but not yet handled.
+        lag: The time elapsed since the creation of the oldest Message not yet handled, or
+            between the creation and handling of the most recent Message if that is longer.
+    """
+    selector: str
+    consumer: str
+    delivered: int
+    delivery_rate: float
+    queue_depth: int
+    lag: Optional[servo.types.Duration] = None
+
+
+class Stats(pydantic.BaseModel):
+    """Stats is a point in time snapshot of the traffic through an Exchange.
+
+    Attributes:
+        created_at: The date and time that the snapshot was taken.
+        queue_depth: The number of published Messages waiting to be processed by the Exchange.
+        channels: Stats for each Channel in the Exchange.
+        subscribers: Stats for each Subscriber in the Exchange.
+    """
+    created_at: datetime.datetime = pydantic.Field(default_factory=datetime.datetime.now)
+    queue_depth: int
+    channels: List[ChannelStats]
+    subscribers: List[SubscriberStats]
+
+
 class _ExchangeChildModel(pydantic.BaseModel):
     _exchange: Exchange = pydantic.PrivateAttr(None)
     __slots__ = ('__weakref__')  # NOTE: Pydantic and weakref both use __slots__
@@ -169,12 +317,18 @@ class Channel(_ExchangeChildModel):
         name: The unique name of the Channel within the Exchange.
         description: An optional supplemental description of the Channel.
         created_at: The date and time that the Channel was created.
+        retention: An optional policy for retaining published Messages for replay.
         exchange: The pub/sub Exchange that the Channel belongs to.
     """
     name: ChannelName
     description: Optional[str] = None
     created_at: datetime.datetime = pydantic.Field(default_factory=datetime.datetime.now)
+    retention: Optional[Retention] = None
     _closed: bool = pydantic.PrivateAttr(False)
+    _retained: collections.deque = pydantic.PrivateAttr(default_factory=collections.deque)
+    _retained_bytes: int = pydantic.PrivateAttr(0)
+    _published: _Meter = pydantic.PrivateAttr(default_factory=_Meter)
+    _delivered: _Meter = pydantic.PrivateAttr(default_factory=_Meter)
 
     async def publish(self, message: Message) -> None:
         """Publish a Message into the Channel."""
@@ -201,6 +355,67 @@ class Channel(_ExchangeChildModel):
         for subscriber in self.exchange._subscribers_to_channel(self, exclusive=True):
             subscriber.cancel()
 
+    def snapshot(self, since: Optional[datetime.datetime] = None, *, columnar: bool = False) -> Union[List[Message], Dict[str, List[Any]]]:
+        """Return the Messages currently retained by the Channel.
+
+        Args:
+            since: An optional point in time. When given, only Messages created at
+                or after the time are returned.
+            columnar: When True, return a mapping of Message attribute names to lists
+                of values (`created_at`, `content`, `content_type`, `metadata`) rather
+                than a list of Message objects.
+
+        Returns:
+            The retained Messages in delivery order as a list or in columnar form.
+        """
+        messages = self._retained_messages(since)
+        if columnar:
+            return {
+                'created_at': [message.created_at for message in messages],
+                'content': [message.content for message in messages],
+                'content_type': [message.content_type for message in messages],
+                'metadata': [message.metadata for message in messages],
+            }
+
+        return messages
+
+    def _retain(self, message: Message) -> None:
+        if self.retention is None:
+            return
+
+        self._retained.append(message)
+        self._retained_bytes += len(message.content)
+        self._evict_retained()
+
+    def _evict_retained(self) -> None:
+        retention = self.retention
+        if retention is None:
+            self._retained.clear()
+            self._retained_bytes = 0
+            return
+
+        cutoff = (
+            datetime.datetime.now() - retention.duration if retention.duration else None
+        )
+        while self._retained:
+            oldest = self._retained[0]
+            if (
+                (retention.count and len(self._retained) > retention.count)
+                or (retention.max_bytes and self._retained_bytes > retention.max_bytes)
+                or (cutoff and oldest.created_at < cutoff)
+            ):
+                self._retained.popleft()
+                self._retained_bytes -= len(oldest.content)
+            else:
+                break
+
+    def _retained_messages(self, since: Optional[datetime.datetime] = None) -> List[Message]:
+        self._evict_retained()
+        if since is None:
+            return list(self._retained)
+
+        return list(filter(lambda m: m.created_at >= since, self._retained))
+
     def stop(self) -> None:
         """Stop the current async iterator.
 
@@ -262,12 +477,25 @@ class Exchange(pydantic.BaseModel):
     """An Exchange facilitates the publication and subscription of Messages in Channels.
 
     Exchange objects are asynchronously iterable and will yield every Message published.
+
+    Attributes:
+        lag_threshold: An optional duration after which a Subscriber that has not yet handled
+            a Message is considered to be lagging. A warning is logged when a Subscriber
+            starts lagging. Messages waiting to be handled are checked every `lag_threshold`
+            so that Subscribers that have stopped consuming are detected.
+        stats_every: An optional interval at which Stats are published to the reserved
+            `servo.pubsub.stats` Channel while the Exchange is running.
     """
+    lag_threshold: Optional[servo.types.Duration] = None
+    stats_every: Optional[servo.types.Duration] = None
     _channels: Set[Channel] = pydantic.PrivateAttr(set())
     _publishers: List[Publisher] = pydantic.PrivateAttr([])
     _subscribers: List[Subscriber] = pydantic.PrivateAttr([])
+    _operators: Dict[Tuple[Selector, Operation], _Operator] = pydantic.PrivateAttr(default_factory=dict)
     _queue: asyncio.Queue = pydantic.PrivateAttr(default_factory=asyncio.Queue)
     _queue_processor: Optional[asyncio.Task] = pydantic.PrivateAttr(None)
+    _stats_publisher: Optional[servo.repeating.Job] = pydantic.PrivateAttr(None)
+    _lag_monitor: Optional[servo.repeating.Job] = pydantic.PrivateAttr(None)
     __slots__ = ('__weakref__')  # NOTE: Pydantic and weakref both use __slots__
 
     def start(self) -> None:
@@ -276,16 +504,47 @@ class Exchange(pydantic.BaseModel):
             raise RuntimeError("the Exchange is already running")
         self._queue_processor = asyncio.create_task(self._process_queue())
 
+        if self.stats_every:
+            channel = self.get_channel(STATS_CHANNEL)
+            if channel is None:
+                channel = Channel(name=STATS_CHANNEL, description="Traffic statistics for the Exchange", exchange=self)
+                self._channels.add(channel)
+
+            self._stats_publisher = servo.repeating.scheduler().schedule(
+                self.stats_every,
+                lambda: self.publish(Message(json=self.stats()), channel),
+                name=f"publish to '{STATS_CHANNEL}'",
+                delay=self.stats_every,
+            )
+
+        if self.lag_threshold:
+            self._lag_monitor = servo.repeating.scheduler().schedule(
+                self.lag_threshold,
+                self._check_lag,
+                name="check subscriber lag",
+                delay=self.lag_threshold,
+            )
+
     def clear(self) -> None:
         """Clear the Exchange by discarding all channels, publishers, and subscribers."""
         self._channels.clear()
         self._publishers.clear()
         self._subscribers.clear()
 
+        for operator in self._operators.values():
+            operator.cancel()
+        self._operators.clear()
+
     async def shutdown(self) -> None:
         """Shutdown the Exchange by processing all Messages and clearing all child objects."""
         if not self.running:
             raise RuntimeError("the Exchange is not running")
+        if self._stats_publisher:
+            self._stats_publisher.cancel()
+            self._stats_publisher = None
+        if self._lag_monitor:
+            self._lag_monitor.cancel()
+            self._lag_monitor = None
         await self._queue.join()
         self._queue_processor.cancel()
         await asyncio.gather(self._queue_processor, return_exceptions=True)
@@ -324,11 +583,53 @@ class Exchange(pydantic.BaseModel):
                 # Exit condition
                 break
 
+            # Retain before delivery so that replaying subscribers never miss a message
+            channel._retain(message)
+
+            # Stream operators deliver their results to the subscribers that share them
+            for operator in self._operators_matching(channel):
+                operator.accept(message, channel)
+
             # Notify subscribers in a new task to avoid blocking the queue
-            asyncio.create_task(_deliver_message_to_subscribers(message, channel, self._subscribers))
+            subscribers = list(filter(lambda s: s.operation is None, self._subscribers))
+            asyncio.create_task(_deliver_message_to_subscribers(message, channel, subscribers))
 
             self._queue.task_done()
 
+    def stats(self) -> Stats:
+        """Return a snapshot of the traffic through the Exchange."""
+        return Stats(
+            queue_depth=self._queue.qsize(),
+            channels=[
+                ChannelStats(
+                    name=channel.name,
+                    published=channel._published.count,
+                    delivered=channel._delivered.count,
+                    publish_rate=channel._published.rate,
+                    delivery_rate=channel._delivered.rate,
+                    retained=len(channel._retained),
+                )
+                for channel in sorted(self._channels, key=lambda c: c.name)
+            ],
+            subscribers=[subscriber.stats() for subscriber in self._subscribers],
+        )
+
+    def _check_lag(self) -> None:
+        for subscriber in self._subscribers:
+            subscriber._check_lag()
+
+    def _operators_matching(self, channel: Channel) -> List[_Operator]:
+        operators = []
+        for key, operator in list(self._operators.items()):
+            if not operator.subscribers:
+                # Discard operators once the last subscriber sharing them is gone
+                operator.cancel()
+                self._operators.pop(key)
+            elif operator.subscription.matches(channel):
+                operators.append(operator)
+
+        return operators
+
     @property
     def running(self) -> bool:
         """Return True if the Exchange is processing Messages."""
@@ -343,22 +644,33 @@ class Exchange(pydantic.BaseModel):
         """Return a Channel by name or `None` if no such Channel exists."""
         return next(filter(lambda m: m.name == name, self._channels), None)
 
-    def create_channel(self, name: str, description: Optional[str] = None) -> Channel:
+    def create_channel(
+        self,
+        name: str,
+        description: Optional[str] = None,
+        *,
+        retention: Optional[Retention] = None
+    ) -> Channel:
         """Create a new Channel in the Exchange.
 
         Args:
             name: A unique name for the Channel.
             description: An optional textual description about the Channel.
+            retention: An optional policy for retaining published Messages for replay
+                to late Subscribers.
 
         Raises:
-            ValueError: Raised if a Channel already exists with the name given.
+            ValueError: Raised if a Channel already exists with the name given or the name
+                is reserved.
 
         Returns:
             A newly created Channel object.
         """
+        if name == STATS_CHANNEL:
+            raise ValueError(f"The Channel name '{name}' is reserved")
         if self.get_channel(name) is not None:
             raise ValueError(f"A Channel named '{name}' already exists")
-        channel = Channel(name=name, description=description, exchange=self)
+        channel = Channel(name=name, description=description, retention=retention, exchange=self)
         self._channels.add(channel)
         return channel
 
@@ -392,6 +704,7 @@ class Exchange(pydantic.BaseModel):
         if channel_ is None:
             raise ValueError(f"no such Channel: {channel}")
 
+        channel_._published.mark()
         await self._queue.put(
             (message, channel_)
         )
@@ -446,7 +759,13 @@ class Exchange(pydantic.BaseModel):
         selector: Selector,
         *,
         timeout: Optional[servo.types.DurationDescriptor] = None,
-        until_done: Optional[servo.types.Futuristic] = None
+        until_done: Optional[servo.types.Futuristic] = None,
+        replay: Optional[Replay] = None,
+        window: Optional[servo.types.DurationDescriptor] = None,
+        slide: Optional[servo.types.DurationDescriptor] = None,
+        reduce: Optional[Union[Reducer, str]] = None,
+        sample: Optional[servo.types.DurationDescriptor] = None,
+        coalesce: Optional[servo.types.DurationDescriptor] = None
     ) -> AsyncContextManager[Subscriber]:
         """An async context manager for subscribing to Messages in the Exchange.
 
@@ -457,12 +776,29 @@ class Exchange(pydantic.BaseModel):
             async with exchange.subscribe("metrics.*") as subscription:
                 async for message, channel in subscription:
                     ...
+
+            # Receive the per-minute mean of each metrics channel
+            async with exchange.subscribe("metrics.*", window="60s", reduce="mean") as subscription:
+                async for message, channel in subscription:
+                    ...
             ```
 
+        See `create_subscriber` for a description of the arguments.
+
         Yields:
             Subscriber: The block temporary subscriber.
         """
-        subscriber = self.create_subscriber(selector, timeout=timeout, until_done=until_done)
+        subscriber = self.create_subscriber(
+            selector,
+            timeout=timeout,
+            until_done=until_done,
+            replay=replay,
+            window=window,
+            slide=slide,
+            reduce=reduce,
+            sample=sample,
+            coalesce=coalesce
+        )
         try:
             yield subscriber
         finally:
@@ -474,7 +810,13 @@ class Exchange(pydantic.BaseModel):
         *,
         callback: Optional[Callback] = None,
         timeout: Optional[servo.types.DurationDescriptor] = None,
-        until_done: Optional[servo.types.Futuristic] = None
+        until_done: Optional[servo.types.Futuristic] = None,
+        replay: Optional[Replay] = None,
+        window: Optional[servo.types.DurationDescriptor] = None,
+        slide: Optional[servo.types.DurationDescriptor] = None,
+        reduce: Optional[Union[Reducer, str]] = None,
+        sample: Optional[servo.types.DurationDescriptor] = None,
+        coalesce: Optional[servo.types.DurationDescriptor] = None
     ) -> Subscriber:
         """Create and return a new Subscriber with the given selector.
 
@@ -483,14 +825,48 @@ class Exchange(pydantic.BaseModel):
             callback: An optional callback for processing Messages received.
             timeout: An optional duration description for specifying when to cancel the request.
             until_done: An optional future to to tie the subscription lifetime to.
+            replay: An optional request to replay Messages retained by the matching Channels
+                before delivering newly published Messages. `True` replays the entire retained
+                window, a datetime replays Messages created at or after that time, and a
+                duration replays Messages created within that duration of now.
+            window: An optional duration over which to aggregate Messages with `reduce`.
+            slide: An optional interval at which to emit sliding `window` aggregations.
+            reduce: The reducer used to aggregate a `window` (e.g., "mean").
+            sample: An optional interval limiting delivery to one Message per Channel.
+            coalesce: An optional interval at which to deliver the latest Message per Channel.
+
+        Raises:
+            ValueError: Raised if the stream operation arguments are invalid or combined with `replay`.
 
         Returns:
             A new Subscriber object listening for Messages.
         """
+        operation = None
+        if any(arg is not None for arg in (window, slide, reduce, sample, coalesce)):
+            operation = Operation(window=window, slide=slide, reduce=reduce, sample=sample, coalesce=coalesce)
+            if replay:
+                raise ValueError("`replay` cannot be combined with stream operations")
+
         subscription = Subscription(selector=selector)
-        subscriber = Subscriber(exchange=self, subscription=subscription, callback=callback)
+        subscriber = Subscriber(exchange=self, subscription=subscription, callback=callback, operation=operation)
         self._subscribers.append(subscriber)
 
+        # Operations are evaluated once and shared by all equivalent subscribers
+        if operation and (subscription.selector, operation) not in self._operators:
+            self._operators[(subscription.selector, operation)] = _Operator(self, subscription, operation)
+
+        if replay is not None and replay is not False:
+            since = _replay_cutoff(replay)
+            retained = [
+                (message, channel)
+                for channel in self._channels
+                if subscription.matches(channel)
+                for message in channel._retained_messages(since)
+            ]
+            if retained:
+                retained.sort(key=lambda context: context[0].created_at)
+                subscriber._replay(retained)
+
         # Handle async affordances
         def _cancelizer(*args, **kwargs) -> None:
             if not subscriber.cancelled:
@@ -624,6 +1000,96 @@ class Subscription(BaseSubscription):
         raise ValueError(f"unknown selector type: {selector.__class__.__name__}")
 
 
+class Reducer(str, enum.Enum):
+    """Reducer enumerates the functions available for aggregating windows of Messages."""
+    mean = "mean"
+    sum = "sum"
+    min = "min"
+    max = "max"
+    count = "count"
+    first = "first"
+    last = "last"
+
+    def __call__(self, values: List[float]) -> float:
+        if self == Reducer.mean:
+            return sum(values) / len(values)
+        elif self == Reducer.sum:
+            return sum(values)
+        elif self == Reducer.min:
+            return min(values)
+        elif self == Reducer.max:
+            return max(values)
+        elif self == Reducer.count:
+            return len(values)
+        elif self == Reducer.first:
+            return values[0]
+        elif self == Reducer.last:
+            return values[-1]
+
+        raise ValueError(f"unknown reducer: {self}")
+
+
+class Operation(pydantic.BaseModel):
+    """An Operation describes a transformation applied by the Exchange to a stream of Messages.
+
+    Operations are evaluated once per Channel within the Exchange and the results are
+    shared by every Subscriber requesting an equivalent Operation with the same selector,
+    regardless of how many Subscribers there are.
+
+    Exactly one of `window`, `sample`, or `coalesce` must be given:
+
+        * `window` aggregates the numeric content of JSON Messages over a time window with
+            the `reduce` function. Windows are tumbling unless a `slide` shorter than the
+            window is given, in which case a result is emitted every `slide` over the
+            trailing `window`.
+        * `sample` delivers at most one Message per Channel per interval, dropping the rest.
+        * `coalesce` delivers only the latest Message per Channel at the end of each interval.
+
+    Attributes:
+        window: The duration of the aggregation window.
+        slide: The interval at which sliding windows are emitted.
+        reduce: The function used to aggregate a window.
+        sample: The minimum interval between Messages delivered per Channel.
+        coalesce: The interval at which the latest Message per Channel is delivered.
+    """
+    window: Optional[servo.types.Duration] = None
+    slide: Optional[servo.types.Duration] = None
+    reduce: Optional[Reducer] = None
+    sample: Optional[servo.types.Duration] = None
+    coalesce: Optional[servo.types.Duration] = None
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def _check_operation(cls, values: Dict[str, Any]) -> Dict[str, Any]:
+        kinds = [key for key in ('window', 'sample', 'coalesce') if values.get(key)]
+        if len(kinds) != 1:
+            raise ValueError("exactly one of `window`, `sample`, or `coalesce` must be given")
+
+        if values.get('window'):
+            if values.get('reduce') is None:
+                raise ValueError("`reduce` must be given when aggregating a `window`")
+            if values.get('slide') and values['slide'] > values['window']:
+                raise ValueError("`slide` cannot be longer than `window`")
+        elif values.get('reduce') is not None or values.get('slide'):
+            raise ValueError("`reduce` and `slide` can only be given when aggregating a `window`")
+
+        return values
+
+    @property
+    def interval(self) -> Optional[servo.types.Duration]:
+        """Return the interval on which the Operation emits results, if it is periodic."""
+        if self.window:
+            return self.slide or self.window
+        return self.coalesce
+
+    def __hash__(self):  # noqa: D105
+        # NOTE: Durations are not hashable so hash their canonical string form
+        return hash(
+            tuple(
+                map(str, (self.window, self.slide, self.reduce, self.sample, self.coalesce))
+            )
+        )
+
+
 _current_iterator_var = contextvars.ContextVar("servo.pubsub._Iterator.current", default=None)
 
 
@@ -669,6 +1135,8 @@ class _Iterator(pydantic.BaseModel):
         if message_context is None:
             self._stop_iteration()
 
+        self.subscriber._handled(*message_context)
+
         _current_context_var.set(message_context)
         if self.yield_channel:
             return message_context
@@ -699,6 +1167,8 @@ class Subscriber(_ExchangeChildModel):
         exchange: The pub/sub exchange that the Subscriber belongs to.
         subscription: A descriptor of the types of Messages that the Subscriber is interested in.
         callback: An optional callable to be invoked whben the Subscriber is notified of new Messages.
+        operation: An optional stream Operation whose results are delivered in place of the
+            Messages published.
 
      Usage:
             ```
@@ -720,8 +1190,14 @@ class Subscriber(_ExchangeChildModel):
     """
     subscription: Subscription
     callback: Optional[Callback]
+    operation: Optional[Operation] = None
     _event: asyncio.Event = pydantic.PrivateAttr(default_factory=asyncio.Event)
     _iterators: List[_Iterator] = pydantic.PrivateAttr([])
+    _backlog: List[Tuple[Message, Channel]] = pydantic.PrivateAttr([])
+    _replay_task: Optional[asyncio.Task] = pydantic.PrivateAttr(None)
+    _delivered: _Meter = pydantic.PrivateAttr(default_factory=_Meter)
+    _lag: Optional[datetime.timedelta] = pydantic.PrivateAttr(None)
+    _lagging: bool = pydantic.PrivateAttr(False)
 
     def stop(self) -> None:
         """Stop the current async iterator.
@@ -771,38 +1247,129 @@ class Subscriber(_ExchangeChildModel):
         """
         await self._event.wait()
 
+    def _replay(self, messages: List[Tuple[Message, Channel]]) -> None:
+        # Replayed messages are delivered ahead of any newly published messages
+        self._backlog.extend(messages)
+        self._replay_task = asyncio.create_task(self._drain_backlog())
+
+    async def _drain_backlog(self) -> None:
+        # NOTE: Without a consumer attached the backlog is held for the first iterator
+        if self.callback is None and not self._iterators:
+            return
+
+        while self._backlog and not self.cancelled:
+            message, channel = self._backlog.pop(0)
+            await self._deliver(message, channel)
+
     async def __call__(self, message: Message, channel: Channel) -> None:
         if self.cancelled:
             servo.logger.warning(f"ignoring call to cancelled Subscriber: {self}")
             return
 
         if self.subscription.matches(channel, message):
-            if self.callback:
-                # NOTE: Yield message or message, channel based on callable arity
-                signature = inspect.Signature.from_callable(self.callback)
-                if len(signature.parameters) == 1:
-                    if asyncio.iscoroutinefunction(self.callback):
-                        await self.callback(message)
-                    else:
-                        self.callback(message)
-                elif len(signature.parameters) == 2:
-                    if asyncio.iscoroutinefunction(self.callback):
-                        await self.callback(message, channel)
-                    else:
-                        self.callback(message, channel)
+            if self._replay_task and not self._replay_task.done():
+                await asyncio.shield(self._replay_task)
+
+            await self._deliver(message, channel)
+
+    async def _deliver(self, message: Message, channel: Channel) -> None:
+        if self.callback:
+            # NOTE: Yield message or message, channel based on callable arity
+            signature = inspect.Signature.from_callable(self.callback)
+            if len(signature.parameters) == 1:
+                if asyncio.iscoroutinefunction(self.callback):
+                    await self.callback(message)
                 else:
-                    raise TypeError(f"Incorrect callback")
+                    self.callback(message)
+            elif len(signature.parameters) == 2:
+                if asyncio.iscoroutinefunction(self.callback):
+                    await self.callback(message, channel)
+                else:
+                    self.callback(message, channel)
+            else:
+                raise TypeError(f"Incorrect callback")
 
+            self._handled(message, channel)
 
-            for _, iterator in enumerate(self._iterators):
-                if iterator.stopped:
-                    self._iterators.remove(iterator)
-                else:
-                    await iterator(message, channel)
+        for _, iterator in enumerate(self._iterators):
+            if iterator.stopped:
+                self._iterators.remove(iterator)
+            else:
+                await iterator(message, channel)
+
+    @property
+    def _selector_name(self) -> str:
+        selector = self.subscription.selector
+        return f"/{selector.pattern}/" if isinstance(selector, re.Pattern) else selector
+
+    def _handled(self, message: Message, channel: Channel) -> None:
+        # Track end-to-end lag from the creation of the Message until a consumer has handled it
+        lag = _age(message)
+        self._lag = lag
+        self._delivered.mark()
+        channel._delivered.mark()
+        self._update_lagging(lag, channel)
+
+    def _oldest_pending(self) -> Optional[Tuple[Message, Channel]]:
+        # NOTE: Iterator queues end with a `None` sentinel once stopped
+        pending = self._backlog[:1] + [
+            iterator._queue._queue[0] for iterator in self._iterators
+            if not iterator._queue.empty() and iterator._queue._queue[0] is not None
+        ]
+        return min(pending, key=lambda message_context: message_context[0].created_at, default=None)
+
+    def _check_lag(self) -> None:
+        # Messages that are never handled must be aged while they wait
+        message_context = self._oldest_pending()
+        if message_context is not None:
+            message, channel = message_context
+            self._update_lagging(_age(message), channel)
+
+    def _update_lagging(self, lag: datetime.timedelta, channel: Channel) -> None:
+        threshold = self.exchange.lag_threshold if self.exchange else None
+        if threshold is None:
+            return
+
+        lagging = lag > threshold
+        if lagging and not self._lagging:
+            servo.logger.warning(
+                f"Subscriber to '{self._selector_name}' ({self._consumer_name}) is lagging behind "
+                f"Channel '{channel.name}': {servo.types.Duration(lag)} exceeds threshold of {threshold}"
+            )
+        self._lagging = lagging
+
+    @property
+    def _consumer_name(self) -> str:
+        if self.callback:
+            return getattr(self.callback, '__qualname__', repr(self.callback))
+        return "iterator"
+
+    def stats(self) -> SubscriberStats:
+        """Return a snapshot of the delivery of Messages to the Subscriber."""
+        lag = self._lag
+        message_context = self._oldest_pending()
+        if message_context is not None:
+            lag = max(lag or datetime.timedelta(0), _age(message_context[0]))
+
+        return SubscriberStats(
+            selector=self._selector_name,
+            consumer=self._consumer_name,
+            delivered=self._delivered.count,
+            delivery_rate=self._delivered.rate,
+            queue_depth=len(self._backlog) + sum(iterator._queue.qsize() for iterator in self._iterators),
+            lag=lag,
+        )
 
     def __aiter__(self):  # noqa: D105
         iterator = _Iterator(self)
         self._iterators.append(iterator)
+
+        # Hand any replayed messages held without a consumer to the new iterator
+        if self._replay_task and self._replay_task.done():
+            for message_context in self._backlog:
+                iterator._queue.put_nowait(message_context)
+            self._backlog.clear()
+
         return iterator
 
     def __eq__(self, other) -> bool:
@@ -837,6 +1404,137 @@ class Publisher(_ExchangeChildModel):
         return next(filter(lambda c: c == channel, self.channels), None)
 
 
+class _Operator:
+    """Evaluates an Operation on behalf of all Subscribers that share it.
+
+    Operators are created by the Exchange when the first Subscriber requests an
+    Operation and are discarded once no Subscribers sharing it remain.
+    """
+
+    def __init__(self, exchange: Exchange, subscription: Subscription, operation: Operation) -> None:
+        self._exchange = weakref.ref(exchange)
+        self.subscription = subscription
+        self.operation = operation
+        self._windows: Dict[Channel, collections.deque] = {}
+        self._latest: Dict[Channel, Message] = {}
+        self._sampled_at: Dict[Channel, datetime.datetime] = {}
+        self._job: Optional[servo.repeating.Job] = None
+
+        if operation.interval:
+            self._job = servo.repeating.scheduler().schedule(
+                operation.interval, self.flush, name=f"flush '{subscription.selector}'", delay=operation.interval
+            )
+
+    @property
+    def subscribers(self) -> List[Subscriber]:
+        """Return the Subscribers that receive the results of the Operator."""
+        exchange = self._exchange()
+        if exchange is None:
+            return []
+
+        return list(
+            filter(
+                lambda s: s.operation == self.operation and s.subscription.selector == self.subscription.selector,
+                exchange._subscribers
+            )
+        )
+
+    def accept(self, message: Message, channel: Channel) -> None:
+        """Accept a Message published to a matching Channel."""
+        if self.operation.window:
+            values = _numeric_values(message)
+            if values is not None:
+                self._windows.setdefault(channel, collections.deque()).append((message.created_at, values))
+        elif self.operation.coalesce:
+            self._latest[channel] = message
+        elif self.operation.sample:
+            sampled_at = self._sampled_at.get(channel)
+            if sampled_at is None or message.created_at - sampled_at >= self.operation.sample:
+                self._sampled_at[channel] = message.created_at
+                self._emit(message, channel)
+
+    def flush(self) -> None:
+        """Emit the results of the Operation for the interval that has just elapsed."""
+        if self.operation.window:
+            window_end = datetime.datetime.now()
+            window_start = window_end - self.operation.window
+            sliding = self.operation.slide and self.operation.slide < self.operation.window
+            for channel, entries in self._windows.items():
+                if sliding:
+                    while entries and entries[0][0] < window_start:
+                        entries.popleft()
+
+                if not entries:
+                    continue
+
+                self._emit(self._reduce(entries, window_start, window_end), channel)
+
+                if not sliding:
+                    entries.clear()
+
+        elif self.operation.coalesce:
+            latest, self._latest = self._latest, {}
+            for channel, message in latest.items():
+                self._emit(message, channel)
+
+    def cancel(self) -> None:
+        """Cancel periodic evaluation of the Operation."""
+        if self._job:
+            self._job.cancel()
+
+    def _reduce(
+        self,
+        entries: Iterable[Tuple[datetime.datetime, Dict[Optional[str], float]]],
+        window_start: datetime.datetime,
+        window_end: datetime.datetime
+    ) -> Message:
+        series: Dict[Optional[str], List[float]] = {}
+        count = 0
+        for _, values in entries:
+            count += 1
+            for key, value in values.items():
+                series.setdefault(key, []).append(value)
+
+        reduced = {key: self.operation.reduce(values) for key, values in series.items()}
+        metadata = {
+            'reduce': self.operation.reduce.value,
+            'window_start': window_start.isoformat(),
+            'window_end': window_end.isoformat(),
+            'count': str(count),
+        }
+        if list(reduced.keys()) == [None]:
+            return Message(json=reduced[None], metadata=metadata)
+
+        return Message(json=reduced, metadata=metadata)
+
+    def _emit(self, message: Message, channel: Channel) -> None:
+        subscribers = self.subscribers
+        if subscribers:
+            asyncio.create_task(_deliver_message_to_subscribers(message, channel, subscribers))
+
+
+def _numeric_values(message: Message) -> Optional[Dict[Optional[str], float]]:
+    # Extract the numeric values from a JSON Message, keyed by top-level key (`None` for scalars)
+    if message.content_type != "application/json":
+        return None
+
+    try:
+        content = message.json()
+    except ValueError:
+        return None
+
+    if isinstance(content, (int, float)) and not isinstance(content, bool):
+        return {None: float(content)}
+    elif isinstance(content, dict):
+        values = {
+            key: float(value) for key, value in content.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        return values or None
+
+    return None
+
+
 class _PublisherMethod:
     def __init__(
         self,
@@ -863,19 +1561,19 @@ class _PublisherMethod:
 
         publisher = self.pubsub_exchange.create_publisher(*self.channels)
         if self.every is not None:
-            duration = self.every if isinstance(self.every, servo.Duration) else servo.Duration(self.every)
+            # Repeating publishers are run on ticks of the shared scheduler
+            task = servo.repeating.scheduler().schedule(
+                self.every, functools.partial(fn, publisher), name=name_
+            )
         else:
-            duration = None
+            @functools.wraps(fn)
+            async def _repeating_publisher() -> None:
+                while True:
+                    await fn(publisher)
 
-        @functools.wraps(fn)
-        async def _repeating_publisher() -> None:
-            while True:
-                await fn(publisher)
-                if duration is not None:
-                    await asyncio.sleep(duration.total_seconds())
+            task = asyncio.create_task(_repeating_publisher())
+            task.add_done_callback(_error_watcher)
 
-        task = asyncio.create_task(_repeating_publisher())
-        task.add_done_callback(_error_watcher)
         task.add_done_callback(lambda _: self._publishers_map.pop(name_))
         self._publishers_map[name_] = (publisher, task)
 
@@ -909,11 +1607,13 @@ class _ChannelMethod:
         parent: Mixin,
         name: Optional[str],
         description: Optional[str],
+        retention: Optional[Retention] = None,
     ) -> None:
         super().__init__()
         self.pubsub_exchange = parent.pubsub_exchange
         self.name = name or self._random_unique_channel_name()
         self.description = description
+        self.retention = retention
 
     def _random_unique_channel_name(self) -> str:
         while True:
@@ -928,7 +1628,7 @@ class _ChannelMethod:
             self.temporary = False
         else:
             self.temporary = True
-            channel = self.pubsub_exchange.create_channel(self.name, self.description)
+            channel = self.pubsub_exchange.create_channel(self.name, self.description, retention=self.retention)
         self.channel = channel
         return channel
 
@@ -944,7 +1644,9 @@ class _SubscriberMethod:
         selector: Selector,
         name: Optional[str] = None,
         timeout: Optional[servo.types.DurationDescriptor] = None,
-        until_done: Optional[servo.types.Futuristic] = None
+        until_done: Optional[servo.types.Futuristic] = None,
+        replay: Optional[Replay] = None,
+        **operation
     ) -> None:
         super().__init__()
         self.pubsub_exchange = parent.pubsub_exchange
@@ -953,6 +1655,8 @@ class _SubscriberMethod:
         self.name = name
         self.timeout = timeout
         self.until_done = until_done
+        self.replay = replay
+        self.operation = operation
 
     def __call__(self, fn) -> None:
         name_ = self.name or fn.__name__
@@ -960,11 +1664,16 @@ class _SubscriberMethod:
             raise KeyError(f"a Subscriber named '{name_}' already exists")
 
         self._subscribers_map[name_] = self.pubsub_exchange.create_subscriber(
-            self.selector, callback=fn, timeout=self.timeout, until_done=self.until_done
+            self.selector,
+            callback=fn,
+            timeout=self.timeout,
+            until_done=self.until_done,
+            replay=self.replay,
+            **self.operation
         )
 
     async def __aenter__(self) -> None:
-        self.subscriber = self.pubsub_exchange.create_subscriber(self.selector)
+        self.subscriber = self.pubsub_exchange.create_subscriber(self.selector, replay=self.replay, **self.operation)
         return self.subscriber
 
     async def __aexit__(self, exc_type, exc_value, traceback):
@@ -1008,7 +1717,9 @@ class Mixin(pydantic.BaseModel):
     def channel(
         self,
         name: Optional[str] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        *,
+        retention: Optional[Retention] = None
     ):
         """A context manager for retrieving pub/sub Channels.
 
@@ -1026,11 +1737,13 @@ class Mixin(pydantic.BaseModel):
             name: A name for the temporary Channel. When omitted, a random
                 unique name is generated.
             description: An optional textual description of the Channel.
+            retention: An optional retention policy for a newly created Channel.
         """
         return _ChannelMethod(
             self,
             name=name,
-            description=description
+            description=description,
+            retention=retention
         )
 
     def subscribe(
@@ -1039,7 +1752,13 @@ class Mixin(pydantic.BaseModel):
         *,
         name: Optional[str] = None,
         timeout: Optional[servo.types.DurationDescriptor] = None,
-        until_done: Optional[asyncio.Future] = None
+        until_done: Optional[asyncio.Future] = None,
+        replay: Optional[Replay] = None,
+        window: Optional[servo.types.DurationDescriptor] = None,
+        slide: Optional[servo.types.DurationDescriptor] = None,
+        reduce: Optional[Union[Reducer, str]] = None,
+        sample: Optional[servo.types.DurationDescriptor] = None,
+        coalesce: Optional[servo.types.DurationDescriptor] = None
     ):
         """Create a Subscriber in the pub/sub Exchange.
 
@@ -1060,6 +1779,10 @@ class Mixin(pydantic.BaseModel):
             selector: A string or regular expression pattern matching Channels of interest.
             name: A name for the subscriber. When omitted, defaults to the name of
                 the decorated function.
+            replay: An optional request to replay Messages retained by matching Channels.
+                See `Exchange.create_subscriber` for the accepted values.
+            window, slide, reduce, sample, coalesce: Optional stream operation applied by
+                the Exchange before delivery. See `Exchange.create_subscriber` for details.
 
         Usage:
             ```
@@ -1084,7 +1807,13 @@ class Mixin(pydantic.BaseModel):
             selector=selector,
             name=name,
             timeout=timeout,
-            until_done=until_done
+            until_done=until_done,
+            replay=replay,
+            window=window,
+            slide=slide,
+            reduce=reduce,
+            sample=sample,
+            coalesce=coalesce
         )
 
     def cancel_subscribers(self, *names: List[str]) -> None:
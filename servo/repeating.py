@@ -2,22 +2,329 @@
 
 The `servo.repeating.Mixin` provides connectors with the ability to easily manage tasks
 that require periodic execution or the observation of particular runtime conditions.
+
+Repeating work is registered as a `Job` with the `Scheduler` of the event loop. The
+Scheduler keeps its Jobs in a heap ordered by their next run time and arms a single
+timer for the earliest of them, so any number of periodic Jobs cost one timer rather
+than one sleeping task apiece. Ticks are computed from absolute time so the runtime of
+a Job does not cause its schedule to drift.
 """
 import asyncio
-import datetime
+import enum
+import functools
+import heapq
+import inspect
+import itertools
+import math
+import random
 import weakref
-from typing import Callable, Dict, Optional, Union
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import pydantic
 
-import servo.utilities.key_paths
+import servo.logging
 from servo.types import Duration, NoneCallable, Numeric
 
-__all__ = ["Every", "Mixin", "repeating"]
+__all__ = ["Every", "Job", "JobStats", "Mixin", "Overrun", "Scheduler", "repeating", "scheduler"]
 
 Every = Union[Numeric, str, Duration]
+JobCallable = Callable[[], Union[None, Awaitable[None]]]
 
 _repeating_tasks_registry = weakref.WeakKeyDictionary()
 
 
+class Overrun(str, enum.Enum):
+    """An enumeration of policies for ticks that elapse while a Job is still running.
+
+    ### Members:
+        skip: Drop the elapsed ticks and run again at the next tick in the future.
+        queue: Run once for every elapsed tick, back to back, until the Job has caught up.
+    """
+    skip = "skip"
+    queue = "queue"
+
+
+class JobStats(pydantic.BaseModel):
+    """JobStats reports on the timing of the runs of a Job.
+
+    Attributes:
+        runs: The number of times that the Job has run.
+        skipped: The number of ticks that were dropped because the Job overran them.
+        errors: The number of runs that raised an exception.
+        last_duration: The duration of the most recent run.
+        max_duration: The duration of the longest run.
+        total_duration: The cumulative duration of all runs.
+        lateness: The delay between the most recent tick and the start of its run.
+    """
+    runs: int = 0
+    skipped: int = 0
+    errors: int = 0
+    last_duration: Optional[Duration] = None
+    max_duration: Optional[Duration] = None
+    total_duration: Duration = pydantic.Field(default_factory=Duration)
+    lateness: Optional[Duration] = None
+
+    @property
+    def mean_duration(self) -> Optional[Duration]:
+        """Return the mean duration of the runs of the Job."""
+        if not self.runs:
+            return None
+
+        return Duration(self.total_duration / self.runs)
+
+
+class Job:
+    """A Job is a callable that a Scheduler runs repeatedly on a fixed interval.
+
+    Jobs support the subset of the `asyncio.Task` interface used to manage repeating
+    tasks (`cancel`, `cancelled`, `done`, and `add_done_callback`). As with tasks, a Job
+    stops running as soon as it is cancelled but is only done once the event loop has
+    processed the cancellation.
+
+    Attributes:
+        name: A name for identifying the Job.
+        every: The interval between ticks.
+        jitter: An optional upper bound on a random delay added to each run.
+        overrun: The policy for ticks that elapse while the Job is running.
+        stats: Timing statistics for the runs of the Job.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        every: Duration,
+        callable: JobCallable,
+        *,
+        jitter: Optional[Duration] = None,
+        overrun: Overrun = Overrun.skip,
+    ) -> None: # noqa: D107
+        self.name = name
+        self.every = every
+        self.jitter = jitter
+        self.overrun = overrun
+        self.stats = JobStats()
+        self._callable = callable
+        self._tick = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+        self._cancelled = False
+        self._done_callbacks: List[Callable[["Job"], None]] = []
+
+    def cancel(self) -> bool:
+        """Request cancellation of the Job and any run that is in progress.
+
+        Returns True if cancellation was requested or False if the Job was already cancelled.
+        """
+        if self._cancel_requested:
+            return False
+
+        self._cancel_requested = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+        try:
+            asyncio.get_event_loop().call_soon(self._set_cancelled)
+        except RuntimeError:
+            # The loop is closed: there is nothing left to wait for
+            self._set_cancelled()
+
+        return True
+
+    def _set_cancelled(self) -> None:
+        self._cancelled = True
+        callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def cancelled(self) -> bool:
+        """Return True if the Job has been cancelled."""
+        return self._cancelled
+
+    def done(self) -> bool:
+        """Return True if the Job will not run again."""
+        return self._cancelled
+
+    def add_done_callback(self, callback: Callable[["Job"], None]) -> None:
+        """Add a callback to be run with the Job once it is done."""
+        if self.done():
+            asyncio.get_event_loop().call_soon(callback, self)
+        else:
+            self._done_callbacks.append(callback)
+
+    def __repr__(self) -> str:
+        return f"<Job '{self.name}' every {self.every}{' (cancelled)' if self._cancel_requested else ''}>"
+
+
+class Scheduler:
+    """A Scheduler runs Jobs on their intervals from a single timer on an event loop.
+
+    Synchronous callables are run inline from the timer. Asynchronous callables are run
+    in a task that exists only for the duration of the run. A Job never overlaps with
+    itself: ticks that elapse while it is running are handled by its overrun policy.
+
+    Use `servo.repeating.scheduler()` to obtain the Scheduler shared by the running loop.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None: # noqa: D107
+        # NOTE: Hold the loop and timer weakly so the registry of Schedulers cannot keep loops alive
+        self._loop = weakref.ref(loop or asyncio.get_event_loop())
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[weakref.ref] = None
+        self._timer_at: Optional[float] = None
+        self._jobs: weakref.WeakSet = weakref.WeakSet()
+
+    @property
+    def jobs(self) -> List[Job]:
+        """Return the Jobs that have not been cancelled."""
+        return sorted(filter(lambda j: not j._cancel_requested, self._jobs), key=lambda j: j.name)
+
+    def schedule(
+        self,
+        every: Every,
+        callable: JobCallable,
+        *,
+        name: Optional[str] = None,
+        delay: Optional[Every] = None,
+        jitter: Optional[Every] = None,
+        overrun: Overrun = Overrun.skip,
+    ) -> Job:
+        """Schedule a callable to run repeatedly on an interval.
+
+        Args:
+            every: The interval between runs.
+            callable: A synchronous or asynchronous callable taking no arguments.
+            name: An optional name for identifying the Job. Defaults to the name of the callable.
+            delay: An optional delay before the first run. By default the first run is immediate.
+            jitter: An optional upper bound on a random delay added to each run. Jitter does not
+                accumulate because ticks are computed from the time the Job was scheduled.
+            overrun: The policy for ticks that elapse while the Job is still running.
+
+        Returns:
+            The scheduled Job.
+        """
+        job = Job(
+            name or getattr(callable, "__qualname__", repr(callable)),
+            _duration(every),
+            callable,
+            jitter=_duration(jitter) if jitter else None,
+            overrun=Overrun(overrun),
+        )
+        job._tick = self._now() + (_duration(delay).total_seconds() if delay else 0.0)
+        self._jobs.add(job)
+        self._push(job)
+        return job
+
+    def _now(self) -> float:
+        return self._loop().time()
+
+    def _push(self, job: Job) -> None:
+        run_at = job._tick
+        if job.jitter:
+            run_at += random.uniform(0, job.jitter.total_seconds())
+        heapq.heappush(self._heap, (run_at, next(self._counter), job))
+
+        if self._timer_at is None or run_at < self._timer_at:
+            self._arm()
+
+    def _arm(self) -> None:
+        timer = self._timer and self._timer()
+        if timer:
+            timer.cancel()
+        self._timer, self._timer_at = None, None
+
+        while self._heap and self._heap[0][2]._cancel_requested:
+            heapq.heappop(self._heap)
+
+        if self._heap:
+            self._timer_at = self._heap[0][0]
+            self._timer = weakref.ref(self._loop().call_at(self._timer_at, self._on_timer))
+
+    def _on_timer(self) -> None:
+        self._timer, self._timer_at = None, None
+        now = self._now()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job = heapq.heappop(self._heap)
+            if not job._cancel_requested:
+                due.append(job)
+
+        for job in due:
+            self._run(job)
+
+        if self._timer_at is None:
+            self._arm()
+
+    def _run(self, job: Job) -> None:
+        started_at = self._now()
+        job.stats.lateness = Duration(seconds=max(0.0, started_at - job._tick))
+        try:
+            result = job._callable()
+        except Exception as error:
+            self._finish(job, started_at, error)
+            return
+
+        if inspect.isawaitable(result):
+            # NOTE: The awaitable is wrapped directly so that cancelling the run before it starts
+            # closes it rather than leaving it never awaited
+            job._task = asyncio.ensure_future(result, loop=self._loop())
+            job._task.add_done_callback(functools.partial(self._awaited, job, started_at))
+        else:
+            self._finish(job, started_at)
+
+    def _awaited(self, job: Job, started_at: float, task: asyncio.Future) -> None:
+        if task.cancelled():
+            return
+        self._finish(job, started_at, task.exception())
+
+    def _finish(self, job: Job, started_at: float, error: Optional[Exception] = None) -> None:
+        job._task = None
+        now = self._now()
+        duration = Duration(seconds=now - started_at)
+        job.stats.runs += 1
+        job.stats.last_duration = duration
+        job.stats.max_duration = max(job.stats.max_duration or duration, duration)
+        job.stats.total_duration = Duration(job.stats.total_duration + duration)
+
+        if error is not None:
+            job.stats.errors += 1
+            servo.logger.opt(exception=error).error(f"Job '{job.name}' failed with exception: {error}")
+
+        if job._cancel_requested:
+            return
+
+        # NOTE: Advance from the previous tick rather than from now to keep the schedule drift-free
+        interval = job.every.total_seconds()
+        job._tick += interval
+        if job._tick <= now and job.overrun == Overrun.skip:
+            if interval > 0:
+                missed = math.floor((now - job._tick) / interval) + 1
+                job._tick += missed * interval
+                job.stats.skipped += missed
+            else:
+                job._tick = now
+
+        self._push(job)
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Scheduler]" = weakref.WeakKeyDictionary()
+
+
+def scheduler() -> Scheduler:
+    """Return the Scheduler for the current event loop, creating it on first use."""
+    loop = asyncio.get_event_loop()
+    scheduler_ = _schedulers.get(loop)
+    if scheduler_ is None:
+        scheduler_ = Scheduler(loop)
+        _schedulers[loop] = scheduler_
+
+    return scheduler_
+
+
+def _duration(value: Every) -> Duration:
+    return value if isinstance(value, Duration) else Duration(value)
+
+
 class Mixin:
     """Provides convenience interfaces for working with asyncrhonously repeating tasks."""
 
@@ -34,64 +341,67 @@ class Mixin:
     def __init__(self, *args, **kwargs) -> None: # noqa: D107
         super().__init__(*args, **kwargs)
         repeating_tasks: weakref.WeakValueDictionary[
-            str, asyncio.Task
+            str, Job
         ] = weakref.WeakValueDictionary()
         _repeating_tasks_registry[self] = repeating_tasks
 
         # Start tasks for any methods decorated via `repeating`
         for method, repeat_params in self.__class__.__repeaters__.items():
             if repeat_params := getattr(method, "__repeating__", None):
-                name, duration = servo.utilities.key_paths.values_for_keys(
-                    repeat_params, "name", "duration"
+                self.start_repeating_task(
+                    repeat_params["name"],
+                    repeat_params["duration"],
+                    functools.partial(method, self),
+                    jitter=repeat_params.get("jitter"),
+                    overrun=repeat_params.get("overrun", Overrun.skip),
                 )
-                self.start_repeating_task(name, duration, method)
 
     def start_repeating_task(
-        self, name: str, every: Every, callable: Callable[[None], None]
-    ) -> asyncio.Task:
+        self,
+        name: str,
+        every: Every,
+        callable: JobCallable,
+        *,
+        jitter: Optional[Every] = None,
+        overrun: Overrun = Overrun.skip,
+    ) -> Job:
         """Start a repeating task with the given name and duration.
 
+        The task is registered as a Job with the shared Scheduler and runs on ticks of
+        the interval measured from the time it was started.
+
         Args:
             name: A name for identifying the repeating task.
             every: The duration at which the task will repeatedly run.
-            callable: A callable to be executed repeatedly on the desired interval.
+            callable: A synchronous or asynchronous callable to be executed repeatedly on the desired interval.
+            jitter: An optional upper bound on a random delay added to each run.
+            overrun: The policy for ticks that elapse while the task is still running.
         """
-        if task := self.repeating_tasks.get(name, None):
-            if not task.done():
+        if job := self.repeating_tasks.get(name, None):
+            if not job.done():
                 # Task may be done but hasn't dropped from our index
                 raise KeyError(f"repeating task already exists named '{name}'")
 
-        every = every if isinstance(every, Duration) else Duration(every)
         context_name = getattr(self, "name", self.__class__.__name__)
-        task_name = f"{context_name}:{name} (repeating every {every})"
-
-        async def repeating_async_fn() -> None:
-            while True:
-                callable()
-                await asyncio.sleep(every / datetime.timedelta(microseconds=1))
-
-        asyncio_task = asyncio.create_task(repeating_async_fn(), name=task_name)
-        self.repeating_tasks[name] = asyncio_task
-        return asyncio_task
+        job = scheduler().schedule(
+            every, callable, name=f"{context_name}:{name}", jitter=jitter, overrun=overrun
+        )
+        self.repeating_tasks[name] = job
+        return job
 
     def cancel_repeating_task(self, name: str) -> Optional[bool]:
         """Cancel a repeating task with the given name.
 
-        Returns True if the task was cancelled, False if it was found but could not be cancelled, or None if
+        Returns True if the task was cancelled, False if it was found but had already been cancelled, or None if
         no task with the given name could be found.
-
-        Note that cancellation is not guaranteed (see asyncio.Task docs: https://docs.python.org/3/library/asyncio-task.html#asyncio.Task.cancel)
         """
-        if task := self.repeating_tasks.get(name):
-            if task.cancelled():
-                return False
-            task.cancel()
-            return True
+        if job := self.repeating_tasks.get(name):
+            return job.cancel()
 
         return None
 
     @property
-    def repeating_tasks(self) -> Dict[str, asyncio.Task]:
+    def repeating_tasks(self) -> Dict[str, Job]:
         """Return a dictionary of repeating tasks keyed by task name."""
         tasks = _repeating_tasks_registry.get(self, None)
         if tasks is None:
@@ -101,7 +411,13 @@ class Mixin:
         return tasks
 
 
-def repeating(every: Every, *, name=None) -> Callable[[NoneCallable], NoneCallable]:
+def repeating(
+    every: Every,
+    *,
+    name=None,
+    jitter: Optional[Every] = None,
+    overrun: Overrun = Overrun.skip,
+) -> Callable[[NoneCallable], NoneCallable]:
     """Decorate a function for repeated execution on a given duration.
 
     Note that the decorated function must be a method on a subclass of `servo.repeating.Mixin` or
@@ -111,7 +427,7 @@ def repeating(every: Every, *, name=None) -> Callable[[NoneCallable], NoneCallab
     def decorator(fn: NoneCallable) -> NoneCallable:
         duration = every if isinstance(every, Duration) else Duration(every)
         repeater_name = name if name else fn.__name__
-        fn.__repeating__ = {"duration": duration, "name": repeater_name}
+        fn.__repeating__ = {"duration": duration, "name": repeater_name, "jitter": jitter, "overrun": overrun}
         return fn
 
     return decorator
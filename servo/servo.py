@@ -231,6 +231,11 @@ class Servo(servo.connector.BaseConnector):
 
         # Start up the pub/sub exchange
         if not self.pubsub_exchange.running:
+            pubsub_settings = (
+                self.config.servo and self.config.servo.pubsub
+            ) or servo.configuration.PubSubSettings()
+            self.pubsub_exchange.lag_threshold = pubsub_settings.lag_threshold
+            self.pubsub_exchange.stats_every = pubsub_settings.stats_every
             self.pubsub_exchange.start()
 
     async def shutdown(self):
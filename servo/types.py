@@ -4,6 +4,7 @@ consumers of the servo package.
 from __future__ import annotations
 
 import abc
+import array
 import asyncio
 import datetime
 import enum
@@ -19,6 +20,7 @@ from typing import (
     List,
     Optional,
     Protocol,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -287,26 +289,42 @@ class BaseProgress(abc.ABC, BaseModel):
     ) -> None:
         """Asynchronously watch progress tracking and invoke a callback to periodically report on progress.
 
+        The callback is run by the shared `servo.repeating.Scheduler` rather than by a dedicated
+        sleep loop. Any exception raised by the callback stops the watch and is raised to the caller.
+
         Args:
             notify: An (optionally asynchronous) callable object to periodically invoke for progress reporting.
             every: The Duration to periodically invoke the notify callback to report progress.
         """
-
-        async def async_notifier() -> None:
-            if asyncio.iscoroutinefunction(notify):
-                await notify(self)
-            else:
-                notify(self)
-
         if not self.started:
             self.start()
 
-        while True:
-            if self.finished:
-                break
+        if self.finished:
+            return
+
+        watching = asyncio.get_event_loop().create_future()
+
+        async def async_notifier() -> None:
+            try:
+                if asyncio.iscoroutinefunction(notify):
+                    await notify(self)
+                else:
+                    notify(self)
+            except Exception as error:
+                if not watching.done():
+                    watching.set_exception(error)
+                return
+
+            if self.finished and not watching.done():
+                watching.set_result(None)
 
-            await asyncio.sleep(every.total_seconds())
-            await async_notifier()
+        job = servo.repeating.scheduler().schedule(
+            every, async_notifier, name=f"{self.__class__.__name__}.watch", delay=every
+        )
+        try:
+            await watching
+        finally:
+            job.cancel()
 
     def every(self, duration: DurationDescriptor) -> AsyncIterator[BaseProgress]:
         """Return an async iterator yielding a progress update every duration seconds.
@@ -319,16 +337,27 @@ class BaseProgress(abc.ABC, BaseModel):
                 self.progress = progress
                 self.duration = duration
 
+                # NOTE: The Job holds only the event so that an abandoned iterator can be collected
+                self._ticked = asyncio.Event()
+                self._job = servo.repeating.scheduler().schedule(
+                    duration, self._ticked.set, name=f"{progress.__class__.__name__}.every", delay=duration
+                )
+
             def __aiter__(self):  # noqa: D105
                 return self
 
             async def __anext__(self):
-                while True:
-                    if self.progress.finished:
-                        raise StopAsyncIteration
+                if self.progress.finished:
+                    self._job.cancel()
+                    raise StopAsyncIteration
+
+                await self._ticked.wait()
+                self._ticked.clear()
+                return self.progress
 
-                    await asyncio.sleep(self.duration.total_seconds())
-                    return self.progress
+            def __del__(self) -> None:
+                if job := getattr(self, "_job", None):
+                    job.cancel()
 
         self.start()
         return _Iterator(self, servo.Duration(duration))
@@ -760,6 +789,73 @@ class TimeSeries(BaseModel):
         return {**dict(args), **additional}.items()
 
 
+class ColumnarTimeSeries(TimeSeries):
+    """ColumnarTimeSeries objects are time series backed by packed arrays of timestamps and values.
+
+    Data points are only materialized as `DataPoint` objects when the `data_points` attribute is
+    first accessed (including by iteration, serialization, and validation as a `Measurement`
+    reading), which keeps large series compact and cheap to construct. Samples must be supplied
+    in time order.
+
+    Attributes:
+        timestamps: The POSIX timestamps of the samples in the series.
+        values: The values of the samples in the series.
+    """
+    _timestamps: array.array = pydantic.PrivateAttr()
+    _values: array.array = pydantic.PrivateAttr()
+
+    def __init__(
+        self,
+        metric: Metric,
+        timestamps: Sequence[float],
+        values: Sequence[float],
+        **kwargs,
+    ) -> None: # noqa: D107
+        if len(timestamps) != len(values):
+            raise ValueError(f"timestamps and values must be of equal length: {len(timestamps)} != {len(values)}")
+        super().__init__(metric, [], **kwargs)
+        self._timestamps = timestamps if isinstance(timestamps, array.array) else array.array('d', timestamps)
+        self._values = values if isinstance(values, array.array) else array.array('d', values)
+        # NOTE: Drop the empty list so that `data_points` is materialized on first access
+        del self.__dict__["data_points"]
+
+    @property
+    def timestamps(self) -> array.array:
+        """Return the packed array of sample timestamps."""
+        return self._timestamps
+
+    @property
+    def values(self) -> array.array:
+        """Return the packed array of sample values."""
+        return self._values
+
+    def __getattr__(self, name: str) -> Any:
+        # NOTE: Only reached while `data_points` has not been materialized
+        if name != "data_points":
+            return super().__getattribute__(name)
+
+        data_points = [
+            DataPoint.construct(
+                metric=self.metric,
+                time=datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc),
+                value=value,
+            )
+            for timestamp, value in zip(self._timestamps, self._values)
+        ]
+        self.__dict__["data_points"] = data_points
+        return data_points
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _iter(self, *args, to_dict: bool = False, **kwargs):
+        # NOTE: Materialize before exporting so that `dict` and `json` include the data points. Copies
+        # share the packed arrays and remain lazy.
+        if to_dict:
+            self.data_points
+        return super()._iter(*args, to_dict=to_dict, **kwargs)
+
+
 Reading = Union[DataPoint, TimeSeries]
 Readings = List[Reading]
 
@@ -1394,7 +1490,7 @@ class Measurement(BaseModel):
             expected_count = None
             for obj in value:
                 if isinstance(obj, TimeSeries):
-                    actual_count = len(obj.data_points)
+                    actual_count = len(obj)
                     if expected_count and actual_count != expected_count:
                         logger.warning(
                             f'all TimeSeries readings must contain the same number of values: expected {expected_count} values but found {actual_count} on TimeSeries id "{obj.id}"'
@@ -11,6 +11,7 @@ from typing import IO, Any, Awaitable, Callable, Dict, List, NamedTuple, Optiona
 import loguru
 
 __all__ = (
+    "OutputStreamBatchCallback",
     "OutputStreamCallback",
     "SubprocessResult",
     "Timeout",
@@ -31,6 +32,12 @@ OutputStreamCallback = TypeVar(
     "OutputStreamCallback", bound=Callable[[str], Union[None, Awaitable[None]]]
 )
 
+# Type definition for batched streaming output callbacks.
+# Must accept a single list of strings positional argument and returns nothing. Optionally asynchronous.
+OutputStreamBatchCallback = TypeVar(
+    "OutputStreamBatchCallback", bound=Callable[[List[str]], Union[None, Awaitable[None]]]
+)
+
 # Timeouts can be expressed as nummeric values in seconds or timedelta/Duration values
 Timeout = Union[int, float, datetime.timedelta, None]
 
@@ -277,6 +284,7 @@ async def stream_subprocess_output(
     timeout: Timeout = None,
     stdout_callback: Optional[OutputStreamCallback] = None,
     stderr_callback: Optional[OutputStreamCallback] = None,
+    stdout_batch_callback: Optional[OutputStreamBatchCallback] = None,
 ) -> int:
     """
     Asynchronously read the stdout and stderr output streams of a subprocess and
@@ -286,15 +294,21 @@ async def stream_subprocess_output(
     :param timeout: An optional timeout in seconds for how long to read the streams before giving up.
     :param stdout_callback: An optional callable invoked with each line read from stdout. Must accept a single string positional argument and returns nothing.
     :param stderr_callback: An optional callable invoked with each line read from stderr. Must accept a single string positional argument and returns nothing.
+    :param stdout_batch_callback: An optional callable invoked with the lines of each chunk read from stdout instead of `stdout_callback`. Suited to high volume output. Must accept a single list of strings positional argument and returns nothing.
 
     :raises asyncio.TimeoutError: Raised if the timeout expires before the subprocess exits.
     :return: The exit status of the subprocess.
     """
+    if stdout_callback and stdout_batch_callback:
+        raise ValueError("stdout_callback and stdout_batch_callback are mutually exclusive")
+
     tasks = []
     if process.stdout:
         tasks.append(
             asyncio.create_task(
-                _read_lines_from_output_stream(process.stdout, stdout_callback)
+                _read_line_batches_from_output_stream(process.stdout, stdout_batch_callback)
+                if stdout_batch_callback
+                else _read_lines_from_output_stream(process.stdout, stdout_callback)
             )
         )
     if process.stderr:
@@ -346,3 +360,37 @@ async def _read_lines_from_output_stream(
                     callback(line)
         else:
             break
+
+
+async def _read_line_batches_from_output_stream(
+    stream: asyncio.streams.StreamReader,
+    callback: OutputStreamBatchCallback,
+    *,
+    encoding: str = "utf-8",
+) -> None:
+    """
+    Asynchronously read a subprocess output stream in chunks, invoking a callback
+    with the complete lines of each chunk as it is read.
+
+    :param stream: An IO stream reader linked to the stdout or stderr of a subprocess.
+    :param callback: An optionally async callable that accepts a single list of strings positional argument and returns nothing.
+    :param encoding: The encoding to use when decoding from bytes to string (default is utf-8).
+    """
+    remainder = b""
+    while True:
+        chunk = await stream.read(_DEFAULT_LIMIT)
+        if chunk:
+            # NOTE: Lines are split as bytes so that partial characters are carried over with the remainder
+            complete, newline, remainder = (remainder + chunk).rpartition(b"\n")
+            if not newline:
+                continue
+            lines = [line.rstrip() for line in complete.decode(encoding).split("\n")]
+        elif remainder:
+            lines, remainder = [remainder.decode(encoding).rstrip()], b""
+        else:
+            break
+
+        if asyncio.iscoroutinefunction(callback):
+            await callback(lines)
+        else:
+            callback(lines)
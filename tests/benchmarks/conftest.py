@@ -0,0 +1,105 @@
+import json
+import pathlib
+from typing import Dict, List, Optional, Sequence
+
+import pytest
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baseline.json"
+
+# NOTE: Metrics are lower-is-better unless their name carries one of these suffixes
+HIGHER_IS_BETTER_SUFFIXES = ("_per_second", "_speedup")
+
+# NOTE: Timings depend on the machine and its load, so they are only gated on request
+TIMING_SUFFIXES = ("_ms", "_per_second")
+
+
+class BenchmarkRecorder:
+    """Records benchmark results and gates them against a stored baseline.
+
+    A result regresses when a higher-is-better metric falls below the baseline, or a
+    lower-is-better metric rises above it, by more than the tolerance fraction. Timings
+    are reported but not gated unless `timings` is True, as the baseline is recorded on
+    another machine. Ratios of timings taken within one run are gated.
+    """
+
+    def __init__(
+        self, baseline: Dict[str, Dict[str, float]], *, tolerance: float, update: bool, timings: bool = False
+    ) -> None:
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.update = update
+        self.timings = timings
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, *, informational: Sequence[str] = (), **metrics: float) -> None:
+        """Record the metrics for a named benchmark and fail if any regressed.
+
+        Metrics named in `informational` are recorded and reported but never gated. This
+        is useful for tail latencies that are too noisy to compare across runs.
+        """
+        self.results[name] = dict(metrics)
+        if self.update:
+            return
+
+        regressions = []
+        for metric, value in metrics.items():
+            expected = self.baseline.get(name, {}).get(metric)
+            if expected is None or metric in informational:
+                continue
+            if metric.endswith(TIMING_SUFFIXES) and not self.timings:
+                continue
+
+            if metric.endswith(HIGHER_IS_BETTER_SUFFIXES):
+                limit = expected * (1 - self.tolerance)
+                if value < limit:
+                    regressions.append(f"{metric}={value:.2f} < {limit:.2f} (baseline {expected:.2f})")
+            else:
+                limit = expected * (1 + self.tolerance)
+                if value > limit:
+                    regressions.append(f"{metric}={value:.2f} > {limit:.2f} (baseline {expected:.2f})")
+
+        if regressions:
+            pytest.fail(f"benchmark '{name}' regressed: " + ", ".join(regressions))
+
+    def summary(self) -> List[str]:
+        lines = []
+        for name, metrics in sorted(self.results.items()):
+            values = ", ".join(f"{metric}={value:.2f}" for metric, value in metrics.items())
+            lines.append(f"{name}: {values}")
+        return lines
+
+
+_recorder: Optional[BenchmarkRecorder] = None
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request) -> BenchmarkRecorder:
+    """Return the session-wide benchmark recorder.
+
+    When run with `--benchmark-update`, the results are merged into the baseline file at
+    the end of the session.
+    """
+    global _recorder
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    _recorder = BenchmarkRecorder(
+        baseline,
+        tolerance=request.config.getoption("--benchmark-tolerance"),
+        update=request.config.getoption("--benchmark-update"),
+        timings=request.config.getoption("--benchmark-timings"),
+    )
+    yield _recorder
+
+    if _recorder.update and _recorder.results:
+        # Round to keep baseline diffs readable
+        rounded = {
+            name: {metric: round(value, 4) for metric, value in metrics.items()}
+            for name, metrics in _recorder.results.items()
+        }
+        BASELINE_PATH.write_text(json.dumps({**baseline, **rounded}, indent=2, sort_keys=True) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if _recorder and _recorder.results:
+        terminalreporter.section("benchmark results")
+        for line in _recorder.summary():
+            terminalreporter.write_line(line)
@@ -0,0 +1,252 @@
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List
+
+import httpx
+import pytest
+
+import servo
+import servo.connectors.prometheus
+import servo.pubsub
+import tests.fake
+from servo.connectors.prometheus import (
+    ColumnarRangeVector,
+    MetricResponse,
+    PrometheusConfiguration,
+    PrometheusConnector,
+    PrometheusMetric,
+    QueryData,
+    RangeQuery,
+    RemoteReadRequest,
+    ResultType,
+    Status,
+)
+from servo.connectors.prometheus_remote_read import ChunkedReadDecoder
+
+pytestmark = [pytest.mark.benchmark]
+
+SERIES_COUNT = 10
+SAMPLES_PER_SERIES = 10_000
+
+
+@pytest.fixture(scope="module")
+def metric() -> PrometheusMetric:
+    return PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1s")
+
+
+@pytest.fixture(scope="module")
+def request_() -> RangeQuery:
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    return RangeQuery(
+        query="throughput", start=start, end=start + datetime.timedelta(seconds=SAMPLES_PER_SERIES), step="1s"
+    )
+
+
+@pytest.fixture(scope="module")
+def body(request_) -> bytes:
+    start = request_.start.timestamp()
+    return json.dumps({
+        "status": "success",
+        "data": {
+            "resultType": "matrix",
+            "result": [
+                {
+                    "metric": {"instance": f"10.0.0.{series}:9090", "job": "envoy"},
+                    "values": [[start + offset, str(offset * 0.5)] for offset in range(SAMPLES_PER_SERIES)],
+                }
+                for series in range(SERIES_COUNT)
+            ],
+        },
+    }).encode()
+
+
+@pytest.fixture(scope="module")
+def remote_read_body(request_) -> bytes:
+    """Return a streamed remote read response of the same samples as the matrix response."""
+    start = int(request_.start.timestamp() * 1000)
+    series = {
+        (("__name__", "throughput"), ("instance", f"10.0.0.{series}:9090"), ("job", "envoy")): [
+            (start + offset * 1000, offset * 0.5) for offset in range(SAMPLES_PER_SERIES)
+        ]
+        for series in range(SERIES_COUNT)
+    }
+    return b"".join(tests.fake.PrometheusRemoteRead()._frames(series))
+
+
+def _legacy_decode(metric: PrometheusMetric, request_: RangeQuery, body: bytes) -> List[servo.TimeSeries]:
+    response = MetricResponse(request=request_, metric=metric, **json.loads(body))
+    return response.results()
+
+
+def _columnar_decode(metric: PrometheusMetric, request_: RangeQuery, body: bytes) -> List[servo.TimeSeries]:
+    response = servo.connectors.prometheus._decode_response(
+        lambda **kwargs: MetricResponse(metric=metric, **kwargs), request_, body
+    )
+    return response.results()
+
+
+def _remote_read_decode(metric: PrometheusMetric, request_: RangeQuery, body: bytes) -> List[servo.TimeSeries]:
+    # NOTE: Fed in pieces as the body of a streamed response arrives
+    decoder = ChunkedReadDecoder()
+    for offset in range(0, len(body), 65536):
+        decoder.feed(body[offset:offset + 65536])
+
+    vectors = [
+        ColumnarRangeVector.construct(metric=labels, timestamps=timestamps, samples=samples)
+        for labels, timestamps, samples in decoder.series()
+    ]
+    response = MetricResponse.construct(
+        request=RemoteReadRequest(selector=metric.query, start=request_.start, end=request_.end),
+        status=Status.success,
+        data=QueryData.construct(result_type=ResultType.matrix, result=vectors),
+        metric=metric,
+    )
+    return response.results()
+
+
+def _measure(decode: Callable[[], List[servo.TimeSeries]]) -> Dict[str, float]:
+    tracemalloc.start()
+    try:
+        started_at = time.perf_counter()
+        readings = decode()
+        decoded_at = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Iterating materializes data points on the columnar path
+    assert sum(1 for time_series in readings for _ in time_series) == SERIES_COUNT * SAMPLES_PER_SERIES
+    iterated_at = time.perf_counter()
+    return {
+        "decode_ms": (decoded_at - started_at) * 1000,
+        "decode_and_iterate_ms": (iterated_at - started_at) * 1000,
+        "peak_bytes_per_sample": peak / (SERIES_COUNT * SAMPLES_PER_SERIES),
+    }
+
+
+def test_matrix_decoding(metric, request_, body, benchmark_recorder) -> None:
+    legacy = _measure(lambda: _legacy_decode(metric, request_, body))
+    columnar = _measure(lambda: _columnar_decode(metric, request_, body))
+    columnar["decode_speedup"] = legacy["decode_ms"] / columnar["decode_ms"]
+
+    benchmark_recorder.record("prometheus.decode[legacy]", informational=("decode_and_iterate_ms", ), **legacy)
+    benchmark_recorder.record("prometheus.decode[columnar]", informational=("decode_and_iterate_ms", ), **columnar)
+    assert columnar["decode_speedup"] > 1
+    assert columnar["peak_bytes_per_sample"] < legacy["peak_bytes_per_sample"]
+
+
+def test_remote_read_decoding(metric, request_, body, remote_read_body, benchmark_recorder) -> None:
+    query_range = _measure(lambda: _columnar_decode(metric, request_, body))
+    remote_read = _measure(lambda: _remote_read_decode(metric, request_, remote_read_body))
+    query_range["response_bytes_per_sample"] = len(body) / (SERIES_COUNT * SAMPLES_PER_SERIES)
+    remote_read["response_bytes_per_sample"] = len(remote_read_body) / (SERIES_COUNT * SAMPLES_PER_SERIES)
+
+    benchmark_recorder.record("prometheus.read[query_range]", informational=("decode_and_iterate_ms", ), **query_range)
+    benchmark_recorder.record("prometheus.read[remote_read]", informational=("decode_and_iterate_ms", ), **remote_read)
+    assert remote_read["response_bytes_per_sample"] < query_range["response_bytes_per_sample"] / 10
+    assert remote_read["peak_bytes_per_sample"] < query_range["peak_bytes_per_sample"]
+
+
+# NOTE: 500 series x 10k samples needs gigabytes of memory and minutes of runtime
+SCENARIOS = [(50, 1_000), (500, 1_000), (50, 10_000)]
+if os.environ.get("SERVO_BENCHMARK_SCALE") == "full":
+    SCENARIOS.append((500, 10_000))
+
+MEASUREMENT_DURATION = servo.Duration("2s")
+
+
+@contextlib.contextmanager
+def _synthetic_prometheus(port: int, **options) -> Iterator[str]:
+    """Run a synthetic Prometheus server in a subprocess so that it is not measured."""
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(
+        target=tests.fake.serve_synthetic_prometheus, args=(port, ), kwargs=options, daemon=True
+    )
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{base_url}/synthetic/requests").raise_for_status()
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+        yield base_url
+    finally:
+        process.terminate()
+        process.join()
+
+
+async def _measure_connector(base_url: str, *, mode: str, samples: int, traced: bool = False) -> Dict[str, float]:
+    step = servo.Duration(MEASUREMENT_DURATION.total_seconds() / (samples - 1))
+    streaming_interval = servo.Duration("250ms") if mode == "streaming" else None
+    metric = PrometheusMetric(
+        "throughput",
+        servo.Unit.requests_per_minute,
+        query="throughput",
+        # NOTE: The buffer only serves steps at least as long as the streaming interval
+        step=max(step, streaming_interval) if streaming_interval else step,
+        eager="1s" if mode == "eager" else None,
+    )
+    config = PrometheusConfiguration(
+        base_url=base_url,
+        metrics=[metric],
+        streaming_interval=streaming_interval,
+    )
+    exchange = servo.pubsub.Exchange()
+    exchange.start()
+    connector = PrometheusConnector(config=config, pubsub_exchange=exchange)
+    await connector.startup()
+    requested = _requests(base_url)
+
+    if traced:
+        tracemalloc.start()
+    try:
+        started_at = time.perf_counter()
+        measurement = await connector.measure(control=servo.Control(duration=MEASUREMENT_DURATION))
+        finished_at = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        connector.cancel_publishers()
+        await connector.shutdown()
+        await exchange.shutdown()
+
+    assert sum(map(len, measurement))
+    return {
+        "measure_ms": (finished_at - started_at) * 1000,
+        "result_latency_ms": (finished_at - started_at - MEASUREMENT_DURATION.total_seconds()) * 1000,
+        "peak_mb": peak / 2 ** 20,
+        "requests": _requests(base_url) - requested,
+        "readings": sum(map(len, measurement)),
+    }
+
+
+def _requests(base_url: str) -> int:
+    stats = httpx.get(f"{base_url}/synthetic/requests").json()
+    return sum(count for endpoint, count in stats.items() if endpoint != "generation_time")
+
+
+@pytest.mark.parametrize("mode", ["query", "eager", "streaming"])
+@pytest.mark.parametrize("series, samples", SCENARIOS)
+async def test_measure(mode, series, samples, unused_tcp_port, benchmark_recorder) -> None:
+    with _synthetic_prometheus(unused_tcp_port, series=series) as base_url:
+        # NOTE: Tracing allocations slows execution, so memory is measured in a separate pass
+        results = await _measure_connector(base_url, mode=mode, samples=samples)
+        traced = await _measure_connector(base_url, mode=mode, samples=samples, traced=True)
+        results["peak_mb"] = traced["peak_mb"]
+
+    benchmark_recorder.record(
+        f"prometheus.measure[{mode}-{series}x{samples}]",
+        informational=("measure_ms", "readings"),
+        **results
+    )
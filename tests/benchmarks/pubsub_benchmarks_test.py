@@ -0,0 +1,207 @@
+import asyncio
+import gc
+import time
+import tracemalloc
+from typing import Dict, List
+
+import pytest
+
+import servo
+import servo.pubsub
+
+pytestmark = [pytest.mark.benchmark]
+
+# NOTE: Hold total deliveries roughly constant so that scenarios take comparable time
+DELIVERIES_PER_SCENARIO = 10_000
+
+CALIBRATION_HOPS = 10_000
+
+# NOTE: Delivery is measured repeatedly and the best ratios are kept to shed outliers
+DELIVERY_REPEATS = 3
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _message(payload: bytes) -> servo.pubsub.Message:
+    return servo.pubsub.Message(
+        content=payload,
+        content_type="application/octet-stream",
+        metadata={"sent_at": str(time.perf_counter())},
+    )
+
+
+async def _calibrate() -> Dict[str, float]:
+    """Time hops through a bare asyncio queue, paced like the publish loop of `_measure_delivery`.
+
+    Delivery results are divided by the calibration timed in the same run, which yields
+    ratios that can be gated on machines unlike the one that recorded the baseline.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _consume() -> None:
+        for _ in range(CALIBRATION_HOPS):
+            await queue.get()
+
+    consumer = asyncio.create_task(_consume())
+    started_at = time.perf_counter()
+    for _ in range(CALIBRATION_HOPS):
+        queue.put_nowait(time.perf_counter())
+        await asyncio.sleep(0)
+    await consumer
+    elapsed = time.perf_counter() - started_at
+
+    # NOTE: The mean hop time is steadier than percentiles of hops lasting microseconds
+    return {"hop_ms": elapsed / CALIBRATION_HOPS * 1000}
+
+
+@pytest.fixture
+async def exchange() -> servo.pubsub.Exchange:
+    exchange = servo.pubsub.Exchange()
+    exchange.start()
+    yield exchange
+    await exchange.shutdown()
+
+
+async def _measure_delivery(
+    exchange: servo.pubsub.Exchange,
+    *,
+    subscriber_count: int,
+    selector: str,
+    consumer: str,
+    message_size: int,
+) -> Dict[str, float]:
+    channel = exchange.create_channel("metrics.benchmark.http")
+    message_count = max(1, DELIVERIES_PER_SCENARIO // subscriber_count)
+    expected_deliveries = message_count * subscriber_count
+    latencies: List[float] = []
+    finished = asyncio.Event()
+
+    def _delivered(message: servo.pubsub.Message) -> None:
+        latencies.append(time.perf_counter() - float(message.metadata["sent_at"]))
+        if len(latencies) == expected_deliveries:
+            finished.set()
+
+    tasks = []
+    if consumer == "callback":
+        for _ in range(subscriber_count):
+            exchange.create_subscriber(selector, callback=lambda message, channel: _delivered(message))
+    else:
+        ready = asyncio.Semaphore(0)
+
+        async def _iterate() -> None:
+            received = 0
+            async with exchange.subscribe(selector) as subscriber:
+                ready.release()
+                async for message, _ in subscriber:
+                    _delivered(message)
+                    received += 1
+                    if received == message_count:
+                        subscriber.cancel()
+
+        tasks = [asyncio.create_task(_iterate()) for _ in range(subscriber_count)]
+        for _ in range(subscriber_count):
+            await ready.acquire()
+
+    payload = b"x" * message_size
+    started_at = time.perf_counter()
+    for _ in range(message_count):
+        await channel.publish(_message(payload))
+        # Yield to the exchange so latency reflects delivery rather than queue backlog
+        await asyncio.sleep(0)
+    await asyncio.wait_for(finished.wait(), timeout=60)
+    elapsed = time.perf_counter() - started_at
+    await asyncio.gather(*tasks)
+
+    return {
+        "messages_per_second": expected_deliveries / elapsed,
+        "latency_p50_ms": _percentile(latencies, 50) * 1000,
+        "latency_p90_ms": _percentile(latencies, 90) * 1000,
+        "latency_p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+@pytest.mark.parametrize("message_size", [64, 4096])
+@pytest.mark.parametrize("consumer", ["callback", "iterator"])
+@pytest.mark.parametrize("selector", ["metrics.benchmark.http", "metrics.*"], ids=["exact", "pattern"])
+@pytest.mark.parametrize("subscriber_count", [1, 10, 100])
+async def test_delivery(
+    benchmark_recorder,
+    subscriber_count: int,
+    selector: str,
+    consumer: str,
+    message_size: int,
+) -> None:
+    repeats: List[Dict[str, float]] = []
+    for _ in range(DELIVERY_REPEATS):
+        exchange = servo.pubsub.Exchange()
+        exchange.start()
+        try:
+            # NOTE: Calibrate on both sides of the measurement to follow any change in load during it
+            gc.collect()
+            before = await _calibrate()
+            results = await _measure_delivery(
+                exchange,
+                subscriber_count=subscriber_count,
+                selector=selector,
+                consumer=consumer,
+                message_size=message_size,
+            )
+            after = await _calibrate()
+        finally:
+            await exchange.shutdown()
+
+        hop_ms = (before["hop_ms"] + after["hop_ms"]) / 2
+        results["throughput_speedup"] = results["messages_per_second"] * hop_ms / 1000
+        results["latency_p50_slowdown"] = results["latency_p50_ms"] / hop_ms
+        repeats.append(results)
+
+    best = {
+        metric: (max if metric.endswith(("_per_second", "_speedup")) else min)(
+            results[metric] for results in repeats
+        )
+        for metric in repeats[0]
+    }
+    selector_kind = "pattern" if "*" in selector else "exact"
+    benchmark_recorder.record(
+        f"pubsub.delivery[{subscriber_count}-{selector_kind}-{consumer}-{message_size}]",
+        informational=("latency_p90_ms", "latency_p99_ms"),
+        **best
+    )
+
+
+@pytest.mark.parametrize("message_size", [64, 4096])
+async def test_retained_message_memory(
+    exchange: servo.pubsub.Exchange,
+    benchmark_recorder,
+    message_size: int,
+) -> None:
+    message_count = 5_000
+    channel = exchange.create_channel(
+        "metrics.benchmark.retained",
+        retention=servo.pubsub.Retention(count=message_count),
+    )
+    payload = b"x" * message_size
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(message_count):
+            # NOTE: Copy the payload so that every message owns its content
+            await channel.publish(_message(bytes(bytearray(payload))))
+        await exchange._queue.join()
+        await asyncio.sleep(0)
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(channel.snapshot()) == message_count
+    benchmark_recorder.record(
+        f"pubsub.retention[{message_size}]",
+        bytes_per_message=(after - before) / message_count,
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import pathlib
+import random
+import time
+from typing import Dict, List
+
+import pytest
+
+import servo
+import servo.connectors.vegeta
+from servo.connectors.vegeta import HistogramConfiguration, VegetaResults
+
+pytestmark = [pytest.mark.benchmark]
+
+SHARDS = 4
+RATE = 20_000
+"""The combined rate of results across shards, in results per second."""
+
+ATTACK_DURATION = 10
+
+
+def _write_synthetic_results(directory: pathlib.Path) -> List[pathlib.Path]:
+    """Write the `vegeta encode -to csv` output of each shard of an attack at `RATE`."""
+    random.seed(0)
+    started_at = time.time_ns()
+    paths = []
+    for shard in range(SHARDS):
+        path = directory / f"shard-{shard}.csv"
+        with path.open("w") as file:
+            for index in range(shard, RATE * ATTACK_DURATION, SHARDS):
+                timestamp = started_at + index * 1_000_000_000 // RATE
+                status_code = "200" if random.random() > 0.01 else "503"
+                latency = int(random.lognormvariate(16, 0.5))
+                file.write(f"{timestamp},{status_code},{latency},0,1024,,,,{index},GET,http://localhost:8080/,\n")
+        paths.append(path)
+    return paths
+
+
+async def _consume(paths: List[pathlib.Path], *, batched: bool) -> Dict[str, float]:
+    """Stream the results of every shard through a pipe into a shared `VegetaResults` and time it."""
+    results = VegetaResults(HistogramConfiguration(), servo.Duration("1s"), sources=len(paths))
+    intervals = []
+
+    async def _append(closed) -> None:
+        intervals.extend(closed)
+
+    def _callbacks(source: int) -> Dict[str, object]:
+        if batched:
+            async def _lines(lines: List[str]) -> None:
+                await _append(results.add_csv(lines, source=source))
+            return {"stdout_batch_callback": _lines}
+
+        async def _line(line: str) -> None:
+            timestamp, status_code, latency, _ = line.split(",", 3)
+            await _append(results.add(int(timestamp) / 1e9, status_code, int(latency), source=source))
+        return {"stdout_callback": _line}
+
+    async def _shard(source: int, path: pathlib.Path) -> None:
+        exit_code = await servo.connectors.vegeta._stream_vegeta(["cat", str(path)], ["cat"], **_callbacks(source))
+        assert exit_code == 0
+        intervals.extend(results.finish(source))
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(_shard(source, path) for source, path in enumerate(paths)))
+    elapsed = time.perf_counter() - started_at
+
+    assert len(intervals) == ATTACK_DURATION
+    return {"consume_ms": elapsed * 1000, "results_per_second": RATE * ATTACK_DURATION / elapsed}
+
+
+async def test_sharded_results_consumption(tmp_path, benchmark_recorder) -> None:
+    paths = _write_synthetic_results(tmp_path)
+    per_line = await _consume(paths, batched=False)
+    batched = await _consume(paths, batched=True)
+
+    benchmark_recorder.record("vegeta.results[per_line]", **per_line)
+    benchmark_recorder.record(
+        "vegeta.results[batched]",
+        batch_speedup=per_line["consume_ms"] / batched["consume_ms"],
+        **batched,
+    )
+    # NOTE: The consumer must process results faster than the shards of the attack produce them
+    assert batched["results_per_second"] > RATE
+    assert batched["consume_ms"] < per_line["consume_ms"]
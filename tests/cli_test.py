@@ -306,6 +306,14 @@ class TestShow:
         assert result.exit_code == 0
         assert re.match("METRIC\\s+UNIT\\s+CONNECTORS", result.stdout)
 
+    def test_pubsub(
+        self, cli_runner: CliRunner, servo_cli: Typer, stub_servo_yaml: Path
+    ) -> None:
+        result = cli_runner.invoke(servo_cli, "show pubsub -d 0", catch_exceptions=False)
+        assert result.exit_code == 0, f"non-zero exit code. stdout={result.stdout}, stderr={result.stderr}"
+        assert re.match("CHANNEL\\s+PUBLISHED\\s+PUBLISH RATE\\s+DELIVERED\\s+DELIVERY RATE\\s+RETAINED", result.stdout)
+        assert re.search("SUBSCRIBER\\s+CONSUMER\\s+DELIVERED\\s+DELIVERY RATE\\s+QUEUE DEPTH\\s+LAG", result.stdout)
+
     @pytest.mark.usefixtures("stub_multiservo_yaml")
     class TestMultiservo:
         @pytest.fixture
@@ -366,6 +374,22 @@ class TestShow:
             assert re.search("dev.opsani.com/multi-servox-1", result.stdout) is None
             assert re.search("dev.opsani.com/multi-servox-2", result.stdout)
 
+        def test_pubsub(
+            self, cli_runner: CliRunner, servo_cli: Typer
+        ) -> None:
+            result = cli_runner.invoke(servo_cli, "show pubsub -d 0", catch_exceptions=False)
+            assert result.exit_code == 0, f"Non-zero exit status code: stdout={result.stdout}, stderr={result.stderr}"
+            assert re.match("dev.opsani.com/multi-servox-1\nCHANNEL\\s+PUBLISHED", result.stdout)
+            assert re.search("dev.opsani.com/multi-servox-2\nCHANNEL\\s+PUBLISHED", result.stdout)
+
+        def test_pubsub_by_name(
+            self, cli_runner: CliRunner, servo_cli: Typer
+        ) -> None:
+            result = cli_runner.invoke(servo_cli, "-n dev.opsani.com/multi-servox-2 show pubsub -d 0", catch_exceptions=False)
+            assert result.exit_code == 0, f"Non-zero exit status code: stdout={result.stdout}, stderr={result.stderr}"
+            assert re.search("dev.opsani.com/multi-servox-1", result.stdout) is None
+            assert re.match("dev.opsani.com/multi-servox-2\nCHANNEL\\s+PUBLISHED", result.stdout)
+
         def test_metrics(
             self, cli_runner: CliRunner, servo_cli: Typer
         ) -> None:
@@ -106,6 +106,32 @@ def pytest_addoption(parser) -> None:
         default=False,
         help="enable system tests",
     )
+    parser.addoption(
+        "-B", "--benchmark",
+        action="store_true",
+        default=False,
+        help="enable benchmark tests",
+    )
+    parser.addoption(
+        "--benchmark-tolerance",
+        action="store",
+        type=float,
+        default=0.5,
+        metavar="FRACTION",
+        help="fraction that a benchmark result may regress from the baseline before failing.",
+    )
+    parser.addoption(
+        "--benchmark-update",
+        action="store_true",
+        default=False,
+        help="record benchmark results as the new baseline instead of gating on it.",
+    )
+    parser.addoption(
+        "--benchmark-timings",
+        action="store_true",
+        default=False,
+        help="also gate benchmark timings on the baseline. Only meaningful on the machine that recorded it.",
+    )
     parser.addoption(
         "-T", "--type",
         action="store",
@@ -118,6 +144,7 @@ class TestType(str, enum.Enum):
     unit = "unit"
     integration = "integration"
     system = "system"
+    benchmark = "benchmark"
 
     @classmethod
     def names(cls) -> List[str]:
@@ -163,6 +190,11 @@ SYSTEM_INI = (
     'are capable of verifying that the product meets requirements as specified from a user '
     'perspective.'
 )
+BENCHMARK_INI = (
+    'benchmark: marks the test as a benchmark. Benchmarks measure throughput, latency, '
+    'and memory usage and compare the results against a recorded baseline, failing when '
+    'a result regresses beyond the configured tolerance.'
+)
 EVENT_LOOP_POLICY_INI = (
     'event_loop_policy: marks async tests to run under a parametrized asyncio '
     'runloop policy. There are two event loop policies available: default and uvloop. '
@@ -178,6 +210,7 @@ def pytest_configure(config) -> None:
     config.addinivalue_line("markers", UNIT_INI)
     config.addinivalue_line("markers", INTEGRATION_INI)
     config.addinivalue_line("markers", SYSTEM_INI)
+    config.addinivalue_line("markers", BENCHMARK_INI)
     config.addinivalue_line("markers", EVENT_LOOP_POLICY_INI)
 
     # Add generic description for all environments
@@ -242,7 +275,7 @@ def pytest_collection_modifyitems(config, items) -> None:
     """Modify the discovered pytest nodes to configure default markers.
 
     This methods sets asyncio as the async backend and skips
-    integration and system tests unless opted in.
+    integration, system, and benchmark tests unless opted in.
     """
 
     selected_items = []
@@ -273,7 +306,8 @@ def pytest_collection_modifyitems(config, items) -> None:
                 deselected_items.append(item)
         else:
             if ((type_mark.name == TestType.integration and not config.getoption("--integration"))
-                or (type_mark.name == TestType.system and not config.getoption("--system"))):
+                or (type_mark.name == TestType.system and not config.getoption("--system"))
+                or (type_mark.name == TestType.benchmark and not config.getoption("--benchmark"))):
                     item.add_marker(
                         pytest.mark.skip(
                             reason=f"{type_mark.name} tests not enabled. Run with --{type_mark.name} to enable"
@@ -1,9 +1,11 @@
 import asyncio
 import itertools
 import json
+import math
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import List
 
 import httpx
 import pytest
@@ -18,7 +20,18 @@ from servo import BaseConnector, Duration, License, Maturity, Optimizer, Version
 from servo.cli import ServoCLI
 from servo.configuration import BaseConfiguration, BaseServoConfiguration
 from servo.connector import _connector_subclasses
-from servo.connectors.vegeta import TargetFormat, VegetaConfiguration, VegetaConnector
+from servo.connectors.vegeta import (
+    HistogramConfiguration,
+    LatencyHistogram,
+    LoadProfile,
+    TargetFormat,
+    ThroughputSearch,
+    VegetaConfiguration,
+    VegetaConnector,
+    VegetaReport,
+    VegetaReports,
+    VegetaResults,
+)
 from servo.events import EventContext, Preposition, _events, create_event, event
 from servo.logging import ProgressHandler, reset_to_defaults
 from tests.helpers import *
@@ -528,6 +541,503 @@ class TestVegetaConnector:
         await vegeta_connector.measure()
 
 
+def vegeta_report(end: str = "2020-12-22T17:59:32.123456789-08:00", **overrides) -> dict:
+    return {
+        "latencies": {
+            "total": 2_000_000_000, "mean": 20_000_000, "50th": 15_000_000, "90th": 30_000_000,
+            "95th": 40_000_000, "99th": 90_000_000, "max": 120_000_000, "min": 1_000_000,
+        },
+        "bytes_in": {"total": 1000, "mean": 10.0},
+        "bytes_out": {"total": 0, "mean": 0.0},
+        "earliest": "2020-12-22T17:59:31.12Z",
+        "latest": "2020-12-22T17:59:32.12Z",
+        "end": end,
+        "duration": 1_000_000_000,
+        "wait": 1_000_000,
+        "requests": 100,
+        "rate": 100.0,
+        "throughput": 98.0,
+        "success": 0.98,
+        "status_codes": {"200": 98, "500": 2},
+        "errors": ["500 Internal Server Error"],
+        **overrides,
+    }
+
+
+class TestVegetaReports:
+    def test_columns_match_report_model(self) -> None:
+        reports = VegetaReports()
+        report = vegeta_report()
+        reports.append(report)
+
+        model = VegetaReport(**report)
+        assert len(reports) == 1
+        assert reports.latest("throughput") == pytest.approx(model.throughput)
+        assert reports.latest("error_rate") == pytest.approx(model.error_rate)
+        assert reports.latest("latency_99th") == pytest.approx(model.latencies.p99)
+        assert reports.latest("latency_min") == pytest.approx(model.latencies.min)
+        assert reports.timestamps[0] == pytest.approx(model.end.timestamp())
+
+    def test_time_series(self) -> None:
+        reports = VegetaReports()
+        reports.append(vegeta_report(end="2020-12-22T17:59:32Z", throughput=10.0))
+        reports.append(vegeta_report(end="2020-12-22T17:59:33Z", throughput=20.0))
+
+        readings = reports.time_series(["throughput", "latency_50th"])
+        assert list(map(lambda time_series: time_series.metric.name, readings)) == ["throughput", "latency_50th"]
+        throughput, latency = readings
+        assert [(data_point.time.isoformat(), data_point.value) for data_point in throughput] == [
+            ("2020-12-22T17:59:32+00:00", 600.0), ("2020-12-22T17:59:33+00:00", 1200.0)
+        ]
+        assert [data_point.value for data_point in latency] == [15.0, 15.0]
+        assert len(reports.time_series()) == len(servox.connectors.vegeta.METRICS)
+
+    async def test_measure_returns_readings(self, mocker) -> None:
+        reports = VegetaReports()
+        reports.append(vegeta_report())
+        mocker.patch("servo.connectors.vegeta._run_vegeta", return_value=(0, reports))
+        connector = VegetaConnector(config=VegetaConfiguration(rate="50/1s", target="GET http://localhost:8080"))
+        measurement = await connector.measure(metrics=["error_rate"])
+        (time_series, ) = measurement.readings
+        assert time_series[0].value == pytest.approx(2.0)
+
+
+class TestLatencyHistogram:
+    def test_percentiles_within_precision(self) -> None:
+        histogram = LatencyHistogram(significant_figures=2)
+        values = list(range(1_000, 10_000_000_000, 9_999_001))
+        for value in values:
+            histogram.record(value)
+
+        for percentile, value in zip((50, 90, 99, 100), histogram.percentiles([50, 90, 99, 100])):
+            expected = values[math.ceil(percentile / 100 * len(values)) - 1]
+            assert value == pytest.approx(expected, rel=0.01)
+        assert histogram.percentiles([100]) == [values[-1]]
+        assert (histogram.min, histogram.max, histogram.count) == (values[0], values[-1], len(values))
+
+    def test_small_values_are_exact(self) -> None:
+        histogram = LatencyHistogram(significant_figures=2)
+        for value in (1, 2, 3, 4):
+            histogram.record(value)
+        assert histogram.percentiles([25, 50, 75]) == [1, 2, 3]
+        assert histogram.count_at_or_below(2) == 2
+
+    def test_empty(self) -> None:
+        assert LatencyHistogram().percentiles([50, 99]) == [None, None]
+
+    def test_record_many(self) -> None:
+        values = [1, 3, 1_000, 5_000_000, 9_999_999_999]
+        one_by_one, batched = LatencyHistogram(), LatencyHistogram()
+        for value in values:
+            one_by_one.record(value)
+        batched.record_many(values[:2])
+        batched.record_many(values[2:])
+        batched.record_many([])
+
+        assert batched._counts == one_by_one._counts
+        assert (batched.count, batched.total, batched.min, batched.max) == (5, sum(values), 1, 9_999_999_999)
+
+    def test_merge(self) -> None:
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(5_000_000)
+        b.record(1_000_000)
+        b.record(9_000_000)
+        a.merge(b)
+        assert (a.count, a.total, a.min, a.max) == (3, 15_000_000, 1_000_000, 9_000_000)
+        assert a.percentiles([50]) == [pytest.approx(5_000_000, rel=0.01)]
+
+    def test_merge_requires_same_precision(self) -> None:
+        with pytest.raises(ValueError, match="cannot merge histograms of different precision"):
+            LatencyHistogram(2).merge(LatencyHistogram(3))
+
+
+class TestVegetaResults:
+    @pytest.fixture
+    def results(self) -> VegetaResults:
+        config = HistogramConfiguration(percentiles=[50, 99.9], buckets=["10ms"], status_codes=["2xx", "503", "0"])
+        return VegetaResults(config, Duration("1s"))
+
+    def test_metrics(self) -> None:
+        config = HistogramConfiguration(percentiles=[50, 99.9], buckets=["10ms"], status_codes=["2xx"])
+        assert [metric.name for metric in config.metrics()] == [
+            "throughput", "error_rate", "latency_total", "latency_mean", "latency_50th", "latency_99.9th",
+            "latency_max", "latency_min", "latency_bucket_10ms", "throughput_2xx",
+        ]
+
+    def test_invalid_percentile(self) -> None:
+        with pytest.raises(ValidationError, match="percentiles must be greater than 0 and at most 100"):
+            HistogramConfiguration(percentiles=[0])
+
+    def test_intervals(self, results) -> None:
+        assert results.add(100.0, "200", 5_000_000) == []
+        assert results.add(100.5, "503", 20_000_000) == []
+        assert results.add(100.9, "0", 0) == []
+        ((end, values), ) = results.add(101.2, "200", 5_000_000)
+
+        assert end == 101.0
+        assert values["throughput"] == pytest.approx(60.0)
+        assert values["error_rate"] == pytest.approx(100 * 2 / 3)
+        assert values["latency_total"] == pytest.approx(25.0)
+        assert values["latency_50th"] == pytest.approx(5.0, rel=0.01)
+        assert values["latency_99.9th"] == pytest.approx(20.0)
+        assert (values["latency_min"], values["latency_max"]) == (0.0, 20.0)
+        assert values["latency_bucket_10ms"] == 2
+        assert (values["throughput_2xx"], values["throughput_503"], values["throughput_0"]) == (60.0, 60.0, 60.0)
+
+        ((end, values), ) = results.finish()
+        assert end == pytest.approx(101.205)
+        assert values["throughput"] == pytest.approx(60 / 0.205)
+        assert results.finish() == []
+
+    def test_intervals_skip_gaps(self, results) -> None:
+        results.add(100.0, "200", 1_000_000)
+        ((end, _), ) = results.add(103.5, "200", 1_000_000)
+        assert end == 101.0
+        ((end, _), ) = results.add(104.0, "200", 1_000_000)
+        assert end == 104.0
+
+    def test_intervals_close_when_all_sources_pass(self) -> None:
+        results = VegetaResults(HistogramConfiguration(), Duration("1s"), sources=2)
+        assert results.add(100.0, "200", 1_000_000, source=0) == []
+        assert results.add(101.5, "200", 1_000_000, source=0) == []
+        assert results.add(100.5, "200", 1_000_000, source=1) == []
+        ((end, values), ) = results.add(101.2, "200", 1_000_000, source=1)
+        assert (end, values["throughput"]) == (101.0, 120.0)
+
+        # NOTE: Late results are counted in the earliest open interval
+        assert results.add(100.9, "200", 1_000_000, source=0) == []
+        assert results.finish(0) == []
+        ((end, values), ) = results.finish(1)
+        assert end == pytest.approx(101.501)
+        assert values["throughput"] == pytest.approx(3 * 60 / 0.501)
+
+
+    def test_add_csv_closes_intervals_per_batch(self, results) -> None:
+        lines = [
+            f"{int(timestamp * 1e9)},{status_code},{latency},0,0,,,,GET,http://localhost:8080"
+            for timestamp, status_code, latency in (
+                (99.5, "200", 1_000_000), (100.0, "200", 5_000_000), (101.2, "200", 5_000_000), (100.5, "503", 20_000_000)
+            )
+        ]
+        # NOTE: The late result of the batch is counted in its own interval as the batch closes intervals once
+        ((end, values), ) = results.add_csv(lines, since=100.0)
+        assert end == 101.0
+        assert values["throughput"] == pytest.approx(60.0)
+        assert values["error_rate"] == pytest.approx(50.0)
+        assert results.add_csv([]) == []
+
+        ((end, values), ) = results.finish()
+        assert end == pytest.approx(101.205)
+
+
+class TestVegetaPipeline:
+    async def test_target_is_piped_through(self) -> None:
+        lines = []
+        exit_code = await servox.connectors.vegeta._stream_vegeta(
+            ["cat"], ["tr", "a-z", "A-Z"], target="GET http://localhost:8080", stdout_callback=lines.append
+        )
+        assert exit_code == 0
+        assert lines == ["GET HTTP://LOCALHOST:8080"]
+
+    async def test_results_are_streamed_in_batches(self) -> None:
+        batches = []
+        exit_code = await servox.connectors.vegeta._stream_vegeta(
+            ["seq", "1", "20000"], ["cat"], stdout_batch_callback=batches.append
+        )
+        assert exit_code == 0
+        assert 1 < len(batches) < 20000
+        assert [line for batch in batches for line in batch] == [str(i) for i in range(1, 20001)]
+
+    async def test_attack_exit_code(self) -> None:
+        exit_code = await servox.connectors.vegeta._stream_vegeta(["sh", "-c", "exit 3"], ["cat"])
+        assert exit_code == 3
+
+    async def test_missing_executable(self) -> None:
+        exit_code = await servox.connectors.vegeta._stream_vegeta(["vegeta-does-not-exist"], ["cat"])
+        assert exit_code == 127
+
+    def test_build_command(self) -> None:
+        config = VegetaConfiguration(rate="50/1s", target="GET http://localhost:8080", histograms={})
+        config._duration = "5s"
+        attack_args, consumer_args = servox.connectors.vegeta._build_vegeta_command(config)
+        assert attack_args[:6] == ["vegeta", "attack", "-rate", "50/1s", "-duration", "5s"]
+        assert consumer_args == ["vegeta", "encode", "-to", "csv"]
+
+    async def test_run_with_histograms(self, mocker) -> None:
+        results = "".join(
+            f"{(1_600_000_000 + offset / 10) * 1e9:.0f},{200 if offset % 5 else 500},{(offset + 1) * 1_000_000},0,10,\"\",,,{offset},GET,http://localhost:8080/,\n"
+            for offset in range(25)
+        )
+        mocker.patch(
+            "servo.connectors.vegeta._build_vegeta_command",
+            return_value=(["printf", results.replace("%", "%%")], ["cat"])
+        )
+        config = VegetaConfiguration(
+            rate="10/1s", target="GET http://localhost:8080", reporting_interval="1s", histograms={"percentiles": [50, 100]}
+        )
+        config._duration = "3s"
+        exit_code, reports = await servox.connectors.vegeta._run_vegeta(config)
+
+        assert exit_code == 0
+        assert len(reports) == 3
+        assert list(reports.columns["error_rate"]) == [20.0, 20.0, 20.0]
+        assert list(reports.columns["latency_100th"]) == [10.0, 20.0, 25.0]
+
+
+class TestVegetaShards:
+    def test_rates_are_split(self) -> None:
+        assert servox.connectors.vegeta._shard_rates("10/1s", 3) == ["4/1s", "3/1s", "3/1s"]
+        assert servox.connectors.vegeta._shard_rates("50", 4) == ["13", "13", "12", "12"]
+
+    def test_shards_never_attack_at_unlimited_rate(self) -> None:
+        assert servox.connectors.vegeta._shard_rates("2/1s", 4) == ["1/1s", "1/1s"]
+        assert servox.connectors.vegeta._shard_rates("0", 2) == ["0", "0"]
+
+    def test_http_targets_are_partitioned(self, tmp_path: Path) -> None:
+        targets = tmp_path / "targets.txt"
+        targets.write_text(
+            "# Comment\nGET http://localhost:8080/1\nX-Account-ID: 8675309\n\n"
+            "POST http://localhost:8080/2\n@/tmp/body.json\n\nGET http://localhost:8080/3\n"
+        )
+        paths = servox.connectors.vegeta._partition_targets(targets, TargetFormat.http, 2, tmp_path)
+        assert [path.read_text() for path in paths] == [
+            "GET http://localhost:8080/1\nX-Account-ID: 8675309\n\nGET http://localhost:8080/3\n\n",
+            "POST http://localhost:8080/2\n@/tmp/body.json\n\n",
+        ]
+
+    def test_json_targets_are_partitioned(self, tmp_path: Path) -> None:
+        targets = tmp_path / "targets.json"
+        targets.write_text('{"method": "GET", "url": "http://localhost:8080/1"}\n{"method": "GET", "url": "http://localhost:8080/2"}\n')
+        paths = servox.connectors.vegeta._partition_targets(targets, TargetFormat.json, 2, tmp_path)
+        assert [path.read_text() for path in paths] == [
+            '{"method": "GET", "url": "http://localhost:8080/1"}\n', '{"method": "GET", "url": "http://localhost:8080/2"}\n'
+        ]
+
+    def test_fewer_targets_than_shards(self, tmp_path: Path) -> None:
+        targets = tmp_path / "targets.txt"
+        targets.write_text("GET http://localhost:8080/\n")
+        assert servox.connectors.vegeta._partition_targets(targets, TargetFormat.http, 2, tmp_path) == [targets, targets]
+
+    def test_shard_commands(self, tmp_path: Path) -> None:
+        config = VegetaConfiguration(rate="100/1s", target="GET http://localhost:8080", shards=4, max_workers=10)
+        config._duration = "5s"
+        commands = servox.connectors.vegeta._build_shard_commands(config, tmp_path)
+        assert len(commands) == 4
+        for attack_args, consumer_args in commands:
+            assert attack_args[attack_args.index("-rate") + 1] == "25/1s"
+            assert attack_args[attack_args.index("-max-workers") + 1] == "3"
+            assert consumer_args == ["vegeta", "encode", "-to", "csv"]
+
+    def test_sharded_metrics_are_aggregated(self) -> None:
+        config = VegetaConfiguration(rate="100/1s", target="GET http://localhost:8080", shards=2)
+        assert config.histogram_config == HistogramConfiguration()
+        assert "throughput_2xx" in [metric.name for metric in config.metrics()]
+
+    @pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU affinity is not supported")
+    async def test_attack_is_pinned_to_core(self) -> None:
+        lines = []
+        await servox.connectors.vegeta._stream_vegeta(
+            ["grep", "Cpus_allowed_list", "/proc/self/status"], ["cat"], core=0, stdout_callback=lines.append
+        )
+        assert lines == ["Cpus_allowed_list:\t0"]
+
+    async def test_results_are_merged(self, mocker) -> None:
+        def shard_command(config, *, rate, targets, max_workers):
+            offset = int(rate.split("/")[0]) - 5
+            results = "".join(
+                f"{(1_600_000_000 + index / 5) * 1e9:.0f},200,{(index * 2 + offset + 1) * 1_000_000},0,10,\"\",,,{index},GET,http://localhost:8080/,\n"
+                for index in range(10)
+            )
+            return ["printf", results], ["cat"]
+
+        mocker.patch("servo.connectors.vegeta._build_vegeta_command", side_effect=shard_command)
+        # NOTE: A rate of 11/1s yields shards at 6/1s and 5/1s, which produce odd and even latencies
+        config = VegetaConfiguration(
+            rate="11/1s", target="GET http://localhost:8080", reporting_interval="1s", shards=2, pin_shards=True,
+            histograms={"percentiles": [50, 100]},
+        )
+        config._duration = "2s"
+        exit_code, reports = await servox.connectors.vegeta._run_vegeta(config)
+
+        assert exit_code == 0
+        assert len(reports) == 2
+        assert list(reports.columns["throughput"]) == [600.0, pytest.approx(600 / 0.82)]
+        assert list(reports.columns["latency_100th"]) == [10.0, 20.0]
+        assert list(reports.columns["latency_min"]) == [1.0, 11.0]
+
+
+class TestLoadProfile:
+    def test_ramp(self) -> None:
+        profile = LoadProfile(type="ramp", start_rate="10/1s", end_rate="100/1s", segments=4)
+        assert profile.schedule("50/1s", Duration("20s")) == [
+            ("10/1s", Duration("5s")), ("40/1s", Duration("5s")), ("70/1s", Duration("5s")), ("100/1s", Duration("5s")),
+        ]
+
+    def test_ramp_at_low_rates(self) -> None:
+        profile = LoadProfile(type="ramp", start_rate="1/1s", end_rate="2/1s", segments=3)
+        assert [rate for rate, _ in profile.schedule("50/1s", Duration("3s"))] == ["60/1m", "90/1m", "120/1m"]
+
+    def test_step(self) -> None:
+        profile = LoadProfile(type="step", rates=["10/1s", 20])
+        assert profile.schedule("50/1s", Duration("1m")) == [("10/1s", Duration("30s")), ("20", Duration("30s"))]
+
+    def test_spike(self) -> None:
+        profile = LoadProfile(type="spike", spike_rate="200/1s", period="10s", spike_duration="2s")
+        assert profile.schedule("50/1s", Duration("25s")) == [
+            ("50/1s", Duration("8s")), ("200/1s", Duration("2s")),
+            ("50/1s", Duration("8s")), ("200/1s", Duration("2s")),
+            ("50/1s", Duration("5s")),
+        ]
+
+    @pytest.mark.parametrize(
+        "profile, message",
+        [
+            ({"type": "ramp", "start_rate": "10/1s"}, "ramp profiles require a start_rate and end_rate"),
+            ({"type": "step"}, "step profiles require rates"),
+            ({"type": "spike", "spike_rate": "10/1s", "period": "1s"}, "spike profiles require a spike_rate, period and spike_duration"),
+            ({"type": "spike", "spike_rate": "10/1s", "period": "1s", "spike_duration": "1s"}, "spike_duration must be shorter than period"),
+            ({"type": "step", "rates": ["10/1s", "0"]}, "rates must be greater than zero"),
+        ],
+    )
+    def test_invalid(self, profile, message) -> None:
+        with pytest.raises(ValidationError, match=message):
+            LoadProfile(**profile)
+
+    async def test_segments_are_run_in_turn(self, mocker) -> None:
+        def segment_command(config, **kwargs):
+            # NOTE: Latencies encode the rate of the segment for assertions
+            hits = int(config.rate.split("/")[0])
+            results = "".join(
+                f"{(1_600_000_000 + hits + index / 10) * 1e9:.0f},200,{hits * 1_000_000},0,10,\"\",,,{index},GET,http://localhost:8080/,\n"
+                for index in range(10)
+            )
+            return ["printf", results], ["cat"]
+
+        mocker.patch("servo.connectors.vegeta._build_vegeta_command", side_effect=segment_command)
+        config = VegetaConfiguration(
+            rate="50/1s", target="GET http://localhost:8080", reporting_interval="1s", histograms={},
+            profile={"type": "step", "rates": ["10/1s", "20/1s"]},
+        )
+        config._duration = "2s"
+        exit_code, reports = await servox.connectors.vegeta._run_vegeta(config)
+
+        assert exit_code == 0
+        assert list(reports.columns["latency_max"]) == [10.0, 20.0]
+        assert list(reports.columns["offered_rate"]) == [600.0, 1200.0]
+        assert [segment["rate"] for segment in reports.segments] == ["10/1s", "20/1s"]
+
+    async def test_measure_annotates_segments(self, mocker) -> None:
+        reports = VegetaReports([*servox.connectors.vegeta.METRICS, servox.connectors.vegeta.OFFERED_RATE])
+        reports.segments.append({"start": "2020-12-22T17:59:31", "end": "2020-12-22T17:59:32", "rate": "10/1s"})
+        reports.append_values(1_600_000_000, dict.fromkeys(reports.columns, 1.0))
+        mocker.patch("servo.connectors.vegeta._run_vegeta", return_value=(0, reports))
+        connector = VegetaConnector(config=VegetaConfiguration(
+            rate="50/1s", target="GET http://localhost:8080", profile={"type": "step", "rates": ["10/1s"]}
+        ))
+        assert "offered_rate" in [metric.name for metric in connector.metrics()]
+
+        measurement = await connector.measure(metrics=["offered_rate"])
+        assert "following a step load profile" in measurement.annotations["load_profile"]
+        assert json.loads(measurement.annotations["load_segments"]) == reports.segments
+        assert [time_series.metric.name for time_series in measurement.readings] == ["offered_rate"]
+
+
+class TestThroughputSearch:
+    @pytest.fixture
+    def saturating_vegeta(self, mocker) -> List[str]:
+        """Mock Vegeta attacking a service that saturates at 100 requests per second."""
+        return self._mock_saturating_vegeta(mocker, 100)
+
+    @staticmethod
+    def _mock_saturating_vegeta(mocker, saturation: float) -> List[str]:
+        rates = []
+
+        async def run_vegeta(config, warmup_until=None, publisher=None):
+            rates.append(config.rate)
+            rate = servox.connectors.vegeta._rate_per_second(config.rate)
+            reports = VegetaReports(config.metrics())
+            reports.append_values(1_600_000_000 + len(rates), {
+                **dict.fromkeys(reports.columns, 0.0),
+                "throughput": min(rate, saturation) * 60,
+                "latency_99th": 10.0 if rate <= saturation else 500.0,
+            })
+            return 0, reports
+
+        mocker.patch("servo.connectors.vegeta._run_vegeta", side_effect=run_vegeta)
+        return rates
+
+    @pytest.fixture
+    def config(self) -> VegetaConfiguration:
+        return VegetaConfiguration(
+            rate="50/1s", target="GET http://localhost:8080", search={"latency": "100ms", "start_rate": "10/1s"},
+        )
+
+    async def test_exponential_probe_then_bisection(self, config, saturating_vegeta) -> None:
+        exit_code, reports, rate = await servox.connectors.vegeta._search_throughput(config)
+
+        assert exit_code == 0
+        assert saturating_vegeta == ["10/1s", "20/1s", "40/1s", "80/1s", "160/1s", "120/1s", "100/1s", "110/1s", "105/1s"]
+        assert rate == 100.0
+        assert [probe["sustained"] for probe in reports.segments] == [True, True, True, True, False, False, True, False, False]
+        assert list(reports.columns["offered_rate"])[:2] == [600.0, 1200.0]
+
+    async def test_bisection_stops_at_rate_resolution(self, config, mocker) -> None:
+        rates = self._mock_saturating_vegeta(mocker, 11)
+        _, _, rate = await servox.connectors.vegeta._search_throughput(config)
+
+        # NOTE: The midpoint of 11/1s and 12/1s rounds to 12/1s, which was already probed
+        assert rates == ["10/1s", "20/1s", "15/1s", "12/1s", "11/1s"]
+        assert rate == 11.0
+
+    async def test_max_rate(self, config, saturating_vegeta) -> None:
+        config.search.max_rate = "50/1s"
+        _, _, rate = await servox.connectors.vegeta._search_throughput(config)
+        assert saturating_vegeta == ["10/1s", "20/1s", "40/1s", "50/1s"]
+        assert rate == 50.0
+
+    async def test_max_probes(self, config, saturating_vegeta) -> None:
+        config.search.max_probes = 3
+        _, _, rate = await servox.connectors.vegeta._search_throughput(config)
+        assert rate == 40.0
+
+    async def test_probes_are_published(self, config, saturating_vegeta) -> None:
+        messages = []
+
+        async def publisher(message: servox.Message) -> None:
+            messages.append(message.json())
+
+        await servox.connectors.vegeta._search_throughput(config, publisher=publisher)
+        assert len(messages) == len(saturating_vegeta)
+        assert messages[0]["rate"] == "10/1s"
+        assert messages[0]["sustained"] is True
+        assert messages[0]["latency_99th"] == 10.0
+
+    async def test_measure(self, config, saturating_vegeta) -> None:
+        connector = VegetaConnector(config=config)
+        measurement = await connector.measure(metrics=["max_sustainable_throughput", "offered_rate"])
+        offered_rate, max_sustainable_throughput = measurement.readings
+        assert len(offered_rate) == len(saturating_vegeta)
+        assert [data_point.value for data_point in max_sustainable_throughput] == [6000.0]
+        assert len(json.loads(measurement.annotations["load_segments"])) == len(saturating_vegeta)
+
+    def test_percentile_must_be_reported(self) -> None:
+        with pytest.raises(ValidationError, match="latency percentile 99.9 of the search is not reported"):
+            VegetaConfiguration(rate="50/1s", target="GET http://localhost:8080", search={"latency": "1s", "percentile": 99.9})
+
+        config = VegetaConfiguration(
+            rate="50/1s", target="GET http://localhost:8080", search={"latency": "1s", "percentile": 99.9},
+            histograms={"percentiles": [99.9]},
+        )
+        assert config.search.latency_metric == "latency_99.9th"
+
+    def test_exclusive_of_profile(self) -> None:
+        with pytest.raises(ValidationError, match="profile and search cannot both be configured"):
+            VegetaConfiguration(
+                rate="50/1s", target="GET http://localhost:8080", search={"latency": "1s"},
+                profile={"type": "step", "rates": ["10/1s"]},
+            )
+
+
 def test_init_vegeta_connector() -> None:
     config = VegetaConfiguration(
         rate="50/1s", target="GET http://localhost:8080"
@@ -851,6 +1361,73 @@ def test_vegeta_cli_schema_json(
                     '72h3m0.5s',
                 ],
             },
+            'histograms': {
+                'title': 'Histograms',
+                'description': (
+                    'Build latency histograms in-process from the raw results of the attack instead of reading the repo'
+                    'rts of `vegeta report`.'
+                ),
+                'env_names': [
+                    'VEGETA_HISTOGRAMS',
+                ],
+                'allOf': [
+                    {
+                        '$ref': '#/definitions/HistogramConfiguration',
+                    },
+                ],
+            },
+            'shards': {
+                'title': 'Shards',
+                'description': (
+                    'Specifies the number of `vegeta attack` processes to split the rate and targets across. The raw res'
+                    'ults of sharded attacks are always aggregated in-process.'
+                ),
+                'default': 1,
+                'minimum': 1,
+                'env_names': [
+                    'VEGETA_SHARDS',
+                ],
+                'type': 'integer',
+            },
+            'pin_shards': {
+                'title': 'Pin Shards',
+                'description': 'Specifies whether to pin each shard to a single CPU core.',
+                'default': False,
+                'env_names': [
+                    'VEGETA_PIN_SHARDS',
+                ],
+                'type': 'boolean',
+            },
+            'profile': {
+                'title': 'Profile',
+                'description': (
+                    'Specifies a load profile to execute as successive attack segments instead of attacking at a constan'
+                    't rate.'
+                ),
+                'env_names': [
+                    'VEGETA_PROFILE',
+                ],
+                'allOf': [
+                    {
+                        '$ref': '#/definitions/LoadProfile',
+                    },
+                ],
+            },
+            'search': {
+                'title': 'Search',
+                'description': (
+                    'Specifies a search for the maximum sustainable throughput to run instead of attacking at a constant'
+                    ' rate.'
+                ),
+                'env_names': [
+                    'VEGETA_SEARCH',
+                ],
+                'allOf': [
+                    {
+                        '$ref': '#/definitions/ThroughputSearch',
+                    },
+                ],
+            },
         },
         'required': ['rate'],
         'additionalProperties': False,
@@ -864,6 +1441,252 @@ def test_vegeta_cli_schema_json(
                 ],
                 'type': 'string',
             },
+            'HistogramConfiguration': {
+                'title': 'HistogramConfiguration',
+                'description': 'Configuration of latency histograms built in-process from the raw results of an attack.',
+                'type': 'object',
+                'properties': {
+                    'percentiles': {
+                        'title': 'Percentiles',
+                        'description': 'The latency percentiles to report as metrics.',
+                        'default': [50, 90, 95, 99],
+                        'type': 'array',
+                        'items': {
+                            'type': 'number',
+                        },
+                    },
+                    'buckets': {
+                        'title': 'Buckets',
+                        'description': (
+                            'Latency bucket boundaries to report the number of requests completing at or below as metri'
+                            'cs.'
+                        ),
+                        'default': [],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                            'format': 'duration',
+                            'pattern': (
+                                '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]'
+                                '+us)?([\\d\\.]+ns)?'
+                            ),
+                            'examples': [
+                                '300ms',
+                                '5m',
+                                '2h45m',
+                                '72h3m0.5s',
+                            ],
+                        },
+                    },
+                    'status_codes': {
+                        'title': 'Status Codes',
+                        'description': (
+                            'Status codes or classes (e.g., 503 or 5xx) to report the throughput of as metrics. Transpo'
+                            'rt errors are reported with a status code of 0.'
+                        ),
+                        'default': ['2xx', '3xx', '4xx', '5xx'],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                        },
+                    },
+                    'significant_figures': {
+                        'title': 'Significant Figures',
+                        'description': 'The number of significant figures of precision that latencies are recorded to.',
+                        'default': 2,
+                        'minimum': 1,
+                        'maximum': 5,
+                        'type': 'integer',
+                    },
+                },
+            },
+            'LoadProfileType': {
+                'title': 'LoadProfileType',
+                'description': 'An enumeration.',
+                'enum': [
+                    'ramp',
+                    'step',
+                    'spike',
+                ],
+                'type': 'string',
+            },
+            'LoadProfile': {
+                'title': 'LoadProfile',
+                'description': (
+                    'A schedule of request rates over the duration of a measurement.\n\nProfiles are executed as successiv'
+                    'e attack segments at constant rates:\n\n* `ramp` profiles change linearly from `start_rate` to `end_r'
+                    'ate` across `segments` segments.\n* `step` profiles attack at each of the `rates` in turn for an equ'
+                    'al share of the duration.\n* `spike` profiles attack at `spike_rate` for the last `spike_duration` o'
+                    'f every `period` and\n    at the rate of the configuration otherwise.'
+                ),
+                'type': 'object',
+                'properties': {
+                    'type': {
+                        'description': 'The type of load profile.',
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/LoadProfileType',
+                            },
+                        ],
+                    },
+                    'start_rate': {
+                        'title': 'Start Rate',
+                        'description': 'The rate to start a ramp at.',
+                        'type': 'string',
+                    },
+                    'end_rate': {
+                        'title': 'End Rate',
+                        'description': 'The rate to end a ramp at.',
+                        'type': 'string',
+                    },
+                    'segments': {
+                        'title': 'Segments',
+                        'description': 'The number of segments to ramp across.',
+                        'default': 5,
+                        'minimum': 2,
+                        'type': 'integer',
+                    },
+                    'rates': {
+                        'title': 'Rates',
+                        'description': 'The rates of the steps of a step profile.',
+                        'default': [],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                        },
+                    },
+                    'spike_rate': {
+                        'title': 'Spike Rate',
+                        'description': 'The rate to attack at during a spike.',
+                        'type': 'string',
+                    },
+                    'period': {
+                        'title': 'Period',
+                        'description': 'How often spikes occur.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'spike_duration': {
+                        'title': 'Spike Duration',
+                        'description': 'How long each spike lasts.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                },
+                'required': ['type'],
+            },
+            'ThroughputSearch': {
+                'title': 'ThroughputSearch',
+                'description': (
+                    'A search for the maximum throughput sustainable within a latency and error rate objective.\n\nThe rat'
+                    'e is probed with short attacks that grow exponentially from `start_rate` until the\nobjective is mis'
+                    'sed and is then bisected until the highest sustainable rate is known to\nwithin `tolerance`.'
+                ),
+                'type': 'object',
+                'properties': {
+                    'latency': {
+                        'title': 'Latency',
+                        'description': 'The latency objective at the percentile.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'percentile': {
+                        'title': 'Percentile',
+                        'description': 'The latency percentile that the objective applies to.',
+                        'default': 99,
+                        'type': 'number',
+                    },
+                    'max_error_rate': {
+                        'title': 'Max Error Rate',
+                        'description': 'The maximum error rate percentage of the objective.',
+                        'default': 1.0,
+                        'minimum': 0,
+                        'maximum': 100,
+                        'type': 'number',
+                    },
+                    'start_rate': {
+                        'title': 'Start Rate',
+                        'description': 'The rate of the first probe.',
+                        'default': '10/1s',
+                        'type': 'string',
+                    },
+                    'max_rate': {
+                        'title': 'Max Rate',
+                        'description': 'The highest rate to probe.',
+                        'type': 'string',
+                    },
+                    'growth_factor': {
+                        'title': 'Growth Factor',
+                        'description': 'The factor to grow the rate by between probes until the objective is missed.',
+                        'default': 2.0,
+                        'exclusiveMinimum': 1,
+                        'type': 'number',
+                    },
+                    'tolerance': {
+                        'title': 'Tolerance',
+                        'description': 'The relative precision to find the maximum sustainable rate to.',
+                        'default': 0.05,
+                        'exclusiveMinimum': 0,
+                        'exclusiveMaximum': 1,
+                        'type': 'number',
+                    },
+                    'probe_duration': {
+                        'title': 'Probe Duration',
+                        'description': 'How long to attack at each probed rate.',
+                        'default': '10s',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'max_probes': {
+                        'title': 'Max Probes',
+                        'description': 'The maximum number of probes to run.',
+                        'default': 20,
+                        'minimum': 1,
+                        'type': 'integer',
+                    },
+                },
+                'required': ['latency'],
+            },
         },
     }
 
@@ -1031,8 +1854,10 @@ def test_vegeta_cli_generate_with_defaults(
             "insecure": False,
             "keepalive": True,
             "max_body": -1,
+            "pin_shards": False,
             "rate": "50/1s",
             "reporting_interval": "15s",
+            "shards": 1,
             "target": "GET https://example.com/",
             "workers": 10,
         },
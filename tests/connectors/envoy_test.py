@@ -0,0 +1,184 @@
+import asyncio
+import datetime
+import itertools
+import math
+
+import httpx
+import pydantic
+import pytest
+import respx
+
+import servo
+import servo.cli
+import servo.connectors.envoy
+import servo.pubsub
+from servo.connectors.envoy import (
+    EnvoyConfiguration,
+    EnvoyConnector,
+    EnvoyMetric,
+    EnvoyScraper,
+    EnvoyStatType,
+    parse_exposition,
+)
+
+
+def _stats(requests: float, errors: float = 0, buckets=(0, 0, 0)) -> str:
+    return "\n".join([
+        "# TYPE envoy_cluster_upstream_rq_total counter",
+        f'envoy_cluster_upstream_rq_total{{envoy_cluster_name="app"}} {requests}',
+        f'envoy_cluster_upstream_rq_xx{{envoy_response_code_class="2",envoy_cluster_name="app"}} {requests - errors}',
+        f'envoy_cluster_upstream_rq_xx{{envoy_response_code_class="5",envoy_cluster_name="app"}} {errors}',
+        "# TYPE envoy_cluster_upstream_rq_time histogram",
+        *[
+            f'envoy_cluster_upstream_rq_time_bucket{{envoy_cluster_name="app",le="{le}"}} {count}'
+            for le, count in zip(("10", "100", "+Inf"), buckets)
+        ],
+        'envoy_cluster_upstream_rq_time_sum{envoy_cluster_name="app"} 0',
+        "envoy_server_live 1",
+    ]) + "\n"
+
+
+@pytest.fixture
+def config() -> EnvoyConfiguration:
+    return EnvoyConfiguration(
+        targets=[
+            {"url": "http://10.0.0.1:9901", "labels": {"pod": "app-1"}},
+            {"url": "http://10.0.0.2:9901", "labels": {"pod": "app-tuning", "opsani_role": "tuning"}},
+        ],
+        scrape_interval="10ms",
+        metrics=[
+            EnvoyMetric("main_request_rate", servo.Unit.requests_per_second, stat="envoy_cluster_upstream_rq_total", matchers='opsani_role!="tuning"'),
+            EnvoyMetric("total_request_rate", servo.Unit.requests_per_second, stat="envoy_cluster_upstream_rq_total"),
+            EnvoyMetric("error_rate", servo.Unit.requests_per_second, stat="envoy_cluster_upstream_rq_xx", matchers='envoy_response_code_class=~"4|5"'),
+            EnvoyMetric("instances", servo.Unit.count, stat="envoy_server_live", type=EnvoyStatType.gauge),
+            EnvoyMetric(
+                "p50_latency", servo.Unit.milliseconds, stat="envoy_cluster_upstream_rq_time",
+                type=EnvoyStatType.histogram, quantile=0.5,
+            ),
+        ],
+    )
+
+
+class TestEnvoyMetric:
+    def test_histogram_requires_quantile(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="a quantile must be given for histogram stats only"):
+            EnvoyMetric("latency", servo.Unit.milliseconds, stat="envoy_cluster_upstream_rq_time", type="histogram")
+
+    def test_series_names(self) -> None:
+        metric = EnvoyMetric(
+            "latency", servo.Unit.milliseconds, stat="envoy_cluster_upstream_rq_time", type="histogram", quantile=0.9
+        )
+        assert metric.series_names == ("envoy_cluster_upstream_rq_time_bucket", )
+
+
+class TestEnvoyConfiguration:
+    def test_targets_required(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="targets or a namespace and deployment"):
+            EnvoyConfiguration(metrics=[])
+
+    def test_generate(self) -> None:
+        config = EnvoyConfiguration.generate()
+        assert config.deployment == "app"
+        assert list(map(lambda m: m.name, config.metrics)) == ["request_rate", "p99_latency"]
+
+
+class TestParseExposition:
+    def test_selects_named_series(self) -> None:
+        samples = parse_exposition(_stats(10, 2, (1, 2, 3)), ["envoy_cluster_upstream_rq_xx", "envoy_server_live"])
+        assert samples == {
+            ("envoy_cluster_upstream_rq_xx", frozenset({("envoy_response_code_class", "2"), ("envoy_cluster_name", "app")})): 8.0,
+            ("envoy_cluster_upstream_rq_xx", frozenset({("envoy_response_code_class", "5"), ("envoy_cluster_name", "app")})): 2.0,
+            ("envoy_server_live", frozenset()): 1.0,
+        }
+
+    def test_escaped_label_values_and_timestamps(self) -> None:
+        samples = parse_exposition('requests{path="/a\\"b",code="200"} 3 1600000000000\n', ["requests"])
+        assert samples == {("requests", frozenset({("path", '/a\\"b'), ("code", "200")})): 3.0}
+
+
+class TestEnvoyScraper:
+    @pytest.fixture
+    def scraper(self, config) -> EnvoyScraper:
+        return EnvoyScraper(config)
+
+    def _scrape(self, scraper: EnvoyScraper, timestamp: float, stats: dict) -> None:
+        for target in scraper.targets:
+            window = scraper._windows.setdefault(target.url, servo.connectors.envoy._TargetWindow(target.labels))
+            samples = parse_exposition(stats[target.labels["pod"]], scraper._names)
+            window.append(timestamp, samples, scraper.config.rate_window.total_seconds())
+
+    def _metric(self, scraper: EnvoyScraper, name: str) -> EnvoyMetric:
+        return next(filter(lambda m: m.name == name, scraper.config.metrics))
+
+    def test_rates_per_role(self, scraper) -> None:
+        self._scrape(scraper, 0, {"app-1": _stats(100, 10), "app-tuning": _stats(50)})
+        self._scrape(scraper, 2, {"app-1": _stats(300, 30), "app-tuning": _stats(70)})
+
+        assert scraper.value(self._metric(scraper, "main_request_rate")) == 100.0
+        assert scraper.value(self._metric(scraper, "total_request_rate")) == 110.0
+        assert scraper.value(self._metric(scraper, "error_rate")) == 10.0
+        assert scraper.value(self._metric(scraper, "instances")) == 2.0
+
+    def test_rates_require_two_scrapes(self, scraper) -> None:
+        self._scrape(scraper, 0, {"app-1": _stats(100), "app-tuning": _stats(50)})
+        assert scraper.value(self._metric(scraper, "total_request_rate")) is None
+
+    def test_rates_slide_over_window(self, scraper) -> None:
+        for timestamp in range(10):
+            self._scrape(scraper, timestamp, {"app-1": _stats(timestamp * 10 + (timestamp >= 8) * 100), "app-tuning": _stats(0)})
+
+        # NOTE: The window spans from t=4 to t=9 with a burst of 100 requests at t=8
+        assert scraper.value(self._metric(scraper, "total_request_rate")) == pytest.approx(150 / 5)
+
+    def test_counter_reset(self, scraper) -> None:
+        self._scrape(scraper, 0, {"app-1": _stats(1000), "app-tuning": _stats(0)})
+        self._scrape(scraper, 1, {"app-1": _stats(20), "app-tuning": _stats(0)})
+        assert scraper.value(self._metric(scraper, "total_request_rate")) == 20.0
+
+    def test_histogram_quantile_across_targets(self, scraper) -> None:
+        self._scrape(scraper, 0, {"app-1": _stats(0, buckets=(5, 5, 5)), "app-tuning": _stats(0, buckets=(0, 0, 0))})
+        self._scrape(scraper, 1, {"app-1": _stats(0, buckets=(15, 15, 15)), "app-tuning": _stats(0, buckets=(0, 10, 10))})
+
+        # NOTE: 10 observations under 10ms and 10 between 10ms and 100ms
+        assert scraper.value(self._metric(scraper, "p50_latency")) == pytest.approx(10.0)
+
+    async def test_scrape(self, scraper) -> None:
+        requests = itertools.count(step=100)
+        with respx.mock as respx_mock:
+            respx_mock.get("http://10.0.0.1:9901/stats/prometheus").mock(
+                side_effect=lambda request: httpx.Response(200, text=_stats(next(requests)))
+            )
+            respx_mock.get("http://10.0.0.2:9901/stats/prometheus").mock(httpx.Response(503))
+            assert await scraper.scrape() == {}
+            await asyncio.sleep(0.01)
+            data_points = await scraper.scrape()
+        await scraper.aclose()
+
+        assert set(data_points.keys()) == {"main_request_rate", "total_request_rate", "error_rate", "instances"}
+        assert data_points["main_request_rate"].value > 0
+        assert data_points["instances"].value == 1.0
+
+
+class TestEnvoyConnector:
+    async def test_measure_settles_early(self, config) -> None:
+        config.settlement = servo.Duration("100ms")
+        requests = itertools.count(step=10)
+        exchange = servo.pubsub.Exchange()
+        exchange.start()
+        connector = EnvoyConnector(config=config, pubsub_exchange=exchange)
+        with respx.mock as respx_mock:
+            respx_mock.get(url__regex=r"http://10\.0\.0\.\d:9901/stats/prometheus").mock(
+                side_effect=lambda request: httpx.Response(200, text=_stats(next(requests)))
+            )
+            await connector.startup()
+            try:
+                started_at = datetime.datetime.now()
+                measurement = await connector.measure(metrics=["instances"], control=servo.Control(duration="10s"))
+            finally:
+                await connector.shutdown()
+                await exchange.shutdown()
+
+        assert datetime.datetime.now() - started_at < datetime.timedelta(seconds=5)
+        (time_series, ) = measurement
+        assert time_series.metric.name == "instances"
+        assert all(math.isclose(data_point.value, 2.0) for data_point in time_series)
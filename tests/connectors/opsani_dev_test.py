@@ -52,7 +52,7 @@ def checks(config: servo.connectors.opsani_dev.OpsaniDevConfiguration) -> servo.
 class TestConfig:
     def test_generate(self) -> None:
         config = servo.connectors.opsani_dev.OpsaniDevConfiguration.generate()
-        assert list(config.dict().keys()) == ['namespace', 'deployment', 'container', 'service', 'cpu', 'memory', 'prometheus_base_url']
+        assert list(config.dict().keys()) == ['namespace', 'deployment', 'container', 'service', 'cpu', 'memory', 'prometheus_base_url', 'envoy_scrape_interval']
 
     def test_generate_yaml(self) -> None:
         config = servo.connectors.opsani_dev.OpsaniDevConfiguration.generate()
@@ -71,6 +71,94 @@ class TestConfig:
             "  step: 128.0MiB\n"
         )
 
+    def test_latency_quantiles_share_bucket_queries(self, config) -> None:
+        prometheus_config = config.generate_prometheus_config()
+        histograms = list(filter(lambda m: m.histogram, prometheus_config.metrics))
+        assert len(histograms) == 6
+        assert len(set(map(lambda m: m.build_query(), histograms))) == 1
+
+    def test_generate_envoy_config(self, config) -> None:
+        config.envoy_scrape_interval = "500ms"
+        envoy_config = config.generate_envoy_config()
+        assert envoy_config.deployment == "fiber-http"
+        assert envoy_config.scrape_interval == servo.Duration("500ms")
+        assert list(map(lambda m: m.name, envoy_config.metrics)) == [
+            f"envoy_{role}_{name}" for role in ("main", "tuning") for name in ("request_rate", "error_rate", "p99_latency")
+        ]
+
+    def test_main_metrics_share_grouped_queries(self, config) -> None:
+        prometheus_config = config.generate_prometheus_config()
+        assert len(prometheus_config.metrics) == 16
+        assert set(map(lambda m: m.build_query(), prometheus_config.metrics)) == {
+            'sum by (opsani_role) (envoy_cluster_membership_healthy)',
+            'avg(rate(envoy_cluster_upstream_rq_total{opsani_role!="tuning"}[3m]))',
+            'sum by (opsani_role) (rate(envoy_cluster_upstream_rq_total[3m]))',
+            'sum by (opsani_role) (rate(envoy_cluster_upstream_rq_xx{envoy_response_code_class="2"}[3m]))',
+            'sum by (opsani_role) (rate(envoy_cluster_upstream_rq_xx{envoy_response_code_class=~"4|5"}[3m]))',
+            'rate(envoy_cluster_upstream_rq_time_bucket[3m])',
+            'envoy_cluster_membership_healthy{opsani_role="tuning"}',
+            'rate(envoy_cluster_upstream_rq_total{opsani_role="tuning"}[3m])',
+            'rate(envoy_cluster_upstream_rq_xx{opsani_role="tuning", envoy_response_code_class="2"}[3m]) or on() vector(0)',
+            'rate(envoy_cluster_upstream_rq_xx{opsani_role="tuning", envoy_response_code_class=~"4|5"}[3m]) or on() vector(0)',
+        }
+
+
+class TestClusterSnapshot:
+    @pytest.fixture
+    def snapshot(self, config) -> servo.connectors.opsani_dev.ClusterSnapshot:
+        return servo.connectors.opsani_dev.ClusterSnapshot(config)
+
+    async def test_concurrent_reads_are_shared(self, snapshot, mocker) -> None:
+        read = mocker.patch.object(servo.connectors.kubernetes.Deployment, "read", return_value=mocker.sentinel.deployment)
+        deployments = await asyncio.gather(snapshot.deployment(), snapshot.deployment())
+        assert deployments == [mocker.sentinel.deployment, mocker.sentinel.deployment]
+        read.assert_called_once_with("fiber-http", "default")
+
+    async def test_refresh(self, snapshot, mocker) -> None:
+        read = mocker.patch.object(servo.connectors.kubernetes.Service, "read", return_value=mocker.sentinel.service)
+        mocker.patch.object(servo.connectors.kubernetes.Deployment, "read", return_value=mocker.sentinel.deployment)
+        await snapshot.service()
+        await snapshot.deployment()
+        snapshot.refresh("deployment")
+        await snapshot.service()
+        assert read.call_count == 1
+
+        snapshot.refresh()
+        await snapshot.service()
+        assert read.call_count == 2
+
+    async def test_failed_reads_are_retained(self, snapshot, mocker) -> None:
+        read = mocker.patch.object(
+            servo.connectors.kubernetes.Namespace, "read", side_effect=RuntimeError("forbidden")
+        )
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="forbidden"):
+                await snapshot.namespace()
+        assert read.call_count == 1
+
+    async def test_prometheus_targets(self, snapshot) -> None:
+        with respx.mock(base_url=servo.connectors.opsani_dev.PROMETHEUS_SIDECAR_BASE_URL) as respx_mock:
+            request = respx_mock.get("/api/v1/targets").mock(
+                return_value=httpx.Response(200, json={"status": "success", "data": {"activeTargets": [], "droppedTargets": []}})
+            )
+            await snapshot.prometheus_targets()
+            await snapshot.prometheus_targets()
+        await snapshot.aclose()
+        assert request.call_count == 1
+
+    async def test_checks_share_reads_within_a_run(self, checks, mocker) -> None:
+        mocker.patch.object(servo.connectors.kubernetes.Namespace, "read")
+        deployment = mocker.Mock()
+        deployment.find_container.return_value = mocker.sentinel.container
+        read = mocker.patch.object(servo.connectors.kubernetes.Deployment, "read", return_value=deployment)
+
+        results = await checks.run_all(matching=servo.CheckFilter(id=["check_kubernetes_deployment", "check_kubernetes_container"]))
+        assert all(map(lambda c: c.success, results))
+        assert read.call_count == 1
+
+        await checks.run_one(id="check_kubernetes_container")
+        assert read.call_count == 2
+
 
 @pytest.mark.integration
 @pytest.mark.usefixtures("kubernetes_asyncio_config")
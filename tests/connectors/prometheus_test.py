@@ -1,23 +1,33 @@
+import array
+import asyncio
 import datetime
+import functools
 import json
+import math
 import pathlib
 import re
-from typing import AsyncIterator
+from typing import AsyncIterator, Dict, List, Tuple
 
 import freezegun
 import httpx
+import numpy
+import orjson
 import pydantic
 import pytest
 import pytz
 import respx
+import snappy
 import typer
 
 import servo.connectors.prometheus
+import servo.connectors.prometheus_remote_read
 import servo.utilities
+import tests.fake
 from servo.connectors.prometheus import (
     Client,
     PrometheusChecks,
     PrometheusConfiguration,
+    MetricResponse,
     PrometheusConnector,
     PrometheusMetric,
     RangeQuery,
@@ -63,6 +73,33 @@ class TestPrometheusMetric:
         pass
 
     # item[1] == 'NaN':
+    def test_auto_step(self):
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="auto")
+        assert metric.step == Duration("1m")
+        assert metric.max_points == servo.connectors.prometheus.AUTO_STEP_MAX_POINTS
+
+    @pytest.mark.parametrize(
+        "query, step, window, expected",
+        [
+            ("throughput", "1m", "5m", "1m"),
+            ("throughput", "10s", "1h", "1m"),
+            ("throughput", "10s", "24h", "15m"),
+            ("throughput", "10s", "400d", "5d"),
+            ("sum(rate(requests[3m]))", "10s", "2h", "1m30s"),
+            ("sum(rate(requests[3m]))", "10s", "10h", "9m"),
+            ("sum(rate(requests[5m])) / sum(rate(requests[1m:10s]))", "10s", "5h", "4m"),
+        ]
+    )
+    def test_step_for_caps_points(self, query, step, window, expected):
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query=query, step=step, max_points=100)
+        start = datetime.datetime(2020, 1, 1)
+        assert metric.step_for(start, start + Duration(window)) == Duration(expected)
+
+    def test_step_for_without_max_points(self):
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        start = datetime.datetime(2020, 1, 1)
+        assert metric.step_for(start, start + Duration("30d")) == Duration("1m")
+
     def test_handling_nan_values(self):
         pass
 
@@ -122,6 +159,7 @@ class TestPrometheusConfiguration:
             "description: Update the base_url and metrics to match your Prometheus configuration\n"
             "base_url: http://prometheus:9090\n"
             "streaming_interval: null\n"
+            "streaming_buffer_size: 1024\n"
             "metrics:\n"
             "- name: throughput\n"
             "  unit: rps\n"
@@ -129,13 +167,30 @@ class TestPrometheusConfiguration:
             "  step: 1m\n"
             "  absent: ignore\n"
             "  eager: null\n"
+            "  max_points: null\n"
+            "  histogram: null\n"
+            "  raw: false\n"
+            "  group: null\n"
             "- name: error_rate\n"
             "  unit: '%'\n"
             "  query: rate(errors[5m])\n"
             "  step: 1m\n"
             "  absent: ignore\n"
             "  eager: null\n"
+            "  max_points: null\n"
+            "  histogram: null\n"
+            "  raw: false\n"
+            "  group: null\n"
             "targets: null\n"
+            "max_connections: 10\n"
+            "max_concurrent_queries: 10\n"
+            "timeouts: null\n"
+            "max_points_per_query: 11000\n"
+            "cache_size: 256\n"
+            "cache_ttl: 10m\n"
+            "replicas: []\n"
+            "hedge_percentile: 95.0\n"
+            "hedge_delay: 1s\n"
         )
 
     def test_generate_override_metrics(self):
@@ -189,6 +244,662 @@ class TestPrometheusRequest:
             == "/query_range?query=go_memstats_heap_inuse_bytes&start=1577836800.0&end=1577966400.0&step=1m"
         )
 
+class TestPrometheusClient:
+    @pytest.fixture
+    def client(self) -> servo.connectors.prometheus.Client:
+        return servo.connectors.prometheus.Client(base_url="http://localhost:9090", max_concurrent_queries=2)
+
+    async def test_reuses_pooled_connections(self, client, targets_response) -> None:
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            request = respx_mock.get("/api/v1/targets").mock(httpx.Response(200, json=targets_response))
+            await client.list_targets()
+            http_client = client._pooled_http_client()
+            await client.list_targets()
+            assert client._pooled_http_client() is http_client
+            assert request.call_count == 2
+
+        await client.aclose()
+        assert client._endpoints == []
+        assert http_client.is_closed
+
+    async def test_bounds_concurrent_queries(self, client, targets_response, mocker) -> None:
+        in_flight, max_in_flight = 0, 0
+
+        async def _send(request, **kwargs) -> httpx.Response:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(in_flight, max_in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, json={"status": "success", "data": {"resultType": "vector", "result": []}}, request=request)
+
+        mocker.patch.object(httpx.AsyncClient, "send", side_effect=_send)
+        async with client:
+            responses = await asyncio.gather(*(client.query(f"metric_{index}") for index in range(6)))
+
+        assert len(responses) == 6
+        assert max_in_flight == 2
+
+    async def test_coalesces_identical_requests_in_flight(self, client, targets_response, mocker) -> None:
+        async def _send(request, **kwargs) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=targets_response, request=request)
+
+        send = mocker.patch.object(httpx.AsyncClient, "send", side_effect=_send)
+        async with client:
+            responses = await asyncio.gather(*(client.list_targets() for _ in range(5)))
+            assert send.call_count == 1
+            assert len(set(map(id, responses))) == 5
+            assert all(len(response.active) == 1 for response in responses)
+
+            # Not a range query over a past window so not cached
+            await client.list_targets()
+            assert send.call_count == 2
+
+    async def test_caches_completed_windows(self, client) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        past = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        matrix = {"status": "success", "data": {"resultType": "matrix", "result": []}}
+        async with client:
+            with respx.mock(base_url="http://localhost:9090") as respx_mock:
+                request = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=matrix))
+                for _ in range(3):
+                    await client.query_range(metric, past, past + Duration("10m"))
+                assert request.call_count == 1
+
+                for _ in range(2):
+                    await client.query_range(metric, now - Duration("10m"), now)
+                assert request.call_count == 3
+
+    async def test_windows_moments_apart_share_cached_responses(self, client) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        past = datetime.datetime(2020, 1, 1, 0, 0, 10, tzinfo=datetime.timezone.utc)
+        matrix = {"status": "success", "data": {"resultType": "matrix", "result": []}}
+        async with client:
+            with respx.mock(base_url="http://localhost:9090") as respx_mock:
+                request = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=matrix))
+                # NOTE: Two measurements of the same duration started a few seconds apart
+                for offset in ("0s", "3s", "7s"):
+                    start = past + Duration(offset)
+                    await client.query_range(metric, start, start + Duration("10m"))
+
+        assert request.call_count == 1
+        params = dict(httpx.QueryParams(request.calls.last.request.url.query))
+        assert float(params["start"]) == (past + Duration("50s")).timestamp()
+        assert float(params["end"]) == (past + Duration("9m50s")).timestamp()
+
+    def test_align_to_step(self) -> None:
+        start = datetime.datetime(2020, 1, 1, 0, 0, 10, tzinfo=datetime.timezone.utc)
+        assert servo.connectors.prometheus._align_to_step(start, Duration("1m")) == start + Duration("50s")
+        assert servo.connectors.prometheus._align_to_step(start, Duration("1m"), math.floor) == start - Duration("10s")
+        assert servo.connectors.prometheus._align_to_step(start, Duration("10s")) == start
+
+    async def test_cache_is_bounded(self) -> None:
+        client = servo.connectors.prometheus.Client(base_url="http://localhost:9090", cache_size=2)
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        matrix = {"status": "success", "data": {"resultType": "matrix", "result": []}}
+        async with client:
+            with respx.mock(base_url="http://localhost:9090") as respx_mock:
+                request = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=matrix))
+                for minutes in (10, 20, 30, 10):
+                    await client.query_range(metric, start, start + Duration(f"{minutes}m"))
+
+        assert request.call_count == 4
+        assert len(client._cache) == 2
+
+    def test_timeouts_from_config(self) -> None:
+        config = PrometheusConfiguration(
+            base_url="http://localhost:9090",
+            metrics=[PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="rate(http_requests_total[5m])")],
+            max_connections=4,
+            timeouts="10s",
+        )
+        client = servo.connectors.prometheus.Client.from_config(config)
+        assert client.max_connections == 4
+        http_client = client._pooled_http_client()
+        assert http_client.timeout.read == 10.0
+        assert http_client.timeout.connect == 10.0
+
+    def test_default_timeouts(self, client) -> None:
+        assert client._pooled_http_client().timeout.read == 5.0
+
+    async def test_decodes_matrix_into_columnar_time_series(self, client) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json={
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [{"metric": {"instance": "a", "job": "b"}, "values": [[start.timestamp(), "1.5"], [start.timestamp() + 60, "NaN"]]}],
+                },
+            }))
+            async with client:
+                response = await client.query_range(metric, start, start + Duration("1m"))
+
+        vector = response.data[0]
+        assert isinstance(vector, servo.connectors.prometheus.ColumnarRangeVector)
+        assert len(vector) == 2
+        assert vector.values[0] == (start, 1.5)
+
+        (time_series, ) = response.results()
+        assert isinstance(time_series, servo.ColumnarTimeSeries)
+        assert time_series.id == "{instance=a,job=b}"
+        assert time_series[0].time == start
+        assert math.isnan(time_series[1].value)
+
+    async def test_query_range_records_automatic_step(self, client) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="auto")
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            route = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json={
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [{"metric": {"instance": "a", "job": "b"}, "values": [[start.timestamp(), "1"]]}],
+                },
+            }))
+            async with client:
+                response = await client.query_range(metric, start, start + Duration("7d"))
+
+        assert dict(httpx.QueryParams(route.calls.last.request.url.query))["step"] == "15m"
+        (time_series, ) = response.results()
+        assert time_series.metadata["step"] == "15m"
+
+    @freezegun.freeze_time("2020-01-01")
+    def test_split_range_query_is_step_aligned(self) -> None:
+        query = RangeQuery(
+            query="throughput",
+            start=datetime.datetime.now(),
+            end=datetime.datetime.now() + Duration("9m30s"),
+            step="1m",
+        )
+        chunks = servo.connectors.prometheus._split_range_query(query, 4)
+        assert [(c.start - query.start, c.end - query.start) for c in chunks] == [
+            (Duration("0m"), Duration("3m")),
+            (Duration("3m"), Duration("6m")),
+            (Duration("6m"), Duration("9m")),
+            (Duration("9m"), Duration("9m30s")),
+        ]
+        assert servo.connectors.prometheus._split_range_query(query, 11) == [query]
+
+    async def test_query_range_splits_and_merges_chunks(self) -> None:
+        client = servo.connectors.prometheus.Client(base_url="http://localhost:9090", max_points_per_query=3)
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        requested = []
+
+        def _matrix(request: httpx.Request) -> httpx.Response:
+            params = dict(httpx.QueryParams(request.url.query))
+            start_, end_ = float(params["start"]), float(params["end"])
+            requested.append((start_, end_))
+            timestamps = range(int(start_), int(end_) + 1, 60)
+            return httpx.Response(200, json={
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [
+                        {"metric": {"instance": instance}, "values": [[t, str(t)] for t in timestamps]}
+                        for instance in ("a", "b")
+                    ],
+                },
+            })
+
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+        async with client:
+            with respx.mock(base_url="http://localhost:9090") as respx_mock:
+                respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(side_effect=_matrix)
+                response = await client.query_range(metric, start, start + Duration("10m"))
+
+        assert len(requested) == 5
+        assert response.request.start == start and response.request.end == start + Duration("10m")
+        assert len(response.chunks) == 5
+        assert [chunk.points for chunk in response.chunks] == [6] * 5
+        series = response.results()
+        assert len(series) == 2
+        for time_series in series:
+            timestamps = [data_point.time for data_point in time_series]
+            assert timestamps == sorted(set(timestamps))
+            assert len(timestamps) == 11
+
+
+class TestReplicas:
+    @pytest.fixture
+    def client(self) -> servo.connectors.prometheus.Client:
+        return servo.connectors.prometheus.Client(
+            base_url="http://prometheus-a:9090",
+            replicas=["http://prometheus-b:9090/"],
+            hedge_delay="50ms",
+        )
+
+    @pytest.fixture
+    def metric(self) -> PrometheusMetric:
+        return PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m")
+
+    @pytest.fixture
+    def matrix(self) -> dict:
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": [{"metric": {"instance": "a", "job": "b"}, "values": [[start.timestamp(), "1"]]}],
+            },
+        }
+
+    def test_replicas_are_normalized(self, client) -> None:
+        assert client.replicas == ["http://prometheus-b:9090"]
+
+    async def test_hedges_slow_requests_to_replica(self, client, metric, matrix, mocker) -> None:
+        cancelled = asyncio.Event()
+
+        async def _send(self, request, **kwargs) -> httpx.Response:
+            if request.url.host == "prometheus-a":
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return httpx.Response(200, json=matrix, request=request)
+
+        mocker.patch.object(httpx.AsyncClient, "send", side_effect=_send, autospec=True)
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        async with client:
+            response = await client.query_range(metric, start, start + Duration("1m"))
+            await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert response.replica == "http://prometheus-b:9090"
+        (time_series, ) = response.results()
+        assert time_series.metadata == {"replica": "http://prometheus-b:9090"}
+
+    async def test_fails_over_unhealthy_replica(self, client, metric, matrix) -> None:
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        with respx.mock(assert_all_called=False) as respx_mock:
+            primary = respx_mock.get(re.compile(r"http://prometheus-a:9090/api/v1/query_range.+")).mock(httpx.Response(503))
+            replica = respx_mock.get(re.compile(r"http://prometheus-b:9090/api/v1/query_range.+")).mock(httpx.Response(200, json=matrix))
+            async with client:
+                response = await client.query_range(metric, start, start + Duration("1m"))
+                assert response.replica == "http://prometheus-b:9090"
+                stats = {stats.base_url: stats for stats in client.replica_stats()}
+
+                # NOTE: Unhealthy replicas are skipped until their backoff elapses
+                await client.query_range(metric, start, start + Duration("2m"))
+
+        assert primary.call_count == 1
+        assert replica.call_count == 2
+        assert not stats["http://prometheus-a:9090"].healthy
+        assert stats["http://prometheus-a:9090"].failures == 1
+        assert stats["http://prometheus-b:9090"].served == 1
+
+    async def test_does_not_fail_over_client_errors(self, client, metric) -> None:
+        start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        with respx.mock(assert_all_called=False) as respx_mock:
+            respx_mock.get(re.compile(r"http://prometheus-a:9090/api/v1/query_range.+")).mock(httpx.Response(400))
+            replica = respx_mock.get(re.compile(r"http://prometheus-b:9090/api/v1/query_range.+")).mock(httpx.Response(200))
+            async with client:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await client.query_range(metric, start, start + Duration("1m"))
+
+                assert all(stats.healthy for stats in client.replica_stats())
+
+        assert not replica.called
+
+
+class TestHistogramQuantile:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def buckets(self, start) -> dict:
+        def _buckets(instance: str, counts: List[float]) -> List[dict]:
+            return [
+                {
+                    "metric": {"instance": instance, "job": "envoy", "le": le},
+                    "values": [[start.timestamp(), str(count)], [start.timestamp() + 60, str(count * 2)]],
+                }
+                for le, count in zip(("0.1", "0.5", "1", "+Inf"), counts)
+            ]
+
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": [
+                    *_buckets("a", [10, 50, 90, 100]),
+                    *_buckets("b", [5, 5, 5, 10]),
+                    {"metric": {"instance": "c", "job": "envoy"}, "values": [[start.timestamp(), "0"]]},
+                ],
+            },
+        }
+
+    @pytest.mark.parametrize(
+        "quantile, counts, expected",
+        [
+            (0.5, [10, 50, 90, 100], 0.5),
+            (0.9, [10, 50, 90, 100], 1.0),
+            (0.99, [10, 50, 90, 100], 1.0),
+            (0.5, [5, 5, 5, 10], 0.1),
+            (0.5, [0, 1, 1, 1], 0.3),
+            (0.5, [0, 0, 0, 0], math.nan),
+            (0.5, [10, 5, 90, 100], 0.75),
+        ]
+    )
+    def test_histogram_quantile_semantics(self, quantile, counts, expected) -> None:
+        upper_bounds = numpy.array([0.1, 0.5, 1, math.inf])
+        (value, ) = servo.connectors.prometheus._histogram_quantile(
+            quantile, upper_bounds, numpy.array(counts, dtype=float).reshape(-1, 1)
+        )
+        assert value == pytest.approx(expected, nan_ok=True)
+
+    def test_histogram_without_inf_bucket(self) -> None:
+        (value, ) = servo.connectors.prometheus._histogram_quantile(
+            0.5, numpy.array([0.1, 0.5]), numpy.array([[1.0], [2.0]])
+        )
+        assert math.isnan(value)
+
+    def test_results_per_histogram(self, buckets, start) -> None:
+        metric = PrometheusMetric(
+            "latency", servo.Unit.milliseconds, query="rate(latency_bucket[3m])", histogram={"quantile": 0.5}
+        )
+        response = servo.connectors.prometheus._decode_response(
+            functools.partial(MetricResponse, metric=metric),
+            RangeQuery(query=metric.query, start=start, end=start + Duration("1m"), step="1m"),
+            orjson.dumps(buckets),
+        )
+        series = {time_series.annotation: [data_point.value for data_point in time_series] for time_series in response.results()}
+        assert series == {
+            "instance=a job=envoy": [pytest.approx(0.5), pytest.approx(0.5)],
+            "instance=b job=envoy": [pytest.approx(0.1), pytest.approx(0.1)],
+        }
+
+    async def test_quantiles_share_a_single_fetch(self, buckets) -> None:
+        metrics = [
+            PrometheusMetric(
+                f"latency_p{int(quantile * 100)}",
+                servo.Unit.milliseconds,
+                query="rate(latency_bucket[3m])",
+                histogram={"quantile": quantile, "aggregation": "avg"},
+            )
+            for quantile in (0.5, 0.9, 0.99)
+        ]
+        config = PrometheusConfiguration(base_url="http://localhost:9090", metrics=metrics)
+        connector = PrometheusConnector(config=config)
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            route = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=buckets))
+            measurement = await connector.measure(control=servo.Control(duration="0.0001s"))
+            await connector.shutdown()
+
+        assert route.call_count == 1
+        averages = {time_series.metric.name: time_series[0].value for time_series in measurement}
+        assert averages == {
+            "latency_p50": pytest.approx((0.5 + 0.1) / 2),
+            "latency_p90": pytest.approx((1.0 + 1.0) / 2),
+            "latency_p99": pytest.approx((1.0 + 1.0) / 2),
+        }
+
+
+class TestQueryGroup:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def by_role(self, start) -> dict:
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": [
+                    {"metric": {}, "values": [[start.timestamp(), "1"], [start.timestamp() + 60, "2"]]},
+                    {"metric": {"opsani_role": "main"}, "values": [[start.timestamp() + 60, "10"]]},
+                    {"metric": {"opsani_role": "tuning"}, "values": [[start.timestamp(), "5"], [start.timestamp() + 60, "7"]]},
+                ],
+            },
+        }
+
+    def test_parse_matchers(self) -> None:
+        group = servo.connectors.prometheus.QueryGroup(by="opsani_role", matchers='opsani_role!="tuning"')
+        assert group.matchers == [
+            servo.connectors.prometheus.LabelMatcher(name="opsani_role", value="tuning", type="!=")
+        ]
+        assert group.build_query("rate(requests[3m])") == "sum by (opsani_role) (rate(requests[3m]))"
+
+    def test_avg_is_rejected(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="averages cannot be aggregated across groups"):
+            servo.connectors.prometheus.QueryGroup(by="opsani_role", aggregation="avg")
+
+    def test_grouped_metric_skips_absent_suffix(self) -> None:
+        metric = PrometheusMetric(
+            "tuning_errors", servo.Unit.requests_per_second, query="rate(errors[3m])",
+            group={"by": "opsani_role", "matchers": 'opsani_role="tuning"'}, absent="zero",
+        )
+        assert metric.build_query(probe_absent=True) == "sum by (opsani_role) (rate(errors[3m]))"
+
+    @pytest.mark.parametrize(
+        "matchers, expected",
+        [
+            (None, [6.0, 19.0]),
+            ('opsani_role!="tuning"', [1.0, 12.0]),
+            ('opsani_role="tuning"', [5.0, 7.0]),
+            ('opsani_role=~"main|tuning"', [5.0, 17.0]),
+        ]
+    )
+    def test_results_select_and_aggregate(self, by_role, start, matchers, expected) -> None:
+        metric = PrometheusMetric(
+            "requests", servo.Unit.requests_per_second, query="rate(requests[3m])",
+            group={"by": "opsani_role", "matchers": matchers or []},
+        )
+        response = servo.connectors.prometheus._decode_response(
+            functools.partial(MetricResponse, metric=metric),
+            RangeQuery(query=metric.build_query(), start=start, end=start + Duration("1m"), step="1m"),
+            orjson.dumps(by_role),
+        )
+        (time_series, ) = response.results()
+        assert [data_point.value for data_point in time_series] == expected
+
+    def test_absent_zero_fills_range(self, by_role, start) -> None:
+        metric = PrometheusMetric(
+            "canary", servo.Unit.requests_per_second, query="rate(requests[3m])",
+            group={"by": "opsani_role", "matchers": 'opsani_role="canary"'}, absent="zero",
+        )
+        response = servo.connectors.prometheus._decode_response(
+            functools.partial(MetricResponse, metric=metric),
+            RangeQuery(query=metric.build_query(), start=start, end=start + Duration("2m"), step="1m"),
+            orjson.dumps(by_role),
+        )
+        (time_series, ) = response.results()
+        assert [(data_point.time, data_point.value) for data_point in time_series] == [
+            (start, 0.0), (start + Duration("1m"), 0.0), (start + Duration("2m"), 0.0)
+        ]
+
+    async def test_grouped_metrics_share_a_single_fetch(self, by_role) -> None:
+        metrics = [
+            PrometheusMetric(
+                f"{role}_requests", servo.Unit.requests_per_second, query="rate(requests[3m])",
+                group={"by": "opsani_role", "matchers": matchers}, absent="fail",
+            )
+            for role, matchers in (("main", 'opsani_role!="tuning"'), ("tuning", 'opsani_role="tuning"'))
+        ]
+        config = PrometheusConfiguration(base_url="http://localhost:9090", metrics=metrics)
+        connector = PrometheusConnector(config=config)
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            route = respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=by_role))
+            measurement = await connector.measure(control=servo.Control(duration="0.0001s"))
+            await connector.shutdown()
+
+        assert route.call_count == 1
+        assert dict(httpx.QueryParams(route.calls.last.request.url.query))["query"] == (
+            "sum by (opsani_role) (rate(requests[3m]))"
+        )
+        assert {time_series.metric.name: time_series[-1].value for time_series in measurement} == {
+            "main_requests": 12.0, "tuning_requests": 7.0,
+        }
+
+    async def test_absent_grouped_metric_fails(self, by_role) -> None:
+        metric = PrometheusMetric(
+            "canary_requests", servo.Unit.requests_per_second, query="rate(requests[3m])",
+            group={"by": "opsani_role", "matchers": 'opsani_role="canary"'}, absent="fail",
+        )
+        client = servo.connectors.prometheus.Client(base_url="http://localhost:9090")
+        end = datetime.datetime.now(datetime.timezone.utc)
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(httpx.Response(200, json=by_role))
+            with pytest.raises(RuntimeError, match="Required metric 'canary_requests' is absent from Prometheus"):
+                await client.read_metric(metric, end - Duration("1m"), end)
+        await client.aclose()
+
+
+class TestRemoteRead:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def series(self, start) -> Dict[tests.fake.Labels, tests.fake.Samples]:
+        timestamp = int(start.timestamp() * 1000)
+        return {
+            (("__name__", "requests_total"), ("instance", "a"), ("job", "envoy")): [
+                (timestamp + index * 15_000 + (index % 3), float(index * 2)) for index in range(500)
+            ],
+            (("__name__", "requests_total"), ("instance", "b"), ("job", "envoy")): [
+                (timestamp + index * 15_000, math.nan if index % 7 == 0 else index / 3) for index in range(300)
+            ],
+            (("__name__", "errors_total"), ("instance", "a"), ("job", "envoy")): [(timestamp, 1.0)],
+        }
+
+    @pytest.fixture
+    def fastapi_app(self, series) -> tests.fake.PrometheusRemoteRead:
+        return tests.fake.PrometheusRemoteRead(series, samples_per_chunk=120, chunks_per_frame=2)
+
+    @pytest.fixture
+    def metric(self) -> PrometheusMetric:
+        return PrometheusMetric(
+            "requests", servo.Unit.requests_per_minute, query='requests_total{job="envoy"}', raw=True
+        )
+
+    def test_parse_selector(self) -> None:
+        matchers = servo.connectors.prometheus.LabelMatcher.parse_selector(
+            'requests_total{job=~"api|web", code!="5\\"00",}'
+        )
+        assert [(m.name, m.type.value, m.value) for m in matchers] == [
+            ("__name__", "=", "requests_total"),
+            ("job", "=~", "api|web"),
+            ("code", "!=", '5"00'),
+        ]
+        with pytest.raises(ValueError, match="invalid series selector"):
+            servo.connectors.prometheus.LabelMatcher.parse_selector("rate(requests_total[5m])")
+
+    def test_read_request_prefers_streamed_chunks(self, start) -> None:
+        request = servo.connectors.prometheus.RemoteReadRequest(
+            selector='requests_total{job!="envoy"}', start=start, end=start + Duration("1h")
+        )
+        message = servo.connectors.prometheus_remote_read.ReadRequest.FromString(snappy.uncompress(request.content))
+        assert list(message.accepted_response_types) == [1, 0]
+        (query, ) = message.queries
+        assert (query.start_timestamp_ms, query.end_timestamp_ms) == (1577836800000, 1577840400000)
+        assert [(m.type, m.name, m.value) for m in query.matchers] == [(0, "__name__", "requests_total"), (1, "job", "envoy")]
+
+    def test_xor_chunk_round_trip(self, series) -> None:
+        for samples in series.values():
+            timestamps, values = array.array('d'), array.array('d')
+            servo.connectors.prometheus_remote_read.decode_xor_chunk(tests.fake.encode_xor_chunk(samples), timestamps, values)
+            assert list(timestamps) == [timestamp / 1000 for timestamp, _ in samples]
+            assert list(values) == pytest.approx([value for _, value in samples], nan_ok=True)
+
+    async def test_read_streamed_chunks(self, fakeapi_url, fastapi_app, metric, series, start) -> None:
+        async with Client(base_url=fakeapi_url) as client:
+            readings = await client.read_metric(metric, start, start + Duration("3h"))
+
+        ((start_ms, end_ms, matchers), ) = fastapi_app.requests
+        assert (start_ms, end_ms) == (start.timestamp() * 1000, (start + Duration("3h")).timestamp() * 1000)
+        assert [(m.name, m.value) for m in matchers] == [("__name__", "requests_total"), ("job", "envoy")]
+
+        assert len(readings) == 2
+        for time_series in readings:
+            assert isinstance(time_series, servo.ColumnarTimeSeries)
+            samples = series[(("__name__", "requests_total"), *(
+                tuple(label.split("=")) for label in time_series.annotation.split(" ") if not label.startswith("__name__")
+            ))]
+            assert list(time_series.timestamps) == [timestamp / 1000 for timestamp, _ in samples]
+            assert list(time_series.values) == pytest.approx([value for _, value in samples], nan_ok=True)
+            assert time_series.metadata == {"replica": fakeapi_url.rstrip("/")}
+
+    async def test_read_buffered_samples(self, fakeapi_url, fastapi_app, metric, start) -> None:
+        fastapi_app.streamed = False
+        async with Client(base_url=fakeapi_url) as client:
+            readings = await client.read_metric(metric, start, start + Duration("1h"))
+
+        assert sorted(map(len, readings)) == [241, 241]
+
+    async def test_absent_raw_metric_fails(self, fakeapi_url, start) -> None:
+        metric = PrometheusMetric("missing", servo.Unit.count, query="missing_total", raw=True, absent="fail")
+        async with Client(base_url=fakeapi_url) as client:
+            with pytest.raises(RuntimeError, match="Required metric 'missing' is absent from Prometheus"):
+                await client.read_metric(metric, start, start + Duration("1h"))
+
+    def test_frame_checksum_is_verified(self) -> None:
+        frame = bytearray(tests.fake.encode_frame(b"\x10\x01"))
+        frame[1:5] = bytes(4)
+        with pytest.raises(ValueError, match="checksum"):
+            servo.connectors.prometheus_remote_read.ChunkedReadDecoder().feed(bytes(frame))
+
+    def test_incomplete_frames_are_buffered(self, series) -> None:
+        frames = b"".join(tests.fake.PrometheusRemoteRead()._frames(series))
+        decoder = servo.connectors.prometheus_remote_read.ChunkedReadDecoder()
+        for index in range(0, len(frames), 100):
+            decoder.feed(frames[index:index + 100])
+        assert sorted(len(timestamps) for _, timestamps, _ in decoder.series()) == [1, 300, 500]
+
+        decoder.feed(frames[:10])
+        with pytest.raises(ValueError, match="incomplete frame"):
+            decoder.series()
+
+
+class TestSyntheticPrometheus:
+    @pytest.fixture
+    def fastapi_app(self) -> tests.fake.SyntheticPrometheus:
+        return tests.fake.SyntheticPrometheus(series=5)
+
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    async def test_query_range_is_deterministic(self, fakeapi_url, fastapi_app, start) -> None:
+        async with Client(base_url=fakeapi_url) as client:
+            response = await client.query_range("throughput", start, start + Duration("10m"), step="1m")
+
+        assert fastapi_app.requests == {"query_range": 1}
+        assert len(response.data) == 5
+        for series, vector in enumerate(response.data):
+            assert len(vector) == 11
+            assert [value for _, value in vector] == pytest.approx(
+                [fastapi_app.value(series, (start + Duration(f"{minute}m")).timestamp()) for minute in range(11)]
+            )
+
+    async def test_targets(self, fakeapi_url) -> None:
+        async with Client(base_url=fakeapi_url) as client:
+            response = await client.list_targets()
+
+        assert len(response.data.active_targets) == 5
+        assert {target.health for target in response.data.active_targets} == {"up"}
+
+    async def test_measure(self, fakeapi_url, fastapi_app) -> None:
+        metrics = [
+            PrometheusMetric(name, servo.Unit.requests_per_second, query=name, step="10ms")
+            for name in ("throughput", "error_rate")
+        ]
+        connector = PrometheusConnector(config=PrometheusConfiguration(base_url=fakeapi_url, metrics=metrics))
+        measurement = await connector.measure(control=servo.Control(duration="100ms"))
+        await connector.shutdown()
+
+        assert fastapi_app.requests == {"query_range": 2}
+        assert len(measurement) == 10
+        # NOTE: The window is narrowed to its step boundaries, spanning 10 steps only when it starts on one
+        assert all(len(time_series) in {10, 11} for time_series in measurement)
+
+
 def targets_response_() -> dict:
     return {
         "status": "success",
@@ -223,6 +934,196 @@ def targets_response_() -> dict:
 def targets_response() -> dict:
     return targets_response_()
 
+class TestEagerMetricObserver:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def metric(self) -> PrometheusMetric:
+        return PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="1m", eager="1m")
+
+    @pytest.fixture
+    async def client(self) -> AsyncIterator[Client]:
+        async with Client(base_url="http://localhost:9090") as client:
+            yield client
+
+    @pytest.fixture
+    def observer(self, client, metric, start) -> servo.connectors.prometheus.EagerMetricObserver:
+        return servo.connectors.prometheus.EagerMetricObserver(
+            base_url="http://localhost:9090", metrics=[metric], start=start, end=start + Duration("10m"), client=client
+        )
+
+    async def test_polls_incrementally_from_last_seen_timestamp(self, observer, metric, start) -> None:
+        requested, now = [], start + Duration("2m")
+
+        def _matrix(request: httpx.Request) -> httpx.Response:
+            params = dict(httpx.QueryParams(request.url.query))
+            requested.append(float(params["start"]))
+            timestamps = range(int(float(params["start"])), int(now.timestamp()) + 1, 60)
+            return httpx.Response(200, json={
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [{"metric": {"instance": "a"}, "values": [[t, "1"] for t in timestamps]}],
+                },
+            })
+
+        with respx.mock(base_url="http://localhost:9090") as respx_mock:
+            respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(side_effect=_matrix)
+            tail = await observer._poll(metric)
+            assert len(tail) == 3
+
+            now = start + Duration("4m")
+            tail = await observer._poll(metric)
+
+        assert requested == [start.timestamp(), (start + Duration("2m")).timestamp()]
+        times = [data_point.time for data_point in tail]
+        assert times == [start + Duration(f"{minutes}m") for minutes in range(5)]
+
+    async def test_observe_polls_metrics_concurrently(self, client, start, mocker) -> None:
+        metrics = [
+            PrometheusMetric(name, servo.Unit.requests_per_minute, query=name, step="10ms", eager="1m")
+            for name in ("throughput", "error_rate", "latency")
+        ]
+        observer = servo.connectors.prometheus.EagerMetricObserver(
+            base_url="http://localhost:9090", metrics=metrics, start=start, end=start + Duration("10m"), client=client
+        )
+        in_flight, max_in_flight = 0, 0
+
+        async def _poll(metric):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(in_flight, max_in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [servo.DataPoint(metric, start, 1.0)]
+
+        mocker.patch.object(servo.connectors.prometheus.EagerMetricObserver, "_poll", side_effect=_poll)
+        progress = servo.EventProgress(timeout="5m", settlement="1m")
+        progress.start()
+        await observer.observe(progress)
+
+        assert max_in_flight == 3
+        assert set(observer.data_points.keys()) == set(metrics)
+        assert progress.settling
+
+
+class TestMetricsBuffer:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    @pytest.fixture
+    def metric(self) -> PrometheusMetric:
+        return PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="10s")
+
+    @pytest.fixture
+    def buffer(self, metric, start) -> servo.connectors.prometheus.MetricsBuffer:
+        buffer = servo.connectors.prometheus.MetricsBuffer(8)
+        # NOTE: Samples every 10s with a hole between 30s and 70s
+        for seconds in (0, 10, 20, 30, 70, 80, 90):
+            time = start + datetime.timedelta(seconds=seconds)
+            buffer.append(metric, [
+                servo.TimeSeries(metric, [servo.DataPoint(metric, time, float(seconds))], id="a", annotation="instance=a")
+            ])
+        return buffer
+
+    def test_ring_buffer_is_bounded(self, metric, start) -> None:
+        buffer = servo.connectors.prometheus.MetricsBuffer(3)
+        for seconds in range(5):
+            data_point = servo.DataPoint(metric, start + datetime.timedelta(seconds=seconds), 1.0)
+            buffer.append(metric, [servo.TimeSeries(metric, [data_point], id="a")])
+        readings = buffer.readings(metric, start, start + Duration("4s"), step=Duration("1s"))
+        assert [data_point.time.second for data_point in readings[0]] == [2, 3, 4]
+
+    def test_gaps(self, buffer, metric, start) -> None:
+        end = start + Duration("2m")
+        gaps = buffer.gaps(metric, start, end, Duration("20s"))
+        assert gaps == [
+            (start + Duration("30s"), start + Duration("70s")),
+            (start + Duration("90s"), end),
+        ]
+
+    def test_readings_merge_backfill(self, buffer, metric, start) -> None:
+        backfill = servo.TimeSeries(
+            metric,
+            [servo.DataPoint(metric, start + Duration(f"{seconds}s"), -1.0) for seconds in (30, 40, 50, 60, 70)],
+            id="a",
+            annotation="instance=a",
+        )
+        readings = buffer.readings(metric, start, start + Duration("90s"), step=Duration("10s"), backfill=[backfill])
+        assert len(readings) == 1
+        assert [(data_point.time - start).total_seconds() for data_point in readings[0]] == list(range(0, 100, 10))
+        assert [data_point.value for data_point in readings[0]] == [0, 10, 20, 30, -1, -1, -1, 70, 80, 90]
+
+    def test_readings_resample_onto_step_grid(self, buffer, metric, start) -> None:
+        # NOTE: Buffered samples every 10s are mixed with backfilled samples at a 30s step
+        backfill = servo.TimeSeries(
+            metric,
+            [servo.DataPoint(metric, start + Duration("60s"), -1.0)],
+            id="a",
+            annotation="instance=a",
+        )
+        readings = buffer.readings(
+            metric, start, start + Duration("90s"), step=Duration("30s"), tolerance=Duration("20s"), backfill=[backfill]
+        )
+        assert [(data_point.time - start).total_seconds() for data_point in readings[0]] == [0, 30, 60, 90]
+        assert [data_point.value for data_point in readings[0]] == [0, 30, -1, 90]
+
+    def test_readings_drop_steps_without_recent_samples(self, buffer, metric, start) -> None:
+        readings = buffer.readings(metric, start, start + Duration("90s"), step=Duration("10s"))
+        assert [(data_point.time - start).total_seconds() for data_point in readings[0]] == [0, 10, 20, 30, 40, 70, 80, 90]
+        assert readings[0].data_points[4].value == 30.0
+
+    @pytest.fixture
+    def connector(self, buffer, metric) -> PrometheusConnector:
+        config = PrometheusConfiguration(base_url="http://localhost:9090", metrics=[metric], streaming_interval="10s")
+        connector = PrometheusConnector(config=config)
+        connector._buffer = buffer
+        return connector
+
+    async def _read_buffer(self, connector, metric, start, end) -> Tuple[List[servo.TimeSeries], list]:
+        requested = []
+
+        def _matrix(request: httpx.Request) -> httpx.Response:
+            params = dict(httpx.QueryParams(request.url.query))
+            requested.append((float(params["start"]), float(params["end"])))
+            values = [[(start + Duration(f"{seconds}s")).timestamp(), "-1"] for seconds in (40, 50, 60)]
+            return httpx.Response(200, json={
+                "status": "success",
+                "data": {
+                    "resultType": "matrix",
+                    "result": [{"metric": {"instance": "a"}, "values": values}],
+                },
+            })
+
+        async with connector.client:
+            with respx.mock(base_url="http://localhost:9090") as respx_mock:
+                respx_mock.get(re.compile(r"/api/v1/query_range.+")).mock(side_effect=_matrix)
+                readings = await connector._read_buffer(metric, start, end)
+
+        return readings, requested
+
+    async def test_measure_backfills_only_gaps(self, connector, metric, start) -> None:
+        readings, requested = await self._read_buffer(connector, metric, start, start + Duration("90s"))
+        assert requested == [((start + Duration("30s")).timestamp(), (start + Duration("70s")).timestamp())]
+        assert [data_point.value for data_point in readings[0]] == [0, 10, 20, 30, -1, -1, -1, 70, 80, 90]
+
+    async def test_measure_aligns_backfill_to_step(self, connector, start) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="20s")
+        readings, requested = await self._read_buffer(connector, metric, start, start + Duration("90s"))
+        assert requested == [((start + Duration("40s")).timestamp(), (start + Duration("60s")).timestamp())]
+        assert [(data_point.time - start).total_seconds() for data_point in readings[0]] == [0, 20, 40, 60, 80]
+        assert [data_point.value for data_point in readings[0]] == [0, 20, -1, -1, 80]
+
+    async def test_measure_queries_steps_shorter_than_streaming_interval(self, connector, start) -> None:
+        metric = PrometheusMetric("throughput", servo.Unit.requests_per_minute, query="throughput", step="5s")
+        readings, requested = await self._read_buffer(connector, metric, start, start + Duration("90s"))
+        assert requested == [(start.timestamp(), (start + Duration("90s")).timestamp())]
+        assert [data_point.value for data_point in readings[0]] == [-1, -1, -1]
+
+
 class TestPrometheusChecks:
     @pytest.fixture
     def metric(self) -> PrometheusMetric:
@@ -272,11 +1173,13 @@ class TestPrometheusChecks:
             yield respx_mock
 
     @pytest.fixture
-    def checks(self, metric) -> PrometheusChecks:
+    async def checks(self, metric) -> AsyncIterator[PrometheusChecks]:
         config = PrometheusConfiguration(
             base_url="http://localhost:9090", metrics=[metric]
         )
-        return PrometheusChecks(config=config)
+        checks = PrometheusChecks(config=config)
+        yield checks
+        await checks._aclose()
 
     async def test_check_base_url(self, mocked_api, checks) -> None:
         request = mocked_api["targets"]
@@ -1094,34 +1997,23 @@ class TestAbsentMetrics:
 
     @pytest.fixture
     def absent_metric_query_response(self) -> Dict:
-        """Returned by Prometheus from an absent(metric) query when the metric is absent."""
+        """Returned by Prometheus from a range query with an absence probe when the metric is absent."""
         return {
             'status': 'success',
             'data': {
-                'resultType': 'vector',
+                'resultType': 'matrix',
                 'result': [
                     {
-                        'metric': {},
-                        'value': [
-                            1608522635.537,
-                            '1',
+                        'metric': {'servo_absent': 'true'},
+                        'values': [
+                            [1608522635.537, '1'],
+                            [1608522695.537, '1'],
                         ],
                     },
                 ],
             },
         }
 
-    @pytest.fixture
-    def present_metric_query_response(self) -> Dict:
-        """Returned by Prometheus from an absent(metric) query when the metric is present."""
-        return {
-            'status': 'success',
-            'data': {
-                'resultType': 'vector',
-                'result': [],
-            },
-        }
-
     @pytest.fixture
     def connector(self) -> servo.connectors.prometheus.PrometheusConnector:
         optimizer = servo.Optimizer(
@@ -1132,11 +2024,7 @@ class TestAbsentMetrics:
         return PrometheusConnector(config=config, optimizer=optimizer)
 
     @pytest.fixture
-    def routes(self,
-        empty_range_query_response,
-        absent_metric_query_response,
-        present_metric_query_response,
-    ) -> None:
+    def routes(self, empty_range_query_response) -> None:
         respx.get(
             "https://localhost:9090/api/v1/query_range",
             params={"query": "empty_metric"},
@@ -1157,11 +2045,30 @@ class TestAbsentMetrics:
                 json=empty_range_query_response
             )
         )
+        respx.get(
+            "https://localhost:9090/api/v1/query",
+            name="instant_query"
+        ).mock(
+            return_value=httpx.Response(
+                status_code=500,
+            )
+        )
 
+    def probe_route(self, response: Dict) -> respx.Route:
+        return respx.get(
+            "https://localhost:9090/api/v1/query_range",
+            params={"query": 'empty_metric or on() label_replace(absent(empty_metric), "servo_absent", "true", "", "")'},
+            name="range_query_with_absent_probe"
+        ).mock(
+            return_value=httpx.Response(
+                status_code=200,
+                json=response
+            )
+        )
 
     @pytest.mark.parametrize("absent", list(map(lambda ab: ab, servo.connectors.prometheus.Absent)))
     @respx.mock
-    async def test_that_empty_range_query_triggers_absent_check(
+    async def test_that_absent_metric_is_detected_in_one_request(
         self,
         connector,
         absent,
@@ -1175,17 +2082,7 @@ class TestAbsentMetrics:
             absent=absent
         )
         assert metric.query
-
-        respx.get(
-            "https://localhost:9090/api/v1/query",
-            params={"query": "absent(empty_metric)"},
-            name="instant_query_for_absent_empty_metric"
-        ).mock(
-            return_value=httpx.Response(
-                status_code=200,
-                json=absent_metric_query_response
-            )
-        )
+        probe = self.probe_route(absent_metric_query_response)
 
         start = datetime.datetime.now()
         end = start + Duration("36h")
@@ -1194,27 +2091,28 @@ class TestAbsentMetrics:
             with pytest.raises(RuntimeError, match="Required metric 'empty_metric' is absent from Prometheus"):
                 await connector._query_prometheus(metric, start, end)
 
-            assert respx.routes["range_query_for_empty_metric"].called
-            assert respx.routes["instant_query_for_absent_empty_metric"].called
+            assert probe.call_count == 1
 
         elif absent == servo.connectors.prometheus.Absent.zero:
             await connector._query_prometheus(metric, start, end)
 
             assert respx.routes["range_query_for_empty_metric_or_zero_vector"].called
-            assert not respx.routes["range_query_for_empty_metric"].called
-            assert not respx.routes["instant_query_for_absent_empty_metric"].called
+            assert not probe.called
 
-        else:
-            await connector._query_prometheus(metric, start, end)
+        elif absent == servo.connectors.prometheus.Absent.ignore:
+            assert await connector._query_prometheus(metric, start, end) == []
             assert respx.routes["range_query_for_empty_metric"].called
+            assert not probe.called
+
+        elif absent == servo.connectors.prometheus.Absent.warn:
+            # NOTE: The probe series is never returned as a reading
+            assert await connector._query_prometheus(metric, start, end) == []
+            assert probe.call_count == 1
 
-            if absent == servo.connectors.prometheus.Absent.ignore:
-                assert not respx.routes["instant_query_for_absent_empty_metric"].called
-            elif absent == servo.connectors.prometheus.Absent.warn:
-                assert respx.routes["instant_query_for_absent_empty_metric"].called
-            else:
-                assert False, "unhandled case"
+        else:
+            assert False, "unhandled case"
 
+        assert not respx.routes["instant_query"].called
 
     @pytest.mark.parametrize("absent", list(map(lambda ab: ab, servo.connectors.prometheus.Absent)))
     @respx.mock
@@ -1223,7 +2121,7 @@ class TestAbsentMetrics:
         connector,
         absent,
         routes,
-        present_metric_query_response
+        empty_range_query_response
     ) -> None:
         metric = PrometheusMetric(
             "empty_metric",
@@ -1231,36 +2129,36 @@ class TestAbsentMetrics:
             query="empty_metric",
             absent=absent
         )
+        probe = self.probe_route(empty_range_query_response)
 
-        respx.get(
-            "https://localhost:9090/api/v1/query",
-            params={"query": "absent(empty_metric)"},
-            name="instant_query_for_absent_empty_metric"
-        ).mock(
-            return_value=httpx.Response(
-                status_code=200,
-                json=present_metric_query_response
-            )
-        )
-
-        metric.absent = absent
         start = datetime.datetime.now()
         end = start + Duration("36h")
 
         result = await connector._query_prometheus(metric, start, end)
+        assert result == []
+        assert not respx.routes["instant_query"].called
         if absent == "zero":
-            # NOTE: Zero will append the `or on() vector(0)` suffix and never trigger `absent()`
+            # NOTE: Zero will append the `or on() vector(0)` suffix and never probe for absence
             assert respx.routes["range_query_for_empty_metric_or_zero_vector"].called
-            assert not respx.routes["instant_query_for_absent_empty_metric"].called
-            assert result == []
+            assert not probe.called
         elif absent == "ignore":
-            # NOTE: Ignore doesn't care and won't issue the absent() query
+            # NOTE: Ignore doesn't care and won't probe for absence
             assert respx.routes["range_query_for_empty_metric"].called
-            assert not respx.routes["instant_query_for_absent_empty_metric"].called
+            assert not probe.called
         else:
-            assert respx.routes["range_query_for_empty_metric"].called
-            assert respx.routes["instant_query_for_absent_empty_metric"].called
-            assert result == []
+            assert probe.call_count == 1
+
+    async def test_eager_observer_shares_absent_handling(self, routes, absent_metric_query_response) -> None:
+        metric = PrometheusMetric("empty_metric", Unit.count, query="empty_metric", absent="fail")
+        start = datetime.datetime.now()
+        async with Client(base_url="https://localhost:9090") as client:
+            observer = servo.connectors.prometheus.EagerMetricObserver(
+                base_url="https://localhost:9090", metrics=[metric], start=start, end=start + Duration("1h"), client=client
+            )
+            with respx.mock:
+                self.probe_route(absent_metric_query_response)
+                with pytest.raises(RuntimeError, match="Required metric 'empty_metric' is absent from Prometheus"):
+                    await observer._query_prometheus(metric)
 
     class TestAbsentZero:
         async def test_range_query_includes_or_on_vector(self) -> None:
@@ -1314,7 +2212,8 @@ async def test_list_targets() -> None:
     client = Client(base_url="http://localhost:9090/")
     with respx.mock(base_url=client.base_url) as respx_mock:
         request = respx_mock.get("/api/v1/targets").mock(httpx.Response(200, json=targets_response_()))
-        response = await client.list_targets()
+        async with client:
+            response = await client.list_targets()
         assert response.data.active_targets
         assert len(response.data.active_targets) == 1
         target = response.data.active_targets[0]
@@ -1,12 +1,25 @@
 import abc
+import asyncio
 import collections
+import math
 import random
-from typing import List, Optional, Union
+import re
+import struct
+import time
+import urllib.parse
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import fastapi
+import google_crc32c
+import orjson
+import snappy
 import statesman
+import uvicorn
 
 import servo
+import servo.cli
+import servo.connectors.prometheus
+from servo.connectors.prometheus_remote_read import ChunkedReadResponse, ReadRequest, ReadResponse
 
 
 class StateMachine(statesman.HistoryMixin, statesman.StateMachine):
@@ -281,6 +294,300 @@ async def servo_get(account: str, app: str, ev: servo.api.Request) -> Union[serv
     else:
         raise ValueError(f"unknown event: {ev.event}")
 
+#########
+
+Labels = Tuple[Tuple[str, str], ...]
+Samples = List[Tuple[int, float]]
+
+
+class PrometheusRemoteRead(fastapi.FastAPI):
+    """A fake Prometheus server implementing the remote read API over a fixed set of series.
+
+    Series are keyed by their sorted labels (including `__name__`) and hold samples of
+    millisecond timestamps and values. Responses are streamed XOR chunks unless the fake
+    is configured to respond with buffered samples as older Prometheus releases do.
+    """
+
+    def __init__(
+        self,
+        series: Dict[Labels, Samples] = {},
+        *,
+        streamed: bool = True,
+        samples_per_chunk: int = 120,
+        chunks_per_frame: int = 2,
+    ) -> None:
+        super().__init__()
+        self.series = dict(series)
+        self.streamed = streamed
+        self.samples_per_chunk = samples_per_chunk
+        self.chunks_per_frame = chunks_per_frame
+        self.requests: List[Tuple[int, int, List[servo.connectors.prometheus.LabelMatcher]]] = []
+        self.add_api_route("/api/v1/read", self.read, methods=["POST"])
+
+    async def read(self, request: fastapi.Request) -> fastapi.Response:
+        (query, ) = ReadRequest.FromString(snappy.uncompress(await request.body())).queries
+        start, end = query.start_timestamp_ms, query.end_timestamp_ms
+        matchers = [
+            servo.connectors.prometheus.LabelMatcher(
+                name=matcher.name, value=matcher.value, type=list(servo.connectors.prometheus.MatchType)[matcher.type],
+            )
+            for matcher in query.matchers
+        ]
+        self.requests.append((start, end, matchers))
+
+        selected = {
+            labels: [(timestamp, value) for timestamp, value in samples if start <= timestamp <= end]
+            for labels, samples in self.series.items()
+            if all(_matches(matcher, dict(labels)) for matcher in matchers)
+        }
+        if self.streamed:
+            return fastapi.responses.StreamingResponse(
+                self._frames(selected),
+                media_type="application/x-streamed-protobuf; proto=prometheus.ChunkedReadResponse",
+            )
+
+        response = ReadResponse()
+        result = response.results.add()
+        for labels, samples in selected.items():
+            time_series = result.timeseries.add()
+            _add_labels(time_series, labels)
+            for timestamp, value in samples:
+                time_series.samples.add(value=value, timestamp=timestamp)
+        return fastapi.Response(
+            snappy.compress(response.SerializeToString()),
+            media_type="application/x-protobuf",
+            headers={"Content-Encoding": "snappy"},
+        )
+
+    def _frames(self, selected: Dict[Labels, Samples]) -> Iterator[bytes]:
+        for labels, samples in selected.items():
+            chunks = [
+                samples[index:index + self.samples_per_chunk]
+                for index in range(0, len(samples), self.samples_per_chunk)
+            ]
+            for index in range(0, len(chunks), self.chunks_per_frame):
+                response = ChunkedReadResponse()
+                series = response.chunked_series.add()
+                _add_labels(series, labels)
+                for chunk in chunks[index:index + self.chunks_per_frame]:
+                    series.chunks.add(
+                        min_time_ms=chunk[0][0], max_time_ms=chunk[-1][0], type=1, data=encode_xor_chunk(chunk),
+                    )
+                yield encode_frame(response.SerializeToString())
+
+
+class SyntheticPrometheus(fastapi.FastAPI):
+    """A synthetic Prometheus server that generates deterministic series for any query.
+
+    Every query returns `series` series labeled by instance. The value of series `i` at time
+    `t` is `(i + 1) * (1 + sin(t / 60))`, so responses depend only on the request and can
+    be verified by tests. Range queries return a sample at every step from start to end,
+    as Prometheus does.
+
+    Requests are counted by endpoint and can be retrieved from `/synthetic/requests` when
+    the server runs in another process. Each response is delayed by `latency` seconds.
+    """
+
+    def __init__(self, *, series: int = 10, latency: float = 0.0) -> None:
+        super().__init__()
+        self.series = series
+        self.latency = latency
+        self.requests: Dict[str, int] = collections.Counter()
+        self.generation_time = 0.0
+        self.add_api_route("/api/v1/query", self.query, methods=["GET", "POST"])
+        self.add_api_route("/api/v1/query_range", self.query_range, methods=["GET", "POST"])
+        self.add_api_route("/api/v1/targets", self.targets, methods=["GET"])
+        self.add_api_route("/synthetic/requests", self.stats, methods=["GET"])
+
+    def value(self, series: int, timestamp: float) -> float:
+        """Return the value of a series at a POSIX timestamp."""
+        return (series + 1) * (1 + math.sin(timestamp / 60))
+
+    async def query(self, request: fastapi.Request) -> fastapi.Response:
+        params = await _params(request)
+        timestamp = float(params.get("time", time.time()))
+        return await self._respond("query", lambda: {
+            "resultType": "vector",
+            "result": [
+                {"metric": self._labels(series), "value": [timestamp, str(self.value(series, timestamp))]}
+                for series in range(self.series)
+            ],
+        })
+
+    async def query_range(self, request: fastapi.Request) -> fastapi.Response:
+        params = await _params(request)
+        start, end = float(params["start"]), float(params["end"])
+        step = servo.Duration(params["step"]).total_seconds()
+        timestamps = [start + index * step for index in range(int(round((end - start) / step, 3)) + 1)]
+        return await self._respond("query_range", lambda: {
+            "resultType": "matrix",
+            "result": [
+                {
+                    "metric": self._labels(series),
+                    "values": [[timestamp, str(self.value(series, timestamp))] for timestamp in timestamps],
+                }
+                for series in range(self.series)
+            ],
+        })
+
+    async def targets(self) -> fastapi.Response:
+        return await self._respond("targets", lambda: {
+            "activeTargets": [
+                {
+                    "discoveredLabels": {"__address__": self._labels(series)["instance"], "job": "synthetic"},
+                    "labels": self._labels(series),
+                    "scrapePool": "synthetic",
+                    "scrapeUrl": f"http://{self._labels(series)['instance']}/metrics",
+                    "globalUrl": f"http://{self._labels(series)['instance']}/metrics",
+                    "lastError": "",
+                    "lastScrape": "2020-01-01T00:00:00Z",
+                    "lastScrapeDuration": 0.01,
+                    "health": "up",
+                }
+                for series in range(self.series)
+            ],
+            "droppedTargets": [],
+        })
+
+    async def stats(self) -> Dict[str, Union[int, float]]:
+        return {**self.requests, "generation_time": self.generation_time}
+
+    async def _respond(self, endpoint: str, generate) -> fastapi.Response:
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        started_at = time.perf_counter()
+        content = orjson.dumps({"status": "success", "data": generate()})
+        self.generation_time += time.perf_counter() - started_at
+        return fastapi.Response(content, media_type="application/json")
+
+    def _labels(self, series: int) -> Dict[str, str]:
+        return {"instance": f"10.0.{series // 256}.{series % 256}:9901", "job": "synthetic"}
+
+
+def serve_synthetic_prometheus(port: int, **options) -> None:
+    """Serve a synthetic Prometheus server on a local port until the process is terminated.
+
+    This is the target of a subprocess so that benchmarks do not measure the server.
+    """
+    uvicorn.run(SyntheticPrometheus(**options), host="127.0.0.1", port=port, log_level="warning")
+
+
+async def _params(request: fastapi.Request) -> Dict[str, str]:
+    if request.method == "POST":
+        return dict(urllib.parse.parse_qsl((await request.body()).decode()))
+    return dict(request.query_params)
+
+
+def encode_frame(message: bytes) -> bytes:
+    """Encode a message as a frame of a streamed remote read response."""
+    return _varint(len(message)) + google_crc32c.value(message).to_bytes(4, "big") + message
+
+
+def encode_xor_chunk(samples: Sequence[Tuple[int, float]]) -> bytes:
+    """Encode samples of millisecond timestamps and values as a Prometheus TSDB XOR chunk."""
+    writer = _BitWriter()
+    previous_timestamp, previous_bits, delta = 0, 0, 0
+    leading, trailing = 0xFF, 0
+    for index, (timestamp, value) in enumerate(samples):
+        bits = struct.unpack(">Q", struct.pack(">d", value))[0]
+        if index == 0:
+            writer.write_bytes(_varint((timestamp << 1) ^ (timestamp >> 63)))
+            writer.write(bits, 64)
+        else:
+            if index == 1:
+                delta = timestamp - previous_timestamp
+                writer.write_bytes(_varint(delta))
+            else:
+                delta_ = timestamp - previous_timestamp
+                dod, delta = delta_ - delta, delta_
+                for prefix, prefix_width, width in ((0b10, 2, 14), (0b110, 3, 17), (0b1110, 4, 20)):
+                    if -((1 << (width - 1)) - 1) <= dod <= 1 << (width - 1):
+                        if dod == 0:
+                            writer.write(0, 1)
+                        else:
+                            writer.write(prefix, prefix_width)
+                            writer.write(dod & ((1 << width) - 1), width)
+                        break
+                else:
+                    writer.write(0b1111, 4)
+                    writer.write(dod & ((1 << 64) - 1), 64)
+
+            xor = bits ^ previous_bits
+            if xor == 0:
+                writer.write(0, 1)
+            else:
+                writer.write(1, 1)
+                leading_ = min(64 - xor.bit_length(), 31)
+                trailing_ = (xor & -xor).bit_length() - 1
+                if leading != 0xFF and leading_ >= leading and trailing_ >= trailing:
+                    writer.write(0, 1)
+                    writer.write(xor >> trailing, 64 - leading - trailing)
+                else:
+                    leading, trailing = leading_, trailing_
+                    significant = 64 - leading - trailing
+                    writer.write(1, 1)
+                    writer.write(leading, 5)
+                    writer.write(significant & 0x3F, 6)
+                    writer.write(xor >> trailing, significant)
+
+        previous_timestamp, previous_bits = timestamp, bits
+
+    return len(samples).to_bytes(2, "big") + writer.getvalue()
+
+
+class _BitWriter:
+    def __init__(self) -> None:
+        self._data = bytearray()
+        self._value = 0
+        self._size = 0
+
+    def write(self, value: int, width: int) -> None:
+        # Whole bytes are flushed so that the pending bits stay short
+        self._value = (self._value << width) | value
+        self._size += width
+        whole = self._size >> 3
+        if whole:
+            self._size &= 7
+            self._data.extend((self._value >> self._size).to_bytes(whole, "big"))
+            self._value &= (1 << self._size) - 1
+
+    def write_bytes(self, data: bytes) -> None:
+        for byte in data:
+            self.write(byte, 8)
+
+    def getvalue(self) -> bytes:
+        padding = -self._size % 8
+        return bytes(self._data) + (self._value << padding).to_bytes((self._size + padding) // 8, "big")
+
+
+def _varint(value: int) -> bytes:
+    value &= (1 << 64) - 1
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _add_labels(series, labels: Labels) -> None:
+    for name, value in labels:
+        series.labels.add(name=name, value=value)
+
+
+def _matches(matcher: servo.connectors.prometheus.LabelMatcher, labels: Dict[str, str]) -> bool:
+    value = labels.get(matcher.name, "")
+    MatchType = servo.connectors.prometheus.MatchType
+    if matcher.type == MatchType.equal:
+        return value == matcher.value
+    elif matcher.type == MatchType.not_equal:
+        return value != matcher.value
+    elif matcher.type == MatchType.regex:
+        return re.fullmatch(matcher.value, value) is not None
+    return re.fullmatch(matcher.value, value) is None
+
 ##
 # Utilities
 
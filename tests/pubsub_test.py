@@ -43,9 +43,9 @@ class TestMessage:
         # NOTE: Use Pydantic's json() method support
         channel = servo.pubsub.Channel.construct(name="whatever", created_at=datetime.datetime.now())
         message = servo.pubsub.Message(json=channel)
-        assert message.text == '{"description": null, "created_at": "2021-01-01T12:00:01", "name": "whatever"}'
+        assert message.text == '{"description": null, "created_at": "2021-01-01T12:00:01", "retention": null, "name": "whatever"}'
         assert message.content_type == 'application/json'
-        assert message.content == b'{"description": null, "created_at": "2021-01-01T12:00:01", "name": "whatever"}'
+        assert message.content == b'{"description": null, "created_at": "2021-01-01T12:00:01", "retention": null, "name": "whatever"}'
 
     def test_yaml_message(self) -> None:
         message = servo.pubsub.Message(yaml={"key": "value"})
@@ -849,6 +849,415 @@ class TestExchange:
         )
         assert messages
 
+def _message_at(text: str, created_at: datetime.datetime) -> servo.pubsub.Message:
+    message = servo.pubsub.Message(text=text)
+    message.created_at = created_at
+    return message
+
+class TestRetention:
+    def test_requires_a_bound(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="at least one of `count`, `duration`, or `max_bytes` must be given"):
+            servo.pubsub.Retention()
+
+    def test_channels_do_not_retain_by_default(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics")
+        channel._retain(servo.pubsub.Message(text="foo"))
+        assert channel.snapshot() == []
+
+    def test_retain_by_count(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=3))
+        for i in range(5):
+            channel._retain(servo.pubsub.Message(text=f"Message: {i}"))
+
+        assert list(map(operator.attrgetter("text"), channel.snapshot())) == [
+            "Message: 2",
+            "Message: 3",
+            "Message: 4",
+        ]
+
+    def test_retain_by_bytes(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10, max_bytes=25))
+        for i in range(5):
+            channel._retain(servo.pubsub.Message(text=f"Message: {i}"))
+
+        assert list(map(operator.attrgetter("text"), channel.snapshot())) == [
+            "Message: 3",
+            "Message: 4",
+        ]
+        assert channel._retained_bytes == 20
+
+    def test_retain_by_duration(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(duration="1m"))
+        with freezegun.freeze_time("2021-01-01 12:00:00") as frozen_time:
+            channel._retain(_message_at("old", datetime.datetime.now()))
+            frozen_time.tick(datetime.timedelta(seconds=45))
+            channel._retain(_message_at("new", datetime.datetime.now()))
+            assert len(channel.snapshot()) == 2
+
+            frozen_time.tick(datetime.timedelta(seconds=30))
+            assert list(map(operator.attrgetter("text"), channel.snapshot())) == ["new"]
+
+    def test_snapshot_since(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        channel._retain(_message_at("first", datetime.datetime(2021, 1, 1, 12, 0, 0)))
+        channel._retain(_message_at("second", datetime.datetime(2021, 1, 1, 12, 0, 10)))
+
+        since = datetime.datetime(2021, 1, 1, 12, 0, 5)
+        assert list(map(operator.attrgetter("text"), channel.snapshot(since))) == ["second"]
+
+    def test_snapshot_columnar(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        messages = [servo.pubsub.Message(json={"value": i}) for i in range(3)]
+        for message in messages:
+            channel._retain(message)
+
+        columns = channel.snapshot(columnar=True)
+        assert columns['content'] == [b'{"value": 0}', b'{"value": 1}', b'{"value": 2}']
+        assert columns['content_type'] == ['application/json'] * 3
+        assert columns['created_at'] == [message.created_at for message in messages]
+        assert columns['metadata'] == [{}, {}, {}]
+
+    async def test_published_messages_are_retained(self, exchange: servo.pubsub.Exchange, mocker: pytest_mock.MockerFixture) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        event = asyncio.Event()
+        exchange.create_subscriber("metrics", callback=lambda m, c: event.set())
+        await channel.publish(servo.pubsub.Message(text="foo"))
+        await event.wait()
+        assert list(map(operator.attrgetter("text"), channel.snapshot())) == ["foo"]
+
+    async def test_replay_to_late_callback_subscriber(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        for i in range(3):
+            channel._retain(servo.pubsub.Message(text=f"Message: {i}"))
+
+        exchange.start()
+        messages = []
+        event = asyncio.Event()
+
+        def _callback(message: servo.pubsub.Message, channel: servo.pubsub.Channel) -> None:
+            messages.append(message.text)
+            if len(messages) == 4:
+                event.set()
+
+        exchange.create_subscriber("metrics*", callback=_callback, replay=True)
+        await channel.publish(servo.pubsub.Message(text="Message: 3"))
+        await asyncio.wait_for(event.wait(), timeout=1.0)
+        assert messages == ["Message: 0", "Message: 1", "Message: 2", "Message: 3"]
+
+    async def test_replay_to_late_iterator(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        for i in range(3):
+            channel._retain(_message_at(f"Message: {i}", datetime.datetime(2021, 1, 1, 12, 0, i * 10)))
+
+        messages = []
+        async with exchange.subscribe("metrics", replay=datetime.datetime(2021, 1, 1, 12, 0, 5)) as subscriber:
+            await asyncio.sleep(0)
+            async for message, channel_ in subscriber:
+                messages.append(message.text)
+                if len(messages) == 2:
+                    subscriber.cancel()
+
+        assert messages == ["Message: 1", "Message: 2"]
+
+    async def test_replay_is_opt_in(self, exchange: servo.pubsub.Exchange, mocker: pytest_mock.MockerFixture) -> None:
+        channel = exchange.create_channel("metrics", retention=servo.pubsub.Retention(count=10))
+        channel._retain(servo.pubsub.Message(text="foo"))
+        subscriber = exchange.create_subscriber("metrics", callback=mocker.stub())
+        await asyncio.sleep(0.01)
+        subscriber.callback.assert_not_called()
+
+
+class TestOperation:
+    def test_window_requires_reduce(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="`reduce` must be given when aggregating a `window`"):
+            servo.pubsub.Operation(window="1m")
+
+    def test_requires_exactly_one_kind(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="exactly one of `window`, `sample`, or `coalesce` must be given"):
+            servo.pubsub.Operation(sample="1s", coalesce="1s")
+
+    def test_slide_cannot_exceed_window(self) -> None:
+        with pytest.raises(pydantic.ValidationError, match="`slide` cannot be longer than `window`"):
+            servo.pubsub.Operation(window="1s", slide="2s", reduce="mean")
+
+    def test_interval(self) -> None:
+        assert servo.pubsub.Operation(window="1m", reduce="mean").interval == servo.Duration("1m")
+        assert servo.pubsub.Operation(window="1m", slide="10s", reduce="mean").interval == servo.Duration("10s")
+        assert servo.pubsub.Operation(coalesce="5s").interval == servo.Duration("5s")
+        assert servo.pubsub.Operation(sample="5s").interval is None
+
+    @pytest.mark.parametrize(
+        ("reducer", "expected"),
+        [
+            ("mean", 2.5),
+            ("sum", 10.0),
+            ("min", 1.0),
+            ("max", 4.0),
+            ("count", 4),
+            ("first", 4.0),
+            ("last", 3.0),
+        ]
+    )
+    def test_reducers(self, reducer: str, expected: float) -> None:
+        assert servo.pubsub.Reducer(reducer)([4.0, 1.0, 2.0, 3.0]) == expected
+
+
+class TestOperators:
+    async def test_window_is_reduced_once_for_all_subscribers(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics.http")
+        results = []
+        event = asyncio.Event()
+
+        def _callback(message: servo.pubsub.Message, channel: servo.pubsub.Channel) -> None:
+            results.append((message, channel))
+            if len(results) == 3:
+                event.set()
+
+        for _ in range(3):
+            exchange.create_subscriber("metrics.*", callback=_callback, window="50ms", reduce="mean")
+        raw_messages = []
+        exchange.create_subscriber("metrics.*", callback=lambda m, c: raw_messages.append(m))
+        assert len(exchange._operators) == 1
+
+        for value in (1, 2, 3, 6):
+            await channel.publish(servo.pubsub.Message(json={"throughput": value, "status": "ok"}))
+
+        await asyncio.wait_for(event.wait(), timeout=1.0)
+        assert len(raw_messages) == 4
+        messages = {id(message) for message, _ in results}
+        assert len(messages) == 1, "the reduction should be computed once and shared"
+        message, channel_ = results[0]
+        assert channel_ == channel
+        assert message.json() == {"throughput": 3.0}
+        assert message.metadata["reduce"] == "mean"
+        assert message.metadata["count"] == "4"
+
+    async def test_scalar_window(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        event = asyncio.Event()
+        results = []
+
+        def _callback(message: servo.pubsub.Message) -> None:
+            results.append(message.json())
+            event.set()
+
+        exchange.create_subscriber("metrics", callback=_callback, window="50ms", reduce="max")
+        for value in (5, 31337, 3):
+            await channel.publish(servo.pubsub.Message(json=value))
+
+        await asyncio.wait_for(event.wait(), timeout=1.0)
+        assert results == [31337.0]
+
+    async def test_sliding_window(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics")
+        exchange.create_subscriber("metrics", callback=lambda m: None, window="1m", slide="10s", reduce="sum")
+        operator = next(iter(exchange._operators.values()))
+        operator.cancel()
+        emitted = []
+        operator._emit = lambda message, channel: emitted.append(message.json())
+
+        operator.accept(_json_message_at({"value": 1}, datetime.datetime.now() - datetime.timedelta(minutes=2)), channel)
+        operator.accept(_json_message_at({"value": 2}, datetime.datetime.now() - datetime.timedelta(seconds=30)), channel)
+        operator.accept(_json_message_at({"value": 3}, datetime.datetime.now()), channel)
+        operator.flush()
+        operator.flush()
+        assert emitted == [{"value": 5.0}, {"value": 5.0}]
+
+    async def test_tumbling_window_is_cleared(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics")
+        exchange.create_subscriber("metrics", callback=lambda m: None, window="1m", reduce="sum")
+        operator = next(iter(exchange._operators.values()))
+        operator.cancel()
+        emitted = []
+        operator._emit = lambda message, channel: emitted.append(message.json())
+
+        operator.accept(servo.pubsub.Message(json={"value": 2}), channel)
+        operator.flush()
+        operator.flush()
+        assert emitted == [{"value": 2.0}]
+
+    async def test_sample(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        received = []
+        exchange.create_subscriber("metrics", callback=lambda m: received.append(m.json()), sample="1h")
+        for value in range(5):
+            await channel.publish(servo.pubsub.Message(json=value))
+        await exchange._queue.join()
+        await asyncio.sleep(0.01)
+        assert received == [0]
+
+    async def test_coalesce(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        event = asyncio.Event()
+        received = []
+
+        def _callback(message: servo.pubsub.Message) -> None:
+            received.append(message.json())
+            event.set()
+
+        exchange.create_subscriber("metrics", callback=_callback, coalesce="50ms")
+        for value in range(5):
+            await channel.publish(servo.pubsub.Message(json=value))
+
+        await asyncio.wait_for(event.wait(), timeout=1.0)
+        assert received == [4]
+
+    async def test_iterator_receives_aggregates(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        event = asyncio.Event()
+
+        async def _publisher() -> None:
+            await event.wait()
+            for value in (1, 2, 3):
+                await channel.publish(servo.pubsub.Message(json=value))
+
+        async def _subscriber() -> List[float]:
+            async with exchange.subscribe("metrics", window="50ms", reduce="sum") as subscriber:
+                event.set()
+                async for message, _ in subscriber:
+                    subscriber.cancel()
+                    return message.json()
+
+        _, result = await asyncio.wait_for(asyncio.gather(_publisher(), _subscriber()), timeout=1.0)
+        assert result == 6.0
+
+    async def test_operator_is_discarded_without_subscribers(self, exchange: servo.pubsub.Exchange) -> None:
+        channel = exchange.create_channel("metrics")
+        subscriber = exchange.create_subscriber("metrics", window="1m", reduce="mean")
+        assert len(exchange._operators) == 1
+        exchange.remove_subscriber(subscriber)
+        assert exchange._operators_matching(channel) == []
+        assert len(exchange._operators) == 0
+
+    async def test_replay_cannot_be_combined_with_operations(self, exchange: servo.pubsub.Exchange) -> None:
+        with pytest.raises(ValueError, match="`replay` cannot be combined with stream operations"):
+            exchange.create_subscriber("metrics", replay=True, sample="1s")
+
+
+class TestStats:
+    async def test_channel_counts_and_rates(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        exchange.create_subscriber("metrics", callback=lambda m: None)
+        exchange.create_subscriber("*", callback=lambda m: None)
+        for _ in range(5):
+            await channel.publish(servo.pubsub.Message(text="ping"))
+        await exchange._queue.join()
+        await asyncio.sleep(0.01)
+
+        stats = exchange.stats()
+        assert stats.queue_depth == 0
+        channel_stats = next(filter(lambda c: c.name == "metrics", stats.channels))
+        assert channel_stats.published == 5
+        assert channel_stats.delivered == 10
+        assert channel_stats.publish_rate > 0
+        assert channel_stats.delivery_rate > channel_stats.publish_rate
+        assert [s.delivered for s in stats.subscribers] == [5, 5]
+
+    async def test_subscriber_queue_depth_and_lag(self, exchange: servo.pubsub.Exchange) -> None:
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        subscriber = exchange.create_subscriber("/metrics/")
+        iterator = subscriber.__aiter__()
+        message = servo.pubsub.Message(text="ping")
+        message.created_at = datetime.datetime.now() - datetime.timedelta(seconds=3)
+        await channel.publish(message)
+        await channel.publish(servo.pubsub.Message(text="pong"))
+        await exchange._queue.join()
+        await asyncio.sleep(0.01)
+
+        stats = subscriber.stats()
+        assert stats.selector == "/metrics/"
+        assert stats.consumer == "iterator"
+        assert stats.queue_depth == 2
+        assert stats.delivered == 0
+        assert stats.lag >= servo.Duration("3s")
+
+        await iterator.__anext__()
+        stats = subscriber.stats()
+        assert stats.queue_depth == 1
+        assert stats.delivered == 1
+        assert stats.lag >= servo.Duration("3s")
+
+    async def test_warns_once_when_subscriber_lags(self, exchange: servo.pubsub.Exchange) -> None:
+        messages = []
+        handler_id = servo.logger.add(lambda m: messages.append(m), level="WARNING")
+        exchange.lag_threshold = servo.Duration("1s")
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+
+        def _slow_consumer(message: servo.pubsub.Message) -> None:
+            ...
+
+        exchange.create_subscriber("metrics", callback=_slow_consumer)
+        for _ in range(3):
+            message = servo.pubsub.Message(text="ping")
+            message.created_at = datetime.datetime.now() - datetime.timedelta(seconds=2)
+            await channel.publish(message)
+        await exchange._queue.join()
+        await asyncio.sleep(0.01)
+        servo.logger.remove(handler_id)
+
+        warnings = [m for m in messages if "is lagging behind" in m]
+        assert len(warnings) == 1
+        assert "Subscriber to 'metrics' (TestStats.test_warns_once_when_subscriber_lags.<locals>._slow_consumer)" in warnings[0]
+        assert "exceeds threshold of 1s" in warnings[0]
+
+    async def test_warns_when_iterator_stops_pulling(self, exchange: servo.pubsub.Exchange) -> None:
+        messages = []
+        handler_id = servo.logger.add(lambda m: messages.append(m), level="WARNING")
+        exchange.lag_threshold = servo.Duration("50ms")
+        exchange.start()
+        channel = exchange.create_channel("metrics")
+        subscriber = exchange.create_subscriber("metrics")
+        subscriber.__aiter__()
+        await channel.publish(servo.pubsub.Message(text="ping"))
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            servo.logger.remove(handler_id)
+            await exchange.shutdown()
+
+        warnings = [m for m in messages if "is lagging behind" in m]
+        assert len(warnings) == 1
+        assert "Subscriber to 'metrics' (iterator) is lagging behind Channel 'metrics'" in warnings[0]
+        assert subscriber.stats().lag > servo.Duration("50ms")
+        assert exchange._lag_monitor is None
+
+    async def test_stats_channel_is_reserved(self, exchange: servo.pubsub.Exchange) -> None:
+        with pytest.raises(ValueError, match="The Channel name 'servo.pubsub.stats' is reserved"):
+            exchange.create_channel(servo.pubsub.STATS_CHANNEL)
+
+    async def test_publishes_to_stats_channel(self) -> None:
+        exchange = servo.pubsub.Exchange(stats_every="10ms")
+        exchange.start()
+        try:
+            channel = exchange.create_channel("metrics")
+            await channel.publish(servo.pubsub.Message(text="ping"))
+            async with exchange.subscribe(servo.pubsub.STATS_CHANNEL) as subscriber:
+                async for message, channel_ in subscriber:
+                    assert channel_.name == servo.pubsub.STATS_CHANNEL
+                    stats = servo.pubsub.Stats.parse_raw(message.content)
+                    assert "metrics" in [c.name for c in stats.channels]
+                    subscriber.cancel()
+        finally:
+            await exchange.shutdown()
+
+        assert exchange._stats_publisher is None
+
+
+def _json_message_at(content, created_at: datetime.datetime) -> servo.pubsub.Message:
+    message = servo.pubsub.Message(json=content)
+    message.created_at = created_at
+    return message
+
+
 class HostObject(servo.pubsub.Mixin):
     async def _test_publisher_decorator(self, *, name: Optional[str] = None) -> None:
         @self.publish("metrics", name=name)
@@ -1,8 +1,13 @@
 import asyncio
+import gc
+import warnings
+from typing import List, Optional
 
 import pytest
 from pydantic import Extra
 
+import servo
+import servo.repeating
 from servo import BaseConfiguration, BaseConnector, Duration, Optimizer
 from servo.repeating import Mixin, repeating
 
@@ -18,6 +23,23 @@ class RepeatingConnector(BaseConnector):
         extra = Extra.allow
 
 
+class VirtualClock:
+    """A clock for an event loop that jumps to the next scheduled callback instead of waiting for it.
+
+    Time only passes while the loop is idle, so timings observed by callbacks are exact.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def select(self, timeout: Optional[float] = None) -> List:
+        self.now += timeout or 0.0
+        return []
+
+
 @pytest.fixture(autouse=True)
 async def cleanup_tasks() -> None:
     yield
@@ -107,3 +129,185 @@ async def test_repeating_task_decorator():
     repeated = RepeatedDecorator()
     assert not repeated.called
     await asyncio.sleep(0.0001)
+
+
+async def test_repeating_task_decorator_schedules_bound_method():
+    class RepeatedDecorator(Mixin):
+        called = 0
+
+        @repeating("1ms")
+        async def repeat_this(self) -> None:
+            self.called += 1
+
+    repeated = RepeatedDecorator()
+    await asyncio.sleep(0.01)
+    assert repeated.called > 1
+    assert repeated.cancel_repeating_task("repeat_this")
+
+
+class TestScheduler:
+    @pytest.fixture
+    def scheduler(self) -> servo.repeating.Scheduler:
+        return servo.repeating.Scheduler()
+
+    async def test_shared_per_event_loop(self) -> None:
+        assert servo.repeating.scheduler() is servo.repeating.scheduler()
+
+    async def test_async_callable(self, scheduler: servo.repeating.Scheduler) -> None:
+        calls = []
+
+        async def _job() -> None:
+            calls.append(asyncio.get_event_loop().time())
+
+        job = scheduler.schedule("5ms", _job)
+        await asyncio.sleep(0.03)
+        job.cancel()
+        assert len(calls) >= 3
+        assert job.stats.runs == len(calls)
+        assert job.name == "TestScheduler.test_async_callable.<locals>._job"
+
+    @pytest.fixture
+    def clock(self, event_loop, mocker) -> VirtualClock:
+        # NOTE: The clock of uvloop cannot be patched so clocked tests run on the default loop
+        clock = VirtualClock()
+        mocker.patch.object(event_loop, "time", clock.time)
+        mocker.patch.object(event_loop._selector, "select", clock.select)
+        return clock
+
+    @pytest.mark.event_loop_policy("default")
+    async def test_ticks_do_not_drift_with_runtime(self, scheduler: servo.repeating.Scheduler, clock: VirtualClock) -> None:
+        started_at = []
+
+        async def _slow_job() -> None:
+            started_at.append(clock.time())
+            await asyncio.sleep(0.015)
+
+        job = scheduler.schedule("50ms", _slow_job)
+        await asyncio.sleep(0.16)
+        job.cancel()
+
+        assert started_at == pytest.approx([0.0, 0.05, 0.1, 0.15])
+
+    @pytest.mark.event_loop_policy("default")
+    async def test_overrun_skip(self, scheduler: servo.repeating.Scheduler, clock: VirtualClock) -> None:
+        running, started_at = [], []
+
+        async def _slow_job() -> None:
+            running.append(len(running))
+            started_at.append(clock.time())
+            assert len(running) == 1, "runs should never overlap"
+            await asyncio.sleep(0.035)
+            running.pop()
+
+        job = scheduler.schedule("10ms", _slow_job, overrun=servo.repeating.Overrun.skip)
+        await asyncio.sleep(0.1)
+        job.cancel()
+        # The three ticks that elapse during each run are skipped
+        assert started_at == pytest.approx([0.0, 0.04, 0.08])
+        assert job.stats.runs == 2
+        assert job.stats.skipped == 6
+        assert job.stats.errors == 0
+
+    @pytest.mark.event_loop_policy("default")
+    async def test_overrun_queue(self, scheduler: servo.repeating.Scheduler, clock: VirtualClock) -> None:
+        started_at = []
+
+        async def _job() -> None:
+            started_at.append(clock.time())
+            if len(started_at) == 1:
+                await asyncio.sleep(0.035)
+
+        job = scheduler.schedule("10ms", _job, overrun="queue")
+        await asyncio.sleep(0.095)
+        job.cancel()
+        assert job.stats.skipped == 0
+        # The ticks that elapsed during the first run are caught up back to back
+        assert started_at == pytest.approx([0.0, 0.035, 0.035, 0.035, 0.04, 0.05, 0.06, 0.07, 0.08, 0.09])
+
+    async def test_jitter_delays_runs_within_bound(self, scheduler: servo.repeating.Scheduler) -> None:
+        job = scheduler.schedule("10ms", lambda: None, jitter="5ms", delay="10ms")
+        await asyncio.sleep(0.06)
+        job.cancel()
+        assert job.stats.runs >= 3
+        assert job.stats.lateness < Duration("10ms")
+
+    async def test_errors_are_counted_and_logged(self, scheduler: servo.repeating.Scheduler) -> None:
+        messages = []
+        handler_id = servo.logger.add(lambda m: messages.append(m), level="ERROR")
+
+        def _failing_job() -> None:
+            raise RuntimeError("boom")
+
+        job = scheduler.schedule("5ms", _failing_job, name="failing")
+        await asyncio.sleep(0.02)
+        job.cancel()
+        servo.logger.remove(handler_id)
+
+        assert job.stats.errors == job.stats.runs
+        assert job.stats.runs > 1, "the job should keep running after a failure"
+        assert "Job 'failing' failed with exception: boom" in messages[0]
+
+    async def test_many_jobs_share_one_timer(self, scheduler: servo.repeating.Scheduler) -> None:
+        tasks_before = len(asyncio.all_tasks())
+        counts = [0] * 200
+
+        def _counter(index: int):
+            def _count() -> None:
+                counts[index] += 1
+            return _count
+
+        jobs = [scheduler.schedule("5ms", _counter(i)) for i in range(200)]
+        await asyncio.sleep(0.03)
+        assert len(asyncio.all_tasks()) == tasks_before
+        assert all(count >= 3 for count in counts)
+        assert len(scheduler.jobs) == 200
+
+        for job in jobs:
+            job.cancel()
+        assert scheduler.jobs == []
+
+    async def test_cancelled_job_is_done_after_loop_iteration(self, scheduler: servo.repeating.Scheduler, mocker) -> None:
+        stub = mocker.stub()
+        job = scheduler.schedule("5ms", lambda: None)
+        job.add_done_callback(stub)
+        assert job.cancel()
+        assert not job.cancel()
+        assert not job.done()
+        await asyncio.sleep(0)
+        assert job.done() and job.cancelled()
+        stub.assert_called_once_with(job)
+
+    async def test_cancel_before_run_starts_closes_coroutine(self, scheduler: servo.repeating.Scheduler) -> None:
+        started = []
+
+        async def _job() -> None:
+            started.append(True)
+
+        job = scheduler.schedule("1s", _job)
+        # NOTE: Runs in the same timer callback as the job, after its run has been scheduled
+        scheduler.schedule("1s", lambda: job.cancel())
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            await asyncio.sleep(0.01)
+            gc.collect()
+
+        assert not started
+        assert job.stats.runs == 0
+        assert not [warning for warning in caught if issubclass(warning.category, RuntimeWarning)]
+
+    async def test_cancel_interrupts_running_job(self, scheduler: servo.repeating.Scheduler) -> None:
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def _job() -> None:
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        job = scheduler.schedule("1s", _job)
+        await asyncio.wait_for(started.wait(), timeout=1)
+        job.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert job.stats.runs == 0
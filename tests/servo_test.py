@@ -945,6 +945,62 @@ class TestAssembly:
                 },
                 'additionalProperties': False,
             },
+            'PubSubSettings': {
+                'title': 'PubSubSettings Connector Configuration Schema',
+                'description': (
+                    'PubSubSettings models the configuration of the pub/sub Exchange that connects the\n'
+                    'connectors of a servo assembly.'
+                ),
+                'type': 'object',
+                'properties': {
+                    'description': {
+                        'title': 'Description',
+                        'description': 'An optional annotation describing the configuration.',
+                        'env_names': [
+                            'PUB_SUB_SETTINGS_DESCRIPTION',
+                        ],
+                        'type': 'string',
+                    },
+                    'lag_threshold': {
+                        'title': 'Lag Threshold',
+                        'default': '5s',
+                        'env_names': [
+                            'PUB_SUB_SETTINGS_LAG_THRESHOLD',
+                        ],
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)'
+                            '?([\\d\\.]+us)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'stats_every': {
+                        'title': 'Stats Every',
+                        'env_names': [
+                            'PUB_SUB_SETTINGS_STATS_EVERY',
+                        ],
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)'
+                            '?([\\d\\.]+us)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                },
+                'additionalProperties': False,
+            },
             'servo__configuration__ServoConfiguration': {
                 'title': 'Servo Connector Configuration Schema',
                 'description': (
@@ -1021,6 +1077,17 @@ class TestAssembly:
                             },
                         ],
                     },
+                    'pubsub': {
+                        'title': 'Pubsub',
+                        'env_names': [
+                            'SERVO_PUBSUB',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/PubSubSettings',
+                            },
+                        ],
+                    },
                 },
                 'additionalProperties': False,
             },
@@ -1033,6 +1100,252 @@ class TestAssembly:
                 ],
                 'type': 'string',
             },
+            'HistogramConfiguration': {
+                'title': 'HistogramConfiguration',
+                'description': 'Configuration of latency histograms built in-process from the raw results of an attack.',
+                'type': 'object',
+                'properties': {
+                    'percentiles': {
+                        'title': 'Percentiles',
+                        'description': 'The latency percentiles to report as metrics.',
+                        'default': [50, 90, 95, 99],
+                        'type': 'array',
+                        'items': {
+                            'type': 'number',
+                        },
+                    },
+                    'buckets': {
+                        'title': 'Buckets',
+                        'description': (
+                            'Latency bucket boundaries to report the number of requests completing at or below as metri'
+                            'cs.'
+                        ),
+                        'default': [],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                            'format': 'duration',
+                            'pattern': (
+                                '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]'
+                                '+us)?([\\d\\.]+ns)?'
+                            ),
+                            'examples': [
+                                '300ms',
+                                '5m',
+                                '2h45m',
+                                '72h3m0.5s',
+                            ],
+                        },
+                    },
+                    'status_codes': {
+                        'title': 'Status Codes',
+                        'description': (
+                            'Status codes or classes (e.g., 503 or 5xx) to report the throughput of as metrics. Transpo'
+                            'rt errors are reported with a status code of 0.'
+                        ),
+                        'default': ['2xx', '3xx', '4xx', '5xx'],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                        },
+                    },
+                    'significant_figures': {
+                        'title': 'Significant Figures',
+                        'description': 'The number of significant figures of precision that latencies are recorded to.',
+                        'default': 2,
+                        'minimum': 1,
+                        'maximum': 5,
+                        'type': 'integer',
+                    },
+                },
+            },
+            'LoadProfileType': {
+                'title': 'LoadProfileType',
+                'description': 'An enumeration.',
+                'enum': [
+                    'ramp',
+                    'step',
+                    'spike',
+                ],
+                'type': 'string',
+            },
+            'LoadProfile': {
+                'title': 'LoadProfile',
+                'description': (
+                    'A schedule of request rates over the duration of a measurement.\n\nProfiles are executed as successiv'
+                    'e attack segments at constant rates:\n\n* `ramp` profiles change linearly from `start_rate` to `end_r'
+                    'ate` across `segments` segments.\n* `step` profiles attack at each of the `rates` in turn for an equ'
+                    'al share of the duration.\n* `spike` profiles attack at `spike_rate` for the last `spike_duration` o'
+                    'f every `period` and\n    at the rate of the configuration otherwise.'
+                ),
+                'type': 'object',
+                'properties': {
+                    'type': {
+                        'description': 'The type of load profile.',
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/LoadProfileType',
+                            },
+                        ],
+                    },
+                    'start_rate': {
+                        'title': 'Start Rate',
+                        'description': 'The rate to start a ramp at.',
+                        'type': 'string',
+                    },
+                    'end_rate': {
+                        'title': 'End Rate',
+                        'description': 'The rate to end a ramp at.',
+                        'type': 'string',
+                    },
+                    'segments': {
+                        'title': 'Segments',
+                        'description': 'The number of segments to ramp across.',
+                        'default': 5,
+                        'minimum': 2,
+                        'type': 'integer',
+                    },
+                    'rates': {
+                        'title': 'Rates',
+                        'description': 'The rates of the steps of a step profile.',
+                        'default': [],
+                        'type': 'array',
+                        'items': {
+                            'type': 'string',
+                        },
+                    },
+                    'spike_rate': {
+                        'title': 'Spike Rate',
+                        'description': 'The rate to attack at during a spike.',
+                        'type': 'string',
+                    },
+                    'period': {
+                        'title': 'Period',
+                        'description': 'How often spikes occur.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'spike_duration': {
+                        'title': 'Spike Duration',
+                        'description': 'How long each spike lasts.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                },
+                'required': ['type'],
+            },
+            'ThroughputSearch': {
+                'title': 'ThroughputSearch',
+                'description': (
+                    'A search for the maximum throughput sustainable within a latency and error rate objective.\n\nThe rat'
+                    'e is probed with short attacks that grow exponentially from `start_rate` until the\nobjective is mis'
+                    'sed and is then bisected until the highest sustainable rate is known to\nwithin `tolerance`.'
+                ),
+                'type': 'object',
+                'properties': {
+                    'latency': {
+                        'title': 'Latency',
+                        'description': 'The latency objective at the percentile.',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'percentile': {
+                        'title': 'Percentile',
+                        'description': 'The latency percentile that the objective applies to.',
+                        'default': 99,
+                        'type': 'number',
+                    },
+                    'max_error_rate': {
+                        'title': 'Max Error Rate',
+                        'description': 'The maximum error rate percentage of the objective.',
+                        'default': 1.0,
+                        'minimum': 0,
+                        'maximum': 100,
+                        'type': 'number',
+                    },
+                    'start_rate': {
+                        'title': 'Start Rate',
+                        'description': 'The rate of the first probe.',
+                        'default': '10/1s',
+                        'type': 'string',
+                    },
+                    'max_rate': {
+                        'title': 'Max Rate',
+                        'description': 'The highest rate to probe.',
+                        'type': 'string',
+                    },
+                    'growth_factor': {
+                        'title': 'Growth Factor',
+                        'description': 'The factor to grow the rate by between probes until the objective is missed.',
+                        'default': 2.0,
+                        'exclusiveMinimum': 1,
+                        'type': 'number',
+                    },
+                    'tolerance': {
+                        'title': 'Tolerance',
+                        'description': 'The relative precision to find the maximum sustainable rate to.',
+                        'default': 0.05,
+                        'exclusiveMinimum': 0,
+                        'exclusiveMaximum': 1,
+                        'type': 'number',
+                    },
+                    'probe_duration': {
+                        'title': 'Probe Duration',
+                        'description': 'How long to attack at each probed rate.',
+                        'default': '10s',
+                        'type': 'string',
+                        'format': 'duration',
+                        'pattern': (
+                            '([\\d\\.]+y)?([\\d\\.]+mm)?(([\\d\\.]+w)?[\\d\\.]+d)?([\\d\\.]+h)?([\\d\\.]+m)?([\\d\\.]+s)?([\\d\\.]+ms)?([\\d\\.]+u'
+                            's)?([\\d\\.]+ns)?'
+                        ),
+                        'examples': [
+                            '300ms',
+                            '5m',
+                            '2h45m',
+                            '72h3m0.5s',
+                        ],
+                    },
+                    'max_probes': {
+                        'title': 'Max Probes',
+                        'description': 'The maximum number of probes to run.',
+                        'default': 20,
+                        'minimum': 1,
+                        'type': 'integer',
+                    },
+                },
+                'required': ['latency'],
+            },
             'VegetaConfiguration__other': {
                 'title': 'Vegeta Connector Settings (named other)',
                 'description': 'Configuration of the Vegeta connector',
@@ -1188,6 +1501,73 @@ class TestAssembly:
                             '72h3m0.5s',
                         ],
                     },
+                    'histograms': {
+                        'title': 'Histograms',
+                        'description': (
+                            'Build latency histograms in-process from the raw results of the attack instead of reading the repo'
+                            'rts of `vegeta report`.'
+                        ),
+                        'env_names': [
+                            'SERVO_OTHER_HISTOGRAMS',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/HistogramConfiguration',
+                            },
+                        ],
+                    },
+                    'shards': {
+                        'title': 'Shards',
+                        'description': (
+                            'Specifies the number of `vegeta attack` processes to split the rate and targets across. The raw res'
+                            'ults of sharded attacks are always aggregated in-process.'
+                        ),
+                        'default': 1,
+                        'minimum': 1,
+                        'env_names': [
+                            'SERVO_OTHER_SHARDS',
+                        ],
+                        'type': 'integer',
+                    },
+                    'pin_shards': {
+                        'title': 'Pin Shards',
+                        'description': 'Specifies whether to pin each shard to a single CPU core.',
+                        'default': False,
+                        'env_names': [
+                            'SERVO_OTHER_PIN_SHARDS',
+                        ],
+                        'type': 'boolean',
+                    },
+                    'profile': {
+                        'title': 'Profile',
+                        'description': (
+                            'Specifies a load profile to execute as successive attack segments instead of attacking at a constan'
+                            't rate.'
+                        ),
+                        'env_names': [
+                            'SERVO_OTHER_PROFILE',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/LoadProfile',
+                            },
+                        ],
+                    },
+                    'search': {
+                        'title': 'Search',
+                        'description': (
+                            'Specifies a search for the maximum sustainable throughput to run instead of attacking at a constant'
+                            ' rate.'
+                        ),
+                        'env_names': [
+                            'SERVO_OTHER_SEARCH',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/ThroughputSearch',
+                            },
+                        ],
+                    },
                 },
                 'required': ['rate'],
                 'additionalProperties': False,
@@ -1347,6 +1727,73 @@ class TestAssembly:
                             '72h3m0.5s',
                         ],
                     },
+                    'histograms': {
+                        'title': 'Histograms',
+                        'description': (
+                            'Build latency histograms in-process from the raw results of the attack instead of reading the repo'
+                            'rts of `vegeta report`.'
+                        ),
+                        'env_names': [
+                            'SERVO_VEGETA_HISTOGRAMS',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/HistogramConfiguration',
+                            },
+                        ],
+                    },
+                    'shards': {
+                        'title': 'Shards',
+                        'description': (
+                            'Specifies the number of `vegeta attack` processes to split the rate and targets across. The raw res'
+                            'ults of sharded attacks are always aggregated in-process.'
+                        ),
+                        'default': 1,
+                        'minimum': 1,
+                        'env_names': [
+                            'SERVO_VEGETA_SHARDS',
+                        ],
+                        'type': 'integer',
+                    },
+                    'pin_shards': {
+                        'title': 'Pin Shards',
+                        'description': 'Specifies whether to pin each shard to a single CPU core.',
+                        'default': False,
+                        'env_names': [
+                            'SERVO_VEGETA_PIN_SHARDS',
+                        ],
+                        'type': 'boolean',
+                    },
+                    'profile': {
+                        'title': 'Profile',
+                        'description': (
+                            'Specifies a load profile to execute as successive attack segments instead of attacking at a constan'
+                            't rate.'
+                        ),
+                        'env_names': [
+                            'SERVO_VEGETA_PROFILE',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/LoadProfile',
+                            },
+                        ],
+                    },
+                    'search': {
+                        'title': 'Search',
+                        'description': (
+                            'Specifies a search for the maximum sustainable throughput to run instead of attacking at a constant'
+                            ' rate.'
+                        ),
+                        'env_names': [
+                            'SERVO_VEGETA_SEARCH',
+                        ],
+                        'allOf': [
+                            {
+                                '$ref': '#/definitions/ThroughputSearch',
+                            },
+                        ],
+                    },
                 },
                 'required': ['rate'],
                 'additionalProperties': False,
@@ -8,6 +8,7 @@ import pytest_mock
 
 from servo.types import (
     Adjustment,
+    ColumnarTimeSeries,
     Control,
     DataPoint,
     Duration,
@@ -220,6 +221,22 @@ class TestDurationProgress:
         stub.assert_called()
         assert progress.progress == 100.0
 
+    async def test_watch_notifies_until_finished(self, progress) -> None:
+        updates = []
+        progress.duration = servo.Duration('5ms')
+        await asyncio.wait_for(progress.watch(updates.append, every=servo.Duration('1ms')), timeout=1)
+        assert updates and updates[-1] is progress
+        assert progress.finished
+        assert not [job for job in servo.repeating.scheduler().jobs if job.name == "DurationProgress.watch"]
+
+    async def test_watch_raises_notify_errors(self, progress) -> None:
+        def _notify(progress: servo.DurationProgress) -> None:
+            raise RuntimeError("progress report failed")
+
+        progress.duration = servo.Duration('1s')
+        with pytest.raises(RuntimeError, match="progress report failed"):
+            await asyncio.wait_for(progress.watch(_notify, every=servo.Duration('1ms')), timeout=1)
+
     async def test_context_manager(self, mocker: pytest_mock.MockerFixture) -> None:
         async with servo.DurationProgress('0.5ms') as progress:
             stub = mocker.stub()
@@ -922,6 +939,39 @@ class TestTimeSeries:
     def test_repr(self, time_series: TimeSeries) -> None:
         assert repr(time_series) == "TimeSeries(metric=Metric(name='throughput', unit=<Unit.requests_per_minute: 'rpm'>), data_points=[DataPoint(throughput (rpm), (2020-01-21 12:00:01, 31337.0)), DataPoint(throughput (rpm), (2020-01-21 12:10:01, 666.0)), DataPoint(throughput (rpm), (2020-01-21 12:20:01, 187.0)), DataPoint(throughput (rpm), (2020-01-21 12:30:01, 420.0)), DataPoint(throughput (rpm), (2020-01-21 12:40:01, 69.0))], id=None, annotation=None, metadata=None, timespan=(FakeDatetime(2020, 1, 21, 12, 0, 1), FakeDatetime(2020, 1, 21, 12, 40, 1)), duration=Duration('40m'))"
 
+class TestColumnarTimeSeries:
+    @pytest.fixture
+    def time_series(self) -> ColumnarTimeSeries:
+        metric = Metric("throughput", Unit.requests_per_minute)
+        return ColumnarTimeSeries(metric, [1579608001.0, 1579608601.0, 1579609201.0], [31337.0, 666.0, 187.0], id="a")
+
+    def test_len_does_not_materialize(self, time_series: ColumnarTimeSeries) -> None:
+        assert len(time_series) == 3
+        assert "data_points" not in time_series.__dict__
+
+    def test_iteration_materializes_data_points(self, time_series: ColumnarTimeSeries) -> None:
+        assert [data_point.value for data_point in time_series] == [31337.0, 666.0, 187.0]
+        assert time_series.data_points[0].time.timestamp() == 1579608001.0
+        assert time_series.data_points is time_series.data_points
+
+    def test_copies_remain_lazy(self, time_series: ColumnarTimeSeries) -> None:
+        copy = time_series.copy()
+        assert "data_points" not in copy.__dict__
+        assert copy.timestamps is time_series.timestamps
+
+    def test_measurement(self, time_series: ColumnarTimeSeries) -> None:
+        measurement = Measurement(readings=[time_series])
+        assert measurement.__opsani_repr__()["metrics"]["throughput"]["values"][0]["data"] == [
+            [1579608001, 31337.0], [1579608601, 666.0], [1579609201, 187.0]
+        ]
+
+    def test_serialization_includes_data_points(self, time_series: ColumnarTimeSeries) -> None:
+        assert len(time_series.dict()["data_points"]) == 3
+
+    def test_rejects_mismatched_columns(self) -> None:
+        with pytest.raises(ValueError, match="timestamps and values must be of equal length"):
+            ColumnarTimeSeries(Metric("throughput", Unit.requests_per_minute), [1.0], [])
+
 class TestDataPoint:
     @pytest.fixture
     @freezegun.freeze_time("2020-01-21 12:00:01")
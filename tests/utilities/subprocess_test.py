@@ -60,3 +60,26 @@ async def test_run_subprocess_timeout():
         "echo 'test'", stdout_callback=lambda m: output.append(m), timeout=10.0
     )
     assert output == ["test"]
+
+
+async def test_stream_subprocess_output_in_batches():
+    batches = []
+    # NOTE: Enough output to span multiple reads, ending without a newline
+    process = await asyncio.create_subprocess_shell(
+        "seq 1 50000; printf 'é…'", stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    status_code = await servo.utilities.subprocess.stream_subprocess_output(
+        process, stdout_batch_callback=batches.append
+    )
+    assert status_code == 0
+    assert len(batches) > 1
+    assert [line for batch in batches for line in batch] == [str(i) for i in range(1, 50001)] + ["é…"]
+
+
+async def test_stream_subprocess_output_callbacks_are_exclusive():
+    process = await asyncio.create_subprocess_shell("echo test", stdout=asyncio.subprocess.PIPE)
+    with pytest.raises(ValueError, match="mutually exclusive"):
+        await servo.utilities.subprocess.stream_subprocess_output(
+            process, stdout_callback=print, stdout_batch_callback=print
+        )
+    await process.wait()